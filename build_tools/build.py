@@ -209,6 +209,7 @@ GUI_CONFIG = BuildConfig(
         "src.excel_template_builder",
         "src.fuzzy_matcher",
         "src.hardware_info",
+        "src.history_database",
         "src.history_models",
         "src.history_store",
         "src.history_tab",
@@ -327,6 +328,7 @@ GUI_FULL_CONFIG = BuildConfig(
         "src.excel_template_builder",
         "src.fuzzy_matcher",
         "src.hardware_info",
+        "src.history_database",
         "src.history_models",
         "src.history_store",
         "src.history_tab",
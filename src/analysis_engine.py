@@ -11,12 +11,15 @@ import logging
 import os
 import re
 import shutil
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Optional, Callable, Dict, List, Tuple, Any
 from src.contract_uploader import ContractUploader, page_from_char_position
 from src.result_parser import ResultParser
 from src.analysis_models import AnalysisResult
+from src.session_manager import compute_input_hash, ai_client_identity
+from src.json_grammar import clause_response_schema, summary_map_schema
+from src.early_stop import is_not_found, starts_not_found, strip_preamble
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +37,45 @@ class PreparedContract:
     contract_type: str = ""  # "municipal" | "federal" | "state" | "private"
 
 
+@dataclass
+class CategoryRequest:
+    """Retrieved sections and prompt for one category, ready for inference."""
+    cat_key: str
+    section_key: str
+    display_name: str
+    input_hash: str
+    user_msg: str = ""
+    results: list = field(default_factory=list)
+    clause_location: str = "See contract"
+    clause_page: Optional[int] = None
+    knowledge_block: str = ""
+    # Set when retrieval already decided the outcome and no AI call is needed
+    early_result: Optional[Tuple[str, str, Any, str, str]] = None
+
+
+@dataclass
+class SharedSectionGroup:
+    """Categories retrieving the same top section, analyzed with one prompt."""
+    section_idx: int
+    requests: List[CategoryRequest]
+    results: list = field(default_factory=list)  # union of the members' sections, shared first
+    user_msg: str = ""
+
+    @property
+    def cat_keys(self) -> List[str]:
+        return [request.cat_key for request in self.requests]
+
+
+@dataclass
+class RevisionPlan:
+    """Which categories need fresh AI analysis after a contract revision."""
+    section_diff: object  # SectionDiff from ChangeComparator.compare_sections()
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # cat_key -> CategoryRequest for the new revision, reusable for inference
+    requests: Dict[str, Optional[CategoryRequest]] = field(default_factory=dict)
+
+
 class AnalysisEngine:
     """
     Orchestrates contract analysis workflow.
@@ -56,6 +98,9 @@ class AnalysisEngine:
         ai_backend: str = "local",
         api_key: str = None,
         claude_model: str = "claude-sonnet",
+        response_cache=None,
+        parallel_sequences: int = 1,
+        model_server_address: str = None,
     ):
         """
         Initialize Analysis Engine with local Llama model or Claude API.
@@ -69,6 +114,13 @@ class AnalysisEngine:
             ai_backend: "local" for Llama models, "claude" for Anthropic Claude API
             api_key: Anthropic API key (required when ai_backend="claude")
             claude_model: Claude model tier — "claude-sonnet" or "claude-opus"
+            response_cache: Optional ResponseCache; when given, generate() calls
+                            are memoized across runs
+            parallel_sequences: Requests the local model decodes together
+                                (1 = serial; see LocalModelClient)
+            model_server_address: Send local inference to this model server
+                                  instead of loading the model in-process
+                                  (see src.model_server)
 
         Raises:
             ValueError: If model cannot be loaded or API key is invalid
@@ -112,6 +164,18 @@ class AnalysisEngine:
                     f"Error: {e}\n\n"
                     "Check your API key and internet connection."
                 )
+        elif model_server_address:
+            logger.info(f"Using local model server at {model_server_address}")
+            from src.local_model_client import LocalModelClient
+
+            try:
+                self.ai_client = LocalModelClient(
+                    model_name=local_model_name,
+                    server_address=model_server_address,
+                )
+            except Exception as e:
+                logger.error(f"Failed to connect to model server: {e}")
+                raise ValueError(f"Failed to connect to the local model server.\n\nError: {e}")
         else:
             # Initialize local model
             logger.info(f"Using local model: {local_model_name}")
@@ -139,6 +203,7 @@ class AnalysisEngine:
                     ram_reserved_os_mb=ram_reserved_os_mb,
                     gpu_offload_layers=gpu_offload_layers,
                     gpu_backend=gpu_backend,
+                    parallel_sequences=parallel_sequences,
                 )
                 logger.info("Local model client initialized successfully")
             except Exception as e:
@@ -150,6 +215,11 @@ class AnalysisEngine:
                     "Settings → Manage Models → Download"
                 )
 
+        if response_cache is not None:
+            from src.response_cache import CachedAIClient
+            self.ai_client = CachedAIClient(self.ai_client, response_cache)
+            logger.info("AI response cache enabled at %s", response_cache.db.db_path)
+
         # Initialize knowledge store for RAG-based learning
         from src.knowledge_store import KnowledgeStore
         self.knowledge_store = KnowledgeStore()
@@ -306,17 +376,19 @@ class AnalysisEngine:
             indexed=indexed,
         )
 
-    def analyze_single_category(
+    def prepare_category_request(
         self,
         prepared: PreparedContract,
         cat_key: str,
         progress_callback: Optional[Callable[[str, int], None]] = None
-    ) -> Optional[Tuple[str, str, dict, str, str]]:
+    ) -> Optional[CategoryRequest]:
         """
-        Analyze a single clause category using tri-layer retrieval + AI.
+        Retrieve sections and build the AI prompt for one category.
 
-        Three retrieval layers (regex, keyword, TF-IDF) find the most relevant
-        contract sections. The AI reads the actual section text and summarizes.
+        This is the cheap half of analyze_single_category(). The returned
+        request carries a hash of everything the AI call would see, so a
+        resumed run can tell whether a saved result is still valid before
+        spending time on inference.
 
         Args:
             prepared: PreparedContract from prepare_contract()
@@ -324,8 +396,7 @@ class AnalysisEngine:
             progress_callback: Optional progress callback
 
         Returns:
-            Tuple of (section_key, display_name, clause_block_dict, prompt_sent, ai_response)
-            or None if not found
+            CategoryRequest, or None for an unknown category
         """
         mapping = self.CATEGORY_MAP.get(cat_key)
         if not mapping:
@@ -333,7 +404,13 @@ class AnalysisEngine:
             return None
 
         section_key, display_name = mapping
-        logger.info(f"Analyzing single category: {display_name} ({cat_key})")
+
+        def early(reason: str) -> CategoryRequest:
+            return CategoryRequest(
+                cat_key=cat_key, section_key=section_key, display_name=display_name,
+                input_hash=compute_input_hash(cat_key, reason),
+                early_result=(section_key, display_name, None, reason, "NOT FOUND"),
+            )
 
         if progress_callback:
             progress_callback(f"Retrieving sections for {display_name}...", 10)
@@ -346,7 +423,7 @@ class AnalysisEngine:
         results = retriever.retrieve_for_category(cat_key, top_k=5)
         if not results:
             logger.info(f"No sections retrieved for {cat_key}")
-            return (section_key, display_name, None, "(no sections retrieved)", "NOT FOUND")
+            return early("(no sections retrieved)")
 
         # Minimum retrieval confidence — if the best section was only found
         # by a single weak layer (TF-IDF alone) with a low score, skip the AI
@@ -356,11 +433,11 @@ class AnalysisEngine:
         if top.combined_score < 0.025 and len(top.found_by) == 1:
             logger.info(f"Low confidence retrieval for {cat_key} "
                        f"(score={top.combined_score:.4f}, layers={top.found_by}), skipping AI")
-            return (section_key, display_name, None, "(low retrieval confidence)", "NOT FOUND")
+            return early("(low retrieval confidence)")
 
         section_text = retriever.format_sections_for_ai(results)
         if not section_text or not section_text.strip():
-            return (section_key, display_name, None, "(empty section text)", "NOT FOUND")
+            return early("(empty section text)")
 
         # Derive clause location from the top retrieved section header
         clause_location = top.section_header.upper() if top.section_header else "See contract"
@@ -375,9 +452,6 @@ class AnalysisEngine:
         if section_block:
             clause_page = page_from_char_position(prepared.indexed.contract_text, section_block.start_pos)
 
-        if progress_callback:
-            progress_callback(f"AI analyzing {display_name}...", 30)
-
         from analyzer.template_patterns import CATEGORY_SEARCH_DESCRIPTIONS
         cat_desc = CATEGORY_SEARCH_DESCRIPTIONS.get(cat_key, display_name)
 
@@ -408,58 +482,135 @@ class AnalysisEngine:
             f'{section_text}'
         )
 
+        return CategoryRequest(
+            cat_key=cat_key,
+            section_key=section_key,
+            display_name=display_name,
+            input_hash=compute_input_hash(
+                ai_client_identity(self.ai_client), self._PER_ITEM_SYSTEM_MSG,
+                user_msg, clause_location, clause_page
+            ),
+            user_msg=user_msg,
+            results=results,
+            clause_location=clause_location,
+            clause_page=clause_page,
+            knowledge_block=knowledge_block,
+        )
+
+    def plan_revision(
+        self,
+        old_prepared: PreparedContract,
+        new_prepared: PreparedContract,
+        cat_keys: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[str, int], None]] = None
+    ) -> RevisionPlan:
+        """
+        Decide which categories a new contract revision requires re-analyzing.
+
+        Diffs the two versions section by section (no AI calls), then runs
+        retrieval for each category against both. A category is unchanged
+        when both versions retrieve the same sections, in the same order,
+        and none of them changed; its previous result can be kept. Anything
+        else (an edited, added or removed section, or different retrieval)
+        marks the category as changed.
+
+        Args:
+            old_prepared: PreparedContract of the previous revision
+            new_prepared: PreparedContract of the new revision
+            cat_keys: Categories to plan for (default: all of CATEGORY_MAP)
+            progress_callback: Optional progress callback
+
+        Returns:
+            RevisionPlan with the section diff, changed/unchanged categories
+            and the new revision's category requests
+        """
+        from src.change_comparator import ChangeComparator
+
+        if progress_callback:
+            progress_callback("Comparing contract sections...", 5)
+
+        section_diff = ChangeComparator().compare_sections(
+            old_prepared.contract_text, old_prepared.section_index,
+            new_prepared.contract_text, new_prepared.section_index
+        )
+        unchanged_map = section_diff.unchanged_section_map()
+
+        plan = RevisionPlan(section_diff=section_diff)
+        for cat_key in (cat_keys if cat_keys is not None else list(self.CATEGORY_MAP)):
+            old_request = self.prepare_category_request(old_prepared, cat_key)
+            new_request = self.prepare_category_request(new_prepared, cat_key)
+            plan.requests[cat_key] = new_request
+            if old_request is None or new_request is None:
+                continue
+
+            if old_request.early_result is not None or new_request.early_result is not None:
+                same = old_request.early_result == new_request.early_result
+            else:
+                old_ids = [unchanged_map.get(r.section_idx) for r in old_request.results]
+                new_ids = [r.section_idx for r in new_request.results]
+                same = old_ids == new_ids
+
+            (plan.unchanged if same else plan.changed).append(cat_key)
+
+        logger.info(
+            "Revision plan: %d categories changed, %d unchanged (sections: %s)",
+            len(plan.changed), len(plan.unchanged), section_diff.change_summary
+        )
+        return plan
+
+    def analyze_single_category(
+        self,
+        prepared: PreparedContract,
+        cat_key: str,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        request: Optional[CategoryRequest] = None
+    ) -> Optional[Tuple[str, str, dict, str, str]]:
+        """
+        Analyze a single clause category using tri-layer retrieval + AI.
+
+        Three retrieval layers (regex, keyword, TF-IDF) find the most relevant
+        contract sections. The AI reads the actual section text and summarizes.
+
+        Args:
+            prepared: PreparedContract from prepare_contract()
+            cat_key: Category key from CATEGORY_MAP (e.g., "change_orders")
+            progress_callback: Optional progress callback
+            request: Request from prepare_category_request(), to avoid
+                retrieving the same sections twice
+
+        Returns:
+            Tuple of (section_key, display_name, clause_block_dict, prompt_sent, ai_response)
+            or None if not found
+        """
+        if request is None:
+            request = self.prepare_category_request(prepared, cat_key, progress_callback)
+        if request is None:
+            return None
+        if request.early_result is not None:
+            return request.early_result
+
+        section_key, display_name = request.section_key, request.display_name
+        results, user_msg = request.results, request.user_msg
+        clause_location, clause_page = request.clause_location, request.clause_page
+        logger.info(f"Analyzing single category: {display_name} ({cat_key})")
+
+        if progress_callback:
+            progress_callback(f"AI analyzing {display_name}...", 30)
+
         try:
+            # Generation is cancelled as soon as the answer starts with NOT FOUND
             raw = self.ai_client.generate(
                 self._PER_ITEM_SYSTEM_MSG,
                 user_msg,
                 progress_callback=progress_callback,
-                max_tokens=600
+                max_tokens=self._PER_ITEM_MAX_TOKENS,
+                stop_condition=starts_not_found
             )
 
-            clause_summary = raw.strip() if raw else ""
-
-            # Strip common preamble the small model likes to add
-            clause_summary = re.sub(
-                r'^(?:Here is a summary.*?:\s*\n*)',
-                '', clause_summary, flags=re.IGNORECASE
-            ).strip()
-
-            # Check if AI says not found — still return prompt/response so GUI can log them
-            summary_upper = clause_summary.upper()
-            stripped_text = re.sub(r'[^A-Z]', '', summary_upper)
-            # Check first ~150 chars for NOT FOUND signals to avoid false matches
-            # in long summaries that mention "not found" incidentally
-            first_chunk = summary_upper[:150]
-            is_not_found = (
-                summary_upper.startswith("NOT FOUND")
-                or summary_upper.startswith("N/A")
-                or summary_upper.startswith("NONE FOUND")
-                or summary_upper.startswith("NO RELEVANT")
-                or summary_upper.startswith("THIS CLAUSE IS NOT")
-                or "NOT FOUND" in first_chunk
-                or (stripped_text.count("NOTFOUND") >= 1 and
-                    len(stripped_text.replace("NOTFOUND", "")) < 50)
-            )
-            if is_not_found:
-                logger.info(f"AI determined {cat_key} not present in retrieved sections")
-                return (section_key, display_name, None, user_msg, raw)
-
-            if clause_summary:
-                # Parse multi-clause responses separated by |||
-                clause_blocks = self._parse_multi_clause_response(
-                    clause_summary, results, prepared, clause_location, clause_page
-                )
-                if clause_blocks:
-                    logger.info(f"FOUND: {display_name} ({len(clause_blocks)} instance(s))")
-                    if progress_callback:
-                        progress_callback(f"Analyzed {display_name}!", 100)
-                    # Return list of clause_blocks via the object slot
-                    return (section_key, display_name, clause_blocks, user_msg, raw)
-            else:
-                fallback = self._regex_fallback_for_category(prepared, cat_key, section_key, display_name)
-                if fallback:
-                    return (*fallback, user_msg, raw or "(empty)")
-                return None
+            result = self.interpret_category_response(prepared, request, raw)
+            if result and result[2] is not None and progress_callback:
+                progress_callback(f"Analyzed {display_name}!", 100)
+            return result
 
         except Exception as e:
             logger.warning(f"AI failed for {cat_key}: {e}")
@@ -468,6 +619,287 @@ class AnalysisEngine:
                 return (*fallback, user_msg, f"(AI error: {e})")
             return None
 
+    def interpret_category_response(
+        self,
+        prepared: PreparedContract,
+        request: CategoryRequest,
+        raw: Optional[str]
+    ) -> Optional[Tuple[str, str, Any, str, str]]:
+        """
+        Turn the AI's answer to a category request into a category result.
+
+        Shared by analyze_single_category() and batch analysis, whose
+        answers arrive later from the Message Batches API.
+
+        Args:
+            prepared: PreparedContract the request was built from
+            request: CategoryRequest from prepare_category_request()
+            raw: Raw AI response text
+
+        Returns:
+            Tuple of (section_key, display_name, clause_blocks, prompt_sent, ai_response);
+            clause_blocks is None when the AI found nothing. None if there is
+            neither an answer nor a regex fallback.
+        """
+        cat_key, section_key, display_name = request.cat_key, request.section_key, request.display_name
+        results, user_msg = request.results, request.user_msg
+        clause_location, clause_page = request.clause_location, request.clause_page
+
+        # Strip common preamble the small model likes to add
+        clause_summary = strip_preamble(raw)
+
+        # Check if AI says not found — still return prompt/response so GUI can log them
+        if is_not_found(clause_summary):
+            logger.info(f"AI determined {cat_key} not present in retrieved sections")
+            return (section_key, display_name, None, user_msg, raw)
+
+        if clause_summary:
+            # Parse multi-clause responses separated by |||
+            clause_blocks = self._parse_multi_clause_response(
+                clause_summary, results, prepared, clause_location, clause_page
+            )
+            if clause_blocks:
+                logger.info(f"FOUND: {display_name} ({len(clause_blocks)} instance(s))")
+                # Return list of clause_blocks via the object slot
+                return (section_key, display_name, clause_blocks, user_msg, raw)
+            return None
+
+        fallback = self._regex_fallback_for_category(prepared, cat_key, section_key, display_name)
+        if fallback:
+            return (*fallback, user_msg, raw or "(empty)")
+        return None
+
+    @staticmethod
+    def section_category_map(
+        requests: List[CategoryRequest],
+        top_ranks: Optional[int] = None
+    ) -> Dict[int, List[str]]:
+        """
+        Map each retrieved section to the categories that retrieved it.
+
+        Args:
+            requests: Requests from prepare_category_request()
+            top_ranks: Only count each category's first top_ranks sections
+                (default: all retrieved sections)
+
+        Returns:
+            Dict of {section_idx: [cat_key, ...]} in request order
+        """
+        section_map: Dict[int, List[str]] = {}
+        for request in requests:
+            if request is None or request.early_result is not None:
+                continue
+            for r in request.results[:top_ranks]:
+                cats = section_map.setdefault(r.section_idx, [])
+                if request.cat_key not in cats:
+                    cats.append(request.cat_key)
+        return section_map
+
+    def group_shared_sections(
+        self,
+        prepared: PreparedContract,
+        requests: List[CategoryRequest]
+    ) -> List[SharedSectionGroup]:
+        """
+        Group categories that lead with the same contract section.
+
+        Different categories often retrieve the same top sections (e.g. a
+        GENERAL CONDITIONS article is the best hit for change orders, delays
+        and claims). Categories sharing one of their first
+        _SHARED_SECTION_TOP_RANKS sections with at least
+        _SHARED_SECTION_MIN_CATEGORIES - 1 others are grouped, most-shared
+        section first, so the section is read once for all of them by
+        analyze_shared_group(). Categories not grouped are analyzed alone.
+
+        Each group's prompt and answers must fit the AI client's context
+        window (see _fit_shared_group()); section text is shortened, then
+        categories dropped, until they do.
+
+        Args:
+            prepared: PreparedContract the requests were built from
+            requests: Requests from prepare_category_request(); requests
+                with an early result are ignored
+
+        Returns:
+            List of SharedSectionGroup (possibly empty)
+        """
+        by_key = {r.cat_key: r for r in requests if r is not None and r.early_result is None}
+        section_map = self.section_category_map(list(by_key.values()), self._SHARED_SECTION_TOP_RANKS)
+
+        from src.document_retriever import DocumentRetriever
+        retriever = DocumentRetriever()
+        budget = self._prompt_budget()
+
+        groups: List[SharedSectionGroup] = []
+        assigned = set()
+        while True:
+            candidates = [
+                (section_idx, [k for k in cats if k not in assigned])
+                for section_idx, cats in section_map.items()
+            ]
+            candidates = [c for c in candidates if len(c[1]) >= self._SHARED_SECTION_MIN_CATEGORIES]
+            if not candidates:
+                break
+            section_idx, cat_keys = max(candidates, key=lambda c: len(c[1]))
+
+            for start in range(0, len(cat_keys), self._SHARED_GROUP_MAX_CATEGORIES):
+                chunk = cat_keys[start:start + self._SHARED_GROUP_MAX_CATEGORIES]
+                if len(chunk) < self._SHARED_SECTION_MIN_CATEGORIES:
+                    continue
+                group = self._fit_shared_group(
+                    section_idx, [by_key[k] for k in chunk], retriever, budget
+                )
+                if group is None:
+                    continue
+                groups.append(group)
+                assigned.update(group.cat_keys)
+            # Leftovers of an oversized section stay available to other sections
+            section_map.pop(section_idx)
+
+        if groups:
+            logger.info(
+                "Shared sections: %d categories in %d multi-category calls (%d calls saved)",
+                len(assigned), len(groups), len(assigned) - len(groups)
+            )
+        return groups
+
+    def _fit_shared_group(
+        self,
+        section_idx: int,
+        requests: List[CategoryRequest],
+        retriever,
+        budget: Tuple[int, Callable[[str], int], int]
+    ) -> Optional[SharedSectionGroup]:
+        """
+        Build a SharedSectionGroup whose prompt and answers fit the context window.
+
+        The section text is shortened (down to _SHARED_SECTION_MIN_CHARS)
+        until the prompt, reserved tokens and _PER_ITEM_MAX_TOKENS per
+        category fit. If it still does not fit, the last category is dropped
+        and analyzed alone.
+
+        Args:
+            section_idx: The shared section
+            requests: Candidate members, best first
+            retriever: DocumentRetriever used to format the sections
+            budget: Result of _prompt_budget()
+
+        Returns:
+            Fitted group, or None if fewer than _SHARED_SECTION_MIN_CATEGORIES fit
+        """
+        context_tokens, count_tokens, reserved_tokens = budget
+        while len(requests) >= self._SHARED_SECTION_MIN_CATEGORIES:
+            group = SharedSectionGroup(section_idx=section_idx, requests=requests)
+            group.results = self._union_results(group)
+            room = (
+                context_tokens - reserved_tokens
+                - self._PER_ITEM_MAX_TOKENS * len(requests)
+                - count_tokens(self._SHARED_SECTION_SYSTEM_MSG + self._build_shared_section_prompt(group, ""))
+            )
+            max_chars = self._SHARED_SECTION_MAX_CHARS
+            while room > 0 and max_chars >= self._SHARED_SECTION_MIN_CHARS:
+                section_text = retriever.format_sections_for_ai(group.results, max_chars=max_chars)
+                used = count_tokens(section_text)
+                if used <= room:
+                    group.user_msg = self._build_shared_section_prompt(group, section_text)
+                    return group
+                max_chars = min(max_chars - 1, int(max_chars * room / used * 0.95))
+            requests = requests[:-1]
+        return None
+
+    @staticmethod
+    def _union_results(group: SharedSectionGroup) -> list:
+        """The members' retrieved sections, each once: shared section, then by best rank."""
+        best = {}
+        for request in group.requests:
+            for rank, r in enumerate(request.results):
+                if r.section_idx not in best or rank < best[r.section_idx][0]:
+                    best[r.section_idx] = (rank, r)
+        ordered = sorted(best.values(), key=lambda item: (item[1].section_idx != group.section_idx, item[0]))
+        return [r for _, r in ordered]
+
+    def _build_shared_section_prompt(self, group: SharedSectionGroup, section_text: str) -> str:
+        """Build the multi-category prompt for a SharedSectionGroup."""
+        from analyzer.template_patterns import CATEGORY_SEARCH_DESCRIPTIONS
+
+        category_lines = []
+        knowledge_blocks = []
+        for request in group.requests:
+            cat_desc = CATEGORY_SEARCH_DESCRIPTIONS.get(request.cat_key, request.display_name)
+            category_lines.append(f'- {request.cat_key}: {cat_desc}')
+            if request.knowledge_block:
+                knowledge_blocks.append(f'({request.cat_key}) {request.knowledge_block}')
+
+        return (
+            'Categories:\n' + '\n'.join(category_lines) + '\n\n'
+            + ''.join(knowledge_blocks)
+            + 'Below are sections from a construction contract. Answer separately for '
+            'each category above. If there are multiple distinct clauses about a '
+            'category in different sections, describe each separately with ||| between '
+            'them, prefixing each with its section header in [brackets].\n'
+            'Only describe what is written in the text below.\n'
+            'If the text below is completely unrelated to a category, its answer must '
+            'be exactly "NOT FOUND".\n'
+            'Return a JSON object mapping each category key to its answer:\n'
+            + '{' + ', '.join(f'"{k}": "..."' for k in group.cat_keys) + '}\n\n'
+            + section_text
+        )
+
+    def analyze_shared_group(
+        self,
+        prepared: PreparedContract,
+        group: SharedSectionGroup,
+        progress_callback: Optional[Callable[[str, int], None]] = None
+    ) -> Dict[str, Optional[Tuple[str, str, Any, str, str]]]:
+        """
+        Analyze all categories of a SharedSectionGroup with one AI call.
+
+        The answer is split back into one result per category, in the same
+        form analyze_single_category() returns. Categories missing from the
+        answer, or all of them if the call fails, are analyzed individually.
+
+        Args:
+            prepared: PreparedContract from prepare_contract()
+            group: Group from group_shared_sections()
+            progress_callback: Optional progress callback
+
+        Returns:
+            Dict of {cat_key: result tuple or None}
+        """
+        names = ", ".join(r.display_name for r in group.requests)
+        logger.info(f"Analyzing shared section {group.section_idx} for: {names}")
+        if progress_callback:
+            progress_callback(f"AI analyzing {names}...", 30)
+
+        answers = {}
+        try:
+            raw = self.ai_client.generate(
+                self._SHARED_SECTION_SYSTEM_MSG,
+                group.user_msg,
+                progress_callback=progress_callback,
+                max_tokens=self._PER_ITEM_MAX_TOKENS * len(group.requests),
+                json_schema=summary_map_schema(group.cat_keys)
+            )
+            parsed = self._parse_ai_json_response(raw) if raw else {}
+            if isinstance(parsed, dict):
+                answers = {k: v for k, v in parsed.items() if isinstance(v, str) and v.strip()}
+        except Exception as e:
+            logger.warning(f"Multi-category call failed for {group.cat_keys}: {e}")
+
+        outcomes = {}
+        for request in group.requests:
+            if request.cat_key in answers:
+                shared_request = replace(request, results=group.results, user_msg=group.user_msg)
+                outcomes[request.cat_key] = self.interpret_category_response(
+                    prepared, shared_request, answers[request.cat_key]
+                )
+            else:
+                logger.info(f"No shared-section answer for {request.cat_key}, analyzing alone")
+                outcomes[request.cat_key] = self.analyze_single_category(
+                    prepared, request.cat_key, request=request
+                )
+        return outcomes
+
     def _parse_multi_clause_response(
         self,
         ai_text: str,
@@ -1326,6 +1758,40 @@ class AnalysisEngine:
         "Just write plain flowing sentences about what the contract says."
     )
 
+    # Output limit for one per-item category answer
+    _PER_ITEM_MAX_TOKENS = 600
+
+    # For _per_item_ai_analysis(), whose answers are constrained to
+    # clause_response_schema() on local models
+    _PER_ITEM_JSON_SYSTEM_MSG = (
+        "You are a construction contract analyst. "
+        "You will receive contract text and the clause type to find. "
+        "Answer with ONE JSON object in the format the request shows and nothing else. "
+        "Set found to false if the clause is not in the text. "
+        "Write clause_summary as 1-3 plain sentences about what the contract says, "
+        "without bullet points, numbered lists or preamble."
+    )
+
+    _SHARED_SECTION_SYSTEM_MSG = (
+        "You are a construction contract analyst. "
+        "You will receive several labeled sections from a contract and a list of categories. "
+        "For each category, if there is ONE relevant clause, write a 1-3 sentence summary. "
+        "If there are MULTIPLE DISTINCT clauses about the category in DIFFERENT sections, "
+        "write a separate 1-3 sentence summary for each and separate them with |||. "
+        "Prefix each summary with the section header in square brackets, e.g. [ARTICLE 5 - NOTICES]. "
+        "Do NOT use bullet points, numbered lists, bold text, or sub-categories. "
+        "Return ONLY a JSON object mapping each category key to its answer."
+    )
+
+    # Categories sharing one of their first _SHARED_SECTION_TOP_RANKS sections
+    # are analyzed together once at least _SHARED_SECTION_MIN_CATEGORIES do
+    _SHARED_SECTION_TOP_RANKS = 2
+    _SHARED_SECTION_MIN_CATEGORIES = 3
+    _SHARED_GROUP_MAX_CATEGORIES = 4
+    _SHARED_SECTION_MAX_CHARS = 16000
+    # Below this much section text a group is split rather than shortened further
+    _SHARED_SECTION_MIN_CHARS = 3000
+
     _BATCH_SUMMARIZE_SYSTEM_MSG = (
         "You are a construction contract clause analyst. "
         "You will receive multiple clause excerpts, each labeled with an ID like ### clause_id. "
@@ -1336,8 +1802,49 @@ class AnalysisEngine:
         "Return ONLY the JSON object, no other text."
     )
 
-    # Default batch size for summarization — adjusted dynamically for small context windows
-    _SUMMARIZE_BATCH_SIZE = 4
+    # Packing budget for batch summarization. Models without a known context
+    # window (API backends) are packed against _API_PACKING_CONTEXT.
+    _API_PACKING_CONTEXT = 32768
+    _SUMMARY_OUTPUT_TOKENS = 160       # reserved per category answer
+    _MAX_BATCH_OUTPUT_TOKENS = 4096    # cap on one call's answer
+    _PROMPT_OVERHEAD_TOKENS = 64       # chat template and JSON framing
+    _BATCH_SECTIONS_PER_CATEGORY = 3
+
+    def _client_context_tokens(self) -> int:
+        """Context window of one request to the AI client, or 0 if unknown (API backends)."""
+        # Per-request context: with parallel decoding n_ctx is split across sequences
+        ctx_size = getattr(self.ai_client, 'context_tokens', None)
+        if not isinstance(ctx_size, int):
+            ctx_size = getattr(self.ai_client, 'n_ctx', 0)
+        return ctx_size if isinstance(ctx_size, int) and ctx_size > 0 else 0
+
+    def _prompt_budget(self) -> Tuple[int, Callable[[str], int], int]:
+        """
+        Context window, token counter and reserved tokens for sizing prompts.
+
+        Local clients measure with the model's tokenizer; API backends have
+        no known window and are sized against _API_PACKING_CONTEXT with
+        estimated counts.
+
+        Returns:
+            Tuple of (context_tokens, count_tokens, reserved_tokens), where
+            reserved_tokens covers the chat template and the client's safety
+            headroom
+        """
+        from src.prompt_packing import estimate_tokens
+
+        ctx_size = self._client_context_tokens()
+        count_tokens = getattr(self.ai_client, 'count_tokens', None)
+        if not ctx_size or not callable(count_tokens):
+            count_tokens = estimate_tokens
+        safety_tokens = getattr(self.ai_client, 'CONTEXT_SAFETY_TOKENS', 256)
+        if not isinstance(safety_tokens, int):
+            safety_tokens = 256
+        return (
+            ctx_size or self._API_PACKING_CONTEXT,
+            count_tokens,
+            self._PROMPT_OVERHEAD_TOKENS + safety_tokens,
+        )
 
     def _hybrid_batch_analysis(
         self,
@@ -1351,6 +1858,10 @@ class AnalysisEngine:
 
         Uses DocumentRetriever to find the right sections for each category,
         then sends actual section text to AI in batches for summarization.
+        Batches are packed by PromptPacker: each call holds as many
+        categories as fit the model's context window (measured prompt plus
+        reserved output tokens), and a section retrieved for several
+        categories in the same call is sent only once.
 
         Args:
             extracted_clauses: Output of extract_all_template_clauses()
@@ -1361,8 +1872,8 @@ class AnalysisEngine:
         Returns:
             response dict matching the comprehensive schema
         """
-        import json as _json
         from src.document_retriever import DocumentRetriever
+        from src.prompt_packing import PackItem, PromptPacker
 
         # Set up retriever with the indexed contract
         retriever = DocumentRetriever()
@@ -1371,51 +1882,74 @@ class AnalysisEngine:
         # --- Retrieve sections for ALL categories that have regex hits ---
         all_cat_keys = [ck for ck in extracted_clauses if extracted_clauses[ck]]
         total = len(all_cat_keys)
-        # Adapt batch size to available context window
-        batch_size = self._SUMMARIZE_BATCH_SIZE
-        ctx_size = getattr(self.ai_client, 'n_ctx', 0)
-        if ctx_size and ctx_size <= 8192:
-            batch_size = 2  # Smaller batches for 8K context to avoid overflow
-        logger.info(f"Batch analysis: {total} categories to summarize, "
-                     f"batch size {batch_size} (ctx={ctx_size or 'api'})")
+        ctx_size = self._client_context_tokens()
+        logger.info(f"Batch analysis: {total} categories to summarize (ctx={ctx_size or 'api'})")
 
         # --- Retrieve + derive locations per category ---
-        retrieved_texts = {}  # cat_key -> section text for AI
+        retrieved_texts = {}  # cat_key -> section text (regex-only fallback summary)
         locations = {}  # cat_key -> location string
+        items = []  # PackItem per category
 
         if progress_callback:
             progress_callback("Retrieving relevant sections...", 15)
 
-        # Limit per-category text for small context windows
-        max_chars_per_cat = 1000 if (ctx_size and ctx_size <= 8192) else 1500
-
         for cat_key in all_cat_keys:
+            clause_id = f"{cat_key}_0"
+            preamble = ""
+            # Inject knowledge context (400 token budget in batch mode)
+            if self.knowledge_store and self.knowledge_store.entry_count() > 0:
+                k_entries = self.knowledge_store.retrieve_for_category(cat_key)
+                k_context = self.knowledge_store.format_for_prompt(k_entries, max_tokens=400)
+                if k_context:
+                    preamble = f"[Past knowledge: {k_context}]"
+
             if indexed_contract is not None:
-                results = retriever.retrieve_for_category(cat_key, top_k=3)
+                results = retriever.retrieve_for_category(cat_key, top_k=self._BATCH_SECTIONS_PER_CATEGORY)
                 if results:
-                    retrieved_texts[cat_key] = retriever.format_sections_for_ai(results, max_chars=max_chars_per_cat)
+                    sections = []
+                    for r in results:
+                        header = r.section_header.upper() if r.section_header else f"Section {r.section_idx}"
+                        sections.append((f"section:{r.section_idx}", f"--- {header} ---\n{r.section_text.strip()}"))
+                    items.append(PackItem(key=clause_id, sections=sections, preamble=preamble))
+                    retrieved_texts[cat_key] = results[0].section_text.strip()
                     locations[cat_key] = results[0].section_header.upper() if results[0].section_header else "See contract"
                     continue
 
             # Fallback if no retriever or no results: use regex context
             best = extracted_clauses[cat_key][0]
             ctx = best.get('context', best.get('matched_text', ''))
-            if len(ctx) > max_chars_per_cat:
-                ctx = ctx[:max_chars_per_cat]
+            items.append(PackItem(key=clause_id, sections=[(f"regex:{cat_key}", ctx)], preamble=preamble))
             retrieved_texts[cat_key] = ctx
             pos = best.get('position', 0)
             locations[cat_key] = self._get_location_from_section_index(pos, section_index)
 
         logger.info(f"Retrieved section text for {len(retrieved_texts)} categories")
 
+        # --- Pack categories into context-sized batches ---
+        instructions = (
+            "Summarize each clause below in 1-3 sentences. "
+            "State the key terms, obligations, conditions, and deadlines. "
+            "A contract section shared by several clauses is shown once and "
+            "referred to by its [S#] label afterwards.\n\n"
+        )
+        context_tokens, count_tokens, reserved_tokens = self._prompt_budget()
+        packer = PromptPacker(
+            context_tokens=context_tokens,
+            fixed_tokens=(
+                count_tokens(self._BATCH_SUMMARIZE_SYSTEM_MSG + instructions) + reserved_tokens
+            ),
+            item_output_tokens=self._SUMMARY_OUTPUT_TOKENS,
+            max_output_tokens=self._MAX_BATCH_OUTPUT_TOKENS,
+            count_tokens=count_tokens,
+        )
+        batches = packer.pack(items)
+        total_batches = len(batches)
+        logger.info(f"Packed {len(items)} categories into {total_batches} batches")
+
         # --- Batch-summarize with AI ---
-        summaries = {}  # cat_key -> summary string
-        cat_list = list(retrieved_texts.keys())
-        total_batches = (len(cat_list) + batch_size - 1) // batch_size
+        summaries = {}  # clause_id -> summary string
 
-        for batch_start in range(0, len(cat_list), batch_size):
-            sub_keys = cat_list[batch_start:batch_start + batch_size]
-            batch_num = batch_start // batch_size + 1
+        for batch_num, batch in enumerate(batches, 1):
             pct = 25 + int(55 * batch_num / max(total_batches, 1))
 
             if progress_callback:
@@ -1424,24 +1958,10 @@ class AnalysisEngine:
                 )
 
             # Build prompt — each category's retrieved section text keyed by ID
-            batch_ids = []
-            clause_blocks = []
-            for cat_key in sub_keys:
-                clause_id = f"{cat_key}_0"
-                text = retrieved_texts[cat_key]
-                # Inject knowledge context (400 token budget in batch mode)
-                if self.knowledge_store and self.knowledge_store.entry_count() > 0:
-                    k_entries = self.knowledge_store.retrieve_for_category(cat_key)
-                    k_context = self.knowledge_store.format_for_prompt(k_entries, max_tokens=400)
-                    if k_context:
-                        text = f"[Past knowledge: {k_context}]\n\n{text}"
-                clause_blocks.append(f"### {clause_id}\n{text}")
-                batch_ids.append(clause_id)
-
+            batch_ids = batch.keys
             user_msg = (
-                "Summarize each clause below in 1-3 sentences. "
-                "State the key terms, obligations, conditions, and deadlines.\n\n"
-                + "\n\n".join(clause_blocks)
+                instructions
+                + packer.render(batch)
                 + "\n\nReturn a JSON object mapping each clause ID to its summary:\n"
                 + "{" + ", ".join(f'"{cid}": "summary..."' for cid in batch_ids) + "}"
             )
@@ -1450,7 +1970,8 @@ class AnalysisEngine:
                 raw = self.ai_client.generate(
                     self._BATCH_SUMMARIZE_SYSTEM_MSG, user_msg,
                     progress_callback=None,
-                    max_tokens=2000
+                    max_tokens=batch.output_tokens,
+                    json_schema=summary_map_schema(batch_ids)
                 )
 
                 if not raw:
@@ -1659,9 +2180,10 @@ class AnalysisEngine:
             # 4. Call AI
             try:
                 raw = self.ai_client.generate(
-                    self._PER_ITEM_SYSTEM_MSG,
+                    self._PER_ITEM_JSON_SYSTEM_MSG,
                     user_msg,
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback,
+                    json_schema=clause_response_schema()
                 )
                 ai_result = self._parse_ai_json_response(raw)
 
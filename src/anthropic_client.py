@@ -9,11 +9,41 @@ work without modification.
 import json
 import logging
 import re
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional
 
+from src.early_stop import STOP_CHECK_TOKENS, EarlyStopStats
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class StreamedResponse:
+    """
+    A Claude message assembled from its streamed events.
+
+    Attributes:
+        content: Content blocks as API dicts ({"type": "text", "text": ...}
+                 or {"type": "tool_use", "id": ..., "name": ..., "input": {...}})
+        stop_reason: Why generation stopped ("end_turn", "tool_use", ...,
+                     or "stop_condition" when cancelled by the caller)
+        usage: Token counts reported by the stream
+        first_token_seconds: Time from request to the first text delta
+                             (None if the response had no text)
+    """
+    content: List[Dict[str, Any]] = field(default_factory=list)
+    stop_reason: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    first_token_seconds: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        """Concatenated text of all text blocks."""
+        return "".join(block["text"] for block in self.content if block["type"] == "text")
+
+
 class AnthropicClient:
     """Client for contract analysis using the Anthropic Claude API."""
 
@@ -26,24 +56,48 @@ class AnthropicClient:
     MAX_TOKENS_ANALYSIS = 4096
     MAX_TOKENS_QUERY = 2048
 
+    # Prompt caching: marks the end of a prefix the API may reuse for ~5 minutes.
+    # Prefixes shorter than the model's minimum (1024 tokens) are not cached.
+    CACHE_CONTROL = {"type": "ephemeral"}
+
+    # Cache pricing relative to the base input price
+    CACHE_WRITE_MULTIPLIER = 1.25
+    CACHE_READ_MULTIPLIER = 0.10
+
+    # Message Batches API price relative to regular calls
+    BATCH_PRICE_MULTIPLIER = 0.5
+
     def __init__(
         self,
         api_key: str,
         model_name: str = "claude-sonnet",
+        base_url: Optional[str] = None,
     ):
         """
         Args:
             api_key: Anthropic API key.
             model_name: Model tier — 'claude-sonnet' or 'claude-opus'.
+            base_url: Optional API endpoint override (default: Anthropic's API).
         """
         import anthropic
 
         self._model_name = model_name
         self._model_id = self.MODELS.get(model_name, self.MODELS["claude-sonnet"])
-        self._client = anthropic.Anthropic(api_key=api_key)
+        self._client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
         self._api_key = api_key
         self._loaded = False
 
+        # Token usage reported by the API since this client was created
+        self._usage_lock = threading.Lock()
+        # Calls cut short by a stop condition (see generate(stop_condition=...))
+        self.early_stop_stats = EarlyStopStats()
+        self.usage_totals: Dict[str, int] = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+
         logger.info("AnthropicClient initialized with model: %s (%s)", model_name, self._model_id)
 
     # =========================================================================
@@ -113,17 +167,36 @@ class AnthropicClient:
         user_message: str,
         progress_callback: Optional[Callable[[str, int], None]] = None,
         max_tokens: Optional[int] = None,
+        token_callback: Optional[Callable[[str], None]] = None,
+        cached_context: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+        stop_condition: Optional[Callable[[str], bool]] = None,
     ) -> str:
         """Generate a response from Claude.
 
         This is the core method called by AnalysisEngine for every AI task:
         batch analysis, single category, supplemental risks, overview, etc.
+        The response is streamed; text is passed to token_callback as it
+        arrives.
+
+        The system prompt, and cached_context when given, are marked for
+        prompt caching, so calls sharing them are billed at the cache read
+        rate after the first.
 
         Args:
             system_message: System prompt.
             user_message: User prompt.
             progress_callback: Optional callback(status_str, percent_int).
             max_tokens: Maximum output tokens (default: MAX_TOKENS_ANALYSIS).
+            token_callback: Optional callback(text) for streamed text deltas.
+            cached_context: Optional stable text (e.g. contract text) sent
+                before user_message as its own cached block.
+            json_schema: Accepted for interface compatibility with
+                LocalModelClient; Claude follows the JSON format given in
+                the prompt without grammar constraints.
+            stop_condition: Optional predicate on the text streamed so far,
+                checked for the first STOP_CHECK_TOKENS deltas; the stream is
+                closed as soon as it returns True.
 
         Returns:
             Raw text response from Claude.
@@ -135,23 +208,35 @@ class AnthropicClient:
             progress_callback("Calling Claude API...", 30)
 
         try:
-            response = self._client.messages.create(
-                model=self._model_id,
+            if cached_context:
+                content = [
+                    self._cached_block(cached_context),
+                    {"type": "text", "text": user_message},
+                ]
+            else:
+                content = user_message
+
+            response = self._stream_message(
+                token_callback=token_callback,
+                stop_condition=stop_condition,
                 max_tokens=max_tokens,
-                system=system_message,
-                messages=[{"role": "user", "content": user_message}],
+                messages=[{"role": "user", "content": content}],
+                **self._system_params(system_message),
             )
 
-            text = response.content[0].text
+            text = response.text
 
             if progress_callback:
                 progress_callback("Response received", 90)
 
             logger.debug(
-                "Claude response: %d chars, %d input tokens, %d output tokens",
+                "Claude response: %d chars, %d input tokens (%d cache read, %d cache write), "
+                "%d output tokens",
                 len(text),
-                response.usage.input_tokens,
-                response.usage.output_tokens,
+                response.usage.get("input_tokens", 0),
+                response.usage.get("cache_read_input_tokens", 0),
+                response.usage.get("cache_creation_input_tokens", 0),
+                response.usage.get("output_tokens", 0),
             )
 
             return text
@@ -218,7 +303,8 @@ class AnthropicClient:
             "Cite specific sections and page numbers when possible."
         )
 
-        # Build context from contract text and any prior analysis
+        # Contract text and prior analysis stay the same for the whole chat,
+        # so they form the cached prefix; history and question follow it
         context_parts = []
         if context.get("contract_text"):
             # Truncate if very long to stay within reasonable token limits
@@ -232,21 +318,24 @@ class AnthropicClient:
             if len(analysis_json) < 20000:
                 context_parts.append(f"\nPRIOR ANALYSIS:\n{analysis_json}")
 
+        question_parts = []
+
         # Include conversation history
         if conversation_history:
             history = "\n".join(
                 f"{m['role'].upper()}: {m['content']}"
                 for m in conversation_history[-6:]
             )
-            context_parts.append(f"\nCONVERSATION:\n{history}")
+            question_parts.append(f"\nCONVERSATION:\n{history}")
 
-        context_parts.append(f"\nQUESTION: {query}")
-        user_message = "\n\n".join(context_parts)
+        question_parts.append(f"\nQUESTION: {query}")
+        user_message = "\n\n".join(question_parts)
 
         return self.generate(
             system_message=system_msg,
             user_message=user_message,
             max_tokens=self.MAX_TOKENS_QUERY,
+            cached_context="\n\n".join(context_parts) or None,
         )
 
     def process_with_tools(
@@ -261,26 +350,36 @@ class AnthropicClient:
         """Process a user message with Claude's native tool_use.
 
         Replaces the ReAct text-parsing approach used by LocalModelClient
-        with Claude's structured tool calling API.
+        with Claude's structured tool calling API. Each step is streamed:
+        text reaches token_callback as it is generated and tool_use blocks
+        are assembled from their input deltas.
+
+        Tool definitions, the system prompt, the skill prompt and the
+        conversation so far are cached, so each iteration only pays full
+        price for the newest tool results.
 
         Args:
             user_message: The user's chat message.
             tool_registry: ToolRegistry instance with available tools.
             conversation_history: Prior messages for context.
             progress_callback: Optional progress callback.
-            token_callback: Optional token streaming callback (not used for API).
+            token_callback: Optional callback(text) for streamed text deltas.
             max_iterations: Max tool call rounds (default 5).
 
         Returns:
             List of message dicts: [{"role": ..., "content": ...}, ...]
         """
-        # Build tool definitions for Claude's tool_use API
+        # Build tool definitions for Claude's tool_use API; the breakpoint on
+        # the last tool caches all definitions
         tools = self._build_tool_definitions(tool_registry)
+        if tools:
+            tools[-1]["cache_control"] = self.CACHE_CONTROL
 
-        # Build system prompt
+        # System and skill prompts are identical on every iteration and
+        # message, so each gets its own cache breakpoint
         system_prompt = tool_registry.get_system_prompt()
         skill_prompt = tool_registry.get_skill_prompt("all")
-        full_system = f"{system_prompt}\n\n{skill_prompt}"
+        system_params = self._system_params(system_prompt, skill_prompt)
 
         # Build messages for Claude API
         api_messages = []
@@ -303,12 +402,12 @@ class AnthropicClient:
                 progress_callback(f"Thinking... (step {iteration})", int(20 + iteration * 15))
 
             try:
-                response = self._client.messages.create(
-                    model=self._model_id,
+                response = self._stream_message(
+                    token_callback=token_callback,
                     max_tokens=4096,
-                    system=full_system,
-                    messages=api_messages,
+                    messages=self._with_cache_breakpoint(api_messages),
                     tools=tools,
+                    **system_params,
                 )
             except Exception as e:
                 result_messages.append({
@@ -319,23 +418,19 @@ class AnthropicClient:
 
             # Process response content blocks
             assistant_content = []
-            has_tool_use = False
+            tool_results = []
 
             for block in response.content:
-                if block.type == "text":
-                    text = block.text.strip()
+                if block["type"] == "text":
+                    text = block["text"].strip()
                     if text:
                         assistant_content.append(block)
-                        # Stream text to token_callback if available
-                        if token_callback:
-                            token_callback(text)
                         result_messages.append({"role": "assistant", "content": text})
 
-                elif block.type == "tool_use":
-                    has_tool_use = True
+                elif block["type"] == "tool_use":
                     assistant_content.append(block)
-                    tool_name = block.name
-                    tool_args = block.input
+                    tool_name = block["name"]
+                    tool_args = block["input"]
 
                     result_messages.append({
                         "role": "tool_call",
@@ -348,28 +443,19 @@ class AnthropicClient:
                     # Execute the tool
                     observation = tool_registry.execute(tool_name, tool_args)
                     result_messages.append({"role": "observation", "content": observation})
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": block["id"],
+                        "content": observation,
+                    })
 
             # If no tool use, we're done
-            if not has_tool_use:
+            if not tool_results:
                 break
 
             # Feed tool results back to Claude for next iteration
             api_messages.append({"role": "assistant", "content": assistant_content})
-
-            # Build tool_result messages for all tool_use blocks
-            tool_results = []
-            for block in assistant_content:
-                if hasattr(block, 'type') and block.type == "tool_use":
-                    # Find the corresponding observation
-                    obs = tool_registry.execute(block.name, block.input)
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": obs,
-                    })
-
-            if tool_results:
-                api_messages.append({"role": "user", "content": tool_results})
+            api_messages.append({"role": "user", "content": tool_results})
 
             # Check stop reason
             if response.stop_reason == "end_turn":
@@ -387,22 +473,146 @@ class AnthropicClient:
 
         return result_messages
 
+    # =========================================================================
+    # Message Batches
+    # =========================================================================
+
+    def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """Submit single-turn prompts as one Message Batches API job.
+
+        Batches are processed asynchronously (usually within the hour, at
+        most 24 hours) at half the price of regular calls. The system prompt
+        is marked for prompt caching as in generate().
+
+        Args:
+            requests: Dicts with 'custom_id', 'system_message',
+                'user_message' and optional 'max_tokens'
+                (default: MAX_TOKENS_ANALYSIS).
+
+        Returns:
+            Batch id to pass to get_batch() and get_batch_results().
+        """
+        batch_requests = [
+            {
+                "custom_id": request["custom_id"],
+                "params": {
+                    "model": self._model_id,
+                    "max_tokens": request.get("max_tokens") or self.MAX_TOKENS_ANALYSIS,
+                    "messages": [{"role": "user", "content": request["user_message"]}],
+                    **self._system_params(request["system_message"]),
+                },
+            }
+            for request in requests
+        ]
+
+        try:
+            batch = self._client.messages.batches.create(requests=batch_requests)
+        except Exception as e:
+            logger.error("Batch submission failed: %s", e)
+            raise RuntimeError(f"Claude batch submission failed: {e}") from e
+
+        logger.info("Submitted batch %s with %d requests", batch.id, len(batch_requests))
+        return batch.id
+
+    def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Get the processing state of a batch.
+
+        Args:
+            batch_id: Id returned by submit_batch().
+
+        Returns:
+            Dict with 'id', 'processing_status' ("in_progress", "canceling"
+            or "ended") and 'request_counts' (processing, succeeded, errored,
+            canceled, expired).
+        """
+        try:
+            batch = self._client.messages.batches.retrieve(batch_id)
+        except Exception as e:
+            logger.error("Batch status check failed: %s", e)
+            raise RuntimeError(f"Claude batch status check failed: {e}") from e
+
+        counts = batch.request_counts
+        return {
+            "id": batch.id,
+            "processing_status": batch.processing_status,
+            "request_counts": {
+                name: getattr(counts, name, 0)
+                for name in ("processing", "succeeded", "errored", "canceled", "expired")
+            },
+        }
+
+    def get_batch_results(self, batch_id: str) -> Dict[str, Optional[str]]:
+        """Download the answers of an ended batch.
+
+        Args:
+            batch_id: Id returned by submit_batch().
+
+        Returns:
+            Dict mapping custom_id to response text, or None for requests
+            that errored, were canceled or expired.
+        """
+        results: Dict[str, Optional[str]] = {}
+        try:
+            for entry in self._client.messages.batches.results(batch_id):
+                if entry.result.type != "succeeded":
+                    logger.warning("Batch request %s %s", entry.custom_id, entry.result.type)
+                    results[entry.custom_id] = None
+                    continue
+
+                message = entry.result.message
+                results[entry.custom_id] = "".join(
+                    block.text for block in message.content if block.type == "text"
+                )
+                usage = message.usage
+                self._record_usage({
+                    name: getattr(usage, name, 0) or 0 for name in self.usage_totals
+                })
+        except Exception as e:
+            logger.error("Batch result download failed: %s", e)
+            raise RuntimeError(f"Claude batch result download failed: {e}") from e
+
+        return results
+
     # =========================================================================
     # Cost Estimation
     # =========================================================================
 
-    def estimate_cost(self, input_chars: int, max_output_tokens: int = 4096) -> Dict[str, float]:
-        """Estimate API cost for an analysis call.
+    def estimate_cost(
+        self,
+        input_chars: int,
+        max_output_tokens: int = 4096,
+        cached_chars: int = 0,
+        calls: int = 1,
+        batch: bool = False,
+    ) -> Dict[str, float]:
+        """Estimate API cost for an analysis run.
+
+        With prompt caching, a prefix shared by several calls (system prompt,
+        contract context) is written to the cache once at a premium and then
+        read at a discount. The defaults describe a single uncached call.
 
         Args:
-            input_chars: Number of input characters.
-            max_output_tokens: Expected output tokens.
+            input_chars: Number of input characters per call.
+            max_output_tokens: Expected output tokens per call.
+            cached_chars: Characters of input_chars that form a shared,
+                cached prefix.
+            calls: Number of calls sharing that prefix.
+            batch: Price the calls as a Message Batches job.
 
         Returns:
-            Dict with 'input_cost', 'output_cost', 'total_cost' in USD.
+            Dict with token estimates, 'input_cost', 'cache_write_cost',
+            'cache_read_cost', 'output_cost', 'total_cost' in USD, and the
+            cache token counts the API has reported so far
+            ('cache_write_tokens', 'cache_read_tokens').
         """
+        calls = max(1, calls)
+        cached_chars = min(max(0, cached_chars), input_chars)
+
         # Approximate: ~4 chars per token for English text
-        input_tokens = input_chars / 4
+        uncached_tokens = (input_chars - cached_chars) / 4 * calls
+        cache_write_tokens = cached_chars / 4
+        cache_read_tokens = cached_chars / 4 * (calls - 1)
+        output_tokens = max_output_tokens * calls
 
         # Pricing per 1M tokens (as of 2025)
         if "sonnet" in self._model_id:
@@ -412,22 +622,189 @@ class AnthropicClient:
             input_price = 15.00   # $15/MTok input
             output_price = 75.00  # $75/MTok output
 
-        input_cost = (input_tokens / 1_000_000) * input_price
-        output_cost = (max_output_tokens / 1_000_000) * output_price
-        total = input_cost + output_cost
+        input_cost = (uncached_tokens / 1_000_000) * input_price
+        cache_write_cost = (cache_write_tokens / 1_000_000) * input_price * self.CACHE_WRITE_MULTIPLIER
+        cache_read_cost = (cache_read_tokens / 1_000_000) * input_price * self.CACHE_READ_MULTIPLIER
+        output_cost = (output_tokens / 1_000_000) * output_price
+        if batch:
+            input_cost *= self.BATCH_PRICE_MULTIPLIER
+            cache_write_cost *= self.BATCH_PRICE_MULTIPLIER
+            cache_read_cost *= self.BATCH_PRICE_MULTIPLIER
+            output_cost *= self.BATCH_PRICE_MULTIPLIER
+        total = input_cost + cache_write_cost + cache_read_cost + output_cost
+
+        with self._usage_lock:
+            reported = dict(self.usage_totals)
 
         return {
-            "input_tokens_est": int(input_tokens),
-            "output_tokens_est": max_output_tokens,
+            "input_tokens_est": int(uncached_tokens + cache_write_tokens + cache_read_tokens),
+            "output_tokens_est": output_tokens,
+            "cache_write_tokens_est": int(cache_write_tokens),
+            "cache_read_tokens_est": int(cache_read_tokens),
             "input_cost": round(input_cost, 4),
+            "cache_write_cost": round(cache_write_cost, 4),
+            "cache_read_cost": round(cache_read_cost, 4),
             "output_cost": round(output_cost, 4),
             "total_cost": round(total, 4),
+            "cache_write_tokens": reported["cache_creation_input_tokens"],
+            "cache_read_tokens": reported["cache_read_input_tokens"],
         }
 
     # =========================================================================
     # Internal helpers
     # =========================================================================
 
+    def _stream_message(
+        self,
+        token_callback: Optional[Callable[[str], None]] = None,
+        stop_condition: Optional[Callable[[str], bool]] = None,
+        **params: Any,
+    ) -> StreamedResponse:
+        """Make a streaming Messages API call and assemble the response.
+
+        Text deltas are forwarded to token_callback as they arrive. Tool
+        input arrives as partial JSON and is parsed when its block closes.
+        If stop_condition returns True for the text so far, the stream is
+        closed and the partial response returned.
+
+        Args:
+            token_callback: Optional callback(text) for streamed text deltas.
+            stop_condition: Optional predicate that cancels the stream early.
+            **params: Messages API parameters other than model and stream.
+
+        Returns:
+            StreamedResponse with the assembled content blocks.
+        """
+        response = StreamedResponse()
+        blocks: Dict[int, Dict[str, Any]] = {}
+        partial_json: Dict[int, List[str]] = {}
+        start = time.perf_counter()
+        text_deltas = 0
+        stopped_early = False
+
+        stream = self._client.messages.create(model=self._model_id, stream=True, **params)
+        for event in stream:
+            if event.type == "message_start":
+                usage = event.message.usage
+                for name in ("input_tokens", "cache_creation_input_tokens",
+                             "cache_read_input_tokens"):
+                    response.usage[name] = getattr(usage, name, 0) or 0
+
+            elif event.type == "content_block_start":
+                block = event.content_block
+                if block.type == "text":
+                    blocks[event.index] = {"type": "text", "text": block.text or ""}
+                elif block.type == "tool_use":
+                    blocks[event.index] = {
+                        "type": "tool_use", "id": block.id, "name": block.name, "input": {},
+                    }
+                    partial_json[event.index] = []
+
+            elif event.type == "content_block_delta":
+                delta = event.delta
+                if delta.type == "text_delta" and event.index in blocks:
+                    if response.first_token_seconds is None:
+                        response.first_token_seconds = time.perf_counter() - start
+                    blocks[event.index]["text"] += delta.text
+                    text_deltas += 1
+                    if token_callback and delta.text:
+                        token_callback(delta.text)
+                    if (stop_condition and text_deltas <= STOP_CHECK_TOKENS
+                            and stop_condition(blocks[event.index]["text"])):
+                        stopped_early = True
+                        break
+                elif delta.type == "input_json_delta" and event.index in partial_json:
+                    partial_json[event.index].append(delta.partial_json)
+
+            elif event.type == "content_block_stop":
+                if event.index in partial_json:
+                    raw = "".join(partial_json.pop(event.index))
+                    blocks[event.index]["input"] = json.loads(raw) if raw else {}
+
+            elif event.type == "message_delta":
+                response.stop_reason = event.delta.stop_reason
+                if event.usage is not None:
+                    response.usage["output_tokens"] = event.usage.output_tokens
+
+        response.content = [blocks[index] for index in sorted(blocks)]
+
+        if stopped_early:
+            stream.close()
+            response.stop_reason = "stop_condition"
+            # The final usage event never arrives; estimate ~4 chars per token
+            response.usage["output_tokens"] = max(1, len(response.text) // 4)
+            self.early_stop_stats.record_aborted(
+                response.usage["output_tokens"], params.get("max_tokens", self.MAX_TOKENS_ANALYSIS),
+                time.perf_counter() - start - response.first_token_seconds,
+            )
+            logger.info("Claude stream stopped early after %d chars", len(response.text))
+        elif stop_condition:
+            self.early_stop_stats.record_completed(response.usage.get("output_tokens", 0))
+
+        self._record_usage(response.usage)
+
+        if response.first_token_seconds is not None:
+            logger.info(
+                "Claude stream: first token after %.2fs, complete after %.2fs",
+                response.first_token_seconds,
+                time.perf_counter() - start,
+            )
+
+        return response
+
+    def _record_usage(self, usage: Dict[str, int]) -> None:
+        """Add one response's token counts to usage_totals."""
+        with self._usage_lock:
+            for name in self.usage_totals:
+                self.usage_totals[name] += usage.get(name, 0)
+
+    def _cached_block(self, text: str) -> Dict[str, Any]:
+        """Build a text content block ending a cacheable prefix."""
+        return {"type": "text", "text": text, "cache_control": self.CACHE_CONTROL}
+
+    def _system_params(self, *texts: str) -> Dict[str, Any]:
+        """Build the system parameter with one cached block per prompt text.
+
+        Empty texts (e.g. a skill prompt whose files are missing) are left
+        out, because the API rejects an empty text block with cache_control.
+
+        Args:
+            *texts: System prompt parts, in order.
+
+        Returns:
+            {"system": blocks}, or {} if every text is empty.
+        """
+        blocks = [self._cached_block(text) for text in texts if text]
+        return {"system": blocks} if blocks else {}
+
+    def _with_cache_breakpoint(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return messages with a cache breakpoint on the last content block.
+
+        Only the newest message carries one, so the request stays within the
+        API's limit of four breakpoints as the tool loop grows. Earlier
+        messages are passed through unchanged and reads still hit the cache
+        written by the previous iteration.
+
+        Args:
+            messages: API messages; not modified.
+
+        Returns:
+            New list whose last message has a copied, marked final block.
+        """
+        if not messages:
+            return messages
+
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            blocks = [{"type": "text", "text": content}]
+        else:
+            blocks = [dict(block) for block in content]
+        if not blocks:
+            return messages
+        blocks[-1]["cache_control"] = self.CACHE_CONTROL
+        return messages[:-1] + [{**last, "content": blocks}]
+
     def _build_tool_definitions(self, tool_registry) -> List[Dict[str, Any]]:
         """Convert ToolRegistry tools to Claude API tool definitions."""
         tools = []
@@ -0,0 +1,406 @@
+"""
+Batch Analysis Module
+
+Offline bulk analysis through the Anthropic Message Batches API. Every
+category prompt for every contract in a project goes out as one batch,
+which the API processes within 24 hours at half the price of regular
+calls. The batch id and the map from request ids back to contracts and
+categories are kept in the project's .cr2a/batches/ folder, so a job
+submitted before closing the app (or a crash) can be polled and collected
+later.
+
+Collected answers go through the same interpretation as live per-category
+analysis and are assembled with AnalysisEngine.build_comprehensive_result().
+"""
+
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.analysis_engine import AnalysisEngine, PreparedContract
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalysisError(Exception):
+    """Exception raised for batch analysis errors."""
+    pass
+
+
+@dataclass
+class BatchJob:
+    """
+    A submitted batch and what is needed to map its answers back.
+
+    Attributes:
+        batch_id: Id assigned by the Message Batches API
+        model: Model identifier the batch was submitted with
+        created_at: ISO timestamp of submission
+        status: "submitted", "ended" (answers downloaded) or "collected"
+                (results built)
+        contracts: File paths of the contracts in the batch
+        cat_keys: Categories analyzed for every contract
+        requests: {custom_id: {"file_path", "cat_key", "input_hash"}}
+        results: {custom_id: response text, or None if the request failed}
+        request_counts: Last reported counts by request state
+        failed: custom_ids that errored, expired or were canceled; collect()
+                analyzed them live
+    """
+    batch_id: str
+    model: str
+    created_at: str
+    status: str = "submitted"
+    contracts: List[str] = field(default_factory=list)
+    cat_keys: List[str] = field(default_factory=list)
+    requests: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    results: Dict[str, Optional[str]] = field(default_factory=dict)
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BatchJob':
+        """
+        Create a BatchJob from a dictionary written by to_dict().
+
+        Args:
+            data: Dictionary representation
+
+        Returns:
+            BatchJob instance
+        """
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+
+class BatchJobTracker:
+    """
+    Persists BatchJob records as JSON files in .cr2a/batches/.
+
+    Files are written atomically (temp file + rename) so an interrupted save
+    never leaves a half-written job behind.
+    """
+
+    def __init__(self, storage_root: Path):
+        """
+        Initialize tracker.
+
+        Args:
+            storage_root: Project .cr2a/ directory (ProjectStorage.storage_root)
+        """
+        self.batches_dir = Path(storage_root) / "batches"
+
+    def _job_path(self, batch_id: str) -> Path:
+        return self.batches_dir / f"{batch_id}.json"
+
+    def save(self, job: BatchJob) -> None:
+        """
+        Write a job record.
+
+        Args:
+            job: Job to save
+
+        Raises:
+            BatchAnalysisError: If the record cannot be written
+        """
+        path = self._job_path(job.batch_id)
+        temp_path = path.with_suffix(".tmp")
+        try:
+            self.batches_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f, ensure_ascii=False, indent=2)
+            temp_path.replace(path)
+        except OSError as e:
+            raise BatchAnalysisError(f"Failed to save batch job {job.batch_id}: {e}")
+
+    def load(self, batch_id: str) -> BatchJob:
+        """
+        Read a job record.
+
+        Args:
+            batch_id: Batch id
+
+        Returns:
+            BatchJob
+
+        Raises:
+            BatchAnalysisError: If the record is missing or unreadable
+        """
+        path = self._job_path(batch_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return BatchJob.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            raise BatchAnalysisError(f"Failed to load batch job {batch_id}: {e}")
+
+    def jobs(self) -> List[BatchJob]:
+        """
+        Get all readable job records, oldest first.
+
+        Returns:
+            List of BatchJob
+        """
+        if not self.batches_dir.exists():
+            return []
+
+        jobs = []
+        for path in self.batches_dir.glob("*.json"):
+            try:
+                jobs.append(self.load(path.stem))
+            except BatchAnalysisError as e:
+                logger.warning("Skipping batch job record: %s", e)
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def pending(self) -> List[BatchJob]:
+        """
+        Get jobs whose results have not been collected yet, oldest first.
+
+        Returns:
+            List of BatchJob
+        """
+        return [job for job in self.jobs() if job.status != "collected"]
+
+
+class BatchAnalysisRunner:
+    """
+    Submits, polls and collects batch analyses for an AnalysisEngine.
+
+    The engine's AI client must support the Message Batches API
+    (AnthropicClient.submit_batch/get_batch/get_batch_results).
+    """
+
+    def __init__(self, engine: AnalysisEngine, tracker: BatchJobTracker):
+        """
+        Args:
+            engine: AnalysisEngine using the Claude backend
+            tracker: Where job records are kept
+
+        Raises:
+            BatchAnalysisError: If the AI client cannot submit batches
+        """
+        if not hasattr(engine.ai_client, "submit_batch"):
+            raise BatchAnalysisError(
+                "Batch analysis requires the Claude API backend."
+            )
+        self.engine = engine
+        self.tracker = tracker
+
+    def submit(
+        self,
+        prepared_contracts: List[PreparedContract],
+        cat_keys: Optional[List[str]] = None
+    ) -> BatchJob:
+        """
+        Submit every category prompt for every contract as one batch.
+
+        Categories that retrieval already settles (no relevant sections)
+        are left out; collect() derives them again without an AI call.
+
+        Args:
+            prepared_contracts: Contracts from AnalysisEngine.prepare_contract()
+            cat_keys: Categories to analyze (default: all of CATEGORY_MAP)
+
+        Returns:
+            Saved BatchJob
+
+        Raises:
+            BatchAnalysisError: If there is nothing to submit or submission fails
+        """
+        cat_keys = list(cat_keys) if cat_keys is not None else list(self.engine.CATEGORY_MAP)
+
+        batch_requests = []
+        request_map = {}
+        for index, prepared in enumerate(prepared_contracts):
+            for cat_key in cat_keys:
+                request = self.engine.prepare_category_request(prepared, cat_key)
+                if request is None or request.early_result is not None:
+                    continue
+
+                custom_id = f"c{index:03d}-{cat_key}"
+                batch_requests.append({
+                    "custom_id": custom_id,
+                    "system_message": self.engine._PER_ITEM_SYSTEM_MSG,
+                    "user_message": request.user_msg,
+                    "max_tokens": self.engine._PER_ITEM_MAX_TOKENS,
+                })
+                request_map[custom_id] = {
+                    "file_path": prepared.file_path,
+                    "cat_key": cat_key,
+                    "input_hash": request.input_hash,
+                }
+
+        if not batch_requests:
+            raise BatchAnalysisError("No category prompts to submit")
+
+        try:
+            batch_id = self.engine.ai_client.submit_batch(batch_requests)
+        except Exception as e:
+            raise BatchAnalysisError(f"Batch submission failed: {e}")
+
+        job = BatchJob(
+            batch_id=batch_id,
+            model=str(self.engine.ai_client.model),
+            created_at=datetime.now().isoformat(),
+            contracts=[prepared.file_path for prepared in prepared_contracts],
+            cat_keys=cat_keys,
+            requests=request_map,
+        )
+        self.tracker.save(job)
+        logger.info("Batch %s submitted: %d requests for %d contracts",
+                    batch_id, len(batch_requests), len(prepared_contracts))
+        return job
+
+    def refresh(self, job: BatchJob) -> BatchJob:
+        """
+        Poll a submitted job once, downloading its answers if it has ended.
+
+        Args:
+            job: Job from submit() or BatchJobTracker
+
+        Returns:
+            The same job, updated and saved
+
+        Raises:
+            BatchAnalysisError: If the API cannot be reached
+        """
+        if job.status != "submitted":
+            return job
+
+        try:
+            batch = self.engine.ai_client.get_batch(job.batch_id)
+            job.request_counts = batch["request_counts"]
+            if batch["processing_status"] == "ended":
+                job.results = self.engine.ai_client.get_batch_results(job.batch_id)
+                job.status = "ended"
+        except Exception as e:
+            raise BatchAnalysisError(f"Failed to poll batch {job.batch_id}: {e}")
+
+        self.tracker.save(job)
+        logger.info("Batch %s: %s %s", job.batch_id, job.status, job.request_counts)
+        return job
+
+    def wait(
+        self,
+        job: BatchJob,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> BatchJob:
+        """
+        Poll a job until its answers are downloaded.
+
+        Args:
+            job: Job from submit() or BatchJobTracker
+            poll_interval: Seconds between polls
+            timeout: Give up after this many seconds (None = wait indefinitely)
+            progress_callback: Optional callback(status_message, percent)
+            sleep: Sleep function (replaceable in tests)
+
+        Returns:
+            The job, with status "ended" or later
+
+        Raises:
+            BatchAnalysisError: On timeout or polling failure
+        """
+        start = time.monotonic()
+        while True:
+            self.refresh(job)
+            if job.status != "submitted":
+                return job
+
+            if progress_callback:
+                total = sum(job.request_counts.values()) or len(job.requests)
+                done = total - job.request_counts.get("processing", total)
+                progress_callback(
+                    f"Batch {job.batch_id}: {done}/{total} requests processed",
+                    int(done * 100 / total) if total else 0
+                )
+
+            if timeout is not None and time.monotonic() - start >= timeout:
+                raise BatchAnalysisError(
+                    f"Batch {job.batch_id} still processing after {timeout:.0f}s"
+                )
+            sleep(poll_interval)
+
+    def collect(
+        self,
+        job: BatchJob,
+        prepared_contracts: List[PreparedContract]
+    ) -> Dict[str, 'ComprehensiveAnalysisResult']:
+        """
+        Build analysis results from an ended job's answers.
+
+        Each category's request is rebuilt and its input hash compared with
+        the submitted one. Categories whose prompt changed since submission
+        (edited contract, different knowledge base) are analyzed live
+        instead of using the stale answer, and so are requests that errored,
+        expired or were canceled (recorded in job.failed).
+
+        Args:
+            job: Job with status "ended" (or "collected", to rebuild)
+            prepared_contracts: The job's contracts, prepared again
+
+        Returns:
+            Dict of {file_path: ComprehensiveAnalysisResult}
+
+        Raises:
+            BatchAnalysisError: If the job's answers are not downloaded yet
+        """
+        if job.status == "submitted":
+            raise BatchAnalysisError(f"Batch {job.batch_id} has not ended yet")
+
+        custom_ids = {
+            (entry["file_path"], entry["cat_key"]): custom_id
+            for custom_id, entry in job.requests.items()
+        }
+
+        analyses = {}
+        failed = []
+        for prepared in prepared_contracts:
+            category_results = {}
+            for cat_key in job.cat_keys:
+                request = self.engine.prepare_category_request(prepared, cat_key)
+                if request is None:
+                    continue
+
+                custom_id = custom_ids.get((prepared.file_path, cat_key))
+                if request.early_result is not None:
+                    result = request.early_result
+                elif custom_id is None or job.requests[custom_id]["input_hash"] != request.input_hash:
+                    logger.info("Prompt for %s changed since batch submission, analyzing live",
+                                cat_key)
+                    result = self.engine.analyze_single_category(prepared, cat_key, request=request)
+                elif job.results.get(custom_id) is None:
+                    logger.info("Batch request for %s failed, analyzing live", cat_key)
+                    failed.append(custom_id)
+                    result = self.engine.analyze_single_category(prepared, cat_key, request=request)
+                else:
+                    result = self.engine.interpret_category_response(
+                        prepared, request, job.results.get(custom_id)
+                    )
+
+                if result and result[2]:
+                    blocks = result[2]
+                    # Keep the first instance as the category's result, as the GUI does
+                    category_results[cat_key] = blocks[0] if isinstance(blocks, list) else blocks
+
+            analyses[prepared.file_path] = self.engine.build_comprehensive_result(
+                prepared, category_results
+            )
+
+        job.failed = failed
+        job.status = "collected"
+        self.tracker.save(job)
+        if failed:
+            logger.warning("Batch %s: %d of %d requests failed and were analyzed live",
+                           job.batch_id, len(failed), len(job.requests))
+        logger.info("Batch %s collected: %d contracts", job.batch_id, len(analyses))
+        return analyses
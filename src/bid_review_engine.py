@@ -35,6 +35,8 @@ from src.bid_review_models import (
 )
 from src.analysis_models import ContractMetadata
 from src.contract_uploader import page_from_char_position
+from src.json_grammar import bid_item_response_schema
+from src.session_manager import compute_input_hash, ai_client_identity
 
 logger = logging.getLogger(__name__)
 
@@ -137,26 +139,7 @@ class BidReviewEngine:
 
         section_key, display_name = BID_ITEM_MAP[item_key]
         description = BID_ITEM_DESCRIPTIONS.get(item_key, display_name)
-
-        # Gather context: regex matches + keyword search fallback + section fallback
-        context_parts = []
-        regex_matches = prepared.regex_results.get(item_key, [])
-        self._last_keyword_positions = []  # Reset for this item
-
-        if regex_matches:
-            for match in regex_matches[:3]:  # Top 3 matches
-                context_parts.append(match["context"])
-        else:
-            # Fallback: keyword search in full text
-            context_parts = self._keyword_search(
-                prepared.contract_text, item_key, display_name
-            )
-
-        if not context_parts:
-            # Last resort: send a relevant section of the document based on item type
-            context_parts = self._section_fallback(
-                prepared.contract_text, section_key
-            )
+        context_parts, regex_matches, regex_hint = self._gather_item_context(prepared, item_key)
 
         if not context_parts:
             # No context found at all
@@ -166,14 +149,6 @@ class BidReviewEngine:
                 notes="No relevant text found in document",
             )
 
-        # Pass any regex-captured value as a hint to AI (never use directly —
-        # raw captures often grab section numbers or unrelated values)
-        regex_hint = None
-        if regex_matches and regex_matches[0].get("captured_value"):
-            captured = regex_matches[0]["captured_value"].strip()
-            if captured and len(captured) > 1:
-                regex_hint = captured[:300]  # Cap at 300 chars — some patterns capture entire doc
-
         # If AI client available, use AI to extract and verify; otherwise regex-only
         if self.ai_client:
             context_text = self._merge_contexts(context_parts, MAX_CONTEXT_PER_ITEM)
@@ -187,7 +162,8 @@ class BidReviewEngine:
 
             try:
                 response = self.ai_client.generate(
-                    self.SYSTEM_MSG, user_msg, max_tokens=500
+                    self.SYSTEM_MSG, user_msg, max_tokens=500,
+                    json_schema=bid_item_response_schema()
                 )
                 item = self._parse_single_response(response, regex_matches)
             except Exception as e:
@@ -237,12 +213,79 @@ class BidReviewEngine:
 
         return section_key, display_name, item
 
+    def _gather_item_context(
+        self, prepared: PreparedBidReview, item_key: str
+    ) -> Tuple[List[str], List[Dict], Optional[str]]:
+        """
+        Collect the text an item is analyzed against.
+
+        Returns:
+            (context_parts, regex_matches, regex_hint)
+        """
+        section_key, display_name = BID_ITEM_MAP[item_key]
+
+        # Gather context: regex matches + keyword search fallback + section fallback
+        context_parts = []
+        regex_matches = prepared.regex_results.get(item_key, [])
+        self._last_keyword_positions = []  # Reset for this item
+
+        if regex_matches:
+            for match in regex_matches[:3]:  # Top 3 matches
+                context_parts.append(match["context"])
+        else:
+            # Fallback: keyword search in full text
+            context_parts = self._keyword_search(
+                prepared.contract_text, item_key, display_name
+            )
+
+        if not context_parts:
+            # Last resort: send a relevant section of the document based on item type
+            context_parts = self._section_fallback(
+                prepared.contract_text, section_key
+            )
+
+        # Pass any regex-captured value as a hint to AI (never use directly —
+        # raw captures often grab section numbers or unrelated values)
+        regex_hint = None
+        if regex_matches and regex_matches[0].get("captured_value"):
+            captured = regex_matches[0]["captured_value"].strip()
+            if captured and len(captured) > 1:
+                regex_hint = captured[:300]  # Cap at 300 chars — some patterns capture entire doc
+
+        return context_parts, regex_matches, regex_hint
+
+    def item_input_hash(self, prepared: PreparedBidReview, item_key: str) -> str:
+        """
+        Hash everything analyze_single_item() would base its result on.
+
+        Cheap compared with inference: only regex/keyword context gathering
+        runs. A resumed run reuses a saved item when this hash is unchanged.
+        """
+        if item_key not in BID_ITEM_MAP:
+            raise ValueError(f"Unknown bid item key: {item_key}")
+
+        _, display_name = BID_ITEM_MAP[item_key]
+        description = BID_ITEM_DESCRIPTIONS.get(item_key, display_name)
+        context_parts, _, regex_hint = self._gather_item_context(prepared, item_key)
+        if self.ai_client and context_parts:
+            context_text = self._merge_contexts(context_parts, MAX_CONTEXT_PER_ITEM)
+            prompt = self._build_single_item_prompt(
+                display_name, description, context_text, regex_hint
+            )
+        else:
+            prompt = "\n".join(context_parts) + f"\n{regex_hint or ''}"
+        return compute_input_hash(
+            item_key, ai_client_identity(self.ai_client), self.SYSTEM_MSG, prompt
+        )
+
     def analyze_all_items(
         self,
         prepared: PreparedBidReview,
         progress_callback: Optional[Callable[[str, int], None]] = None,
         item_callback: Optional[Callable[[str, str, ChecklistItem], None]] = None,
         cancelled_check: Optional[Callable[[], bool]] = None,
+        reusable_items: Optional[Dict[str, Tuple[str, ChecklistItem]]] = None,
+        input_hash_callback: Optional[Callable[[str, str], None]] = None,
     ) -> Dict[str, ChecklistItem]:
         """
         Analyze all checklist items.
@@ -252,6 +295,11 @@ class BidReviewEngine:
             progress_callback: (message, percent) callback
             item_callback: (item_key, display_name, ChecklistItem) per-item callback
             cancelled_check: callable returning True if cancelled
+            reusable_items: item_key -> (input_hash, ChecklistItem) from an
+                earlier run. Items whose input hash is unchanged are reused
+                without calling the AI; item_callback still receives them.
+            input_hash_callback: (item_key, input_hash) called once an item
+                has been analyzed or reused without error
 
         Returns:
             Dict of item_key -> ChecklistItem
@@ -259,6 +307,7 @@ class BidReviewEngine:
         all_keys = list(BID_ITEM_MAP.keys())
         total = len(all_keys)
         results = {}
+        reused = 0
 
         for i, item_key in enumerate(all_keys):
             if cancelled_check and cancelled_check():
@@ -268,6 +317,20 @@ class BidReviewEngine:
             section_key, display_name = BID_ITEM_MAP[item_key]
             pct = int((i / total) * 100)
 
+            input_hash = None
+            if reusable_items is not None or input_hash_callback:
+                input_hash = self.item_input_hash(prepared, item_key)
+
+            saved = (reusable_items or {}).get(item_key)
+            if saved and saved[0] == input_hash:
+                results[item_key] = saved[1]
+                reused += 1
+                if item_callback:
+                    item_callback(item_key, display_name, saved[1])
+                if input_hash_callback:
+                    input_hash_callback(item_key, input_hash)
+                continue
+
             if progress_callback:
                 progress_callback(f"[{i+1}/{total}] {display_name}...", pct)
 
@@ -277,6 +340,8 @@ class BidReviewEngine:
 
                 if item_callback:
                     item_callback(item_key, display_name, item)
+                if input_hash_callback and item.value != "ERROR":
+                    input_hash_callback(item_key, input_hash)
 
             except Exception as e:
                 logger.error("Error analyzing %s: %s", item_key, e)
@@ -284,6 +349,9 @@ class BidReviewEngine:
                     value="ERROR", confidence="not_found", notes=str(e)
                 )
 
+        if reused:
+            logger.info("Reused %d unchanged bid items from previous run", reused)
+
         if progress_callback:
             progress_callback("Bid review complete!", 100)
 
@@ -454,24 +522,47 @@ class BidReviewEngine:
         )
         parts.append(f"\n{context_text}")
         parts.append(
-            "\nRespond in this EXACT format (4 lines only):\n"
-            "VALUE: [the extracted value, or NOT FOUND]\n"
-            "LOCATION: [where found in document, e.g. Section 00700, Article 4.2, or UNKNOWN]\n"
-            "PAGE: [integer page number where found, using the --- Page N --- markers, or UNKNOWN]\n"
-            "NOTES: [any conditions, exceptions, or additional details, or NONE]"
+            "\nReturn JSON only in this format:\n"
+            '{"value": "the extracted value, or NOT FOUND", '
+            '"location": "where found in document, e.g. Section 00700, Article 4.2, or UNKNOWN", '
+            '"page": integer page number from the --- Page N --- markers, or null, '
+            '"notes": "any conditions, exceptions, or additional details, or NONE"}'
         )
         return "\n".join(parts)
 
     def _parse_single_response(
         self, response: str, regex_matches: List[Dict]
     ) -> ChecklistItem:
-        """Parse the AI response into a ChecklistItem."""
-        lines = response.strip().split("\n")
+        """Parse the AI response into a ChecklistItem.
+
+        Accepts the JSON object the prompt asks for, and the older
+        VALUE:/LOCATION:/PAGE:/NOTES: line format (cached responses, or a
+        backend that ignored the format).
+        """
         value = ""
         location = ""
         notes = ""
         page: Optional[int] = None
 
+        text = response.strip()
+        lines = text.split("\n")
+        parsed = None
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end > start:
+            # Tolerate code fences or a sentence around the object
+            try:
+                parsed = json.loads(text[start:end + 1])
+            except ValueError:
+                pass
+        if isinstance(parsed, dict):
+            lines = []
+            value = str(parsed.get("value") or "").strip()
+            location = str(parsed.get("location") or "").strip()
+            notes = str(parsed.get("notes") or "").strip()
+            raw_page = parsed.get("page")
+            if isinstance(raw_page, int) and not isinstance(raw_page, bool) and raw_page > 0:
+                page = raw_page
+
         for line in lines:
             line_stripped = line.strip()
             upper = line_stripped.upper()
@@ -491,7 +582,7 @@ class BidReviewEngine:
                 notes = line_stripped[6:].strip()
 
         # If AI couldn't parse the format, use the full response as value
-        if not value:
+        if not value and not isinstance(parsed, dict):
             value = response.strip()[:500]
 
         # Determine confidence
@@ -82,21 +82,34 @@ SECTION_DEFS = [
 # ---------------------------------------------------------------------------
 
 class BidReviewAllThread(QThread):
-    """Background thread for analyzing all bid checklist items."""
+    """Background thread for analyzing all bid checklist items.
+
+    When fresh is True (Re-analyze Checklist), the AI response cache is
+    bypassed so every item gets a new answer.
+    """
     item_complete = pyqtSignal(str, str, object)   # item_key, display_name, ChecklistItem
     item_not_found = pyqtSignal(str, str)           # item_key, display_name
     item_error = pyqtSignal(str, str)               # item_key, error_msg
     all_finished = pyqtSignal(object)               # BidChecklistResult
     progress = pyqtSignal(str, int)                 # message, percent
 
-    def __init__(self, engine, prepared):
+    def __init__(self, engine, prepared, fresh=False):
         super().__init__()
         self.engine = engine
         self.prepared = prepared
+        self.fresh = fresh
         self.cancelled = False
         self._item_results: Dict[str, ChecklistItem] = {}
 
     def run(self):
+        if not self.fresh:
+            self._run()
+            return
+        from src.response_cache import bypass_cache
+        with bypass_cache(self.engine.ai_client):
+            self._run()
+
+    def _run(self):
         try:
             text_len = len(self.prepared.contract_text) if self.prepared.contract_text else 0
             ai_avail = self.engine.ai_client is not None
@@ -494,8 +507,14 @@ class BidReviewTab(QWidget):
     # Start full analysis (called by main GUI after signal)
     # ------------------------------------------------------------------
 
-    def start_analysis(self, engine, prepared):
-        """Start analyzing all checklist items in background."""
+    def start_analysis(self, engine, prepared, fresh=False):
+        """Start analyzing all checklist items in background.
+
+        Args:
+            engine: BidReviewEngine to run
+            prepared: Prepared bid review data
+            fresh: True to bypass the AI response cache (explicit re-run)
+        """
         # Cancel any running single-item thread first (llama_cpp not thread-safe)
         if self._current_thread and self._current_thread.isRunning():
             logger.info("Cancelling previous thread before starting full analysis")
@@ -517,7 +536,7 @@ class BidReviewTab(QWidget):
         for row in self._item_rows.values():
             row["btn"].setEnabled(False)
 
-        thread = BidReviewAllThread(engine, prepared)
+        thread = BidReviewAllThread(engine, prepared, fresh=fresh)
         thread.item_complete.connect(self._on_item_complete)
         thread.item_not_found.connect(self._on_item_not_found)
         thread.item_error.connect(self._on_item_error)
@@ -1,15 +1,18 @@
 """
 Change Comparator Module
 
-Compares two versions of a contract and identifies changes at the clause level.
+Compares two versions of a contract and identifies changes at the clause level,
+and at the section level directly from the extracted contract text.
 Implements Requirements 4.1, 4.2, 4.3, 4.4, 4.5, and 4.6.
 """
 
 import difflib
+import hashlib
 import logging
-from dataclasses import dataclass
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from src.analysis_models import ClauseBlock, ComprehensiveAnalysisResult
 
@@ -63,6 +66,54 @@ class ContractDiff:
     change_summary: Dict[str, int]
 
 
+@dataclass
+class SectionComparison:
+    """
+    Represents the comparison result for a single contract section.
+    
+    Attributes:
+        header: Section header (from the new version unless deleted)
+        change_type: Type of change (unchanged, modified, added, deleted)
+        old_index: Index into the old version's section list (None if added)
+        new_index: Index into the new version's section list (None if deleted)
+        similarity_score: Text similarity score (0.0 to 1.0)
+        old_ranges: Changed (start, end) character ranges in the old text
+        new_ranges: Changed (start, end) character ranges in the new text
+    """
+    header: str
+    change_type: ClauseChangeType
+    old_index: Optional[int]
+    new_index: Optional[int]
+    similarity_score: float
+    old_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    new_ranges: List[Tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class SectionDiff:
+    """
+    Represents the section-level difference between two extracted contracts.
+    
+    Unchanged sections may have moved; their old and new indexes differ.
+    
+    Attributes:
+        unchanged_sections: Sections with identical content
+        modified_sections: Sections aligned across versions whose text changed
+        added_sections: Sections only in the new version
+        deleted_sections: Sections only in the old version
+        change_summary: Summary counts by change type
+    """
+    unchanged_sections: List[SectionComparison]
+    modified_sections: List[SectionComparison]
+    added_sections: List[SectionComparison]
+    deleted_sections: List[SectionComparison]
+    change_summary: Dict[str, int]
+    
+    def unchanged_section_map(self) -> Dict[int, int]:
+        """Map old section index to new section index for unchanged sections."""
+        return {s.old_index: s.new_index for s in self.unchanged_sections}
+
+
 class ChangeComparator:
     """
     Compares two versions of a contract and identifies changes at the clause level.
@@ -73,8 +124,18 @@ class ChangeComparator:
     # Threshold for considering clauses as unchanged (95% similarity)
     UNCHANGED_THRESHOLD = 0.95
     
+    # Character shingle length for the similarity pre-filter
+    SHINGLE_SIZE = 3
+    
+    # Number of texts whose shingle sets are kept between comparisons
+    SHINGLE_CACHE_SIZE = 256
+    
+    # Minimum similarity for pairing sections whose headers differ
+    SECTION_MATCH_THRESHOLD = 0.5
+    
     def __init__(self):
         """Initialize the change comparator."""
+        self._shingle_cache: Dict[str, Counter] = {}
         logger.debug("ChangeComparator initialized")
     
     def normalize_text(self, text: str) -> str:
@@ -108,7 +169,12 @@ class ChangeComparator:
         
         return normalized
     
-    def calculate_text_similarity(self, text1: str, text2: str) -> float:
+    def calculate_text_similarity(
+        self,
+        text1: str,
+        text2: str,
+        threshold: Optional[float] = None
+    ) -> float:
         """
         Calculate similarity between two text strings.
         
@@ -117,9 +183,20 @@ class ChangeComparator:
         Uses difflib.SequenceMatcher to calculate similarity ratio.
         Text is normalized before comparison.
         
+        The full ratio is quadratic in text length, so cheaper checks run
+        first. Identical normalized texts return 1.0 without diffing. When a
+        threshold is given, pairs that provably score below it return an
+        upper bound on the ratio instead: first the length bound
+        (real_quick_ratio), then the character-count bound (quick_ratio),
+        then a bound from shared character shingles. Only pairs that could
+        reach the threshold pay for the full diff, so classifying against
+        the threshold is always exact.
+        
         Args:
             text1: First text string
             text2: Second text string
+            threshold: Optional classification threshold enabling the
+                upper-bound shortcuts for clearly different pairs
             
         Returns:
             Similarity score between 0.0 (completely different) and 1.0 (identical)
@@ -134,8 +211,26 @@ class ChangeComparator:
         if not norm1 or not norm2:
             return 0.0  # One empty, one not = completely different
         
+        # Identical normalized text (the common case between versions)
+        if norm1 == norm2:
+            return 1.0
+        
         # Calculate similarity using SequenceMatcher
         matcher = difflib.SequenceMatcher(None, norm1, norm2)
+        
+        if threshold is not None:
+            bound = matcher.real_quick_ratio()
+            if bound >= threshold:
+                bound = matcher.quick_ratio()
+            if bound >= threshold:
+                bound = min(bound, self._shingle_ratio_bound(norm1, norm2))
+            if bound < threshold:
+                logger.debug(
+                    "Text similarity bounded: <= %.3f (lengths: %d, %d)",
+                    bound, len(norm1), len(norm2)
+                )
+                return bound
+        
         similarity = matcher.ratio()
         
         logger.debug(
@@ -144,6 +239,43 @@ class ChangeComparator:
         )
         
         return similarity
+    
+    def _shingle_ratio_bound(self, norm1: str, norm2: str) -> float:
+        """
+        Upper bound on SequenceMatcher.ratio() from shared character shingles.
+        
+        With M matched characters in B matching blocks, at least
+        M - (k-1)*B shingle occurrences of the first text lie inside a block
+        and so also occur in the second text. Adjacent blocks are separated
+        by an unmatched character, so B <= N - 2M + 1 for N = len1 + len2.
+        Solving for M bounds the ratio 2M/N by the shared shingle count.
+        
+        Args:
+            norm1: First normalized text
+            norm2: Second normalized text
+            
+        Returns:
+            Upper bound on the similarity ratio (1.0 if texts are too short)
+        """
+        k = self.SHINGLE_SIZE
+        if len(norm1) < k or len(norm2) < k:
+            return 1.0
+        
+        shared = sum((self._shingles(norm1) & self._shingles(norm2)).values())
+        total = len(norm1) + len(norm2)
+        max_matched = (shared + (k - 1) * (total + 1)) / (2 * k - 1)
+        return min(1.0, 2.0 * max_matched / total)
+    
+    def _shingles(self, text: str) -> Counter:
+        """Character k-shingle counts of a normalized text, cached per text."""
+        cached = self._shingle_cache.get(text)
+        if cached is None:
+            k = self.SHINGLE_SIZE
+            cached = Counter(text[i:i + k] for i in range(len(text) - k + 1))
+            if len(self._shingle_cache) >= self.SHINGLE_CACHE_SIZE:
+                self._shingle_cache.clear()
+            self._shingle_cache[text] = cached
+        return cached
 
     
     def compare_clauses(
@@ -196,8 +328,13 @@ class ChangeComparator:
             old_content = old_clause.clause_location
             new_content = new_clause.clause_location
             
-            # Calculate similarity
-            similarity = self.calculate_text_similarity(old_content, new_content)
+            # Classify with the cheap bounds, then score modified clauses
+            # exactly: their similarity is stored with the new version
+            similarity = self.calculate_text_similarity(
+                old_content, new_content, threshold=self.UNCHANGED_THRESHOLD
+            )
+            if similarity < self.UNCHANGED_THRESHOLD:
+                similarity = self.calculate_text_similarity(old_content, new_content)
             
             # Classify based on threshold
             if similarity >= self.UNCHANGED_THRESHOLD:
@@ -489,3 +626,218 @@ class ChangeComparator:
         except Exception as e:
             logger.error("Contract comparison failed: %s", e, exc_info=True)
             raise RuntimeError(f"Contract comparison failed: {e}")
+    
+    def compare_sections(
+        self,
+        old_text: str,
+        old_sections: list,
+        new_text: str,
+        new_sections: list
+    ) -> SectionDiff:
+        """
+        Compare two extracted contracts section by section.
+        
+        Works on the raw text and SectionBlocks from parse_contract_sections,
+        so no AI analysis of either version is needed. Sections are aligned
+        in three passes:
+        1. Content fingerprints (whitespace-insensitive hashes) are aligned
+           in document order; sections outside the common runs that still
+           have an identical twin elsewhere are treated as moved.
+        2. Within each region that differs, sections with the same header
+           are paired as modified.
+        3. Remaining sections in a region are paired in order when their
+           similarity reaches SECTION_MATCH_THRESHOLD; the rest are
+           added or deleted.
+        Only modified pairs are diffed, line by line, to report the changed
+        character ranges in both texts.
+        
+        Args:
+            old_text: Extracted text of the old version
+            old_sections: SectionBlocks of the old version
+            new_text: Extracted text of the new version
+            new_sections: SectionBlocks of the new version
+            
+        Returns:
+            SectionDiff object containing all section changes
+        """
+        old_texts = [old_text[s.start_pos:s.end_pos] for s in old_sections]
+        new_texts = [new_text[s.start_pos:s.end_pos] for s in new_sections]
+        old_prints = [self._section_fingerprint(t) for t in old_texts]
+        new_prints = [self._section_fingerprint(t) for t in new_texts]
+        
+        unchanged: Dict[int, int] = {}
+        regions: List[Tuple[List[int], List[int]]] = []
+        matcher = difflib.SequenceMatcher(None, old_prints, new_prints, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    unchanged[i1 + offset] = j1 + offset
+            else:
+                regions.append((list(range(i1, i2)), list(range(j1, j2))))
+        
+        # Moved sections: identical content outside the aligned runs
+        free_new: Dict[str, List[int]] = defaultdict(list)
+        for _, new_ids in regions:
+            for j in new_ids:
+                free_new[new_prints[j]].append(j)
+        for old_ids, _ in regions:
+            for i in old_ids:
+                if free_new.get(old_prints[i]):
+                    unchanged[i] = free_new[old_prints[i]].pop(0)
+        moved_to = set(unchanged.values())
+        
+        modified: Dict[int, Tuple[int, float]] = {}
+        for old_ids, new_ids in regions:
+            old_left = [i for i in old_ids if i not in unchanged]
+            new_left = [j for j in new_ids if j not in moved_to]
+            
+            # Same header within the region: an edited section
+            for i in list(old_left):
+                key = (old_sections[i].header_normalized, old_sections[i].section_type)
+                for j in new_left:
+                    if (new_sections[j].header_normalized, new_sections[j].section_type) == key:
+                        similarity = self.calculate_text_similarity(
+                            old_texts[i], new_texts[j], threshold=self.UNCHANGED_THRESHOLD
+                        )
+                        modified[i] = (j, similarity)
+                        old_left.remove(i)
+                        new_left.remove(j)
+                        break
+            
+            # Renumbered or retitled sections: pair in order if similar enough
+            for i, j in zip(old_left, new_left):
+                similarity = self.calculate_text_similarity(
+                    old_texts[i], new_texts[j], threshold=self.SECTION_MATCH_THRESHOLD
+                )
+                if similarity >= self.SECTION_MATCH_THRESHOLD:
+                    modified[i] = (j, similarity)
+        
+        paired_new = moved_to | {j for j, _ in modified.values()}
+        
+        unchanged_sections = [
+            SectionComparison(
+                header=new_sections[j].header_text,
+                change_type=ClauseChangeType.UNCHANGED,
+                old_index=i,
+                new_index=j,
+                similarity_score=1.0
+            )
+            for i, j in sorted(unchanged.items(), key=lambda item: item[1])
+        ]
+        
+        modified_sections = []
+        for i, (j, similarity) in sorted(modified.items(), key=lambda item: item[1][0]):
+            old_ranges, new_ranges = self._changed_ranges(
+                old_texts[i], old_sections[i].start_pos,
+                new_texts[j], new_sections[j].start_pos
+            )
+            modified_sections.append(SectionComparison(
+                header=new_sections[j].header_text,
+                change_type=ClauseChangeType.MODIFIED,
+                old_index=i,
+                new_index=j,
+                similarity_score=similarity,
+                old_ranges=old_ranges,
+                new_ranges=new_ranges
+            ))
+        
+        added_sections = [
+            SectionComparison(
+                header=new_sections[j].header_text,
+                change_type=ClauseChangeType.ADDED,
+                old_index=None,
+                new_index=j,
+                similarity_score=0.0,
+                new_ranges=[(new_sections[j].start_pos, new_sections[j].end_pos)]
+            )
+            for j in range(len(new_sections)) if j not in paired_new
+        ]
+        
+        deleted_sections = [
+            SectionComparison(
+                header=old_sections[i].header_text,
+                change_type=ClauseChangeType.DELETED,
+                old_index=i,
+                new_index=None,
+                similarity_score=0.0,
+                old_ranges=[(old_sections[i].start_pos, old_sections[i].end_pos)]
+            )
+            for i in range(len(old_sections)) if i not in unchanged and i not in modified
+        ]
+        
+        change_summary = {
+            'unchanged': len(unchanged_sections),
+            'modified': len(modified_sections),
+            'added': len(added_sections),
+            'deleted': len(deleted_sections),
+            'total': len(unchanged_sections) + len(modified_sections)
+                     + len(added_sections) + len(deleted_sections)
+        }
+        
+        logger.info(
+            "Section comparison complete: %d unchanged, %d modified, %d added, %d deleted",
+            change_summary['unchanged'],
+            change_summary['modified'],
+            change_summary['added'],
+            change_summary['deleted']
+        )
+        
+        return SectionDiff(
+            unchanged_sections=unchanged_sections,
+            modified_sections=modified_sections,
+            added_sections=added_sections,
+            deleted_sections=deleted_sections,
+            change_summary=change_summary
+        )
+    
+    @staticmethod
+    def _section_fingerprint(text: str) -> str:
+        """Hash of a section's text, insensitive to extraction whitespace."""
+        return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _changed_ranges(
+        old_text: str,
+        old_start: int,
+        new_text: str,
+        new_start: int
+    ) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Line-level changed ranges between two versions of one section.
+        
+        Lines are compared with whitespace collapsed; the ranges are
+        absolute character offsets into each contract's text. A pure
+        insertion or deletion yields an empty range on the other side.
+        
+        Args:
+            old_text: Old section text
+            old_start: Offset of the old section in the old contract text
+            new_text: New section text
+            new_start: Offset of the new section in the new contract text
+            
+        Returns:
+            Tuple of (old_ranges, new_ranges)
+        """
+        old_lines = old_text.splitlines(keepends=True)
+        new_lines = new_text.splitlines(keepends=True)
+        
+        old_offsets = [old_start]
+        for line in old_lines:
+            old_offsets.append(old_offsets[-1] + len(line))
+        new_offsets = [new_start]
+        for line in new_lines:
+            new_offsets.append(new_offsets[-1] + len(line))
+        
+        matcher = difflib.SequenceMatcher(
+            None,
+            [' '.join(line.split()) for line in old_lines],
+            [' '.join(line.split()) for line in new_lines],
+            autojunk=False
+        )
+        old_ranges: List[Tuple[int, int]] = []
+        new_ranges: List[Tuple[int, int]] = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != 'equal':
+                old_ranges.append((old_offsets[i1], old_offsets[i2]))
+                new_ranges.append((new_offsets[j1], new_offsets[j2]))
+        return old_ranges, new_ranges
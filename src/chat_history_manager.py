@@ -12,12 +12,20 @@ import json
 import logging
 import os
 import platform
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import uuid
 
+# Platform-specific file locking
+if os.name == 'nt':  # Windows
+    import msvcrt
+else:  # Unix/Linux/Mac
+    import fcntl
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,78 +39,169 @@ class ChatHistoryManager:
     Manages append-only chat history with file locking.
 
     Supports concurrent writes from multiple users on network shares using
-    file locking and atomic writes with exponential backoff retry logic.
-
-    Chat history is stored as a single JSON file with the following structure:
-    {
-        "version": "1.0",
-        "project_path": "/path/to/project",
-        "chats": [
-            {
-                "chat_id": "uuid",
-                "timestamp": "ISO 8601",
-                "username": "windows_username",
-                "computer_name": "COMPUTER-NAME",
-                "contract_file": "contract.pdf",
-                "contract_version": 1,
-                "question": "User question",
-                "answer": "AI response",
-                "metadata": {...}
-            },
-            ...
-        ]
-    }
+    a lock file and exponential backoff retry logic.
+
+    Chat history is stored as a JSON Lines log. The first line is a header
+    and every following line is one chat entry, appended and fsync'd in place
+    so the cost of an append does not depend on the size of the history:
+
+        {"version": "2.0", "generation": "uuid", "project_path": "..."}
+        {"chat_id": "uuid", "timestamp": "ISO 8601", "username": "...",
+         "computer_name": "...", "contract_file": "contract.pdf",
+         "contract_version": 1, "question": "...", "answer": "...",
+         "metadata": {...}}
+        ...
+
+    A sidecar index (chat_history.idx.json) maps each contract file to the
+    byte offsets of its entries. The index is caught up lazily on read by
+    scanning only the bytes appended since it was last written, and is tied
+    to the log's header generation so a compacted log is never read through
+    stale offsets. Legacy chat_history.json files are migrated on first use.
 
     Attributes:
-        chat_history_path: Path to chat_history.json file
+        chat_history_path: Path to chat_history.jsonl log file
+        index_path: Path to the sidecar contract index
+        legacy_path: Path to the pre-2.0 chat_history.json file
         max_retries: Maximum number of retry attempts for file locking
         initial_backoff_ms: Initial backoff delay in milliseconds
     """
 
-    SCHEMA_VERSION = "1.0"
+    SCHEMA_VERSION = "2.0"
+    INDEX_VERSION = "1.0"
     MAX_RETRIES = 3
     INITIAL_BACKOFF_MS = 100
+    LOCK_TIMEOUT = 5.0
+    TAIL_BLOCK_SIZE = 8192
 
     def __init__(self, chat_history_path: Path | str, max_retries: int = MAX_RETRIES):
         """
         Initialize chat history manager.
 
         Args:
-            chat_history_path: Path to chat_history.json file
+            chat_history_path: Path to chat_history.jsonl file. A legacy
+                chat_history.json path is accepted and mapped to the
+                .jsonl log next to it.
             max_retries: Maximum number of retry attempts (default: 3)
         """
-        self.chat_history_path = Path(chat_history_path)
+        path = Path(chat_history_path)
+        self.chat_history_path = path if path.suffix == '.jsonl' else path.with_suffix('.jsonl')
+        self.legacy_path = self.chat_history_path.with_suffix('.json')
+        self.index_path = self.chat_history_path.with_suffix('.idx.json')
+        self.lock_path = self.chat_history_path.with_suffix('.lock')
         self.max_retries = max_retries
         self.initial_backoff_ms = self.INITIAL_BACKOFF_MS
 
+        self._index_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
         # Ensure parent directory exists
         self.chat_history_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize empty file if it doesn't exist
+        # Initialize empty log (migrating legacy history) if it doesn't exist
         if not self.chat_history_path.exists():
-            self._initialize_empty_history()
+            self._initialize_log()
 
         logger.info(f"Chat history manager initialized: {self.chat_history_path}")
 
-    def _initialize_empty_history(self) -> None:
-        """Create an empty chat history file."""
-        empty_history = {
+    # ------------------------------------------------------------------
+    # Log file layout
+    # ------------------------------------------------------------------
+
+    def _make_header(self) -> Dict[str, Any]:
+        """Build a header record with a fresh generation id."""
+        return {
             "version": self.SCHEMA_VERSION,
+            "generation": str(uuid.uuid4()),
             "project_path": str(self.chat_history_path.parent.parent),
-            "chats": []
         }
 
+    @staticmethod
+    def _encode_line(record: Dict[str, Any]) -> bytes:
+        """Serialize one record as a single JSON Lines row."""
+        return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+    @staticmethod
+    def _is_header(record: Dict[str, Any]) -> bool:
+        """Return True if a parsed log line is the header record."""
+        return 'generation' in record and 'chat_id' not in record
+
+    def _initialize_log(self) -> None:
+        """Create the log file, importing entries from a legacy JSON history."""
+        chats = self._read_legacy_chats()
+
         try:
-            with open(self.chat_history_path, 'w', encoding='utf-8') as f:
-                json.dump(empty_history, f, indent=2, ensure_ascii=False)
-            logger.debug("Created empty chat history file")
+            with self._locked():
+                if self.chat_history_path.exists():
+                    return  # Another process created it while we waited
+                self._write_log(self._make_header(), chats)
+        except TimeoutError as e:
+            raise ChatHistoryError(f"Failed to create chat history file: {e}")
         except OSError as e:
             logger.error(f"Failed to create chat history file: {e}")
             raise ChatHistoryError(f"Failed to create chat history file: {e}")
 
-    def _acquire_file_lock(self, file_handle, timeout: float = 5.0):
+        if chats:
+            try:
+                self.legacy_path.replace(self.legacy_path.with_suffix('.json.migrated'))
+            except OSError as e:
+                logger.warning(f"Could not rename legacy chat history (non-critical): {e}")
+            logger.info(f"Migrated {len(chats)} chat entries from {self.legacy_path.name}")
+        else:
+            logger.debug("Created empty chat history file")
+
+    def _read_legacy_chats(self) -> List[Dict[str, Any]]:
+        """Read chat entries from a pre-2.0 chat_history.json file, if present."""
+        if not self.legacy_path.exists():
+            return []
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return list(data.get('chats', []))
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable legacy chat history: {e}")
+            return []
+
+    def _write_log(self, header: Dict[str, Any], chats: List[Dict[str, Any]]) -> None:
+        """
+        Atomically replace the log with a header and the given entries.
+
+        Caller must hold the log lock.
+        """
+        temp_path = self.chat_history_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(self._encode_line(header))
+                for chat in chats:
+                    f.write(self._encode_line(chat))
+                f.flush()
+                os.fsync(f.fileno())
+            temp_path.replace(self.chat_history_path)
+        finally:
+            if temp_path.exists():
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+
+    def _read_generation(self, f) -> Optional[str]:
+        """Read the generation id from the header line of an open log file."""
+        f.seek(0)
+        first = f.readline()
+        try:
+            header = json.loads(first.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if isinstance(header, dict) and self._is_header(header):
+            return header.get('generation')
+        return None
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    def _acquire_file_lock(self, file_handle, timeout: float = LOCK_TIMEOUT):
         """
-        Acquire an exclusive file lock (Windows-specific).
+        Acquire an exclusive lock on the first byte of a file.
 
         Args:
             file_handle: Open file handle
@@ -111,13 +210,14 @@ class ChatHistoryManager:
         Raises:
             TimeoutError: If lock cannot be acquired within timeout
         """
-        import msvcrt
-
         start_time = time.time()
         while True:
             try:
-                # Lock the entire file (0 = from start, -1 = to end)
-                msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, -1)
+                if os.name == 'nt':  # Windows
+                    file_handle.seek(0)
+                    msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, 1)
+                else:  # Unix/Linux/Mac
+                    fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
                 return
             except OSError:
                 if time.time() - start_time > timeout:
@@ -126,22 +226,44 @@ class ChatHistoryManager:
 
     def _release_file_lock(self, file_handle):
         """
-        Release file lock (Windows-specific).
+        Release a lock taken with _acquire_file_lock.
 
         Args:
             file_handle: Open file handle
         """
-        import msvcrt
         try:
-            msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, -1)
+            if os.name == 'nt':  # Windows
+                file_handle.seek(0)
+                msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:  # Unix/Linux/Mac
+                fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
         except OSError as e:
             logger.warning(f"Failed to release file lock: {e}")
 
+    @contextmanager
+    def _locked(self, timeout: float = LOCK_TIMEOUT):
+        """
+        Hold the exclusive lock guarding writes to the log.
+
+        A separate lock file is used so the log itself can be atomically
+        replaced by compaction while other processes wait on the lock.
+        """
+        with open(self.lock_path, 'a+b') as lock_file:
+            self._acquire_file_lock(lock_file, timeout=timeout)
+            try:
+                yield
+            finally:
+                self._release_file_lock(lock_file)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
     def append_chat(self, chat_entry: Dict[str, Any]) -> None:
         """
         Append a chat entry to the history with user attribution.
 
-        Uses file locking and atomic writes to support concurrent access.
+        Uses file locking and an fsync'd append to support concurrent access.
         Retries with exponential backoff if lock cannot be acquired.
 
         Args:
@@ -192,15 +314,17 @@ class ChatHistoryManager:
 
     def _append_chat_atomic(self, chat_entry: Dict[str, Any]) -> None:
         """
-        Atomically append a chat entry using file locking.
+        Append a single chat entry to the end of the log.
 
         This method:
-        1. Acquires an exclusive lock on the file
-        2. Reads the current data
-        3. Appends the new entry
-        4. Writes to a temporary file
-        5. Atomically renames the temp file
-        6. Releases the lock
+        1. Acquires the exclusive log lock
+        2. Terminates any torn trailing line left by a crashed writer
+        3. Writes the entry as one JSON line
+        4. Flushes and fsyncs the log
+        5. Releases the lock
+
+        The sidecar index is not touched here; readers catch it up from the
+        bytes appended since it was last written.
 
         Args:
             chat_entry: Chat entry dictionary
@@ -209,49 +333,182 @@ class ChatHistoryManager:
             TimeoutError: If file lock cannot be acquired
             OSError: If file operations fail
         """
-        temp_path = self.chat_history_path.with_suffix('.tmp')
+        line = self._encode_line(chat_entry)
+
+        with self._locked():
+            if not self.chat_history_path.exists():
+                self._write_log(self._make_header(), [])
+
+            with open(self.chat_history_path, 'a+b') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b'\n':
+                        logger.warning("Repairing torn trailing line in chat history")
+                        f.write(b'\n')
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear_history(self) -> None:
+        """
+        Clear all chat history (WARNING: This is destructive!).
 
+        This should only be used for testing or user-initiated cleanup.
+        """
+        logger.warning("Clearing all chat history")
         try:
-            # Open file for reading with exclusive lock
-            with open(self.chat_history_path, 'r+', encoding='utf-8') as f:
-                # Acquire lock
-                self._acquire_file_lock(f, timeout=5.0)
+            with self._locked():
+                self._write_log(self._make_header(), [])
+        except (OSError, TimeoutError) as e:
+            raise ChatHistoryError(f"Failed to clear chat history: {e}")
+        with self._index_lock:
+            self._remove_index()
+
+    # ------------------------------------------------------------------
+    # Sidecar index
+    # ------------------------------------------------------------------
+
+    def _empty_index(self, generation: Optional[str]) -> Dict[str, Any]:
+        """Return an index covering no bytes of the log."""
+        return {
+            "version": self.INDEX_VERSION,
+            "generation": generation,
+            "indexed_size": 0,
+            "entry_count": 0,
+            "damaged_lines": 0,
+            "contracts": {},
+        }
 
-                try:
-                    # Read current data
-                    f.seek(0)
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError:
-                        logger.warning("Corrupted chat history, reinitializing")
-                        data = {
-                            "version": self.SCHEMA_VERSION,
-                            "project_path": str(self.chat_history_path.parent.parent),
-                            "chats": []
-                        }
-
-                    # Append new chat
-                    data['chats'].append(chat_entry)
-
-                    # Write to temporary file
-                    with open(temp_path, 'w', encoding='utf-8') as temp_f:
-                        json.dump(data, temp_f, indent=2, ensure_ascii=False)
-
-                finally:
-                    # Release lock
-                    self._release_file_lock(f)
-
-            # Atomic rename (replaces original file)
-            temp_path.replace(self.chat_history_path)
+    def _read_index_file(self) -> Optional[Dict[str, Any]]:
+        """Read the sidecar index, returning None if missing or unreadable."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(index, dict) or index.get('version') != self.INDEX_VERSION:
+            return None
+        return index
+
+    def _write_index_file(self, index: Dict[str, Any]) -> None:
+        """Atomically persist the sidecar index (best effort)."""
+        temp_path = self.index_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+            temp_path.replace(self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to write chat history index (non-critical): {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
 
-        except Exception as e:
-            # Clean up temp file if it exists
-            if temp_path.exists():
+    def _remove_index(self) -> None:
+        """Delete the sidecar index so it is rebuilt on next read."""
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove chat history index: {e}")
+
+    def _scan_into_index(self, f, index: Dict[str, Any], start: int) -> bool:
+        """
+        Index complete lines of an open log from byte offset `start`.
+
+        A trailing line without a newline may still be in the middle of being
+        written by another process, so it is left for the next catch-up.
+
+        Returns:
+            True if any lines were indexed
+        """
+        f.seek(start)
+        offset = start
+        changed = False
+        contracts = index['contracts']
+
+        for raw in iter(f.readline, b''):
+            if not raw.endswith(b'\n'):
+                break
+            line_offset = offset
+            offset += len(raw)
+            changed = True
+
+            if line_offset == 0 or not raw.strip():
+                continue  # Header or blank line
+            try:
+                entry = json.loads(raw.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                index['damaged_lines'] += 1
+                continue
+            if not isinstance(entry, dict) or self._is_header(entry):
+                index['damaged_lines'] += 1
+                continue
+
+            key = entry.get('contract_file') or ''
+            contracts.setdefault(key, []).append(line_offset)
+            index['entry_count'] += 1
+
+        index['indexed_size'] = offset
+        return changed
+
+    def _load_index(self) -> Dict[str, Any]:
+        """
+        Return an up-to-date sidecar index.
+
+        Only the bytes appended since the index was last persisted are read.
+        The index is rebuilt from scratch if it belongs to a different log
+        generation (e.g. after compaction) or claims more bytes than exist.
+
+        Raises:
+            ChatHistoryError: If the log cannot be read
+        """
+        with self._index_lock:
+            try:
+                with open(self.chat_history_path, 'rb') as f:
+                    generation = self._read_generation(f)
+                    f.seek(0, os.SEEK_END)
+                    size = f.tell()
+
+                    index = self._read_index_file()
+                    if (index is None
+                            or index.get('generation') != generation
+                            or index.get('indexed_size', 0) > size):
+                        index = self._empty_index(generation)
+
+                    start = index['indexed_size']
+                    if start < size and self._scan_into_index(f, index, start):
+                        self._write_index_file(index)
+            except FileNotFoundError:
+                return self._empty_index(None)
+            except OSError as e:
+                logger.error(f"Failed to read chat history: {e}")
+                raise ChatHistoryError(f"Failed to read chat history: {e}")
+
+        if index['damaged_lines']:
+            self.compact_in_background()
+        return index
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _iter_log_entries(self):
+        """Yield every valid chat entry in the log, in chronological order."""
+        with open(self.chat_history_path, 'rb') as f:
+            for line_no, raw in enumerate(f):
+                if not raw.strip():
+                    continue
                 try:
-                    temp_path.unlink()
-                except:
-                    pass
-            raise
+                    entry = json.loads(raw.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    logger.warning(f"Skipping damaged chat history line {line_no + 1}")
+                    continue
+                if isinstance(entry, dict) and not self._is_header(entry):
+                    yield entry
 
     def load_all_chats(self) -> List[Dict[str, Any]]:
         """
@@ -264,15 +521,10 @@ class ChatHistoryManager:
             ChatHistoryError: If loading fails
         """
         try:
-            with open(self.chat_history_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('chats', [])
+            return list(self._iter_log_entries())
         except FileNotFoundError:
             logger.warning("Chat history file not found, returning empty list")
             return []
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse chat history: {e}")
-            raise ChatHistoryError(f"Chat history file is corrupted: {e}")
         except OSError as e:
             logger.error(f"Failed to read chat history: {e}")
             raise ChatHistoryError(f"Failed to read chat history: {e}")
@@ -281,39 +533,169 @@ class ChatHistoryManager:
         """
         Get all chat entries for a specific contract file.
 
+        Uses the sidecar index to seek directly to the contract's entries.
+
         Args:
             contract_file: Contract filename (e.g., "contract_v1.pdf")
 
         Returns:
             List of chat entries for the specified contract, in chronological order
         """
-        all_chats = self.load_all_chats()
-        return [
-            chat for chat in all_chats
-            if chat.get('contract_file') == contract_file
-        ]
+        index = self._load_index()
+        offsets = index['contracts'].get(contract_file or '', [])
+        if not offsets:
+            return []
+
+        chats = []
+        try:
+            with open(self.chat_history_path, 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    try:
+                        entry = json.loads(f.readline().decode('utf-8'))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        logger.warning(f"Stale chat history index entry at offset {offset}")
+                        continue
+                    if isinstance(entry, dict) and entry.get('contract_file') == contract_file:
+                        chats.append(entry)
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error(f"Failed to read chat history: {e}")
+            raise ChatHistoryError(f"Failed to read chat history: {e}")
+
+        return chats
 
     def get_recent_chats(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get the most recent chat entries.
 
+        Reads the log backwards from the end in fixed-size blocks, so only
+        the tail of the history is touched.
+
         Args:
             limit: Maximum number of entries to return (default: 10)
 
         Returns:
             List of most recent chat entries, newest first
         """
-        all_chats = self.load_all_chats()
-        return list(reversed(all_chats[-limit:]))
+        if limit <= 0:
+            return []
 
-    def clear_history(self) -> None:
+        chats: List[Dict[str, Any]] = []
+        try:
+            with open(self.chat_history_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                remainder = b''
+
+                while position > 0 and len(chats) < limit:
+                    read_size = min(self.TAIL_BLOCK_SIZE, position)
+                    position -= read_size
+                    f.seek(position)
+                    block = f.read(read_size) + remainder
+
+                    lines = block.split(b'\n')
+                    # The first piece may be a partial line unless we hit the start
+                    remainder = lines.pop(0) if position > 0 else b''
+                    for raw in reversed(lines):
+                        entry = self._parse_tail_line(raw)
+                        if entry is not None:
+                            chats.append(entry)
+                            if len(chats) >= limit:
+                                break
+
+                if remainder and len(chats) < limit:
+                    entry = self._parse_tail_line(remainder)
+                    if entry is not None:
+                        chats.append(entry)
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error(f"Failed to read chat history: {e}")
+            raise ChatHistoryError(f"Failed to read chat history: {e}")
+
+        return chats
+
+    def _parse_tail_line(self, raw: bytes) -> Optional[Dict[str, Any]]:
+        """Parse one line read from the tail, ignoring header and damaged lines."""
+        if not raw.strip():
+            return None
+        try:
+            entry = json.loads(raw.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or self._is_header(entry):
+            return None
+        return entry
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self) -> int:
         """
-        Clear all chat history (WARNING: This is destructive!).
+        Rewrite the log, dropping damaged lines and duplicate chat ids.
 
-        This should only be used for testing or user-initiated cleanup.
+        The rewritten log gets a new header generation, which invalidates
+        any sidecar index built against the old file.
+
+        Returns:
+            Number of lines removed
+
+        Raises:
+            ChatHistoryError: If compaction fails
         """
-        logger.warning("Clearing all chat history")
-        self._initialize_empty_history()
+        try:
+            with self._locked():
+                total_lines = 0
+                seen_ids = set()
+                chats = []
+                with open(self.chat_history_path, 'rb') as f:
+                    for raw in f:
+                        if raw.strip():
+                            total_lines += 1
+                for entry in self._iter_log_entries():
+                    chat_id = entry.get('chat_id')
+                    if chat_id is not None:
+                        if chat_id in seen_ids:
+                            continue
+                        seen_ids.add(chat_id)
+                    chats.append(entry)
+
+                self._write_log(self._make_header(), chats)
+        except (OSError, TimeoutError) as e:
+            logger.error(f"Chat history compaction failed: {e}")
+            raise ChatHistoryError(f"Failed to compact chat history: {e}")
+
+        with self._index_lock:
+            self._remove_index()
+
+        removed = max(0, total_lines - 1 - len(chats))
+        logger.info(f"Compacted chat history: {len(chats)} entries kept, {removed} lines removed")
+        return removed
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """
+        Run compact() on a daemon thread if one is not already running.
+
+        Returns:
+            The compaction thread, or None if one was already running
+        """
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return None
+
+        def _run():
+            try:
+                self.compact()
+            except ChatHistoryError as e:
+                logger.warning(f"Background chat history compaction failed: {e}")
+
+        self._compaction_thread = threading.Thread(
+            target=_run, name="ChatHistoryCompaction", daemon=True
+        )
+        self._compaction_thread.start()
+        return self._compaction_thread
 
     @staticmethod
     def create_chat_entry(
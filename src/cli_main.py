@@ -7,6 +7,7 @@ A tkinter-free version that works via command line.
 import os
 import sys
 import json
+import argparse
 import logging
 from pathlib import Path
 from typing import Optional
@@ -18,6 +19,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.contract_uploader import ContractUploader
 from src.analysis_engine import AnalysisEngine
 from src.query_engine import QueryEngine
+from src.differential_storage import DifferentialStorage
+from src.project_storage import ProjectStorage
+from src.version_database import VersionDatabase
 
 
 # Configure logging
@@ -54,8 +58,19 @@ class CR2A_CLI:
         try:
             # Initialize analysis engine if needed
             if not self.analysis_engine:
-                print("Initializing local AI engine...")
-                self.analysis_engine = AnalysisEngine()
+                from src.config_manager import ConfigManager
+                config = ConfigManager()
+                config.load_config()
+                server_address = config.get_local_model_server_address()
+                if server_address:
+                    print(f"Connecting to local model server at {server_address}...")
+                    self.analysis_engine = AnalysisEngine(
+                        local_model_name=config.get_local_model_name(),
+                        model_server_address=server_address,
+                    )
+                else:
+                    print("Initializing local AI engine...")
+                    self.analysis_engine = AnalysisEngine()
 
             # Analyze the contract
             print("Running local AI analysis...")
@@ -284,6 +299,246 @@ class CR2A_CLI:
         print("  • What are the payment terms?")
 
 
+def search_projects(query: str, roots: list, limit: int = 20,
+                    current_only: bool = True) -> list:
+    """
+    Search clauses across every project under the given folders.
+
+    Args:
+        query: Words or "quoted phrases" that must all appear
+        roots: Folders to search for project .cr2a/versions.db files,
+               or versions.db files themselves
+        limit: Maximum number of hits to return overall
+        current_only: Only search each contract's current version
+
+    Returns:
+        List of (project folder, ClauseSearchHit) tuples, best match first
+    """
+    db_paths = []
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            db_paths.append(root)
+        else:
+            db_paths.extend(ProjectStorage.find_version_databases(root))
+
+    hits = []
+    for db_path in db_paths:
+        storage = None
+        try:
+            storage = DifferentialStorage(VersionDatabase(db_path))
+            project = db_path.parent.parent
+            hits.extend(
+                (project, hit)
+                for hit in storage.search_clauses(query, limit, current_only)
+            )
+        except Exception as e:
+            logger.warning("Skipping %s: %s", db_path, e)
+        finally:
+            if storage is not None:
+                storage.close()
+
+    # BM25 ranks from separate indexes are comparable enough to interleave
+    hits.sort(key=lambda item: item[1].rank)
+    return hits[:limit]
+
+
+def search_command(argv: list) -> int:
+    """
+    Run the 'search' subcommand.
+
+    Args:
+        argv: Arguments after 'search'
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="cli_main.py search",
+        description="Full-text search of analyzed clauses across projects."
+    )
+    parser.add_argument("query", nargs="+",
+                        help='words or "quoted phrases" that must all appear')
+    parser.add_argument("--root", action="append", default=None,
+                        help="folder containing projects, or a versions.db "
+                             "(repeatable; default: current folder)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="maximum number of results (default: 20)")
+    parser.add_argument("--all-versions", action="store_true",
+                        help="also match clauses from superseded versions")
+    args = parser.parse_args(argv)
+
+    query = " ".join(args.query)
+    hits = search_projects(query, args.root or [os.getcwd()], args.limit,
+                           current_only=not args.all_versions)
+
+    if not hits:
+        print(f"\nNo clauses match: {query}")
+        return 1
+
+    print(f"\n🔎 {len(hits)} result(s) for: {query}")
+    print("=" * 60)
+    for project, hit in hits:
+        print(f"\n{hit.filename} (v{hit.version}) — {hit.category}")
+        print(f"  Project: {project}")
+        print(f"  {hit.snippet}")
+    return 0
+
+
+def batch_command(argv: list) -> int:
+    """
+    Run the 'batch' subcommand.
+
+    Submits every contract in a project folder to the Message Batches API,
+    or resumes all of the folder's pending batches, then waits for them and
+    saves one analysis JSON per contract under .cr2a/analyses/.
+
+    Args:
+        argv: Arguments after 'batch'
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="cli_main.py batch",
+        description="Analyze every contract in a project folder with the "
+                    "Claude Message Batches API (half price, results within 24h)."
+    )
+    parser.add_argument("folder", help="project folder containing contracts")
+    parser.add_argument("--poll-interval", type=float, default=60.0,
+                        help="seconds between status checks (default: 60)")
+    parser.add_argument("--no-wait", action="store_true",
+                        help="submit (or check) the batch and exit; "
+                             "run again later to collect results")
+    args = parser.parse_args(argv)
+
+    from src.api_key_manager import ApiKeyManager
+    from src.batch_analysis import BatchAnalysisError, BatchAnalysisRunner, BatchJobTracker
+    from src.config_manager import ConfigManager
+
+    try:
+        storage = ProjectStorage(args.folder)
+        storage.initialize_structure()
+    except Exception as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    config = ConfigManager()
+    api_key = ApiKeyManager(config).get_key()
+    if not api_key:
+        print(f"\n❌ No Anthropic API key found. Set {ApiKeyManager.ENV_VAR}.")
+        return 1
+
+    try:
+        engine = AnalysisEngine(ai_backend="claude", api_key=api_key,
+                                claude_model=config.get_claude_model())
+        tracker = BatchJobTracker(storage.storage_root)
+        runner = BatchAnalysisRunner(engine, tracker)
+
+        jobs = tracker.pending()
+        if jobs:
+            print(f"\n⏳ Resuming {len(jobs)} pending batch(es)")
+        else:
+            contract_paths = [str(path) for path in storage.get_contract_files()]
+            if not contract_paths:
+                print(f"\nNo contracts found in: {storage.project_root}")
+                return 1
+            job = runner.submit([engine.prepare_contract(path) for path in contract_paths])
+            print(f"\n📤 Submitted batch {job.batch_id}: "
+                  f"{len(job.requests)} requests for {len(contract_paths)} contracts")
+            jobs = [job]
+    except (BatchAnalysisError, ValueError) as e:
+        print(f"\n❌ Batch analysis failed: {e}")
+        return 1
+
+    # Oldest first, so no pending job is left behind by a newer one
+    exit_code = 0
+    for job in jobs:
+        try:
+            if args.no_wait:
+                runner.refresh(job)
+                if job.status == "submitted":
+                    print(f"Batch {job.batch_id} is still processing; run this command again later.")
+                    continue
+            else:
+                runner.wait(job, poll_interval=args.poll_interval,
+                            progress_callback=lambda status, _: print(f"  {status}"))
+
+            prepared = [engine.prepare_contract(path) for path in job.contracts]
+            analyses = runner.collect(job, prepared)
+        except (BatchAnalysisError, ValueError) as e:
+            print(f"\n❌ Batch {job.batch_id} failed: {e}")
+            exit_code = 1
+            continue
+
+        for file_path, analysis in analyses.items():
+            output_path = storage.get_analysis_path(Path(file_path).stem)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(analysis.to_dict(), f, indent=2, ensure_ascii=False)
+            print(f"💾 {Path(file_path).name} → {output_path}")
+
+        if job.failed:
+            print(f"⚠️  {len(job.failed)} of {len(job.requests)} requests errored or expired "
+                  f"and were analyzed live")
+        print(f"\n✅ Batch {job.batch_id} collected: {len(analyses)} contract(s)")
+
+    return exit_code
+
+
+def serve_command(argv: list) -> int:
+    """
+    Run the 'serve' subcommand.
+
+    Keeps the configured local model resident in this process and serves it
+    to the GUI and CLI runs whose config sets local_model_server_address.
+    Runs until interrupted.
+
+    Args:
+        argv: Arguments after 'serve'
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="cli_main.py serve",
+        description="Keep the local model loaded and serve it to other CR2A processes."
+    )
+    parser.add_argument("--address", default=None,
+                        help="host:port, named pipe or socket path "
+                             "(default: configured address, else 127.0.0.1:47811)")
+    parser.add_argument("--model", default=None,
+                        help="model to serve (default: configured local model)")
+    parser.add_argument("--idle-unload", type=float, default=None,
+                        help="seconds without requests before the model is unloaded, "
+                             "0 = never (default: configured, 600)")
+    args = parser.parse_args(argv)
+
+    from src.config_manager import ConfigManager
+    from src.model_server import DEFAULT_ADDRESS, ModelServer, ModelServerError, create_server_client
+
+    config = ConfigManager()
+    config.load_config()
+    address = args.address or config.get_local_model_server_address() or DEFAULT_ADDRESS
+    idle_unload = (args.idle_unload if args.idle_unload is not None
+                   else config.get_local_model_server_idle_unload_seconds())
+
+    try:
+        server = ModelServer(create_server_client(config, args.model),
+                             address=address, idle_unload_seconds=idle_unload)
+        server.start()
+    except (ModelServerError, ImportError, ValueError, RuntimeError) as e:
+        print(f"\n❌ Model server failed to start: {e}")
+        return 1
+
+    print(f"\n🖥  Serving {server.client.model_name} on {server.address} (Ctrl+C to stop)")
+    print(f'   Set "local_model_server_address": "{server.address}" in config.json to use it.')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
 def main():
     """Main entry point."""
     print("\n" + "=" * 60)
@@ -295,13 +550,26 @@ def main():
         print("\nUsage:")
         print("  python src/cli_main.py <contract_file>")
         print("  python src/cli_main.py <analysis.json>")
+        print("  python src/cli_main.py search <query> [--root FOLDER] [--limit N]")
+        print("  python src/cli_main.py batch <project_folder> [--no-wait]")
+        print("  python src/cli_main.py serve [--address HOST:PORT] [--idle-unload SECONDS]")
         print("\nExamples:")
         print("  python src/cli_main.py test_contract.txt")
         print("  python src/cli_main.py contract.pdf")
         print("  python src/cli_main.py contract_analysis.json")
+        print('  python src/cli_main.py search pay-if-paid --root "F:\\Projects"')
         print("\nSupported formats: PDF, DOCX, TXT, JSON")
         sys.exit(1)
     
+    if sys.argv[1] == 'search':
+        sys.exit(search_command(sys.argv[2:]))
+
+    if sys.argv[1] == 'batch':
+        sys.exit(batch_command(sys.argv[2:]))
+
+    if sys.argv[1] == 'serve':
+        sys.exit(serve_command(sys.argv[2:]))
+    
     file_path = sys.argv[1]
     
     if not os.path.exists(file_path):
@@ -37,12 +37,17 @@ class ConfigManager:
         "gpu_backend": "auto",  # "auto", "vulkan", "sycl", "opencl", "ipex", "cpu"
         "ram_reserved_os_mb": None,  # None = auto-detect; MB of RAM reserved for OS
         "gpu_offload_layers": None,  # None = auto-detect; explicit layer count for GPU offload
+        "local_parallel_sequences": 1,  # Requests decoded together on the local model (1 = serial)
+        "local_model_server_address": None,  # None = load the model in-process; else a model server address
+        "local_model_server_idle_unload_seconds": 600,  # Model server unloads the model after this idle time
         # AI backend settings
         "ai_backend": "local",  # "local" = local Llama model, "claude" = Anthropic Claude API
         "claude_model": "claude-sonnet",  # "claude-sonnet" or "claude-opus"
         "anthropic_api_key_encrypted": None,  # Fernet-encrypted API key (machine-bound)
         "fallback_to_local": False,  # Auto-fallback to local model if API unavailable
         "show_cost_estimate": True,  # Show cost estimate dialog before Claude analysis
+        "ai_response_cache_enabled": True,  # Reuse stored AI responses for identical prompts
+        "ai_response_cache_max_mb": 256,  # Size limit of the AI response cache
         # Storage settings for multi-user network drive support
         "storage_mode": "local",  # "local" = %APPDATA%, "shared" = network drive
         "shared_storage_path": None,  # Path to network drive (e.g., "F:\\ContractAnalysis")
@@ -412,6 +417,33 @@ class ConfigManager:
         self.config["gpu_offload_layers"] = layers
         logger.info(f"GPU offload layers set to: {layers if layers is not None else 'auto-detect'}")
 
+    def get_local_parallel_sequences(self) -> int:
+        """Get how many requests the local model decodes together (1 = serial)."""
+        return self.config.get("local_parallel_sequences",
+                               self.DEFAULT_CONFIG["local_parallel_sequences"])
+
+    def set_local_parallel_sequences(self, sequences: int) -> None:
+        """Set how many requests the local model decodes together (1-8)."""
+        self.config["local_parallel_sequences"] = min(8, max(1, int(sequences)))
+
+    def get_local_model_server_address(self) -> Optional[str]:
+        """Get the model server address, or None to load the model in-process."""
+        return self.config.get("local_model_server_address",
+                               self.DEFAULT_CONFIG["local_model_server_address"])
+
+    def set_local_model_server_address(self, address: Optional[str]) -> None:
+        """Set the model server address (e.g. "127.0.0.1:47811"); None or "" disables it."""
+        self.config["local_model_server_address"] = address.strip() if address and address.strip() else None
+
+    def get_local_model_server_idle_unload_seconds(self) -> int:
+        """Get how long the model server keeps an idle model loaded (0 = forever)."""
+        return self.config.get("local_model_server_idle_unload_seconds",
+                               self.DEFAULT_CONFIG["local_model_server_idle_unload_seconds"])
+
+    def set_local_model_server_idle_unload_seconds(self, seconds: int) -> None:
+        """Set how long the model server keeps an idle model loaded (0 = forever)."""
+        self.config["local_model_server_idle_unload_seconds"] = max(0, int(seconds))
+
     def get_local_model_settings(self) -> Dict[str, Any]:
         """
         Get all local model settings as a dictionary.
@@ -427,6 +459,9 @@ class ConfigManager:
             "gpu_backend": self.get_gpu_backend(),
             "ram_reserved_os_mb": self.get_ram_reserved_os_mb(),
             "gpu_offload_layers": self.get_gpu_offload_layers(),
+            "local_parallel_sequences": self.get_local_parallel_sequences(),
+            "local_model_server_address": self.get_local_model_server_address(),
+            "local_model_server_idle_unload_seconds": self.get_local_model_server_idle_unload_seconds(),
         }
 
     # =========================================================================
@@ -481,6 +516,24 @@ class ConfigManager:
         """Set cost estimate dialog visibility."""
         self.config["show_cost_estimate"] = bool(show)
 
+    def get_ai_response_cache_enabled(self) -> bool:
+        """Get whether identical AI requests are answered from the response cache."""
+        return self.config.get("ai_response_cache_enabled",
+                               self.DEFAULT_CONFIG["ai_response_cache_enabled"])
+
+    def set_ai_response_cache_enabled(self, enabled: bool) -> None:
+        """Enable or bypass the AI response cache."""
+        self.config["ai_response_cache_enabled"] = bool(enabled)
+
+    def get_ai_response_cache_max_mb(self) -> int:
+        """Get the AI response cache size limit in MB."""
+        return self.config.get("ai_response_cache_max_mb",
+                               self.DEFAULT_CONFIG["ai_response_cache_max_mb"])
+
+    def set_ai_response_cache_max_mb(self, max_mb: int) -> None:
+        """Set the AI response cache size limit in MB (minimum 1)."""
+        self.config["ai_response_cache_max_mb"] = max(1, int(max_mb))
+
     # ===== Storage Settings (Multi-User Network Drive Support) =====
 
     def get_storage_mode(self) -> str:
@@ -2,15 +2,19 @@
 Contract Identity Detector Module
 
 Detects when an uploaded contract matches a previously analyzed contract
-using file hashing and filename similarity matching.
+using file hashing, MinHash content similarity and filename similarity.
 """
 
 import hashlib
 import logging
+import re
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
 
+import numpy as np
+
 from src.version_database import VersionDatabase
 
 
@@ -24,8 +28,8 @@ class ContractMatch:
     filename: str
     file_hash: str
     current_version: int
-    match_type: str  # 'hash' or 'filename'
-    similarity_score: float  # 1.0 for hash match, 0.0-1.0 for filename match
+    match_type: str  # 'hash', 'content' or 'filename'
+    similarity_score: float  # 1.0 for hash match, 0.0-1.0 for content/filename match
 
 
 class ContractIdentityDetector:
@@ -34,11 +38,47 @@ class ContractIdentityDetector:
     
     This class implements contract identity detection as specified in
     Requirements 1.1, 1.2, and 1.3.
+    
+    Filename matching uses a trigram index kept in the version database
+    (contract_filename_index / contract_filename_trigrams). Only contracts
+    sharing enough trigrams with the uploaded filename to possibly reach
+    FILENAME_SIMILARITY_THRESHOLD are scored with Levenshtein distance.
+    
+    Content matching finds re-scanned or re-exported copies of a contract,
+    which have a different file hash. A MinHash signature of the extracted
+    text is stored in contracts.content_signature, and locality-sensitive
+    hashing over its bands (contract_minhash_bands) returns the contracts
+    whose estimated Jaccard similarity is worth checking.
     """
     
     # Threshold for filename similarity matching (80%)
     FILENAME_SIMILARITY_THRESHOLD = 0.8
     
+    # Padding added to both ends of a filename stem before taking trigrams,
+    # so every character (including the first and last) is in three trigrams
+    TRIGRAM_PADDING = "##"
+    
+    # Estimated Jaccard similarity of word shingles for a content match
+    CONTENT_SIMILARITY_THRESHOLD = 0.8
+    
+    # Words per shingle when computing content signatures
+    SHINGLE_SIZE = 5
+    
+    # MinHash signature length; MINHASH_BANDS bands of 4 rows each make
+    # contracts at the threshold candidates with probability > 0.999
+    MINHASH_PERMUTATIONS = 128
+    MINHASH_BANDS = 32
+    
+    # Seed for the MinHash permutations. Stored signatures are only
+    # comparable with ones made from the same permutations, so never change it.
+    MINHASH_SEED = 35
+    
+    # Order of match types in find_potential_matches() results
+    MATCH_TYPE_ORDER = {'hash': 0, 'content': 1, 'filename': 2}
+    
+    _MERSENNE_PRIME = (1 << 61) - 1
+    _SHINGLE_CHUNK = 4096
+    
     def __init__(self, db: VersionDatabase):
         """
         Initialize the contract identity detector.
@@ -47,6 +87,10 @@ class ContractIdentityDetector:
             db: VersionDatabase instance for querying existing contracts
         """
         self.db = db
+        
+        rng = np.random.RandomState(self.MINHASH_SEED)
+        self._perm_a = rng.randint(1, 1 << 31, size=self.MINHASH_PERMUTATIONS).astype(np.uint64)
+        self._perm_b = rng.randint(0, 1 << 31, size=self.MINHASH_PERMUTATIONS).astype(np.uint64)
         logger.debug("ContractIdentityDetector initialized")
     
     def compute_file_hash(self, file_path: str) -> str:
@@ -178,21 +222,25 @@ class ContractIdentityDetector:
     def find_potential_matches(
         self,
         file_hash: str,
-        filename: str
+        filename: str,
+        content_signature: Optional[bytes] = None
     ) -> List[ContractMatch]:
         """
-        Find contracts that might match based on hash or filename similarity.
+        Find contracts that might match based on hash, content or filename similarity.
         
         Implements Requirements 1.2 and 1.3: Hash-based and filename-based
-        duplicate detection.
+        duplicate detection. When a content signature is given, contracts
+        with near-identical text are also matched.
         
         Args:
             file_hash: SHA-256 hash of the uploaded file
             filename: Name of the uploaded file
+            content_signature: Optional signature from compute_content_signature()
             
         Returns:
             List of ContractMatch objects, sorted by match quality
-            (hash matches first, then filename matches by similarity score)
+            (hash matches first, then content and filename matches,
+            each by similarity score)
             
         Raises:
             ValueError: If file_hash or filename is empty
@@ -237,16 +285,16 @@ class ContractIdentityDetector:
                     logger.warning("Failed to create ContractMatch from row: %s", e)
                     continue
             
+            # If no hash matches, check for near-duplicate content
+            if not matches and content_signature:
+                matches.extend(self._content_matches(content_signature))
+            
             # If no hash matches, check for filename similarity (Requirement 1.3)
-            if not matches:
-                cursor = self.db.execute("""
-                    SELECT contract_id, filename, file_hash, current_version
-                    FROM contracts
-                """)
-                
-                all_contracts = cursor.fetchall()
-                
-                for row in all_contracts:
+            if not any(m.match_type == 'hash' for m in matches):
+                content_ids = {m.contract_id for m in matches}
+                for row in self._filename_candidates(filename):
+                    if row['contract_id'] in content_ids:
+                        continue
                     try:
                         similarity = self.calculate_filename_similarity(
                             filename,
@@ -272,8 +320,8 @@ class ContractIdentityDetector:
                         logger.warning("Failed to process contract row: %s", e)
                         continue
             
-            # Sort matches: hash matches first, then by similarity score
-            matches.sort(key=lambda m: (m.match_type != 'hash', -m.similarity_score))
+            # Sort matches: hash, then content, then filename; each by similarity
+            matches.sort(key=lambda m: (self.MATCH_TYPE_ORDER[m.match_type], -m.similarity_score))
             
             logger.info("Found %d potential matches for file: %s", len(matches), filename)
             
@@ -285,3 +333,310 @@ class ContractIdentityDetector:
             logger.error("Error finding potential matches for file '%s': %s", filename, e, exc_info=True)
             # Return empty list on database error rather than failing
             return []
+    
+    def _filename_candidates(self, filename: str) -> list:
+        """
+        Find contracts whose filenames could meet the similarity threshold.
+        
+        Uses the q-gram lemma: if two stems are within edit distance d, and
+        the longer has L characters, their padded trigram multisets share at
+        least L + 2 - 3*d trigrams (each edit touches at most three). The
+        index returns shared-trigram counts for contracts with a plausible
+        stem length, and only those meeting the bound for the largest d the
+        threshold allows are returned for exact scoring.
+        
+        Below a threshold of 2/3 the bound can reach zero, so contracts that
+        share no trigram could still match; all contracts are returned then.
+        
+        Args:
+            filename: Name of the uploaded file
+            
+        Returns:
+            Contract rows (contract_id, filename, file_hash, current_version)
+        """
+        self._sync_filename_index()
+        
+        threshold = self.FILENAME_SIMILARITY_THRESHOLD
+        if threshold * 3 <= 2:
+            return self.db.execute("""
+                SELECT contract_id, filename, file_hash, current_version
+                FROM contracts
+            """).fetchall()
+        
+        stem = self._filename_stem(filename)
+        if not stem:
+            return []  # An empty stem never scores above 0.0
+        
+        trigrams = self._trigrams(stem)
+        length = len(stem)
+        values = ", ".join(["(?, ?)"] * len(trigrams))
+        params = [item for pair in trigrams.items() for item in pair]
+        params += [int(length * threshold) - 1, int(length / threshold) + 1]
+        
+        cursor = self.db.execute(f"""
+            WITH query(trigram, occurrences) AS (VALUES {values})
+            SELECT c.contract_id, c.filename, c.file_hash, c.current_version,
+                   n.stem_length,
+                   SUM(MIN(t.occurrences, query.occurrences)) AS shared
+            FROM query
+            JOIN contract_filename_trigrams t ON t.trigram = query.trigram
+            JOIN contract_filename_index n ON n.contract_id = t.contract_id
+            JOIN contracts c ON c.contract_id = t.contract_id
+            WHERE n.stem_length BETWEEN ? AND ?
+            GROUP BY t.contract_id
+            ORDER BY shared DESC
+        """, tuple(params))
+        
+        candidates = []
+        for row in cursor.fetchall():
+            longest = max(length, row['stem_length'])
+            max_distance = self._max_edit_distance(longest)
+            if abs(length - row['stem_length']) > max_distance:
+                continue
+            if row['shared'] < longest + 2 - 3 * max_distance:
+                continue
+            candidates.append(row)
+        
+        logger.debug("Trigram index returned %d filename candidates", len(candidates))
+        return candidates
+    
+    def _max_edit_distance(self, length: int) -> int:
+        """Largest edit distance that still meets the threshold for a stem length."""
+        threshold = self.FILENAME_SIMILARITY_THRESHOLD
+        distance = int(length * (1.0 - threshold)) + 1
+        # Step down using the same float comparison as the exact check
+        while distance > 0 and 1.0 - (distance / length) < threshold:
+            distance -= 1
+        return distance
+    
+    def _sync_filename_index(self) -> None:
+        """
+        Add contracts missing from the filename trigram index.
+        
+        Contracts can be inserted by other components or other users of a
+        shared database, so the index catches up lazily before each lookup.
+        Deleted contracts drop out of the index through cascading deletes.
+        """
+        rows = self.db.execute("""
+            SELECT c.contract_id, c.filename
+            FROM contracts c
+            LEFT JOIN contract_filename_index n ON n.contract_id = c.contract_id
+            WHERE n.contract_id IS NULL
+        """).fetchall()
+        if not rows:
+            return
+        
+        with self.db.write_transaction() as conn:
+            for row in rows:
+                stem = self._filename_stem(row['filename'])
+                conn.execute("""
+                    INSERT OR IGNORE INTO contract_filename_index (contract_id, stem, stem_length)
+                    VALUES (?, ?, ?)
+                """, (row['contract_id'], stem, len(stem)))
+                if stem:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO contract_filename_trigrams
+                            (trigram, contract_id, occurrences)
+                        VALUES (?, ?, ?)
+                    """, [
+                        (trigram, row['contract_id'], count)
+                        for trigram, count in self._trigrams(stem).items()
+                    ])
+        logger.info("Indexed %d contract filenames for similarity matching", len(rows))
+    
+    @staticmethod
+    def _filename_stem(filename: str) -> str:
+        """Normalized filename used for similarity (lowercase, no extension)."""
+        return Path(filename).stem.lower()
+    
+    def _trigrams(self, stem: str) -> Counter:
+        """Trigram counts of a padded filename stem."""
+        padded = f"{self.TRIGRAM_PADDING}{stem}{self.TRIGRAM_PADDING}"
+        return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+    
+    def compute_content_signature(self, text: str) -> Optional[bytes]:
+        """
+        Compute a MinHash signature of contract text.
+        
+        The text is lowercased and split into words, so differences in
+        layout, whitespace and punctuation between a re-scanned or
+        re-exported copy and the original do not matter. Each run of
+        SHINGLE_SIZE words is a shingle, and the signature keeps the minimum
+        of MINHASH_PERMUTATIONS hash permutations over the shingle set.
+        
+        Args:
+            text: Extracted contract text
+            
+        Returns:
+            Signature bytes (MINHASH_PERMUTATIONS little-endian uint32 values),
+            or None if the text has no words
+        """
+        words = re.findall(r'[a-z0-9]+', (text or '').lower())
+        if not words:
+            return None
+        
+        size = min(self.SHINGLE_SIZE, len(words))
+        shingles = {
+            ' '.join(words[i:i + size])
+            for i in range(len(words) - size + 1)
+        }
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(),
+                    'little'
+                )
+                for shingle in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        
+        signature = np.full(self.MINHASH_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(hashes), self._SHINGLE_CHUNK):
+            chunk = hashes[start:start + self._SHINGLE_CHUNK]
+            permuted = (
+                np.outer(self._perm_a, chunk) + self._perm_b[:, None]
+            ) % np.uint64(self._MERSENNE_PRIME)
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        
+        return (signature & np.uint64(0xFFFFFFFF)).astype('<u4').tobytes()
+    
+    @staticmethod
+    def estimate_content_similarity(signature1: bytes, signature2: bytes) -> float:
+        """
+        Estimate the Jaccard similarity of two contracts' word shingles.
+        
+        Args:
+            signature1: Signature from compute_content_signature()
+            signature2: Signature from compute_content_signature()
+            
+        Returns:
+            Fraction of matching signature positions (0.0 to 1.0)
+        """
+        values1 = np.frombuffer(signature1, dtype='<u4')
+        values2 = np.frombuffer(signature2, dtype='<u4')
+        if len(values1) != len(values2) or len(values1) == 0:
+            return 0.0
+        return float(np.mean(values1 == values2))
+    
+    def store_content_signature(self, contract_id: str, signature: Optional[bytes]) -> None:
+        """
+        Store a contract's content signature and index its LSH bands.
+        
+        Call after a contract (or a new version of it) is stored, with the
+        signature of the text that was analyzed.
+        
+        Args:
+            contract_id: Contract the signature belongs to
+            signature: Signature from compute_content_signature(), or None to clear
+        """
+        with self.db.write_transaction() as conn:
+            conn.execute(
+                "DELETE FROM contract_minhash_bands WHERE contract_id = ?",
+                (contract_id,)
+            )
+            conn.execute(
+                "UPDATE contracts SET content_signature = ? WHERE contract_id = ?",
+                (signature, contract_id)
+            )
+            if signature:
+                conn.executemany("""
+                    INSERT OR IGNORE INTO contract_minhash_bands (band, bucket, contract_id)
+                    VALUES (?, ?, ?)
+                """, [
+                    (band, bucket, contract_id)
+                    for band, bucket in self._band_buckets(signature)
+                ])
+        logger.debug("Stored content signature for contract %s", contract_id)
+    
+    def _content_matches(self, signature: bytes) -> List[ContractMatch]:
+        """
+        Find contracts whose stored signature is close to the given one.
+        
+        Contracts sharing at least one LSH band bucket are candidates; their
+        full signatures are then compared against CONTENT_SIMILARITY_THRESHOLD.
+        
+        Args:
+            signature: Signature from compute_content_signature()
+            
+        Returns:
+            Content ContractMatch objects (unsorted)
+        """
+        self._sync_content_index()
+        
+        buckets = self._band_buckets(signature)
+        values = ", ".join(["(?, ?)"] * len(buckets))
+        params = tuple(item for pair in buckets for item in pair)
+        
+        cursor = self.db.execute(f"""
+            WITH query(band, bucket) AS (VALUES {values})
+            SELECT c.contract_id, c.filename, c.file_hash, c.current_version,
+                   c.content_signature
+            FROM contracts c
+            WHERE c.contract_id IN (
+                SELECT b.contract_id
+                FROM query
+                JOIN contract_minhash_bands b
+                    ON b.band = query.band AND b.bucket = query.bucket
+            )
+        """, params)
+        
+        matches = []
+        for row in cursor.fetchall():
+            similarity = self.estimate_content_similarity(signature, row['content_signature'])
+            if similarity >= self.CONTENT_SIMILARITY_THRESHOLD:
+                matches.append(ContractMatch(
+                    contract_id=row['contract_id'],
+                    filename=row['filename'],
+                    file_hash=row['file_hash'],
+                    current_version=row['current_version'],
+                    match_type='content',
+                    similarity_score=similarity
+                ))
+                logger.info(
+                    "Found content match: contract_id=%s, filename=%s, similarity=%.2f",
+                    row['contract_id'], row['filename'], similarity
+                )
+        return matches
+    
+    def _sync_content_index(self) -> None:
+        """Index LSH bands for signed contracts that have none yet."""
+        rows = self.db.execute("""
+            SELECT c.contract_id, c.content_signature
+            FROM contracts c
+            LEFT JOIN contract_minhash_bands b
+                ON b.contract_id = c.contract_id AND b.band = 0
+            WHERE c.content_signature IS NOT NULL AND b.contract_id IS NULL
+        """).fetchall()
+        if not rows:
+            return
+        
+        with self.db.write_transaction() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO contract_minhash_bands (band, bucket, contract_id)
+                VALUES (?, ?, ?)
+            """, [
+                (band, bucket, row['contract_id'])
+                for row in rows
+                for band, bucket in self._band_buckets(row['content_signature'])
+            ])
+        logger.info("Indexed content signatures of %d contracts", len(rows))
+    
+    def _band_buckets(self, signature: bytes) -> List[tuple]:
+        """Split a signature into (band, bucket) pairs for the LSH index."""
+        band_bytes = len(signature) // self.MINHASH_BANDS
+        return [
+            (
+                band,
+                int.from_bytes(
+                    hashlib.blake2b(
+                        signature[band * band_bytes:(band + 1) * band_bytes],
+                        digest_size=8
+                    ).digest(),
+                    'little',
+                    signed=True
+                )
+            )
+            for band in range(self.MINHASH_BANDS)
+        ]
@@ -7,13 +7,14 @@ Only stores changes (deltas) between versions to minimize redundancy.
 
 import json
 import logging
+import re
 import sqlite3
 import time
 import uuid
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from functools import wraps
-from typing import List, Optional, Dict, Any, Callable, TypeVar
+from typing import List, Optional, Dict, Any, Callable, Tuple, TypeVar
 
 from src.version_database import VersionDatabase, VersionDatabaseError
 
@@ -215,6 +216,29 @@ class VersionMetadata:
         return cls(**data)
 
 
+@dataclass
+class ClauseSearchHit:
+    """
+    One clause matched by a full-text search.
+    
+    Attributes:
+        contract_id: Contract the clause belongs to
+        filename: Filename of that contract
+        category: Clause identifier ("<section>.<category>")
+        version: Contract version the clause row was stored in
+        clause_id: ID of the matching clause row
+        snippet: Matching text with search terms in [brackets]
+        rank: FTS5 BM25 rank (lower is a better match)
+    """
+    contract_id: str
+    filename: str
+    category: str
+    version: int
+    clause_id: str
+    snippet: str
+    rank: float
+
+
 class DifferentialStorageError(Exception):
     """Exception raised for differential storage errors."""
     pass
@@ -226,8 +250,33 @@ class DifferentialStorage:
     
     This class provides CRUD operations for contracts with differential versioning.
     Only changes (deltas) are stored between versions to minimize redundancy.
+    Every SNAPSHOT_INTERVAL versions the reconstructed clause set is also
+    materialized, so rebuilding a version only merges the deltas stored
+    after the nearest snapshot.
+    """
+    
+    # Versions between materialized snapshots
+    SNAPSHOT_INTERVAL = 10
+    
+    _CLAUSE_INSERT_SQL = """
+        INSERT INTO clauses (
+            clause_id, contract_id, clause_version, clause_identifier,
+            content, metadata, created_at, is_deleted, deleted_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    _VERSION_METADATA_INSERT_SQL = """
+        INSERT INTO version_metadata (
+            contract_id, version, timestamp, changed_clause_ids, change_summary
+        )
+        VALUES (?, ?, ?, ?, ?)
     """
     
+    # Columns read into Clause objects, in _clause_from_row order
+    _CLAUSE_COLUMNS = """clause_id, contract_id, clause_version, clause_identifier,
+                         content, metadata, created_at, is_deleted, deleted_at"""
+    
     def __init__(self, database: Optional[VersionDatabase] = None):
         """
         Initialize differential storage.
@@ -238,13 +287,13 @@ class DifferentialStorage:
         self.db = database if database is not None else VersionDatabase()
         logger.info("DifferentialStorage initialized")
 
-    @retry_on_db_lock(max_retries=3, initial_delay=1.0)
     def store_new_contract(self, contract: Contract, clauses: List[Clause]) -> None:
         """
         Store a new contract with version 1.
         
         This method stores a new contract and all its clauses as version 1.
-        All operations are performed within a transaction for atomicity.
+        Rows are validated and serialized first, then written with bulk
+        inserts in one short transaction for atomicity.
         
         Implements Requirement 8.3: Transaction atomicity with rollback on failure.
         
@@ -273,88 +322,35 @@ class DifferentialStorage:
             logger.error("clauses is None")
             raise ValueError("clauses cannot be None")
         
-        logger.info("Storing new contract: %s (version 1)", contract.contract_id)
+        # Validate clauses and serialize rows before taking the write lock
+        for clause in clauses:
+            self._validate_clause(clause, contract.contract_id)
+        clause_rows = [self._clause_insert_row(clause) for clause in clauses]
         
-        conn = None
-        try:
-            conn = self.db.connect()
-            cursor = conn.cursor()
-            
-            # Begin transaction (implicit in SQLite)
-            logger.debug("Beginning transaction for new contract storage")
-            
-            # Insert contract record
-            cursor.execute("""
-                INSERT INTO contracts (
-                    contract_id, filename, file_hash, current_version,
-                    created_at, updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                contract.contract_id,
-                contract.filename,
-                contract.file_hash,
-                contract.current_version,
-                contract.created_at.isoformat(),
-                contract.updated_at.isoformat()
-            ))
-            
-            # Insert all clauses
-            for clause in clauses:
-                # Validate clause metadata (Requirement 8.2)
-                if not clause.clause_id:
-                    logger.error("Clause missing clause_id")
-                    raise ValueError("All clauses must have a clause_id")
-                
-                if clause.contract_id != contract.contract_id:
-                    logger.error(
-                        "Clause contract_id mismatch: expected %s, got %s",
-                        contract.contract_id,
-                        clause.contract_id
-                    )
-                    raise ValueError("Clause contract_id must match contract")
-                
-                cursor.execute("""
-                    INSERT INTO clauses (
-                        clause_id, contract_id, clause_version, clause_identifier,
-                        content, metadata, created_at, is_deleted, deleted_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    clause.clause_id,
-                    clause.contract_id,
-                    clause.clause_version,
-                    clause.clause_identifier,
-                    clause.content,
-                    json.dumps(clause.metadata),
-                    clause.created_at.isoformat(),
-                    1 if clause.is_deleted else 0,
-                    clause.deleted_at.isoformat() if clause.deleted_at else None
-                ))
-            
-            # Insert version metadata
-            changed_clause_ids = [c.clause_id for c in clauses]
-            change_summary = {
+        contract_row = (
+            contract.contract_id,
+            contract.filename,
+            contract.file_hash,
+            contract.current_version,
+            contract.created_at.isoformat(),
+            contract.updated_at.isoformat()
+        )
+        metadata_row = (
+            contract.contract_id,
+            contract.current_version,
+            contract.created_at.isoformat(),
+            json.dumps([c.clause_id for c in clauses]),
+            json.dumps({
                 "modified": 0,
                 "added": len(clauses),
                 "deleted": 0
-            }
-            
-            cursor.execute("""
-                INSERT INTO version_metadata (
-                    contract_id, version, timestamp, changed_clause_ids, change_summary
-                )
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                contract.contract_id,
-                contract.current_version,
-                contract.created_at.isoformat(),
-                json.dumps(changed_clause_ids),
-                json.dumps(change_summary)
-            ))
-            
-            # Commit transaction (Requirement 8.3)
-            conn.commit()
+            })
+        )
+        
+        logger.info("Storing new contract: %s (version 1)", contract.contract_id)
+        
+        try:
+            self._write_new_contract(contract_row, clause_rows, metadata_row)
             logger.debug("Transaction committed successfully")
             
             logger.info(
@@ -363,20 +359,31 @@ class DifferentialStorage:
                 len(clauses)
             )
             
-        except ValueError:
-            if conn:
-                conn.rollback()
-                logger.debug("Transaction rolled back due to validation error")
-            raise
         except Exception as e:
             logger.error("Failed to store new contract: %s", e, exc_info=True)
-            if conn:
-                # Rollback transaction on failure (Requirement 8.3)
-                conn.rollback()
-                logger.debug("Transaction rolled back due to error")
+            # write_transaction() rolled back on failure (Requirement 8.3)
+            logger.debug("Transaction rolled back due to error")
             raise DifferentialStorageError(f"Failed to store new contract: {e}")
-
+    
     @retry_on_db_lock(max_retries=3, initial_delay=1.0)
+    def _write_new_contract(
+        self,
+        contract_row: tuple,
+        clause_rows: List[tuple],
+        metadata_row: tuple
+    ) -> None:
+        """Insert a new contract's pre-serialized rows in one transaction."""
+        with self.db.write_transaction() as conn:
+            conn.execute("""
+                INSERT INTO contracts (
+                    contract_id, filename, file_hash, current_version,
+                    created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, contract_row)
+            conn.executemany(self._CLAUSE_INSERT_SQL, clause_rows)
+            conn.execute(self._VERSION_METADATA_INSERT_SQL, metadata_row)
+
     def store_contract_version(
         self,
         contract_id: str,
@@ -388,8 +395,9 @@ class DifferentialStorage:
         Store a new version with only changed clauses.
         
         This method stores only the clauses that changed in the new version.
-        Unchanged clauses are not duplicated. All operations are performed
-        within a transaction for atomicity.
+        Unchanged clauses are not duplicated. Rows are validated and
+        serialized first, then written with bulk statements in one short
+        transaction for atomicity.
         
         Implements Requirement 8.3: Transaction atomicity with rollback on failure.
         
@@ -437,15 +445,68 @@ class DifferentialStorage:
             )
             raise ValueError("version_metadata version must match version")
         
+        # Validate clauses and serialize rows before taking the write lock
+        for clause in changed_clauses:
+            self._validate_clause(clause, contract_id)
+        
+        now = datetime.now().isoformat()
+        clause_rows = [
+            self._clause_insert_row(clause)
+            for clause in changed_clauses if not clause.is_deleted
+        ]
+        deletion_rows = [
+            (
+                clause.deleted_at.isoformat() if clause.deleted_at else now,
+                clause.clause_id,
+                contract_id
+            )
+            for clause in changed_clauses if clause.is_deleted
+        ]
+        metadata_row = (
+            version_metadata.contract_id,
+            version_metadata.version,
+            version_metadata.timestamp.isoformat(),
+            json.dumps(version_metadata.changed_clause_ids),
+            json.dumps(version_metadata.change_summary)
+        )
+        
         logger.info("Storing contract version: %s v%d", contract_id, version)
         
-        conn = None
         try:
-            conn = self.db.connect()
-            cursor = conn.cursor()
+            self._write_contract_version(
+                contract_id, version, now, clause_rows, deletion_rows, metadata_row
+            )
+            logger.debug("Transaction committed successfully")
+            
+            logger.info(
+                "Successfully stored version %d for contract %s with %d changed clauses",
+                version,
+                contract_id,
+                len(changed_clauses)
+            )
             
-            # Begin transaction (implicit in SQLite)
-            logger.debug("Beginning transaction for version storage")
+        except (ValueError, DifferentialStorageError):
+            logger.debug("Transaction rolled back due to validation error")
+            raise
+        except Exception as e:
+            logger.error("Failed to store contract version: %s", e, exc_info=True)
+            # write_transaction() rolled back on failure (Requirement 8.3)
+            logger.debug("Transaction rolled back due to error")
+            raise DifferentialStorageError(f"Failed to store contract version: {e}")
+    
+    @retry_on_db_lock(max_retries=3, initial_delay=1.0)
+    def _write_contract_version(
+        self,
+        contract_id: str,
+        version: int,
+        updated_at: str,
+        clause_rows: List[tuple],
+        deletion_rows: List[tuple],
+        metadata_row: tuple
+    ) -> None:
+        """Write a new version's pre-serialized rows in one transaction."""
+        with self.db.write_transaction() as conn:
+            cursor = conn.cursor()
             
             # Validate sequential version (Requirement 8.1)
             cursor.execute("""
@@ -475,106 +536,73 @@ class DifferentialStorage:
                 UPDATE contracts
                 SET current_version = ?, updated_at = ?
                 WHERE contract_id = ?
-            """, (
-                version,
-                datetime.now().isoformat(),
-                contract_id
-            ))
+            """, (version, updated_at, contract_id))
             
             if cursor.rowcount == 0:
                 raise DifferentialStorageError(
                     f"Failed to update contract {contract_id}"
                 )
             
-            # Insert or update changed clauses
-            for clause in changed_clauses:
-                # Validate clause metadata (Requirement 8.2)
-                if not clause.clause_id:
-                    logger.error("Clause missing clause_id")
-                    raise ValueError("All clauses must have a clause_id")
+            # Mark deleted clauses
+            if deletion_rows:
+                cursor.executemany("""
+                    UPDATE clauses
+                    SET is_deleted = 1, deleted_at = ?
+                    WHERE clause_id = ? AND contract_id = ?
+                """, deletion_rows)
                 
-                if clause.contract_id != contract_id:
-                    logger.error(
-                        "Clause contract_id mismatch: expected %s, got %s",
-                        contract_id,
-                        clause.contract_id
+                if cursor.rowcount < len(deletion_rows):
+                    logger.warning(
+                        "Failed to mark %d of %d clauses as deleted (may not exist)",
+                        len(deletion_rows) - cursor.rowcount,
+                        len(deletion_rows)
                     )
-                    raise ValueError("Clause contract_id must match contract")
-                
-                if clause.is_deleted:
-                    # Mark existing clause as deleted
-                    cursor.execute("""
-                        UPDATE clauses
-                        SET is_deleted = 1, deleted_at = ?
-                        WHERE clause_id = ? AND contract_id = ?
-                    """, (
-                        clause.deleted_at.isoformat() if clause.deleted_at else datetime.now().isoformat(),
-                        clause.clause_id,
-                        contract_id
-                    ))
-                    
-                    if cursor.rowcount == 0:
-                        logger.warning(
-                            "Failed to mark clause %s as deleted (may not exist)",
-                            clause.clause_id
-                        )
-                else:
-                    # Insert new clause version (modified or added)
-                    cursor.execute("""
-                        INSERT INTO clauses (
-                            clause_id, contract_id, clause_version, clause_identifier,
-                            content, metadata, created_at, is_deleted, deleted_at
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        clause.clause_id,
-                        clause.contract_id,
-                        clause.clause_version,
-                        clause.clause_identifier,
-                        clause.content,
-                        json.dumps(clause.metadata),
-                        clause.created_at.isoformat(),
-                        0,
-                        None
-                    ))
-            
-            # Insert version metadata
-            cursor.execute("""
-                INSERT INTO version_metadata (
-                    contract_id, version, timestamp, changed_clause_ids, change_summary
-                )
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                version_metadata.contract_id,
-                version_metadata.version,
-                version_metadata.timestamp.isoformat(),
-                json.dumps(version_metadata.changed_clause_ids),
-                json.dumps(version_metadata.change_summary)
-            ))
-            
-            # Commit transaction (Requirement 8.3)
-            conn.commit()
-            logger.debug("Transaction committed successfully")
             
-            logger.info(
-                "Successfully stored version %d for contract %s with %d changed clauses",
-                version,
+            # Insert new clause versions (modified or added)
+            cursor.executemany(self._CLAUSE_INSERT_SQL, clause_rows)
+            cursor.execute(self._VERSION_METADATA_INSERT_SQL, metadata_row)
+            
+            # Deletions update clause rows of earlier versions, which
+            # invalidates every snapshot taken before them
+            if deletion_rows:
+                self._rebuild_snapshots(cursor, contract_id)
+            if version % self.SNAPSHOT_INTERVAL == 0:
+                self._materialize_snapshot(cursor, contract_id, version)
+    
+    @staticmethod
+    def _validate_clause(clause: Clause, contract_id: str) -> None:
+        """
+        Check a clause before storage (Requirement 8.2).
+        
+        Raises:
+            ValueError: If the clause has no ID or belongs to another contract
+        """
+        if not clause.clause_id:
+            logger.error("Clause missing clause_id")
+            raise ValueError("All clauses must have a clause_id")
+        
+        if clause.contract_id != contract_id:
+            logger.error(
+                "Clause contract_id mismatch: expected %s, got %s",
                 contract_id,
-                len(changed_clauses)
+                clause.contract_id
             )
-            
-        except (ValueError, DifferentialStorageError):
-            if conn:
-                conn.rollback()
-                logger.debug("Transaction rolled back due to validation error")
-            raise
-        except Exception as e:
-            logger.error("Failed to store contract version: %s", e, exc_info=True)
-            if conn:
-                # Rollback transaction on failure (Requirement 8.3)
-                conn.rollback()
-                logger.debug("Transaction rolled back due to error")
-            raise DifferentialStorageError(f"Failed to store contract version: {e}")
+            raise ValueError("Clause contract_id must match contract")
+    
+    @staticmethod
+    def _clause_insert_row(clause: Clause) -> tuple:
+        """Serialize a clause into _CLAUSE_INSERT_SQL parameters."""
+        return (
+            clause.clause_id,
+            clause.contract_id,
+            clause.clause_version,
+            clause.clause_identifier,
+            clause.content,
+            json.dumps(clause.metadata),
+            clause.created_at.isoformat(),
+            1 if clause.is_deleted else 0,
+            clause.deleted_at.isoformat() if clause.deleted_at else None
+        )
     
     def get_contract(self, contract_id: str) -> Optional[Contract]:
         """
@@ -690,6 +718,184 @@ class DifferentialStorage:
             logger.error("Failed to retrieve clauses: %s", e)
             raise DifferentialStorageError(f"Failed to retrieve clauses: {e}")
     
+    def get_clauses_at_version(self, contract_id: str, version: int) -> List[Clause]:
+        """
+        Retrieve the clauses that make up a contract at a version.
+        
+        Selects, per clause identifier, the latest non-deleted clause with
+        clause_version <= version. The selection runs in SQL with window
+        functions, starting from the nearest materialized snapshot, and
+        keeps the order in which identifiers first appeared.
+        
+        Args:
+            contract_id: ID of the contract
+            version: Version number to reconstruct
+            
+        Returns:
+            List of Clause objects, one per clause identifier
+            
+        Raises:
+            DifferentialStorageError: If retrieval operation fails
+        """
+        logger.debug("Selecting clauses for contract %s at version %d", contract_id, version)
+        
+        try:
+            conn = self.db.connect()
+            cursor = conn.cursor()
+            query, params = self._version_selection(cursor, contract_id, version)
+            cursor.execute(f"""
+                SELECT {self._CLAUSE_COLUMNS}
+                FROM ({query})
+                ORDER BY first_pos
+            """, params)
+            clauses = [self._clause_from_row(row) for row in cursor.fetchall()]
+            
+            logger.debug("Selected %d clauses", len(clauses))
+            return clauses
+            
+        except Exception as e:
+            logger.error("Failed to select clauses at version: %s", e)
+            raise DifferentialStorageError(f"Failed to select clauses at version: {e}")
+    
+    def get_latest_clauses(self, contract_id: str) -> List[Clause]:
+        """
+        Retrieve the most recent stored clause for each clause identifier.
+        
+        Unlike get_clauses_at_version(), deleted clauses are included so a
+        new version can carry their IDs forward.
+        
+        Args:
+            contract_id: ID of the contract
+            
+        Returns:
+            List of Clause objects, one per clause identifier
+            
+        Raises:
+            DifferentialStorageError: If retrieval operation fails
+        """
+        try:
+            cursor = self.db.execute(f"""
+                SELECT {self._CLAUSE_COLUMNS}
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY clause_identifier
+                        ORDER BY clause_version DESC, clause_id DESC
+                    ) AS rn
+                    FROM clauses
+                    WHERE contract_id = ?
+                )
+                WHERE rn = 1
+                ORDER BY clause_version, clause_id
+            """, (contract_id,))
+            return [self._clause_from_row(row) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            logger.error("Failed to retrieve latest clauses: %s", e)
+            raise DifferentialStorageError(f"Failed to retrieve latest clauses: {e}")
+    
+    def _version_selection(
+        self,
+        cursor: sqlite3.Cursor,
+        contract_id: str,
+        version: int
+    ) -> Tuple[str, tuple]:
+        """
+        Build the window-function query selecting a version's clauses.
+        
+        Candidates are the rows of the nearest snapshot at or below version
+        plus the clauses stored after it. Each surviving row gets first_pos,
+        the position at which its identifier first appeared.
+        
+        Args:
+            cursor: Cursor to look up the base snapshot with
+            contract_id: ID of the contract
+            version: Version number to select
+            
+        Returns:
+            Tuple of (query, params)
+        """
+        cursor.execute("""
+            SELECT MAX(version) FROM version_snapshots
+            WHERE contract_id = ? AND version <= ?
+        """, (contract_id, version))
+        row = cursor.fetchone()
+        base = row[0] if row and row[0] is not None else 0
+        
+        query = """
+            WITH candidates AS (
+                SELECT c.*, 0 AS tier, s.position AS ord
+                FROM version_snapshots s
+                JOIN clauses c ON c.clause_id = s.clause_id
+                WHERE s.contract_id = ? AND s.version = ?
+                UNION ALL
+                SELECT c.*, 1 AS tier, 0 AS ord
+                FROM clauses c
+                WHERE c.contract_id = ? AND c.clause_version > ? AND c.clause_version <= ?
+            ),
+            active AS (
+                SELECT *, ROW_NUMBER() OVER (
+                    ORDER BY tier, ord, clause_version, clause_id
+                ) AS pos
+                FROM candidates
+                WHERE is_deleted = 0 OR (deleted_at IS NOT NULL AND deleted_at > ?)
+            ),
+            ranked AS (
+                SELECT *,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY clause_identifier
+                           ORDER BY clause_version DESC, clause_id
+                       ) AS rn,
+                       MIN(pos) OVER (PARTITION BY clause_identifier) AS first_pos
+                FROM active
+            )
+            SELECT * FROM ranked WHERE rn = 1
+        """
+        params = (contract_id, base, contract_id, base, version, datetime.now().isoformat())
+        return query, params
+    
+    def _materialize_snapshot(
+        self,
+        cursor: sqlite3.Cursor,
+        contract_id: str,
+        version: int
+    ) -> None:
+        """Store the clause selection of a version as a snapshot (caller commits)."""
+        cursor.execute("""
+            DELETE FROM version_snapshots WHERE contract_id = ? AND version = ?
+        """, (contract_id, version))
+        query, params = self._version_selection(cursor, contract_id, version)
+        cursor.execute(f"""
+            INSERT INTO version_snapshots (contract_id, version, position, clause_id)
+            SELECT ?, ?, ROW_NUMBER() OVER (ORDER BY first_pos) - 1, clause_id
+            FROM ({query})
+        """, (contract_id, version, *params))
+        logger.debug("Materialized snapshot of contract %s at version %d", contract_id, version)
+    
+    def _rebuild_snapshots(self, cursor: sqlite3.Cursor, contract_id: str) -> None:
+        """Recompute a contract's snapshots in ascending order (caller commits)."""
+        cursor.execute("""
+            SELECT DISTINCT version FROM version_snapshots
+            WHERE contract_id = ?
+            ORDER BY version
+        """, (contract_id,))
+        for (version,) in cursor.fetchall():
+            self._materialize_snapshot(cursor, contract_id, version)
+    
+    @staticmethod
+    def _clause_from_row(row) -> Clause:
+        """Build a Clause from a row selected with _CLAUSE_COLUMNS."""
+        return Clause(
+            clause_id=row[0],
+            contract_id=row[1],
+            clause_version=row[2],
+            clause_identifier=row[3],
+            content=row[4],
+            metadata=json.loads(row[5]) if row[5] else {},
+            created_at=datetime.fromisoformat(row[6]),
+            is_deleted=bool(row[7]),
+            deleted_at=datetime.fromisoformat(row[8]) if row[8] else None
+        )
+    
     def get_version_history(self, contract_id: str) -> List[VersionMetadata]:
         """
         Get all version metadata for a contract.
@@ -770,6 +976,250 @@ class DifferentialStorage:
             logger.error("Failed to retrieve all contracts: %s", e)
             raise DifferentialStorageError(f"Failed to retrieve all contracts: {e}")
     
+    # Columns get_contracts_page() can sort by
+    CONTRACT_SORT_COLUMNS = ("updated_at", "filename")
+
+    @staticmethod
+    def _contract_filter_clause(filename_filter: Optional[str]) -> tuple:
+        """Build a WHERE clause for a case-insensitive filename substring filter."""
+        if not filename_filter:
+            return "", ()
+        escaped = (filename_filter.replace('\\', '\\\\')
+                   .replace('%', '\\%').replace('_', '\\_'))
+        return "WHERE filename LIKE ? ESCAPE '\\'", (f"%{escaped}%",)
+
+    def get_contracts_page(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        filename_filter: Optional[str] = None,
+        sort_by: str = "updated_at",
+        descending: bool = True
+    ) -> List[Contract]:
+        """
+        Retrieve one page of contracts, filtered and sorted in SQL.
+
+        Args:
+            offset: Number of matching contracts to skip
+            limit: Maximum number of contracts to return
+            filename_filter: Case-insensitive substring the filename must contain
+            sort_by: One of CONTRACT_SORT_COLUMNS
+            descending: Sort direction
+
+        Returns:
+            List of Contract objects
+
+        Raises:
+            DifferentialStorageError: If retrieval operation fails
+        """
+        if sort_by not in self.CONTRACT_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+
+        where, params = self._contract_filter_clause(filename_filter)
+        order = "filename COLLATE NOCASE" if sort_by == "filename" else sort_by
+        direction = "DESC" if descending else "ASC"
+
+        try:
+            cursor = self.db.execute(f"""
+                SELECT contract_id, filename, file_hash, current_version,
+                       created_at, updated_at
+                FROM contracts
+                {where}
+                ORDER BY {order} {direction}, contract_id
+                LIMIT ? OFFSET ?
+            """, params + (limit, offset))
+
+            return [
+                Contract(
+                    contract_id=row[0],
+                    filename=row[1],
+                    file_hash=row[2],
+                    current_version=row[3],
+                    created_at=datetime.fromisoformat(row[4]),
+                    updated_at=datetime.fromisoformat(row[5])
+                )
+                for row in cursor.fetchall()
+            ]
+
+        except Exception as e:
+            logger.error("Failed to retrieve contract page: %s", e)
+            raise DifferentialStorageError(f"Failed to retrieve contract page: {e}")
+
+    def count_contracts(self, filename_filter: Optional[str] = None) -> int:
+        """
+        Count contracts, optionally filtered by filename substring.
+
+        Args:
+            filename_filter: Case-insensitive substring the filename must contain
+
+        Returns:
+            Number of matching contracts
+
+        Raises:
+            DifferentialStorageError: If the query fails
+        """
+        where, params = self._contract_filter_clause(filename_filter)
+        try:
+            cursor = self.db.execute(f"SELECT COUNT(*) FROM contracts {where}", params)
+            return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error("Failed to count contracts: %s", e)
+            raise DifferentialStorageError(f"Failed to count contracts: {e}")
+
+    def find_contract_by_filename(self, filename: str) -> Optional[Contract]:
+        """
+        Retrieve the most recently updated contract with the given filename.
+
+        Args:
+            filename: Contract filename
+
+        Returns:
+            Contract object or None if not found
+
+        Raises:
+            DifferentialStorageError: If retrieval operation fails
+        """
+        try:
+            cursor = self.db.execute("""
+                SELECT contract_id FROM contracts
+                WHERE filename = ?
+                ORDER BY updated_at DESC
+                LIMIT 1
+            """, (filename,))
+            row = cursor.fetchone()
+        except Exception as e:
+            logger.error("Failed to find contract by filename: %s", e)
+            raise DifferentialStorageError(f"Failed to find contract by filename: {e}")
+
+        return self.get_contract(row[0]) if row else None
+
+    def count_versioned_clauses(self, contract_id: str) -> int:
+        """
+        Count clause identifiers that exist in more than one version.
+
+        Clauses without an identifier are keyed by clause_id, matching how
+        the history list has always grouped them.
+
+        Args:
+            contract_id: ID of the contract
+
+        Returns:
+            Number of clauses with multiple versions
+
+        Raises:
+            DifferentialStorageError: If the query fails
+        """
+        try:
+            cursor = self.db.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT COALESCE(NULLIF(clause_identifier, ''), clause_id) AS identifier
+                    FROM clauses
+                    WHERE contract_id = ?
+                    GROUP BY identifier
+                    HAVING COUNT(DISTINCT clause_version) > 1
+                )
+            """, (contract_id,))
+            return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error("Failed to count versioned clauses: %s", e)
+            raise DifferentialStorageError(f"Failed to count versioned clauses: {e}")
+
+    # Words of context around search terms in ClauseSearchHit.snippet
+    SEARCH_SNIPPET_TOKENS = 16
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """
+        Turn user search text into an FTS5 query.
+
+        Every word, or "quoted phrase", becomes an FTS5 phrase and all must
+        match, so punctuation such as the hyphens in "pay-if-paid" is never
+        read as query syntax.
+        """
+        terms = [
+            phrase or word
+            for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query)
+        ]
+        return " ".join(
+            '"' + term.replace('"', '""') + '"'
+            for term in terms if term.strip()
+        )
+
+    def search_clauses(
+        self,
+        query: str,
+        limit: int = 20,
+        current_only: bool = True
+    ) -> List[ClauseSearchHit]:
+        """
+        Full-text search over stored clause content and summaries.
+
+        Uses the clause_search FTS5 index, which triggers on the clauses
+        table keep up to date. Deleted clauses are never returned.
+
+        Args:
+            query: Words or "quoted phrases" that must all appear
+            limit: Maximum number of hits to return
+            current_only: Only search clauses in each contract's current
+                version, skipping rows superseded by a later version
+
+        Returns:
+            List of ClauseSearchHit objects, best match first
+
+        Raises:
+            DifferentialStorageError: If the search index is unavailable or
+                the query fails
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        superseded = ""
+        if current_only:
+            superseded = """
+                AND NOT EXISTS (
+                    SELECT 1 FROM clauses later
+                    WHERE later.contract_id = c.contract_id
+                      AND later.clause_identifier = c.clause_identifier
+                      AND later.clause_version > c.clause_version
+                )
+            """
+
+        try:
+            cursor = self.db.execute(f"""
+                SELECT c.contract_id, k.filename, c.clause_identifier,
+                       c.clause_version, c.clause_id,
+                       snippet(clause_search, -1, '[', ']', '...', ?) AS snippet,
+                       clause_search.rank AS rank
+                FROM clause_search
+                JOIN clauses c ON c.rowid = clause_search.rowid
+                JOIN contracts k ON k.contract_id = c.contract_id
+                WHERE clause_search MATCH ?
+                  AND c.is_deleted = 0
+                  {superseded}
+                ORDER BY clause_search.rank
+                LIMIT ?
+            """, (self.SEARCH_SNIPPET_TOKENS, match, limit))
+
+            hits = [
+                ClauseSearchHit(
+                    contract_id=row[0],
+                    filename=row[1],
+                    category=row[2] or "",
+                    version=row[3],
+                    clause_id=row[4],
+                    snippet=row[5],
+                    rank=row[6]
+                )
+                for row in cursor.fetchall()
+            ]
+            logger.debug("Clause search %r returned %d hits", query, len(hits))
+            return hits
+
+        except Exception as e:
+            logger.error("Clause search failed: %s", e)
+            raise DifferentialStorageError(f"Clause search failed: {e}")
+
     def close(self) -> None:
         """Close database connection."""
         self.db.close()
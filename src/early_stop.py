@@ -0,0 +1,150 @@
+"""
+Early Stop Module
+
+Detects "NOT FOUND" answers to category prompts while they are still being
+generated, so the AI client can cancel generation after the first few
+tokens instead of letting a small local model fill up to its token limit.
+The same heuristics decide afterwards whether a finished answer means the
+category is absent, so an answer cut short by the stop condition is always
+classified the same way as the full answer would have been.
+
+EarlyStopStats accumulates how many calls were cut short and an estimate
+of the tokens and time that saved.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Answers starting with one of these mean the category is absent
+NOT_FOUND_PREFIXES = ("NOT FOUND", "N/A", "NONE FOUND", "NO RELEVANT", "THIS CLAUSE IS NOT")
+
+# "NOT FOUND" this close to the start also counts; later mentions are
+# usually incidental ("... the retention amount is not found in ...")
+NOT_FOUND_WINDOW = 150
+
+# Clients only evaluate stop conditions on the first tokens of an answer
+STOP_CHECK_TOKENS = 64
+
+_PREAMBLE_RE = re.compile(r'^(?:Here is a summary.*?:\s*\n*)', re.IGNORECASE)
+
+
+def strip_preamble(text: Optional[str]) -> str:
+    """Remove the 'Here is a summary...:' preamble small models like to add."""
+    return _PREAMBLE_RE.sub('', text.strip() if text else '').strip()
+
+
+def starts_not_found(text: Optional[str]) -> bool:
+    """
+    Whether an answer, possibly still incomplete, already signals NOT FOUND.
+
+    Only checks signals that further tokens cannot undo, so it is safe as
+    a stop condition for streaming generation.
+
+    Args:
+        text: Answer text generated so far
+
+    Returns:
+        True if the answer will be classified as not found
+    """
+    upper = strip_preamble(text).upper()
+    return upper.startswith(NOT_FOUND_PREFIXES) or "NOT FOUND" in upper[:NOT_FOUND_WINDOW]
+
+
+def is_not_found(text: Optional[str]) -> bool:
+    """
+    Whether a complete answer means the category is not in the contract.
+
+    Args:
+        text: Full answer text
+
+    Returns:
+        True if the answer signals NOT FOUND
+    """
+    if starts_not_found(text):
+        return True
+    # Answers that are little more than repeated NOT FOUND markers
+    letters = re.sub(r'[^A-Z]', '', strip_preamble(text).upper())
+    return letters.count("NOTFOUND") >= 1 and len(letters.replace("NOTFOUND", "")) < 50
+
+
+@dataclass
+class EarlyStopStats:
+    """
+    Counters for generation cancelled by a stop condition.
+
+    Savings are estimates: a cancelled answer is assumed to have been as
+    long as the average answer that ran to completion under a stop
+    condition (or the token limit, before any has), generated at the
+    cancelled call's own decode speed.
+
+    Attributes:
+        completed_calls: Calls with a stop condition that ran to completion
+        completed_tokens: Output tokens of those calls
+        aborted_calls: Calls cancelled by their stop condition
+        tokens_generated: Output tokens generated before cancellation
+        tokens_saved: Estimated output tokens not generated
+        seconds_saved: Estimated generation time not spent
+    """
+    completed_calls: int = 0
+    completed_tokens: int = 0
+    aborted_calls: int = 0
+    tokens_generated: int = 0
+    tokens_saved: int = 0
+    seconds_saved: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_completed(self, tokens: int) -> None:
+        """
+        Count a call that had a stop condition but was not cancelled.
+
+        Args:
+            tokens: Output tokens generated
+        """
+        with self._lock:
+            self.completed_calls += 1
+            self.completed_tokens += tokens
+
+    def record_aborted(self, tokens: int, max_tokens: int, decode_seconds: float) -> None:
+        """
+        Count a cancelled call and estimate what cancelling saved.
+
+        Args:
+            tokens: Output tokens generated before cancellation
+            max_tokens: The call's output token limit
+            decode_seconds: Time spent generating those tokens (after the first)
+        """
+        with self._lock:
+            if self.completed_calls:
+                expected = min(self.completed_tokens / self.completed_calls, max_tokens)
+            else:
+                expected = max_tokens
+            saved = max(0, int(expected) - tokens)
+            per_token = decode_seconds / max(tokens - 1, 1)
+
+            self.aborted_calls += 1
+            self.tokens_generated += tokens
+            self.tokens_saved += saved
+            self.seconds_saved += saved * per_token
+
+    def reset(self) -> None:
+        """Zero all counters (e.g. at the start of an analysis run)."""
+        with self._lock:
+            self.completed_calls = self.completed_tokens = 0
+            self.aborted_calls = self.tokens_generated = self.tokens_saved = 0
+            self.seconds_saved = 0.0
+
+    def summary(self) -> str:
+        """One-line description for logs."""
+        with self._lock:
+            return (
+                f"{self.aborted_calls} of {self.aborted_calls + self.completed_calls} answers "
+                f"stopped early at NOT FOUND; ~{self.tokens_saved} tokens and "
+                f"~{self.seconds_saved:.1f}s saved"
+            )
@@ -0,0 +1,257 @@
+"""
+GPU Probe Cache Module
+
+Remembers whether GPU offload works for a model on this machine. Before
+trusting the GPU, LocalModelClient runs crash-safe checks: in frozen
+builds it loads the model in a subprocess, and after loading it runs a
+large-prompt test completion. These checks can add 10-60 seconds to every
+launch. With this cache they run once, and later launches reuse the stored
+outcome.
+
+Results are keyed by a fingerprint of the model file, the GPU driver
+version, the backend and the llama-cpp-python version, so changing any of
+them re-probes.
+
+Each GPU load is marked as in progress first. If the process dies during
+the load (e.g. a Vulkan access violation), the next launch finds the mark,
+drops the cached result and re-probes in a subprocess. After
+MAX_LOAD_CRASHES crashes in a row, the GPU is recorded as failed.
+
+Stored in %APPDATA%/CR2A/gpu_probe_cache.json.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Crashes during a GPU load before the GPU is recorded as failed
+MAX_LOAD_CRASHES = 2
+
+# Bytes read from each end of the model file for its fingerprint
+_SAMPLE_BYTES = 1024 * 1024
+
+# Fingerprints by (path, size, mtime), so a file is read once per process
+_fingerprints: Dict[tuple, str] = {}
+
+
+@dataclass
+class ProbeResult:
+    """
+    Outcome of probing GPU offload for one model.
+
+    Attributes:
+        backend: Backend probed (e.g. 'vulkan', 'sycl')
+        gpu_layers: Layers offloaded when the probe ran (-1 = all)
+        passed: True if the model loaded and ran a test completion on the GPU
+        reason: Why the probe failed (empty if passed)
+        probed_at: ISO timestamp of the probe
+    """
+    backend: str
+    gpu_layers: int
+    passed: bool
+    reason: str = ""
+    probed_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+
+@dataclass
+class ProbeEntry:
+    """
+    What the cache knows about one key.
+
+    Attributes:
+        result: Stored probe outcome, or None to probe again
+        crashes: GPU loads in a row that crashed the process
+    """
+    result: Optional[ProbeResult] = None
+    crashes: int = 0
+
+
+def model_fingerprint(model_path: Path) -> str:
+    """
+    Fingerprint a model file without reading all of it.
+
+    Hashes the size and the first and last megabyte. GGUF files carry
+    their metadata and tensor layout at the start, so re-downloads and
+    re-quantizations change the fingerprint.
+
+    Args:
+        model_path: GGUF model file
+
+    Returns:
+        Hex digest
+    """
+    model_path = Path(model_path)
+    stat = model_path.stat()
+    memo_key = (str(model_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _fingerprints:
+        return _fingerprints[memo_key]
+
+    digest = hashlib.sha256(str(stat.st_size).encode())
+    with open(model_path, 'rb') as f:
+        digest.update(f.read(_SAMPLE_BYTES))
+        if stat.st_size > 2 * _SAMPLE_BYTES:
+            f.seek(-_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(_SAMPLE_BYTES))
+    _fingerprints[memo_key] = digest.hexdigest()[:32]
+    return _fingerprints[memo_key]
+
+
+def runtime_version() -> str:
+    """Version of the installed llama-cpp-python (which bundles the GPU kernels)."""
+    try:
+        import llama_cpp
+        return getattr(llama_cpp, '__version__', 'unknown')
+    except (ImportError, OSError, RuntimeError):
+        return 'none'
+
+
+def _process_alive(pid: int) -> bool:
+    """True if pid is a running process (False when it cannot be checked)."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except Exception:
+        return False
+
+
+class GpuProbeCache:
+    """
+    Persistent store of GPU probe outcomes.
+
+    Failures to read or write the file are logged and treated as an empty
+    cache; they never prevent a model from loading.
+
+    Args:
+        cache_path: JSON file (default: %APPDATA%/CR2A/gpu_probe_cache.json)
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None):
+        if cache_path is None:
+            appdata = os.environ.get('APPDATA', os.path.expanduser('~'))
+            cache_path = Path(appdata) / 'CR2A' / 'gpu_probe_cache.json'
+        self.cache_path = Path(cache_path)
+
+    def make_key(self, model_path: Path, backend: str, driver_version: Optional[str] = None) -> str:
+        """
+        Build the cache key for a model and backend on this machine.
+
+        Args:
+            model_path: GGUF model file
+            backend: Backend to be probed
+            driver_version: GPU driver version (default: detected)
+
+        Returns:
+            Key string
+        """
+        if driver_version is None:
+            from src.hardware_info import get_gpu_driver_version
+            driver_version = get_gpu_driver_version()
+        return "|".join([model_fingerprint(model_path), driver_version, backend, runtime_version()])
+
+    def lookup(self, key: str) -> ProbeEntry:
+        """
+        Get the stored outcome for key, accounting for a crashed load.
+
+        An in-progress mark left by a previous process means that process
+        died while loading on the GPU. The stored result is dropped, or
+        after MAX_LOAD_CRASHES crashes replaced by a failure.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            ProbeEntry (empty if nothing is stored)
+        """
+        entries = self._read()
+        raw = entries.get(key)
+        if raw is None:
+            return ProbeEntry()
+
+        entry = ProbeEntry(crashes=raw.get("crashes", 0))
+        if raw.get("result"):
+            entry.result = ProbeResult(**raw["result"])
+
+        loading_pid = raw.get("loading_pid")
+        if loading_pid is not None and loading_pid != os.getpid() and _process_alive(loading_pid):
+            # Another process is loading right now; probe rather than trust its result
+            return ProbeEntry(crashes=entry.crashes)
+        if loading_pid is not None and loading_pid != os.getpid():
+            entry.crashes += 1
+            backend = key.rsplit("|", 2)[-2]
+            if entry.crashes >= MAX_LOAD_CRASHES:
+                logger.warning("GPU model load crashed %d times; using CPU until the "
+                               "model, driver or backend changes", entry.crashes)
+                entry.result = ProbeResult(backend, 0, False, f"crashed during load ({entry.crashes}x)")
+            else:
+                logger.warning("Previous GPU model load crashed; probing the GPU again")
+                entry.result = None
+            entries[key] = self._entry_to_dict(entry)
+            self._write(entries)
+        return entry
+
+    def mark_loading(self, key: str) -> None:
+        """Mark a GPU load as in progress; cleared by record()."""
+        entries = self._read()
+        raw = entries.setdefault(key, {})
+        raw["loading_pid"] = os.getpid()
+        self._write(entries)
+
+    def record(self, key: str, result: ProbeResult) -> None:
+        """
+        Store a probe outcome and clear the in-progress mark.
+
+        Args:
+            key: Key from make_key()
+            result: Probe outcome
+        """
+        entries = self._read()
+        crashes = 0 if result.passed else entries.get(key, {}).get("crashes", 0)
+        entries[key] = self._entry_to_dict(ProbeEntry(result=result, crashes=crashes))
+        self._write(entries)
+        logger.info("GPU probe result saved: %s, passed=%s%s", result.backend, result.passed,
+                    f" ({result.reason})" if result.reason else "")
+
+    def clear(self) -> None:
+        """Forget all stored outcomes."""
+        try:
+            self.cache_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not clear GPU probe cache: {e}")
+
+    @staticmethod
+    def _entry_to_dict(entry: ProbeEntry) -> Dict:
+        return {"result": asdict(entry.result) if entry.result else None, "crashes": entry.crashes}
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"GPU probe cache unreadable, ignoring it: {e}")
+            return {}
+
+    def _write(self, entries: Dict) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            temp_path.replace(self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save GPU probe cache: {e}")
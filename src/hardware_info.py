@@ -291,6 +291,50 @@ def _detect_gpu() -> tuple:
         return None, "none", None
 
 
+def get_gpu_driver_version() -> str:
+    """
+    Version string of the installed GPU driver(s).
+
+    On Windows, the DriverVersion of every display adapter in the registry.
+    Elsewhere, the NVIDIA driver version if loaded, else the OS release
+    (which carries the in-kernel and Mesa drivers).
+
+    Returns:
+        Version string ("unknown" if it cannot be read)
+    """
+    if sys.platform == "win32":
+        try:
+            import winreg
+            CLASS_KEY = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e968-e325-11ce-bfc1-08002be10318}"
+            versions = []
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, CLASS_KEY) as class_key:
+                i = 0
+                while True:
+                    try:
+                        subkey_name = winreg.EnumKey(class_key, i)
+                    except OSError:
+                        break
+                    i += 1
+                    try:
+                        with winreg.OpenKey(class_key, subkey_name) as gpu_key:
+                            desc = winreg.QueryValueEx(gpu_key, "DriverDesc")[0]
+                            version = winreg.QueryValueEx(gpu_key, "DriverVersion")[0]
+                            versions.append(f"{desc} {version}")
+                    except (FileNotFoundError, OSError):
+                        pass
+            return "; ".join(sorted(versions)) or "unknown"
+        except Exception as e:
+            logger.info("GPU driver version check failed: %s", e)
+            return "unknown"
+
+    try:
+        with open("/proc/driver/nvidia/version", "r") as f:
+            return f.readline().strip()
+    except OSError:
+        pass
+    return f"{platform.system()} {platform.release()}"
+
+
 def _classify_gpu(desc: str) -> str:
     """Classify a GPU adapter description as discrete or integrated."""
     desc_lower = desc.lower()
@@ -0,0 +1,151 @@
+"""
+History Database Module
+
+Manages the SQLite database backing SQLiteHistoryStore.
+Reuses VersionDatabase connection handling (WAL mode, busy timeout,
+Row factory, error mapping) with a schema for analysis history records.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+
+from src.version_database import VersionDatabase, VersionDatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryDatabase(VersionDatabase):
+    """
+    Manages SQLite database for analysis history.
+
+    Each analysis is one row in the `analyses` table. Summary fields used by
+    the history list (filename, date, risk level) are indexed columns so
+    paged queries never touch the result payload, which is stored as a
+    zlib-compressed JSON blob.
+
+    Database location:
+        <history storage dir>/history.db
+    """
+
+    # Schema version for migrations
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize history database.
+
+        Args:
+            db_path: Path to database file
+        """
+        super().__init__(db_path=db_path)
+
+    def _initialize_schema(self) -> None:
+        """
+        Initialize database schema if not exists.
+
+        Creates the analyses table, its indexes and a key/value table for
+        bookkeeping such as the one-time JSON migration marker.
+        """
+        conn = None
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type='table' AND name='schema_version'
+            """)
+
+            if cursor.fetchone() is not None:
+                cursor.execute("SELECT version FROM schema_version LIMIT 1")
+                row = cursor.fetchone()
+                if row and row[0] == self.SCHEMA_VERSION:
+                    logger.debug("History schema up to date (version %d)", self.SCHEMA_VERSION)
+                else:
+                    logger.info("History database schema needs migration")
+                return
+
+            logger.info("Creating history database schema (version %d)", self.SCHEMA_VERSION)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    record_id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    analyzed_at TEXT NOT NULL,
+                    clause_count INTEGER NOT NULL DEFAULT 0,
+                    risk_count INTEGER NOT NULL DEFAULT 0,
+                    risk_level TEXT,
+                    analysis_type TEXT NOT NULL DEFAULT 'comprehensive',
+                    result_blob BLOB NOT NULL,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Indexes backing the history list's paging, search and filters
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_analyses_analyzed_at
+                ON analyses(analyzed_at)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_analyses_filename
+                ON analyses(filename COLLATE NOCASE)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_analyses_risk_level
+                ON analyses(risk_level, analyzed_at)
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS history_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+            cursor.execute("""
+                INSERT INTO schema_version (version) VALUES (?)
+            """, (self.SCHEMA_VERSION,))
+
+            conn.commit()
+            logger.info("History database schema created successfully")
+
+        except sqlite3.Error as e:
+            logger.error("Failed to initialize history schema: %s", e)
+            if conn:
+                conn.rollback()
+            raise VersionDatabaseError(f"Failed to initialize history schema: {e}")
+
+    def get_meta(self, key: str):
+        """
+        Get a bookkeeping value.
+
+        Args:
+            key: Meta key
+
+        Returns:
+            Stored value, or None if unset
+        """
+        row = self.execute("SELECT value FROM history_meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        Set a bookkeeping value (caller commits).
+
+        Args:
+            key: Meta key
+            value: Value to store
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO history_meta (key, value) VALUES (?, ?)",
+            (key, value)
+        )
@@ -8,7 +8,7 @@ All models support serialization to/from dictionaries for JSON compatibility.
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 @dataclass
@@ -26,6 +26,8 @@ class AnalysisRecord:
         clause_count: Number of clauses found
         risk_count: Number of risks identified
         file_path: Path to full analysis JSON file
+        analysis_type: "comprehensive" or "bid_checklist"
+        risk_level: Overall contract risk level, if the analysis reports one
     """
     id: str
     filename: str
@@ -34,6 +36,7 @@ class AnalysisRecord:
     risk_count: int
     file_path: Path
     analysis_type: str = "comprehensive"  # "comprehensive" or "bid_checklist"
+    risk_level: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -50,6 +53,7 @@ class AnalysisRecord:
             'risk_count': self.risk_count,
             'file_path': str(self.file_path),
             'analysis_type': self.analysis_type,
+            'risk_level': self.risk_level,
         }
     
     @classmethod
@@ -75,6 +79,7 @@ class AnalysisRecord:
             risk_count=data['risk_count'],
             file_path=Path(data['file_path']),
             analysis_type=data.get('analysis_type', 'comprehensive'),
+            risk_level=data.get('risk_level'),
         )
     
     def validate(self) -> bool:
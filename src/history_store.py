@@ -2,14 +2,18 @@
 History Store Module
 
 Manages persistence of analysis records to local storage.
-Stores analysis results as JSON files in the application data directory.
+Stores analysis results as JSON files in the application data directory,
+or in a SQLite database with SQLiteHistoryStore.
 """
 
 import json
 import logging
 import os
+import sqlite3
 import time
+import zlib
 from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import uuid
@@ -22,6 +26,8 @@ else:  # Unix/Linux/Mac
 
 from src.history_models import AnalysisRecord
 from src.analysis_models import AnalysisResult
+from src.history_database import HistoryDatabase
+from src.version_database import VersionDatabaseError
 
 
 logger = logging.getLogger(__name__)
@@ -123,6 +129,9 @@ class HistoryStore:
     # Index file format version
     INDEX_VERSION = "1.0"
     ANALYSIS_VERSION = "1.0"
+
+    # Columns load_page() can sort by
+    SORT_COLUMNS = ("analyzed_at", "filename", "risk_level")
     
     def __init__(self, storage_dir: Optional[Path] = None):
         """
@@ -148,6 +157,10 @@ class HistoryStore:
             logger.error("Failed to create storage directory: %s", e)
             raise HistoryStoreError(f"Failed to create storage directory: {e}")
         
+        self._initialize_backend()
+
+    def _initialize_backend(self) -> None:
+        """Prepare backend storage (the JSON index file)."""
         # Initialize index file if it doesn't exist
         if not self.index_path.exists():
             self._create_empty_index()
@@ -419,7 +432,6 @@ class HistoryStore:
         """
         # Generate unique ID
         record_id = str(uuid.uuid4())
-        analysis_file = None
         
         try:
             # Import here to avoid circular dependency
@@ -634,22 +646,6 @@ class HistoryStore:
                     logger.error("Error extracting metadata from AnalysisResult: %s", e, exc_info=True)
                     raise HistoryStoreError(f"Failed to extract metadata from AnalysisResult: {e}")
             
-            # Create analysis file
-            logger.debug("Creating analysis file: %s", record_id)
-            analysis_file = self.storage_dir / f"{record_id}.json"
-            analysis_data = {
-                "version": self.ANALYSIS_VERSION,
-                "record_id": record_id,
-                "analysis": analysis_result.to_dict()
-            }
-            
-            with open(analysis_file, 'w', encoding='utf-8') as f:
-                json.dump(analysis_data, f, indent=2)
-            
-            logger.debug("Saved analysis to: %s", analysis_file)
-
-            # Update index with atomic read-modify-write under file lock
-            logger.debug("Updating index with new record")
             # Determine analysis type for index record
             analysis_type = "bid_checklist" if isinstance(analysis_result, BidChecklistResult) else "comprehensive"
 
@@ -661,9 +657,10 @@ class HistoryStore:
                 "risk_count": len(risks),
                 "file_path": f"{record_id}.json",
                 "analysis_type": analysis_type,
+                "risk_level": self._extract_risk_level(analysis_result),
             }
 
-            self._append_to_index(record)
+            self._persist_record(record, analysis_result.to_dict())
             
             logger.info("Successfully saved analysis record: %s (%s) with %d clauses and %d risks", 
                        record_id, filename, len(clauses), len(risks))
@@ -676,17 +673,67 @@ class HistoryStore:
             # Log full exception with stack trace
             logger.error("Failed to save analysis: %s", e, exc_info=True)
             
-            # Clean up partial save
-            if analysis_file is not None:
-                try:
-                    if analysis_file.exists():
-                        analysis_file.unlink()
-                        logger.debug("Cleaned up partial save: %s", analysis_file)
-                except Exception as cleanup_error:
-                    logger.warning("Failed to clean up partial save: %s", cleanup_error)
-            
             # Raise clear error message
             raise HistoryStoreError(f"Failed to save analysis: {e}")
+
+    @staticmethod
+    def _extract_risk_level(analysis_result) -> Optional[str]:
+        """
+        Get the overall contract risk level from an analysis result.
+
+        Args:
+            analysis_result: Any result type accepted by save()
+
+        Returns:
+            General risk level from the contract overview, or None
+        """
+        base = getattr(analysis_result, 'base_result', analysis_result)
+        if isinstance(base, dict):
+            overview = base.get('contract_overview') or {}
+            return overview.get('General Risk Level') or overview.get('general_risk_level') or None
+        overview = getattr(base, 'contract_overview', None)
+        return getattr(overview, 'general_risk_level', None) or None
+
+    def _persist_record(self, record: Dict[str, Any], analysis_dict: Dict[str, Any]) -> None:
+        """
+        Write a new analysis file and add its record to the index.
+
+        Args:
+            record: Index record dictionary
+            analysis_dict: Serialized analysis result
+
+        Raises:
+            HistoryStoreError: If the index cannot be updated
+        """
+        record_id = record["id"]
+        logger.debug("Creating analysis file: %s", record_id)
+        analysis_file = self.storage_dir / record["file_path"]
+        analysis_data = {
+            "version": self.ANALYSIS_VERSION,
+            "record_id": record_id,
+            "analysis": analysis_dict
+        }
+
+        try:
+            with open(analysis_file, 'w', encoding='utf-8') as f:
+                json.dump(analysis_data, f, indent=2)
+
+            logger.debug("Saved analysis to: %s", analysis_file)
+
+            # Update index with atomic read-modify-write under file lock
+            logger.debug("Updating index with new record")
+            self._append_to_index(record)
+        except HistoryStoreError:
+            raise
+        except Exception:
+            # Clean up partial save
+            try:
+                if analysis_file.exists():
+                    analysis_file.unlink()
+                    logger.debug("Cleaned up partial save: %s", analysis_file)
+            except Exception as cleanup_error:
+                logger.warning("Failed to clean up partial save: %s", cleanup_error)
+            raise
     
     def load_all(self) -> List[AnalysisRecord]:
         """
@@ -744,22 +791,11 @@ class HistoryStore:
             from src.analysis_models import ComprehensiveAnalysisResult
             from src.result_parser import ComprehensiveResultParser
             
-            analysis_file = self.storage_dir / f"{record_id}.json"
-            
-            if not analysis_file.exists():
-                logger.warning("Analysis file not found: %s", record_id)
-                return None
-            
-            with open(analysis_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Validate structure
-            if "analysis" not in data:
-                logger.error("Invalid analysis file structure: %s", record_id)
+            analysis_data = self._load_analysis_data(record_id)
+            if analysis_data is None:
                 return None
             
             # Detect schema format
-            analysis_data = data["analysis"]
             schema_format = ComprehensiveResultParser.detect_schema_format(analysis_data)
             
             logger.debug("Detected schema format: %s for record %s", schema_format, record_id)
@@ -791,6 +827,95 @@ class HistoryStore:
             logger.error("Failed to load analysis: %s. Error: %s", record_id, e)
             return None
     
+    def _load_analysis_data(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the serialized analysis for a record from its JSON file.
+
+        Args:
+            record_id: Unique identifier of the record
+
+        Returns:
+            Analysis dictionary, or None if missing or malformed
+
+        Raises:
+            json.JSONDecodeError: If the analysis file is corrupted
+        """
+        analysis_file = self.storage_dir / f"{record_id}.json"
+        
+        if not analysis_file.exists():
+            logger.warning("Analysis file not found: %s", record_id)
+            return None
+        
+        with open(analysis_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # Validate structure
+        if "analysis" not in data:
+            logger.error("Invalid analysis file structure: %s", record_id)
+            return None
+        
+        return data["analysis"]
+
+    def load_page(self, offset: int = 0, limit: int = 50,
+                  filename_filter: Optional[str] = None,
+                  risk_level: Optional[str] = None,
+                  sort_by: str = "analyzed_at",
+                  descending: bool = True) -> List[AnalysisRecord]:
+        """
+        Load one page of analysis records.
+
+        The JSON backend has no query engine, so this filters and sorts the
+        full index in memory; SQLiteHistoryStore answers it with an indexed query.
+
+        Args:
+            offset: Number of matching records to skip
+            limit: Maximum number of records to return
+            filename_filter: Case-insensitive substring the filename must contain
+            risk_level: Only return records with this overall risk level
+            sort_by: One of SORT_COLUMNS ("analyzed_at", "filename", "risk_level")
+            descending: Sort direction
+
+        Returns:
+            List of AnalysisRecord objects
+        """
+        if sort_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+
+        records = self._filter_records(self.load_all(), filename_filter, risk_level)
+        if sort_by == "filename":
+            records.sort(key=lambda r: r.filename.lower(), reverse=descending)
+        elif sort_by == "risk_level":
+            records.sort(key=lambda r: r.risk_level or "", reverse=descending)
+        elif not descending:
+            records.reverse()
+        return records[offset:offset + limit]
+
+    def count(self, filename_filter: Optional[str] = None,
+              risk_level: Optional[str] = None) -> int:
+        """
+        Count analysis records matching the given filters.
+
+        Args:
+            filename_filter: Case-insensitive substring the filename must contain
+            risk_level: Only count records with this overall risk level
+
+        Returns:
+            Number of matching records
+        """
+        return len(self._filter_records(self.load_all(), filename_filter, risk_level))
+
+    @staticmethod
+    def _filter_records(records: List[AnalysisRecord],
+                        filename_filter: Optional[str],
+                        risk_level: Optional[str]) -> List[AnalysisRecord]:
+        """Apply load_page/count filters to an in-memory record list."""
+        if filename_filter:
+            needle = filename_filter.lower()
+            records = [r for r in records if needle in r.filename.lower()]
+        if risk_level:
+            records = [r for r in records if r.risk_level == risk_level]
+        return records
+
     def delete(self, record_id: str) -> bool:
         """
         Delete an analysis record.
@@ -861,3 +986,333 @@ class HistoryStore:
         except Exception as e:
             logger.error("Failed to get summary: %s. Error: %s", record_id, e)
             return None
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    History store backed by a SQLite database instead of per-record JSON files.
+
+    Summary fields live in indexed columns so the history list can be paged,
+    searched and sorted without reading analysis payloads, which are stored
+    as zlib-compressed JSON blobs. Connection handling (WAL mode, busy
+    timeout) comes from VersionDatabase via HistoryDatabase.
+
+    On first use, records from an existing index.json layout in the same
+    directory are imported once; the JSON files are left in place.
+
+    Storage structure:
+        <storage_dir>/
+        ├── history.db             # analyses table + compressed results
+        └── index.json, *.json     # legacy layout (migrated, then unused)
+    """
+
+    DB_FILENAME = "history.db"
+    MIGRATION_KEY = "json_migrated_at"
+    COMPRESSION_LEVEL = 6
+
+    _SUMMARY_COLUMNS = (
+        "record_id, filename, analyzed_at, clause_count, risk_count, "
+        "risk_level, analysis_type"
+    )
+
+    _INSERT_SQL = """
+        INSERT INTO analyses (
+            record_id, filename, analyzed_at, clause_count, risk_count,
+            risk_level, analysis_type, result_blob
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, storage_dir: Optional[Path] = None,
+                 database: Optional[HistoryDatabase] = None):
+        """
+        Initialize SQLite history store.
+
+        Args:
+            storage_dir: Directory holding history.db (and any legacy JSON files).
+                        Defaults to %APPDATA%/CR2A/history/
+            database: Optional pre-opened HistoryDatabase
+        """
+        self.database = database
+        super().__init__(storage_dir)
+
+    def _initialize_backend(self) -> None:
+        """Open the history database and run the one-time JSON migration."""
+        try:
+            if self.database is None:
+                self.database = HistoryDatabase(self.storage_dir / self.DB_FILENAME)
+            self._migrate_from_json()
+        except VersionDatabaseError as e:
+            logger.error("Failed to open history database: %s", e)
+            raise HistoryStoreError(f"Failed to open history database: {e}")
+
+    def _migrate_from_json(self) -> int:
+        """
+        Import records from the legacy index.json layout, once.
+
+        Returns:
+            Number of records imported
+        """
+        if self.database.get_meta(self.MIGRATION_KEY) is not None:
+            return 0
+
+        rows = []
+        if self.index_path.exists():
+            logger.info("Migrating JSON analysis history into %s", self.DB_FILENAME)
+            for record_data in self._read_index().get("records", []):
+                record_id = record_data.get("id", "unknown")
+                try:
+                    analysis = HistoryStore._load_analysis_data(self, record_id)
+                    if analysis is None:
+                        continue
+                    record = dict(record_data)
+                    record.setdefault("risk_level", self._extract_risk_level(analysis))
+                    rows.append(self._record_row(record, self._compress(analysis)))
+                except Exception as e:
+                    logger.warning("Skipping record %s during migration: %s", record_id, e)
+
+        try:
+            if rows:
+                conn = self.database.connect()
+                conn.executemany(self._INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1), rows)
+            self.database.set_meta(self.MIGRATION_KEY, datetime.now().isoformat())
+            self.database.commit()
+        except (sqlite3.Error, VersionDatabaseError) as e:
+            self.database.rollback()
+            raise VersionDatabaseError(f"JSON history migration failed: {e}")
+
+        if rows:
+            logger.info("Migrated %d analysis records from JSON layout", len(rows))
+        return len(rows)
+
+    @staticmethod
+    def _record_row(record: Dict[str, Any], blob: bytes) -> tuple:
+        """Build an analyses row from an index record dictionary."""
+        return (
+            record["id"],
+            record["filename"],
+            record["analyzed_at"],
+            record.get("clause_count", 0),
+            record.get("risk_count", 0),
+            record.get("risk_level"),
+            record.get("analysis_type", "comprehensive"),
+            blob,
+        )
+
+    def _compress(self, analysis_dict: Dict[str, Any]) -> bytes:
+        """Serialize and compress an analysis dictionary."""
+        payload = json.dumps(analysis_dict, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(payload, self.COMPRESSION_LEVEL)
+
+    @staticmethod
+    def _decompress(blob: bytes) -> Dict[str, Any]:
+        """Inverse of _compress()."""
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+    def _row_to_record(self, row: sqlite3.Row) -> Optional[AnalysisRecord]:
+        """Convert a summary row into a validated AnalysisRecord."""
+        try:
+            record = AnalysisRecord(
+                id=row["record_id"],
+                filename=row["filename"],
+                analyzed_at=datetime.fromisoformat(row["analyzed_at"]),
+                clause_count=row["clause_count"],
+                risk_count=row["risk_count"],
+                file_path=self.database.db_path,
+                analysis_type=row["analysis_type"],
+                risk_level=row["risk_level"],
+            )
+        except (ValueError, TypeError) as e:
+            logger.warning("Failed to load record: %s. Error: %s", row["record_id"], e)
+            return None
+
+        if not record.validate():
+            logger.warning("Invalid record skipped: %s", row["record_id"])
+            return None
+        return record
+
+    def _persist_record(self, record: Dict[str, Any], analysis_dict: Dict[str, Any]) -> None:
+        """
+        Insert a new analysis row.
+
+        The payload is compressed before the write transaction starts so the
+        database lock is held only for the insert itself.
+
+        Raises:
+            HistoryStoreError: If the insert fails
+        """
+        row = self._record_row(record, self._compress(analysis_dict))
+        try:
+            self.database.execute(self._INSERT_SQL, row)
+            self.database.commit()
+        except VersionDatabaseError as e:
+            self.database.rollback()
+            logger.error("Failed to insert analysis record: %s", e)
+            raise HistoryStoreError(f"Failed to save analysis: {e}")
+
+    def _load_analysis_data(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read and decompress the analysis payload for a record.
+
+        Args:
+            record_id: Unique identifier of the record
+
+        Returns:
+            Analysis dictionary, or None if not found
+        """
+        row = self.database.execute(
+            "SELECT result_blob FROM analyses WHERE record_id = ?", (record_id,)
+        ).fetchone()
+        if row is None:
+            logger.warning("Analysis record not found: %s", record_id)
+            return None
+        return self._decompress(row["result_blob"])
+
+    @classmethod
+    def _build_where(cls, filename_filter: Optional[str],
+                     risk_level: Optional[str]) -> tuple:
+        """Build a WHERE clause and parameters for load_page/count filters."""
+        clauses = []
+        params: List[Any] = []
+        if filename_filter:
+            escaped = (filename_filter.replace('\\', '\\\\')
+                       .replace('%', '\\%').replace('_', '\\_'))
+            clauses.append("filename LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if risk_level:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def load_all(self) -> List[AnalysisRecord]:
+        """
+        Load all analysis records from storage.
+
+        Returns:
+            List of AnalysisRecord objects, sorted by date (newest first)
+        """
+        try:
+            rows = self.database.execute(
+                f"SELECT {self._SUMMARY_COLUMNS} FROM analyses "
+                f"ORDER BY analyzed_at DESC, record_id"
+            ).fetchall()
+        except VersionDatabaseError as e:
+            logger.error("Failed to load records: %s", e)
+            return []
+
+        records = [r for r in (self._row_to_record(row) for row in rows) if r is not None]
+        logger.info("Loaded %d analysis records", len(records))
+        return records
+
+    def load_page(self, offset: int = 0, limit: int = 50,
+                  filename_filter: Optional[str] = None,
+                  risk_level: Optional[str] = None,
+                  sort_by: str = "analyzed_at",
+                  descending: bool = True) -> List[AnalysisRecord]:
+        """
+        Load one page of analysis records with an indexed query.
+
+        Args:
+            offset: Number of matching records to skip
+            limit: Maximum number of records to return
+            filename_filter: Case-insensitive substring the filename must contain
+            risk_level: Only return records with this overall risk level
+            sort_by: One of SORT_COLUMNS ("analyzed_at", "filename", "risk_level")
+            descending: Sort direction
+
+        Returns:
+            List of AnalysisRecord objects
+        """
+        if sort_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+
+        where, params = self._build_where(filename_filter, risk_level)
+        order = f"{sort_by} COLLATE NOCASE" if sort_by == "filename" else sort_by
+        direction = "DESC" if descending else "ASC"
+        try:
+            rows = self.database.execute(
+                f"SELECT {self._SUMMARY_COLUMNS} FROM analyses {where} "
+                f"ORDER BY {order} {direction}, record_id LIMIT ? OFFSET ?",
+                tuple(params) + (limit, offset)
+            ).fetchall()
+        except VersionDatabaseError as e:
+            logger.error("Failed to load record page: %s", e)
+            return []
+
+        return [r for r in (self._row_to_record(row) for row in rows) if r is not None]
+
+    def count(self, filename_filter: Optional[str] = None,
+              risk_level: Optional[str] = None) -> int:
+        """
+        Count analysis records matching the given filters.
+
+        Args:
+            filename_filter: Case-insensitive substring the filename must contain
+            risk_level: Only count records with this overall risk level
+
+        Returns:
+            Number of matching records
+        """
+        where, params = self._build_where(filename_filter, risk_level)
+        try:
+            row = self.database.execute(
+                f"SELECT COUNT(*) FROM analyses {where}", tuple(params)
+            ).fetchone()
+        except VersionDatabaseError as e:
+            logger.error("Failed to count records: %s", e)
+            return 0
+        return row[0]
+
+    def delete(self, record_id: str) -> bool:
+        """
+        Delete an analysis record.
+
+        Args:
+            record_id: Unique identifier of the record
+
+        Returns:
+            True if deleted, False if not found
+
+        Raises:
+            HistoryStoreError: If deletion fails
+        """
+        try:
+            cursor = self.database.execute(
+                "DELETE FROM analyses WHERE record_id = ?", (record_id,)
+            )
+            self.database.commit()
+        except VersionDatabaseError as e:
+            self.database.rollback()
+            logger.error("Failed to delete analysis: %s. Error: %s", record_id, e)
+            raise HistoryStoreError(f"Failed to delete analysis: {e}")
+
+        if cursor.rowcount == 0:
+            logger.warning("Record not found in database: %s", record_id)
+            return False
+
+        logger.info("Deleted analysis record: %s", record_id)
+        return True
+
+    def get_summary(self, record_id: str) -> Optional[AnalysisRecord]:
+        """
+        Get summary information for a record without loading full data.
+
+        Args:
+            record_id: Unique identifier of the record
+
+        Returns:
+            AnalysisRecord or None if not found
+        """
+        try:
+            row = self.database.execute(
+                f"SELECT {self._SUMMARY_COLUMNS} FROM analyses WHERE record_id = ?",
+                (record_id,)
+            ).fetchone()
+        except VersionDatabaseError as e:
+            logger.error("Failed to get summary: %s. Error: %s", record_id, e)
+            return None
+
+        if row is None:
+            logger.warning("Record not found: %s", record_id)
+            return None
+        return self._row_to_record(row)
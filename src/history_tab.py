@@ -7,13 +7,17 @@ Supports contract versioning with version selection and comparison.
 """
 
 import logging
+from typing import Optional, Dict, List, Any
+
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea,
-    QPushButton, QMessageBox, QGroupBox, QFrame, QComboBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListView, QLineEdit,
+    QPushButton, QMessageBox, QComboBox, QStyledItemDelegate, QStyle,
+    QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QAbstractListModel, QModelIndex, QSize, QRect, QTimer
 )
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont
-from typing import Optional, Dict
+from PyQt5.QtGui import QFont, QColor, QPen
 
 from src.history_store import HistoryStore
 from src.history_models import AnalysisRecord
@@ -25,12 +29,340 @@ from src.version_comparison_view import VersionComparisonView
 logger = logging.getLogger(__name__)
 
 
+EMPTY_HISTORY_TEXT = (
+    "📭 No analysis history yet.\n\n"
+    "Analyze a contract in the Upload tab to get started."
+)
+NO_MATCHES_TEXT = "🔍 No analyses match your search."
+
+
+class ContractHistorySource:
+    """
+    Adapts DifferentialStorage contracts to the paged record source
+    interface used by HistoryListModel (load_page/count).
+
+    Each contract becomes a pseudo AnalysisRecord whose id is the
+    contract_id, so paging, filtering and sorting run as SQL queries
+    against the contracts table.
+    """
+
+    # HistoryStore sort keys mapped to contracts table columns
+    SORT_MAP = {"analyzed_at": "updated_at", "filename": "filename"}
+
+    def __init__(self, differential_storage: DifferentialStorage):
+        self.differential_storage = differential_storage
+
+    def load_page(self, offset: int = 0, limit: int = 50,
+                  filename_filter: Optional[str] = None,
+                  sort_by: str = "analyzed_at",
+                  descending: bool = True) -> List[AnalysisRecord]:
+        """Load one page of contracts as AnalysisRecord objects."""
+        contracts = self.differential_storage.get_contracts_page(
+            offset=offset,
+            limit=limit,
+            filename_filter=filename_filter,
+            sort_by=self.SORT_MAP.get(sort_by, "updated_at"),
+            descending=descending,
+        )
+
+        records = []
+        for contract in contracts:
+            record = AnalysisRecord(
+                id=contract.contract_id,
+                filename=contract.filename,
+                analyzed_at=contract.updated_at,  # Use updated_at to show latest version time
+                clause_count=0,  # Not tracked at contract level
+                risk_count=0,  # Not tracked at contract level
+                file_path=None,  # Not stored in version database
+            )
+            # Attach version info for display purposes
+            record._version_summary = f"Version {contract.current_version}"
+            records.append(record)
+        return records
+
+    def count(self, filename_filter: Optional[str] = None) -> int:
+        """Count contracts matching the filter."""
+        return self.differential_storage.count_contracts(filename_filter=filename_filter)
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    Lazily paged list model over a history record source.
+
+    Records are fetched PAGE_SIZE at a time through canFetchMore/fetchMore
+    as the view scrolls. Filtering and sorting are passed through to the
+    source so they run in the store. Version details are only computed when
+    a delegate asks for VersionInfoRole, i.e. for rows actually painted,
+    and are cached per record.
+    """
+
+    RecordRole = Qt.UserRole + 1
+    VersionInfoRole = Qt.UserRole + 2
+    DetailRole = Qt.UserRole + 3
+
+    PAGE_SIZE = 50
+
+    def __init__(self, source=None, version_info_provider=None, parent=None):
+        """
+        Initialize the model.
+
+        Args:
+            source: Object providing load_page(...) and count(...)
+            version_info_provider: Optional callable(record) -> dict or None
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.source = source
+        self.version_info_provider = version_info_provider
+        self.filename_filter: Optional[str] = None
+        self.sort_by = "analyzed_at"
+        self.descending = True
+        self._records: List[AnalysisRecord] = []
+        self._total = 0
+        self._version_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    # -- Query control ---------------------------------------------------
+
+    def set_source(self, source, version_info_provider=None) -> None:
+        """Replace the record source and reload the first page."""
+        self.source = source
+        self.version_info_provider = version_info_provider
+        self.reload()
+
+    def set_query(self, filename_filter: Optional[str] = None,
+                  sort_by: str = "analyzed_at", descending: bool = True) -> None:
+        """Change filter/sort and reload the first page."""
+        self.filename_filter = filename_filter or None
+        self.sort_by = sort_by
+        self.descending = descending
+        self.reload()
+
+    def reload(self) -> None:
+        """Discard loaded rows and fetch the first page again."""
+        self.beginResetModel()
+        self._records = []
+        self._version_cache = {}
+        try:
+            self._total = self.source.count(filename_filter=self.filename_filter) if self.source else 0
+        except Exception as e:
+            logger.error("Failed to count history records: %s", e)
+            self._total = 0
+        self.endResetModel()
+
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    @property
+    def total_count(self) -> int:
+        """Number of records matching the current query, loaded or not."""
+        return self._total
+
+    # -- QAbstractListModel interface ------------------------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return len(self._records) < self._total
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid() or self.source is None:
+            return
+
+        offset = len(self._records)
+        try:
+            page = self.source.load_page(
+                offset=offset,
+                limit=self.PAGE_SIZE,
+                filename_filter=self.filename_filter,
+                sort_by=self.sort_by,
+                descending=self.descending,
+            )
+        except Exception as e:
+            logger.error("Failed to load history page at offset %d: %s", offset, e)
+            page = []
+
+        if not page:
+            # Source shrank underneath us; stop asking for more
+            self._total = offset
+            return
+
+        self.beginInsertRows(QModelIndex(), offset, offset + len(page) - 1)
+        self._records.extend(page)
+        self.endInsertRows()
+        logger.debug("Fetched %d history records (offset %d)", len(page), offset)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._records):
+            return None
+
+        record = self._records[index.row()]
+        if role == Qt.DisplayRole:
+            return record.filename
+        if role == self.RecordRole:
+            return record
+        if role == self.VersionInfoRole:
+            return self.version_info(record)
+        if role == self.DetailRole:
+            return self.describe_record(record, self.version_info(record))
+        if role == Qt.ToolTipRole:
+            return f"{record.filename}\n{record.analyzed_at.strftime('%Y-%m-%d %H:%M:%S')}"
+        return None
+
+    # -- Record helpers ----------------------------------------------------
+
+    def record_at(self, row: int) -> Optional[AnalysisRecord]:
+        """Return the record at a loaded row, or None."""
+        if 0 <= row < len(self._records):
+            return self._records[row]
+        return None
+
+    def row_for_id(self, record_id: str) -> int:
+        """Return the loaded row index for a record id, or -1."""
+        for row, record in enumerate(self._records):
+            if record.id == record_id:
+                return row
+        return -1
+
+    def record_ids(self) -> List[str]:
+        """Ids of all loaded records, in display order."""
+        return [record.id for record in self._records]
+
+    def version_info(self, record: AnalysisRecord) -> Optional[Dict[str, Any]]:
+        """Return cached version info for a record, computing it on first use."""
+        if self.version_info_provider is None:
+            return None
+        if record.id not in self._version_cache:
+            try:
+                self._version_cache[record.id] = self.version_info_provider(record)
+            except Exception as e:
+                logger.warning("Failed to get version info for record %s: %s", record.id, e)
+                self._version_cache[record.id] = None
+        return self._version_cache[record.id]
+
+    @staticmethod
+    def describe_record(record: AnalysisRecord, version_info: Optional[Dict[str, Any]]) -> str:
+        """Build the statistics line shown under the filename."""
+        parts = [f"📋 {record.clause_count} clauses", f"⚠️ {record.risk_count} risks"]
+        if version_info:
+            parts.append(f"📌 Version {version_info['contract'].current_version}")
+            if version_info.get('versioned_clauses', 0) > 0:
+                parts.append(f"🔄 {version_info['versioned_clauses']} versioned")
+        if record.risk_level:
+            parts.append(f"Risk: {record.risk_level}")
+        return "    ".join(parts)
+
+    def prepend_record(self, record: AnalysisRecord) -> None:
+        """
+        Insert a record at the top, replacing a loaded entry with the same filename.
+        """
+        for row, existing in enumerate(self._records):
+            if existing.filename == record.filename:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._records[row]
+                self._version_cache.pop(existing.id, None)
+                self._total -= 1
+                self.endRemoveRows()
+                logger.info("Replaced existing entry for %s", record.filename)
+                break
+
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._records.insert(0, record)
+        self._total += 1
+        self.endInsertRows()
+
+    def remove_record(self, record_id: str) -> bool:
+        """Remove a loaded record; returns True if it was present."""
+        row = self.row_for_id(record_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._records[row]
+        self._version_cache.pop(record_id, None)
+        self._total = max(0, self._total - 1)
+        self.endRemoveRows()
+        return True
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """Paints a history record as a two-line card."""
+
+    ROW_HEIGHT = 64
+    MARGIN = 4
+    PADDING = 10
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index) -> None:
+        record = index.data(HistoryListModel.RecordRole)
+        if record is None:
+            super().paint(painter, option, index)
+            return
+
+        painter.save()
+        card = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+        if option.state & QStyle.State_Selected:
+            background, border = QColor("#e3f2fd"), QColor("#2196F3")
+        elif option.state & QStyle.State_MouseOver:
+            background, border = QColor("#f0f0f0"), QColor("#999999")
+        else:
+            background, border = QColor("#f9f9f9"), QColor("#dddddd")
+        painter.setPen(QPen(border))
+        painter.setBrush(background)
+        painter.drawRoundedRect(card, 5, 5)
+
+        inner = card.adjusted(self.PADDING, 6, -self.PADDING, -6)
+        top = QRect(inner.left(), inner.top(), inner.width(), inner.height() // 2)
+        bottom = QRect(inner.left(), top.bottom(), inner.width(), inner.height() - top.height())
+
+        # Top row: date (right), filename and type badge (left)
+        date_text = record.analyzed_at.strftime("%Y-%m-%d %H:%M:%S")
+        painter.setFont(QFont("Arial", 9))
+        painter.setPen(QColor("#666666"))
+        date_width = painter.fontMetrics().horizontalAdvance(date_text)
+        painter.drawText(top, Qt.AlignRight | Qt.AlignVCenter, date_text)
+
+        is_bid = getattr(record, 'analysis_type', 'comprehensive') == "bid_checklist"
+        badge_text = "Bid Review" if is_bid else "Contract"
+        badge_width = painter.fontMetrics().horizontalAdvance(badge_text) + 12
+
+        painter.setFont(QFont("Arial", 11, QFont.Bold))
+        painter.setPen(QColor("#333333"))
+        name_width = max(0, top.width() - date_width - badge_width - 24)
+        name = painter.fontMetrics().elidedText(f"📄 {record.filename}", Qt.ElideMiddle, name_width)
+        name_rect = QRect(top.left(), top.top(), name_width, top.height())
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        name_used = painter.fontMetrics().horizontalAdvance(name)
+        badge_rect = QRect(top.left() + name_used + 8, top.center().y() - 8, badge_width, 16)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#E3F2FD") if is_bid else QColor("#F3E5F5"))
+        painter.drawRoundedRect(badge_rect, 3, 3)
+        painter.setFont(QFont("Arial", 8, QFont.Bold))
+        painter.setPen(QColor("#1565C0") if is_bid else QColor("#7B1FA2"))
+        painter.drawText(badge_rect, Qt.AlignCenter, badge_text)
+
+        # Bottom row: statistics (version info is resolved lazily here)
+        painter.setFont(QFont("Arial", 9))
+        painter.setPen(QColor("#555555"))
+        painter.drawText(bottom, Qt.AlignLeft | Qt.AlignVCenter,
+                         index.data(HistoryListModel.DetailRole) or "")
+
+        painter.restore()
+
+
 class HistoryTab(QWidget):
     """
     History tab widget for displaying past analyses.
     
-    This widget displays a scrollable list of past analysis records,
-    allowing users to select records to view or delete them.
+    This widget displays a lazily paged list of past analysis records,
+    allowing users to search, select records to view or delete them.
     Supports contract versioning with version selection.
     
     Signals:
@@ -43,6 +375,15 @@ class HistoryTab(QWidget):
     analysis_selected = pyqtSignal(str)  # Emits record_id when selected
     analysis_deleted = pyqtSignal(str)   # Emits record_id when deleted
     version_selected = pyqtSignal(str, int)  # Emits contract_id, version when version selected
+
+    # Sort options shown in the sort combo: label -> (sort_by, descending)
+    SORT_OPTIONS = [
+        ("Newest first", ("analyzed_at", True)),
+        ("Oldest first", ("analyzed_at", False)),
+        ("Filename A-Z", ("filename", False)),
+        ("Filename Z-A", ("filename", True)),
+    ]
+    SEARCH_DEBOUNCE_MS = 250
     
     def __init__(self, history_store: HistoryStore, 
                  differential_storage: Optional[DifferentialStorage] = None,
@@ -59,6 +400,8 @@ class HistoryTab(QWidget):
         self.history_store = history_store
         self.differential_storage = differential_storage
         self.version_manager = VersionManager(differential_storage) if differential_storage else None
+        self.model = HistoryListModel(parent=self)
+        self._selected_contract_id: Optional[str] = None
         
         self.init_ui()
         self.refresh()
@@ -78,79 +421,155 @@ class HistoryTab(QWidget):
         
         instructions = QLabel(
             "View and manage your past contract analyses.\n"
-            "Click on an analysis to view its full results."
+            "Double-click an analysis to view its full results."
         )
         instructions.setWordWrap(True)
         instructions.setAlignment(Qt.AlignCenter)
         instructions.setStyleSheet("padding: 5px; font-size: 12px; color: #666;")
         layout.addWidget(instructions)
-        
-        # Scroll area for history list
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; }")
-        
-        # Container widget for scroll area
-        scroll_content = QWidget()
-        self.history_layout = QVBoxLayout()
-        self.history_layout.setSpacing(10)
-        scroll_content.setLayout(self.history_layout)
-        scroll.setWidget(scroll_content)
-        
-        layout.addWidget(scroll)
+
+        # Search and sort row
+        query_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by filename...")
+        self.search_input.setClearButtonEnabled(True)
+        query_layout.addWidget(self.search_input, 1)
+
+        self.sort_combo = QComboBox()
+        for label, option in self.SORT_OPTIONS:
+            self.sort_combo.addItem(label, option)
+        query_layout.addWidget(self.sort_combo)
+        layout.addLayout(query_layout)
+
+        # Debounce typing so each keystroke doesn't hit the store
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_query)
+        self.search_input.textChanged.connect(lambda _text: self._search_timer.start())
+        self.sort_combo.currentIndexChanged.connect(lambda _idx: self._apply_query())
+        
+        # Virtualized list: only visible rows are painted
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(HistoryItemDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setStyleSheet("QListView { border: none; background: transparent; }")
+        self.list_view.doubleClicked.connect(self._on_item_activated)
+        self.list_view.activated.connect(self._on_item_activated)
+        self.list_view.selectionModel().currentChanged.connect(
+            lambda current, _previous: self._update_actions()
+        )
+        layout.addWidget(self.list_view, 1)
         
         # Placeholder for empty state
-        self.empty_label = QLabel(
-            "📭 No analysis history yet.\n\n"
-            "Analyze a contract in the Upload tab to get started."
-        )
+        self.empty_label = QLabel(EMPTY_HISTORY_TEXT)
         self.empty_label.setAlignment(Qt.AlignCenter)
         self.empty_label.setStyleSheet(
             "padding: 50px; font-size: 14px; color: #999;"
         )
-        self.history_layout.addWidget(self.empty_label)
-        
-        # Add stretch at the end
-        self.history_layout.addStretch()
+        layout.addWidget(self.empty_label, 1)
+
+        # Actions for the selected record
+        action_layout = QHBoxLayout()
+
+        self.version_selector_label = QLabel("View version:")
+        self.version_selector_label.setStyleSheet("color: #666; font-size: 10px;")
+        action_layout.addWidget(self.version_selector_label)
+
+        self.version_combo = QComboBox()
+        self.version_combo.setStyleSheet(
+            "QComboBox {"
+            "    padding: 3px 8px;"
+            "    font-size: 10px;"
+            "    border: 1px solid #ccc;"
+            "    border-radius: 3px;"
+            "}"
+        )
+        self.version_combo.currentIndexChanged.connect(self._on_version_combo_changed)
+        action_layout.addWidget(self.version_combo)
+
+        # Compare Versions button (Requirement 6.1)
+        self.compare_btn = QPushButton("Compare Versions")
+        self.compare_btn.setStyleSheet(
+            "QPushButton {"
+            "    padding: 3px 10px;"
+            "    font-size: 10px;"
+            "    background: #2196F3;"
+            "    color: white;"
+            "    border: none;"
+            "    border-radius: 3px;"
+            "}"
+            "QPushButton:hover {"
+            "    background: #1976D2;"
+            "}"
+        )
+        self.compare_btn.clicked.connect(self._on_compare_selected_clicked)
+        action_layout.addWidget(self.compare_btn)
+
+        action_layout.addStretch()
+
+        self.view_btn = QPushButton("View Analysis")
+        self.view_btn.setStyleSheet(
+            "QPushButton {"
+            "    padding: 5px 15px;"
+            "    font-size: 11px;"
+            "    background: #4CAF50;"
+            "    color: white;"
+            "    border: none;"
+            "    border-radius: 3px;"
+            "}"
+            "QPushButton:hover {"
+            "    background: #45a049;"
+            "}"
+        )
+        self.view_btn.clicked.connect(self._on_view_selected_clicked)
+        action_layout.addWidget(self.view_btn)
+
+        self.delete_btn = QPushButton("Delete")
+        self.delete_btn.setStyleSheet(
+            "QPushButton {"
+            "    padding: 5px 15px;"
+            "    font-size: 11px;"
+            "    background: #f44336;"
+            "    color: white;"
+            "    border: none;"
+            "    border-radius: 3px;"
+            "}"
+            "QPushButton:hover {"
+            "    background: #da190b;"
+            "}"
+        )
+        self.delete_btn.clicked.connect(self._on_delete_selected_clicked)
+        action_layout.addWidget(self.delete_btn)
+
+        layout.addLayout(action_layout)
+        self._update_actions()
     
     def refresh(self) -> None:
-        """Refresh the history list from storage."""
+        """Reload the history list from storage, starting at the first page."""
         try:
-            # Clear existing items (except empty label and stretch)
-            while self.history_layout.count() > 0:
-                item = self.history_layout.takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
-            
             # Load records - prefer differential_storage if available
             if self.differential_storage:
                 logger.info("Loading history from differential storage (versioning enabled)")
-                records = self._load_from_differential_storage()
+                source = ContractHistorySource(self.differential_storage)
+                provider = self._version_info_for_record
             else:
                 logger.info("Loading history from history store (versioning disabled)")
-                records = self.history_store.load_all()
-            
-            if not records:
-                # Show empty state
-                self.empty_label = QLabel(
-                    "📭 No analysis history yet.\n\n"
-                    "Analyze a contract in the Upload tab to get started."
-                )
-                self.empty_label.setAlignment(Qt.AlignCenter)
-                self.empty_label.setStyleSheet(
-                    "padding: 50px; font-size: 14px; color: #999;"
-                )
-                self.history_layout.addWidget(self.empty_label)
-            else:
-                # Display records
-                for record in records:
-                    record_widget = self._create_record_widget(record)
-                    self.history_layout.addWidget(record_widget)
-            
-            # Add stretch at the end
-            self.history_layout.addStretch()
-            
-            logger.info("History list refreshed with %d records", len(records))
+                source = self.history_store
+                provider = None
+
+            self.model.set_source(source, provider)
+            self._update_empty_state()
+            self._update_actions()
+
+            logger.info(
+                "History list refreshed: %d of %d records loaded",
+                self.model.rowCount(), self.model.total_count
+            )
             
         except Exception as e:
             logger.error("Failed to refresh history list: %s", e)
@@ -159,49 +578,24 @@ class HistoryTab(QWidget):
                 "Refresh Error",
                 f"Failed to refresh history list:\n{str(e)}"
             )
-    
-    def _load_from_differential_storage(self):
-        """
-        Load analysis records from differential storage.
-        
-        Converts Contract objects from differential storage into AnalysisRecord
-        objects for display in the history list.
-        
-        Returns:
-            List of AnalysisRecord objects
-        """
-        from src.history_models import AnalysisRecord
-        
-        try:
-            # Get all contracts from differential storage
-            contracts = self.differential_storage.get_all_contracts()
-            logger.info("Retrieved %d contracts from differential storage", len(contracts))
-            
-            # Convert to AnalysisRecord format
-            records = []
-            for contract in contracts:
-                # Create a pseudo-record for display
-                # Use contract_id as record_id for compatibility
-                record = AnalysisRecord(
-                    id=contract.contract_id,
-                    filename=contract.filename,
-                    analyzed_at=contract.updated_at,  # Use updated_at to show latest version time
-                    clause_count=0,  # Not tracked at contract level
-                    risk_count=0,  # Not tracked at contract level
-                    file_path=None,  # Not stored in version database
-                )
-                # Attach version info for display purposes
-                record._version_summary = f"Version {contract.current_version}"
-                records.append(record)
 
-            # Sort by analyzed_at (newest first)
-            records.sort(key=lambda r: r.analyzed_at, reverse=True)
-            
-            return records
-            
-        except Exception as e:
-            logger.error("Failed to load from differential storage: %s", e, exc_info=True)
-            return []
+    def _apply_query(self) -> None:
+        """Push the current search text and sort order down to the store."""
+        sort_by, descending = self.sort_combo.currentData() or ("analyzed_at", True)
+        self.model.set_query(
+            filename_filter=self.search_input.text().strip() or None,
+            sort_by=sort_by,
+            descending=descending,
+        )
+        self._update_empty_state()
+        self._update_actions()
+
+    def _update_empty_state(self) -> None:
+        """Show the empty-state label when there are no rows to display."""
+        is_empty = self.model.rowCount() == 0
+        self.empty_label.setText(NO_MATCHES_TEXT if self.model.filename_filter else EMPTY_HISTORY_TEXT)
+        self.empty_label.setVisible(is_empty)
+        self.list_view.setVisible(not is_empty)
     
     def add_record(self, record: AnalysisRecord) -> None:
         """
@@ -216,32 +610,8 @@ class HistoryTab(QWidget):
             record: The new analysis record to add
         """
         try:
-            # Remove empty label if it exists
-            for i in range(self.history_layout.count()):
-                item = self.history_layout.itemAt(i)
-                if item and item.widget() and isinstance(item.widget(), QLabel):
-                    widget = item.widget()
-                    if "No analysis history yet" in widget.text():
-                        self.history_layout.removeWidget(widget)
-                        widget.deleteLater()
-                        break
-
-            # Remove existing entry with the same filename to avoid duplicates
-            for i in range(self.history_layout.count()):
-                item = self.history_layout.itemAt(i)
-                if item and item.widget() and isinstance(item.widget(), QFrame):
-                    existing = item.widget()
-                    existing_filename = getattr(existing, 'record_filename', None)
-                    if existing_filename and existing_filename == record.filename:
-                        self.history_layout.removeWidget(existing)
-                        existing.deleteLater()
-                        logger.info("Replaced existing entry for %s", record.filename)
-                        break
-
-            # Create and insert the new record widget at the top
-            record_widget = self._create_record_widget(record)
-            self.history_layout.insertWidget(0, record_widget)
-
+            self.model.prepend_record(record)
+            self._update_empty_state()
             logger.info("Added record to history list: %s", record.id)
 
         except Exception as e:
@@ -255,242 +625,102 @@ class HistoryTab(QWidget):
             record_id: ID of record to remove
         """
         try:
-            # Find and remove the widget with matching record_id
-            for i in range(self.history_layout.count()):
-                item = self.history_layout.itemAt(i)
-                if item and item.widget():
-                    widget = item.widget()
-                    if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                        self.history_layout.removeWidget(widget)
-                        widget.deleteLater()
-                        logger.info("Removed record from history list: %s", record_id)
-                        break
-            
-            # Check if list is now empty and show empty state
-            has_records = False
-            for i in range(self.history_layout.count()):
-                item = self.history_layout.itemAt(i)
-                if item and item.widget() and hasattr(item.widget(), 'record_id'):
-                    has_records = True
-                    break
-            
-            if not has_records:
-                self.empty_label = QLabel(
-                    "📭 No analysis history yet.\n\n"
-                    "Analyze a contract in the Upload tab to get started."
-                )
-                self.empty_label.setAlignment(Qt.AlignCenter)
-                self.empty_label.setStyleSheet(
-                    "padding: 50px; font-size: 14px; color: #999;"
-                )
-                self.history_layout.insertWidget(0, self.empty_label)
+            if self.model.remove_record(record_id):
+                logger.info("Removed record from history list: %s", record_id)
+            self._update_empty_state()
+            self._update_actions()
             
         except Exception as e:
             logger.error("Failed to remove record from history list: %s", e)
-    
-    def _create_record_widget(self, record: AnalysisRecord) -> QWidget:
+
+    def selected_record(self) -> Optional[AnalysisRecord]:
+        """Return the currently selected record, if any."""
+        index = self.list_view.currentIndex()
+        if not index.isValid():
+            return None
+        return self.model.record_at(index.row())
+
+    def select_record(self, record_id: str) -> bool:
         """
-        Create a widget for displaying a single analysis record.
-        
-        Args:
-            record: The analysis record to display
-            
+        Select a loaded record by id.
+
         Returns:
-            QWidget containing the record display
+            True if the record was found and selected
         """
-        # Create a frame for the record
-        frame = QFrame()
-        frame.setFrameShape(QFrame.StyledPanel)
-        frame.setStyleSheet(
-            "QFrame {"
-            "    background: #f9f9f9;"
-            "    border: 1px solid #ddd;"
-            "    border-radius: 5px;"
-            "    padding: 10px;"
-            "}"
-            "QFrame:hover {"
-            "    background: #f0f0f0;"
-            "    border: 1px solid #999;"
-            "}"
-        )
-        
-        # Store record_id and filename as attributes for later reference
-        frame.record_id = record.id
-        frame.record_filename = record.filename
-        
-        layout = QVBoxLayout()
-        frame.setLayout(layout)
-        
-        # Top row: filename and date
-        top_layout = QHBoxLayout()
-        
-        filename_label = QLabel(f"📄 {record.filename}")
-        filename_label.setFont(QFont("Arial", 12, QFont.Bold))
-        filename_label.setStyleSheet("color: #333;")
-        top_layout.addWidget(filename_label)
-
-        # Analysis type badge
-        analysis_type = getattr(record, 'analysis_type', 'comprehensive')
-        if analysis_type == "bid_checklist":
-            type_label = QLabel("Bid Review")
-            type_label.setStyleSheet(
-                "background: #E3F2FD; color: #1565C0; font-size: 10px; "
-                "padding: 2px 6px; border-radius: 3px; font-weight: bold;"
-            )
-        else:
-            type_label = QLabel("Contract")
-            type_label.setStyleSheet(
-                "background: #F3E5F5; color: #7B1FA2; font-size: 10px; "
-                "padding: 2px 6px; border-radius: 3px; font-weight: bold;"
-            )
-        top_layout.addWidget(type_label)
+        row = self.model.row_for_id(record_id)
+        if row < 0:
+            return False
+        self.list_view.setCurrentIndex(self.model.index(row))
+        return True
 
-        top_layout.addStretch()
-        
-        date_label = QLabel(record.analyzed_at.strftime("%Y-%m-%d %H:%M:%S"))
-        date_label.setStyleSheet("color: #666; font-size: 11px;")
-        top_layout.addWidget(date_label)
-        
-        layout.addLayout(top_layout)
-        
-        # Middle row: statistics and version info
-        stats_layout = QHBoxLayout()
-        
-        clause_label = QLabel(f"📋 {record.clause_count} clauses")
-        clause_label.setStyleSheet("color: #555; font-size: 11px;")
-        stats_layout.addWidget(clause_label)
-        
-        risk_label = QLabel(f"⚠️ {record.risk_count} risks")
-        risk_label.setStyleSheet("color: #555; font-size: 11px;")
-        stats_layout.addWidget(risk_label)
-        
-        # Add version information if available
-        if self.differential_storage:
-            try:
-                # Try to get contract by file hash or filename
-                contract = self._get_contract_for_record(record)
-                
-                if contract:
-                    # Show current version
-                    version_label = QLabel(f"📌 Version {contract.current_version}")
-                    version_label.setStyleSheet("color: #0066cc; font-size: 11px; font-weight: bold;")
-                    stats_layout.addWidget(version_label)
-                    
-                    # Count clauses with multiple versions
-                    versioned_clause_count = self._count_versioned_clauses(contract.contract_id)
-                    if versioned_clause_count > 0:
-                        versioned_label = QLabel(f"🔄 {versioned_clause_count} versioned")
-                        versioned_label.setStyleSheet("color: #ff9800; font-size: 11px;")
-                        stats_layout.addWidget(versioned_label)
-            except Exception as e:
-                logger.warning("Failed to get version info for record %s: %s", record.id, e)
-        
-        stats_layout.addStretch()
-        
-        layout.addLayout(stats_layout)
-        
-        # Version selector row (if versioning is available)
-        if self.differential_storage:
-            try:
-                contract = self._get_contract_for_record(record)
-                if contract and contract.current_version > 1:
-                    version_layout = QHBoxLayout()
-                    
-                    version_selector_label = QLabel("View version:")
-                    version_selector_label.setStyleSheet("color: #666; font-size: 10px;")
-                    version_layout.addWidget(version_selector_label)
-                    
-                    version_combo = QComboBox()
-                    version_combo.setStyleSheet(
-                        "QComboBox {"
-                        "    padding: 3px 8px;"
-                        "    font-size: 10px;"
-                        "    border: 1px solid #ccc;"
-                        "    border-radius: 3px;"
-                        "}"
-                    )
-                    
-                    # Add all versions
-                    for v in range(1, contract.current_version + 1):
-                        version_combo.addItem(f"v{v}", v)
-                    
-                    # Set current version as default
-                    version_combo.setCurrentIndex(contract.current_version - 1)
-                    
-                    # Connect version selection
-                    version_combo.currentIndexChanged.connect(
-                        lambda idx: self._on_version_selected(contract.contract_id, version_combo.itemData(idx))
-                    )
-                    
-                    version_layout.addWidget(version_combo)
-                    
-                    # Add Compare Versions button (Requirement 6.1)
-                    compare_btn = QPushButton("Compare Versions")
-                    compare_btn.setStyleSheet(
-                        "QPushButton {"
-                        "    padding: 3px 10px;"
-                        "    font-size: 10px;"
-                        "    background: #2196F3;"
-                        "    color: white;"
-                        "    border: none;"
-                        "    border-radius: 3px;"
-                        "}"
-                        "QPushButton:hover {"
-                        "    background: #1976D2;"
-                        "}"
-                    )
-                    compare_btn.clicked.connect(
-                        lambda: self._on_compare_versions_clicked(contract.contract_id)
-                    )
-                    version_layout.addWidget(compare_btn)
-                    
-                    version_layout.addStretch()
-                    
-                    layout.addLayout(version_layout)
-            except Exception as e:
-                logger.warning("Failed to create version selector for record %s: %s", record.id, e)
-        
-        # Bottom row: action buttons
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
-        
-        view_btn = QPushButton("View Analysis")
-        view_btn.setStyleSheet(
-            "QPushButton {"
-            "    padding: 5px 15px;"
-            "    font-size: 11px;"
-            "    background: #4CAF50;"
-            "    color: white;"
-            "    border: none;"
-            "    border-radius: 3px;"
-            "}"
-            "QPushButton:hover {"
-            "    background: #45a049;"
-            "}"
-        )
-        view_btn.clicked.connect(lambda: self._on_view_clicked(record.id))
-        button_layout.addWidget(view_btn)
-        
-        delete_btn = QPushButton("Delete")
-        delete_btn.setStyleSheet(
-            "QPushButton {"
-            "    padding: 5px 15px;"
-            "    font-size: 11px;"
-            "    background: #f44336;"
-            "    color: white;"
-            "    border: none;"
-            "    border-radius: 3px;"
-            "}"
-            "QPushButton:hover {"
-            "    background: #da190b;"
-            "}"
-        )
-        delete_btn.clicked.connect(lambda: self._on_delete_clicked(record.id, record.filename))
-        button_layout.addWidget(delete_btn)
-        
-        layout.addLayout(button_layout)
-        
-        return frame
+    def _update_actions(self) -> None:
+        """Enable actions and fill the version selector for the selected record."""
+        record = self.selected_record()
+        self.view_btn.setEnabled(record is not None)
+        self.delete_btn.setEnabled(record is not None)
+
+        contract = None
+        if record is not None and self.differential_storage:
+            info = self.model.version_info(record)
+            contract = info['contract'] if info else None
+
+        has_versions = contract is not None and contract.current_version > 1
+        self.version_combo.blockSignals(True)
+        self.version_combo.clear()
+        if has_versions:
+            # Add all versions, with the current version selected by default
+            for v in range(1, contract.current_version + 1):
+                self.version_combo.addItem(f"v{v}", v)
+            self.version_combo.setCurrentIndex(contract.current_version - 1)
+        self.version_combo.blockSignals(False)
+
+        self._selected_contract_id = contract.contract_id if has_versions else None
+        for widget in (self.version_selector_label, self.version_combo, self.compare_btn):
+            widget.setVisible(has_versions)
+
+    def _version_info_for_record(self, record: AnalysisRecord) -> Optional[Dict[str, Any]]:
+        """
+        Resolve version details for one record (called lazily by the model).
+
+        Returns:
+            Dict with 'contract' and 'versioned_clauses', or None if the
+            record has no matching contract
+        """
+        contract = self._get_contract_for_record(record)
+        if contract is None:
+            return None
+        return {
+            'contract': contract,
+            'versioned_clauses': self._count_versioned_clauses(contract.contract_id),
+        }
+
+    def _on_item_activated(self, index: QModelIndex) -> None:
+        """Open the analysis for a double-clicked or activated row."""
+        record = self.model.record_at(index.row())
+        if record is not None:
+            self._on_view_clicked(record.id)
+
+    def _on_view_selected_clicked(self) -> None:
+        """Handle the View Analysis button for the selected record."""
+        record = self.selected_record()
+        if record is not None:
+            self._on_view_clicked(record.id)
+
+    def _on_delete_selected_clicked(self) -> None:
+        """Handle the Delete button for the selected record."""
+        record = self.selected_record()
+        if record is not None:
+            self._on_delete_clicked(record.id, record.filename)
+
+    def _on_compare_selected_clicked(self) -> None:
+        """Handle the Compare Versions button for the selected record."""
+        if self._selected_contract_id:
+            self._on_compare_versions_clicked(self._selected_contract_id)
+
+    def _on_version_combo_changed(self, idx: int) -> None:
+        """Emit version selection when the user picks a version."""
+        if self._selected_contract_id and idx >= 0:
+            self._on_version_selected(self._selected_contract_id, self.version_combo.itemData(idx))
     
     def _on_view_clicked(self, record_id: str) -> None:
         """
@@ -617,19 +847,11 @@ class HistoryTab(QWidget):
         
         try:
             # Match by contract_id (record.id is set to contract.contract_id
-            # in _load_from_differential_storage), with filename fallback
-            all_contracts = self.differential_storage.get_all_contracts()
-
-            for contract in all_contracts:
-                if contract.contract_id == record.id:
-                    return contract
-
-            # Fallback: match by filename if ID didn't match
-            for contract in all_contracts:
-                if contract.filename == record.filename:
-                    return contract
-
-            return None
+            # in ContractHistorySource), with filename fallback
+            contract = self.differential_storage.get_contract(record.id)
+            if contract is None:
+                contract = self.differential_storage.find_contract_by_filename(record.filename)
+            return contract
         except Exception as e:
             logger.error("Failed to get contract for record %s: %s", record.id, e)
             return None
@@ -648,20 +870,7 @@ class HistoryTab(QWidget):
             return 0
         
         try:
-            all_clauses = self.differential_storage.get_clauses(contract_id)
-            
-            # Group by clause_identifier and count unique versions
-            clause_versions = {}
-            for clause in all_clauses:
-                identifier = clause.clause_identifier or clause.clause_id
-                if identifier not in clause_versions:
-                    clause_versions[identifier] = set()
-                clause_versions[identifier].add(clause.clause_version)
-            
-            # Count clauses with more than one version
-            versioned_count = sum(1 for versions in clause_versions.values() if len(versions) > 1)
-            
-            return versioned_count
+            return self.differential_storage.count_versioned_clauses(contract_id)
         except Exception as e:
             logger.error("Failed to count versioned clauses for contract %s: %s", contract_id, e)
             return 0
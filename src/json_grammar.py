@@ -0,0 +1,268 @@
+"""
+JSON Grammar Module
+
+Converts JSON schemas into GBNF grammars for llama.cpp constrained sampling,
+and builds the response schemas the analysis prompts ask the local model
+for. With a grammar the model can only emit tokens that keep the output a
+valid instance of the schema, and generation ends as soon as the top-level
+object closes, so JSON repair heuristics and plain-text fallbacks are no
+longer needed for these calls.
+
+The response schemas are derived from config/output_schemas_v1.json and
+config/bid_checklist_schema_v1.json so prompts, grammars and validation
+stay in step.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.schema_loader import SchemaLoader, get_resource_path
+
+
+class JsonGrammarError(Exception):
+    """Exception raised for schemas that cannot be converted to a grammar."""
+    pass
+
+
+# Shared primitive rules. Whitespace is limited to one optional space so
+# the model cannot spend tokens on indentation.
+_PRIMITIVE_RULES = {
+    "ws": '[ ]?',
+    "char": r'[^"\\\x7F\x00-\x1F] | "\\" (["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F])',
+    "string": r'"\"" char* "\"" ws',
+    "nonempty-string": r'"\"" char+ "\"" ws',
+    "integer": '"-"? ("0" | [1-9] [0-9]*) ws',
+    "number": '"-"? ("0" | [1-9] [0-9]*) ("." [0-9]+)? ([eE] [-+]? [0-9]+)? ws',
+    "boolean": '("true" | "false") ws',
+    "null": '"null" ws',
+}
+
+
+def _literal(text: str) -> str:
+    """Quote text as a GBNF string literal."""
+    escaped = (
+        text.replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+class _GrammarBuilder:
+    """Walks a schema and collects one GBNF rule per object, array and enum."""
+
+    def __init__(self):
+        self.rules: Dict[str, str] = {}
+        self.used_primitives = set()
+
+    def _primitive(self, name: str) -> str:
+        self.used_primitives.add(name)
+        if name in ("string", "nonempty-string"):
+            self.used_primitives.add("char")
+        return name
+
+    def _add(self, name: str, body: str) -> str:
+        name = re.sub(r'[^a-z0-9-]+', '-', name.lower()).strip('-') or "rule"
+        unique, suffix = name, 2
+        while unique in self.rules or unique in _PRIMITIVE_RULES:
+            if self.rules.get(unique) == body:
+                return unique
+            unique, suffix = f"{name}-{suffix}", suffix + 1
+        self.rules[unique] = body
+        return unique
+
+    def visit(self, schema: Dict[str, Any], name: str) -> str:
+        """
+        Emit rules for a schema node.
+
+        Args:
+            schema: JSON schema node
+            name: Rule name hint
+
+        Returns:
+            Name of the rule matching the node
+        """
+        if "enum" in schema:
+            alternatives = " | ".join(_literal(json.dumps(value)) for value in schema["enum"])
+            return self._add(name, f"({alternatives}) ws")
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, list):
+            alternatives = [
+                self.visit({**schema, "type": member}, f"{name}-{member}")
+                for member in schema_type
+            ]
+            return self._add(name, " | ".join(alternatives))
+
+        if schema_type == "object":
+            return self._object(schema, name)
+        if schema_type == "array":
+            return self._array(schema, name)
+        if schema_type == "string":
+            return self._primitive("nonempty-string" if schema.get("minLength", 0) >= 1 else "string")
+        if schema_type in ("integer", "number", "boolean", "null"):
+            return self._primitive(schema_type)
+
+        raise JsonGrammarError(f"Unsupported schema at '{name}': {schema_type!r}")
+
+    def _object(self, schema: Dict[str, Any], name: str) -> str:
+        # Every property is emitted, in schema order, so the output shape is
+        # fixed and the model never has to decide which keys to write.
+        members = [
+            f'{_literal(json.dumps(key))} ws ":" ws {self.visit(value, f"{name}-{key}")}'
+            for key, value in schema.get("properties", {}).items()
+        ]
+        if not members:
+            return self._add(name, '"{" ws "}" ws')
+        return self._add(name, '"{" ws ' + ' "," ws '.join(members) + ' "}" ws')
+
+    def _array(self, schema: Dict[str, Any], name: str) -> str:
+        item = self.visit(schema.get("items", {"type": "string"}), f"{name}-item")
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems")
+        if max_items == 0:
+            return self._add(name, '"[" ws "]" ws')
+
+        following = f'"," ws {item}'
+        body = " ".join([item] + [following] * max(min_items - 1, 0))
+        if max_items is None:
+            body += f" ({following})*"
+        else:
+            optional = ""
+            for _ in range(max_items - max(min_items, 1)):
+                optional = f"({following} {optional})?" if optional else f"({following})?"
+            if optional:
+                body += f" {optional}"
+        if min_items == 0:
+            body = f"({body})?"
+        return self._add(name, f'"[" ws {body} "]" ws')
+
+
+def schema_to_gbnf(schema: Dict[str, Any]) -> str:
+    """
+    Convert a JSON schema to a GBNF grammar.
+
+    Supports the subset used by the CR2A schemas: objects (all properties
+    emitted in order), arrays (with minItems/maxItems), strings (minLength
+    0 or 1), integers, numbers, booleans, null, type lists and enums.
+
+    Args:
+        schema: JSON schema whose top level is an object
+
+    Returns:
+        GBNF grammar text with a 'root' rule
+
+    Raises:
+        JsonGrammarError: If the schema uses unsupported constructs
+    """
+    if schema.get("type") != "object":
+        raise JsonGrammarError("Top-level schema must be an object")
+
+    builder = _GrammarBuilder()
+    top = builder.visit(schema, "root-object")
+
+    lines = [f"root ::= {top}"]
+    lines += [f"{name} ::= {body}" for name, body in builder.rules.items()]
+    builder.used_primitives.add("ws")
+    lines += [
+        f"{name} ::= {body}"
+        for name, body in _PRIMITIVE_RULES.items()
+        if name in builder.used_primitives
+    ]
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=1)
+def _clause_block_schema() -> Dict[str, Any]:
+    return SchemaLoader().get_clause_block_schema()
+
+
+@lru_cache(maxsize=1)
+def _checklist_item_schema() -> Dict[str, Any]:
+    with open(get_resource_path("config/bid_checklist_schema_v1.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["$defs"]["ChecklistItem"]
+
+
+def clause_response_schema() -> Dict[str, Any]:
+    """
+    Schema for a per-category clause answer from the local model.
+
+    Mirrors the ClauseBlock definition with the snake_case keys the
+    per-item prompt asks for, plus a 'found' flag.
+
+    Returns:
+        JSON schema dict
+    """
+    block = _clause_block_schema()["properties"]
+    redline = block["Redline Recommendations"]["items"]
+    return {
+        "type": "object",
+        "properties": {
+            "found": {"type": "boolean"},
+            "clause_location": {"type": "string"},
+            "clause_page": block["Clause Page"],
+            "clause_summary": block["Clause Summary"],
+            "flow_down": {"type": "array", "items": {"type": "string", "minLength": 1}},
+            "redlines": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": redline["required"],
+                    "properties": {key: redline["properties"][key] for key in redline["required"]},
+                },
+            },
+            "harmful_language": block["Harmful Language / Policy Conflicts"],
+        },
+        "required": ["found", "clause_location", "clause_page", "clause_summary",
+                     "flow_down", "redlines", "harmful_language"],
+    }
+
+
+def summary_map_schema(clause_ids: List[str]) -> Dict[str, Any]:
+    """
+    Schema for a batch of clause summaries keyed by clause ID.
+
+    Args:
+        clause_ids: IDs the prompt asks the model to summarize, in order
+
+    Returns:
+        JSON schema dict
+    """
+    summary = dict(_clause_block_schema()["properties"]["Clause Summary"], minLength=1)
+    return {
+        "type": "object",
+        "properties": {clause_id: summary for clause_id in clause_ids},
+        "required": list(clause_ids),
+    }
+
+
+def bid_item_response_schema() -> Dict[str, Any]:
+    """
+    Schema for one bid checklist answer from the local model.
+
+    Uses the ChecklistItem fields the model is asked to extract; confidence
+    is decided by BidReviewEngine, not the model.
+
+    Returns:
+        JSON schema dict
+    """
+    item = _checklist_item_schema()["properties"]
+    return {
+        "type": "object",
+        "properties": {
+            "value": item["value"],
+            "location": item["location"],
+            "page": {"type": ["integer", "null"]},
+            "notes": item["notes"],
+        },
+        "required": ["value", "location", "page", "notes"],
+    }
+
+
+def is_valid_json_object(text: Optional[str]) -> bool:
+    """Whether text parses as a JSON object without any repair."""
+    try:
+        return isinstance(json.loads(text or ""), dict)
+    except ValueError:
+        return False
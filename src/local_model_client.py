@@ -12,13 +12,16 @@ Supports:
 - Any GGUF-format model via llama-cpp-python
 """
 
+import gc
 import json
 import logging
 import os
 import re
 import sys
+import threading
 import multiprocessing
 from pathlib import Path
+from concurrent.futures import Future
 from typing import Dict, Optional, Callable, List, Tuple
 
 logger = logging.getLogger(__name__)
@@ -110,6 +113,10 @@ def _check_vulkan_devices() -> bool:
         return False
 
 
+# detect_gpu_support() results by backend preference
+_gpu_support_cache: Dict[str, Tuple[bool, int, str]] = {}
+
+
 def detect_gpu_support(preference: str = "auto") -> Tuple[bool, int, str]:
     """
     Detect the best available GPU backend for inference.
@@ -125,7 +132,13 @@ def detect_gpu_support(preference: str = "auto") -> Tuple[bool, int, str]:
         - gpu_available: True if a GPU backend is available
         - recommended_layers: -1 to offload all layers, 0 for CPU-only
         - backend_name: "sycl", "ipex", "vulkan", "opencl", "cpu", etc.
+
+    Results are cached for the life of the process (installed backends and
+    drivers do not change while it runs).
     """
+    if preference in _gpu_support_cache:
+        return _gpu_support_cache[preference]
+
     _ensure_llama()
     _ensure_ipex()
 
@@ -134,16 +147,25 @@ def detect_gpu_support(preference: str = "auto") -> Tuple[bool, int, str]:
     best = get_best_backend(preference)
     if best.available and best.name != CPU:
         logger.info("GPU backend selected: %s (%s)", best.name, best.reason)
-        return True, -1, best.name
+        result = (True, -1, best.name)
     elif best.available:
         logger.info("CPU-only inference (no GPU backend available)")
-        return False, 0, "cpu"
+        result = (False, 0, "cpu")
     else:
         logger.warning("No inference backend available: %s", best.reason)
-        return False, 0, "cpu"
+        result = (False, 0, "cpu")
+    _gpu_support_cache[preference] = result
+    return result
 
 from src.schema_loader import SchemaLoader
+from src.json_grammar import is_valid_json_object, schema_to_gbnf
+from src.early_stop import STOP_CHECK_TOKENS, EarlyStopStats
+from src.parallel_inference import (
+    InferenceScheduler, InferenceSchedulerError, LlamaBatchBackend, SequenceRequest, SequenceResult
+)
 from src.fuzzy_matcher import FuzzyClauseMatcher
+from src.model_server import ModelServerClient
+from src.gpu_probe_cache import GpuProbeCache, ProbeEntry, ProbeResult
 
 
 class LocalModelClient:
@@ -163,6 +185,7 @@ class LocalModelClient:
     DEFAULT_TEMPERATURE = 0.0     # Deterministic for contract analysis
     MAX_TOKENS_ANALYSIS = 4000    # Contract analysis responses (keep short for speed)
     MAX_TOKENS_QUERY = 500        # Chat query responses
+    CONTEXT_SAFETY_TOKENS = 256   # Headroom left unused in the context window
 
     # Model-specific context sizes
     MODEL_CONTEXT_SIZES = {
@@ -182,6 +205,8 @@ class LocalModelClient:
         ram_reserved_os_mb: Optional[int] = None,
         gpu_offload_layers: Optional[int] = None,
         gpu_backend: str = "auto",
+        parallel_sequences: int = 1,
+        server_address: Optional[str] = None,
     ):
         """
         Initialize local model client.
@@ -196,10 +221,25 @@ class LocalModelClient:
             ram_reserved_os_mb: MB reserved for OS (if set, n_ctx is computed from remaining RAM)
             gpu_offload_layers: Explicit layer count for GPU offload (overrides n_gpu_layers)
             gpu_backend: Backend preference ("auto", "sycl", "ipex", "vulkan", "opencl", "cpu")
+            parallel_sequences: Requests decoded together in one batch (1 = serial).
+                Above 1, an InferenceScheduler owns a multi-sequence context and
+                generate() may be called from several threads at once. n_ctx
+                stays the total budget and is split between the sequences
+                while the scheduler runs (see context_tokens).
+            server_address: Address of a model server (see src.model_server)
+                to send inference to instead of loading the model in this
+                process. The server's model settings replace the arguments
+                above; llama-cpp-python is not needed.
 
         Raises:
             ImportError: If llama-cpp-python is not installed
+            ModelServerError: If server_address is given and the server
+                cannot be reached
         """
+        if server_address:
+            self._init_remote(server_address, model_name, temperature)
+            return
+
         _ensure_llama()
         _ensure_ipex()
         if not LLAMA_CPP_AVAILABLE and not IPEX_LLM_AVAILABLE:
@@ -265,9 +305,44 @@ class LocalModelClient:
             self.n_ctx = n_ctx
             self.DEFAULT_CONTEXT_SIZE = n_ctx
 
+        self._init_state(parallel_sequences)
+
+        logger.info(
+            f"LocalModelClient initialized: model={model_name}, "
+            f"ctx={self.n_ctx}, threads={self.n_threads}, "
+            f"gpu_layers={self.n_gpu_layers}, backend={self.gpu_backend}"
+        )
+
+    def _init_state(self, parallel_sequences: int) -> None:
+        """Initialize model state, statistics and prompt helpers (local and remote)."""
         # Lazy loading - model loads on first use
         self._model: Optional[Llama] = None
         self._model_loaded = False
+        # Model server connection (remote mode only)
+        self._server: Optional[ModelServerClient] = None
+
+        # Stored GPU probe outcomes (see _load_model)
+        self._probe_cache = GpuProbeCache()
+        self._gpu_probe_key: Optional[str] = None
+
+        # Multi-sequence decoding (started with the model when parallel_sequences > 1)
+        self.parallel_sequences = max(1, int(parallel_sequences))
+        self._scheduler: Optional[InferenceScheduler] = None
+        # Whether n_ctx is split between decode slots (see context_tokens);
+        # settled when the model loads
+        self._context_split = self.parallel_sequences > 1
+        # Serializes direct (non-scheduler) use of the model, which is not thread-safe
+        self._inference_lock = threading.RLock()
+        # Reloads the model after a GPU crash (None = ensure_loaded() on the
+        # calling thread; a model server reloads on its main thread instead)
+        self._reload_model: Optional[Callable[[], None]] = None
+
+        # Compiled grammars for JSON-constrained generation, keyed by schema
+        self._grammar_cache: Dict[str, object] = {}
+        # Counters for JSON-constrained calls (see generate(json_schema=...))
+        self.json_stats = {"calls": 0, "valid": 0, "invalid": 0, "output_tokens": 0}
+        # Calls cut short by a stop condition (see generate(stop_condition=...))
+        self.early_stop_stats = EarlyStopStats()
 
         # Load schema for prompt construction
         self._schema_loader = SchemaLoader()
@@ -276,10 +351,40 @@ class LocalModelClient:
         # Initialize fuzzy matcher for intelligent category detection
         self._fuzzy_matcher = FuzzyClauseMatcher(confidence_threshold=65.0)
 
+    def _init_remote(self, server_address: str, model_name: str, temperature: float) -> None:
+        """
+        Initialize remote mode: inference runs in a model server process.
+
+        Args:
+            server_address: Model server address
+            model_name: Model the caller expects (a mismatch is logged)
+            temperature: Default sampling temperature sent with requests
+
+        Raises:
+            ModelServerError: If the server cannot be reached
+        """
+        server = ModelServerClient(server_address)
+        info = server.call("info")
+        if info["model_name"] != model_name:
+            logger.warning("Model server runs %s, not the configured %s",
+                           info["model_name"], model_name)
+
+        self.model_path = None
+        self.model_name = info["model_name"]
+        self.n_threads = 0
+        self.temperature = temperature
+        self.gpu_backend_preference = info["gpu_backend"]
+        self.gpu_backend = info["gpu_backend"]
+        self.n_gpu_layers = info["n_gpu_layers"]
+        self.n_ctx = info["n_ctx"]
+        self.DEFAULT_CONTEXT_SIZE = self.n_ctx
+        self._init_state(info["parallel_sequences"])
+        self._context_split = info.get("context_tokens", self.n_ctx) < self.n_ctx
+        self._server = server
+
         logger.info(
-            f"LocalModelClient initialized: model={model_name}, "
-            f"ctx={self.n_ctx}, threads={self.n_threads}, "
-            f"gpu_layers={self.n_gpu_layers}, backend={self.gpu_backend}"
+            f"LocalModelClient connected to model server at {server_address}: "
+            f"model={self.model_name}, ctx={self.n_ctx}, pid={info['pid']}"
         )
 
     # =========================================================================
@@ -291,6 +396,34 @@ class LocalModelClient:
         """Model name for interface compatibility with OpenAIClient."""
         return self.model_name
 
+    @property
+    def context_tokens(self) -> int:
+        """
+        Context window available to one request.
+
+        n_ctx is sized from the RAM budget for a single context. With
+        parallel decoding that budget is split evenly between the model's
+        own context and one KV cache slot per sequence, so every prompt
+        must fit a share of it. If the batch scheduler cannot start, the
+        model is reloaded with the whole budget (see _load_model).
+        """
+        if getattr(self, '_context_split', False):
+            return self.n_ctx // (self.parallel_sequences + 1)
+        return self.n_ctx
+
+    @property
+    def is_parallel(self) -> bool:
+        """
+        True if concurrent calls are decoded together.
+
+        Locally this needs the batch scheduler, which starts with the model
+        and can fall back to serial decoding. A model server queues
+        concurrent requests itself.
+        """
+        if getattr(self, '_server', None) is not None:
+            return self.parallel_sequences > 1
+        return getattr(self, '_scheduler', None) is not None
+
     # =========================================================================
     # Public Interface (matches OpenAIClient)
     # =========================================================================
@@ -311,7 +444,9 @@ class LocalModelClient:
         system_message: str,
         user_message: str,
         progress_callback: Optional[Callable[[str, int], None]] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict] = None,
+        stop_condition: Optional[Callable[[str], bool]] = None
     ) -> str:
         """
         Generate a text response from the local model.
@@ -320,11 +455,19 @@ class LocalModelClient:
         system + user messages and receive raw text back. JSON parsing
         is the caller's responsibility.
 
+        With json_schema, sampling is constrained by a grammar built from
+        the schema: the response is always a JSON object matching it (unless
+        cut off by max_tokens), and generation stops once the object closes.
+
         Args:
             system_message: System/instruction message for the model
             user_message: User input/prompt
             progress_callback: Optional callback for progress updates
             max_tokens: Optional max output tokens (default: MAX_TOKENS_ANALYSIS)
+            json_schema: Optional JSON schema the response must match
+            stop_condition: Optional predicate on the text generated so far,
+                checked during the first STOP_CHECK_TOKENS tokens; generation
+                is cancelled as soon as it returns True
 
         Returns:
             Raw text response from the model
@@ -343,7 +486,9 @@ class LocalModelClient:
             max_tokens=max_tokens or self.MAX_TOKENS_ANALYSIS,
             progress_callback=progress_callback,
             progress_start=55,
-            progress_end=85
+            progress_end=85,
+            json_schema=json_schema,
+            stop_condition=stop_condition
         )
 
     def analyze_contract(
@@ -454,6 +599,29 @@ class LocalModelClient:
 
         return response_text.strip()
 
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens text occupies in the model's context.
+
+        Uses the model's tokenizer when the model is loaded, otherwise a
+        conservative estimate of 3 characters per token. In remote mode the
+        model server counts.
+
+        Args:
+            text: Text to measure (chat template markers count as special tokens)
+
+        Returns:
+            Token count
+        """
+        if getattr(self, '_server', None) is not None:
+            return self._server.call("count_tokens", text=text)
+        if self._model_loaded and self._model is not None:
+            try:
+                return len(self._model.tokenize(text.encode("utf-8"), add_bos=False, special=True))
+            except Exception as e:
+                logger.debug(f"Tokenizer unavailable, estimating token count: {e}")
+        return len(text) // 3 + 1
+
     def validate_api_key(self) -> bool:
         """
         Validate model availability (no API key needed for local models).
@@ -461,6 +629,14 @@ class LocalModelClient:
         Returns:
             True if model file exists and can be loaded, False otherwise
         """
+        if getattr(self, '_server', None) is not None:
+            try:
+                self._load_model()
+                return True
+            except Exception as e:
+                logger.error(f"Model server validation failed: {e}")
+                return False
+
         if not self.model_path or not self.model_path.exists():
             logger.warning(f"Model file not found: {self.model_path}")
             return False
@@ -538,6 +714,29 @@ class LocalModelClient:
             logger.warning("GPU probe subprocess error: %s", e)
             return False
 
+    def _lookup_gpu_probe(self) -> Tuple[Optional[str], ProbeEntry]:
+        """
+        Look up the stored GPU probe outcome for this model and backend.
+
+        Returns:
+            (cache key, entry); the key is None if the model file cannot be read
+        """
+        try:
+            key = self._probe_cache.make_key(self.model_path, self.gpu_backend)
+        except OSError as e:
+            logger.debug(f"GPU probe cache unavailable: {e}")
+            return None, ProbeEntry()
+        return key, self._probe_cache.lookup(key)
+
+    def _record_gpu_probe(self, passed: bool, reason: str = "") -> None:
+        """Store the outcome of a GPU load for later launches."""
+        if getattr(self, '_gpu_probe_key', None) is None:
+            return
+        self._probe_cache.record(
+            self._gpu_probe_key,
+            ProbeResult(backend=self.gpu_backend, gpu_layers=self.n_gpu_layers, passed=passed, reason=reason),
+        )
+
     def _load_model(
         self,
         progress_callback: Optional[Callable[[str, int], None]] = None
@@ -554,6 +753,15 @@ class LocalModelClient:
         if self._model_loaded:
             return
 
+        if getattr(self, '_server', None) is not None:
+            # Remote mode: have the server load the model (it may be idle-unloaded later
+            # and is reloaded on demand)
+            if progress_callback:
+                progress_callback("Waiting for the model server to load the model...", 5)
+            self._server.call("load")
+            self._model_loaded = True
+            return
+
         if not self.model_path or not self.model_path.exists():
             raise RuntimeError(
                 f"Model file not found: {self.model_path}\n\n"
@@ -566,14 +774,27 @@ class LocalModelClient:
 
         # Determine load order: try GPU first (if configured), then CPU fallback.
         # In frozen builds, Vulkan GPU can cause access violations that kill
-        # the process (uncatchable). Probe in a subprocess first.
+        # the process (uncatchable). Probe in a subprocess first. Probe
+        # outcomes are stored per model, driver and backend, so later launches
+        # skip the probe and the GPU inference test (see GpuProbeCache).
         load_attempts = []
+        verify_gpu = True
         if self.n_gpu_layers != 0:
-            if getattr(sys, 'frozen', False):
+            self._gpu_probe_key, probe = self._lookup_gpu_probe()
+            if probe.result is not None and probe.result.passed:
+                logger.info("GPU probe passed on %s (%s backend); skipping GPU checks",
+                            probe.result.probed_at, probe.result.backend)
+                load_attempts.append(("gpu", self.n_gpu_layers))
+                verify_gpu = False
+            elif probe.result is not None:
+                logger.warning("GPU probe failed on %s (%s), using CPU-only",
+                               probe.result.probed_at, probe.result.reason)
+            elif getattr(sys, 'frozen', False) or probe.crashes:
                 if self._probe_gpu_in_subprocess():
                     load_attempts.append(("gpu", self.n_gpu_layers))
                 else:
                     logger.warning("GPU probe failed in subprocess, using CPU-only")
+                    self._record_gpu_probe(False, "subprocess probe failed")
             else:
                 load_attempts.append(("gpu", self.n_gpu_layers))
         load_attempts.append(("cpu", 0))
@@ -598,20 +819,29 @@ class LocalModelClient:
                 else:
                     _Constructor = Llama
 
-                self._model = _Constructor(
-                    model_path=str(self.model_path),
-                    n_ctx=self.n_ctx,
-                    n_threads=self.n_threads,
-                    n_gpu_layers=gpu_layers,
-                    n_batch=n_batch,
-                    verbose=False
-                )
+                if gpu_layers != 0 and self._gpu_probe_key is not None:
+                    # Cleared by _record_gpu_probe(); left behind if the load kills the process
+                    self._probe_cache.mark_loading(self._gpu_probe_key)
+
+                def build_model():
+                    return _Constructor(
+                        model_path=str(self.model_path),
+                        n_ctx=self.context_tokens,
+                        n_threads=self.n_threads,
+                        n_gpu_layers=gpu_layers,
+                        n_batch=n_batch,
+                        verbose=False
+                    )
+
+                # The batch scheduler needs llama-cpp-python's Llama
+                self._context_split = self.parallel_sequences > 1 and _Constructor is Llama
+                self._model = build_model()
 
                 self._model_loaded = True
 
                 # Verify GPU inference with a large prompt (Intel iGPU Vulkan
                 # can pass small tests but crash on real-sized prompts)
-                if gpu_layers != 0:
+                if gpu_layers != 0 and verify_gpu:
                     try:
                         logger.info("Testing GPU inference with large prompt...")
                         test_prompt = ("The contractor shall provide labor and materials " * 50)[:3000]
@@ -629,6 +859,7 @@ class LocalModelClient:
                         raise RuntimeError(f"GPU inference failed: {gpu_err}")
 
                 if gpu_layers != 0:
+                    self._record_gpu_probe(True)
                     self.gpu_backend = self.gpu_backend or "gpu"
                     logger.info("Model loaded successfully (GPU-accelerated, %s)", self.gpu_backend)
                 else:
@@ -640,6 +871,16 @@ class LocalModelClient:
                     else:
                         logger.info("Model loaded successfully (CPU-only)")
 
+                if self._context_split and not self._start_scheduler(n_batch):
+                    # Decoding serially: give the model the whole context back
+                    logger.info("Reloading the model with the full %d-token context", self.n_ctx)
+                    self._context_split = False
+                    model, self._model = self._model, None
+                    if hasattr(model, 'close'):
+                        model.close()
+                    del model
+                    self._model = build_model()
+
                 if progress_callback:
                     status = f"Model loaded ({self.gpu_backend} GPU)" if gpu_layers != 0 else "Model loaded (CPU)"
                     progress_callback(status, 10)
@@ -649,6 +890,8 @@ class LocalModelClient:
                 last_error = e
                 logger.warning("Model load attempt (%s, gpu_layers=%s) failed: %s",
                                attempt_name, gpu_layers, e)
+                if gpu_layers != 0:
+                    self._record_gpu_probe(False, str(e)[:200])
                 continue
 
         logger.error(f"All model load attempts failed. Last error: {last_error}", exc_info=True)
@@ -714,7 +957,9 @@ class LocalModelClient:
         progress_callback: Optional[Callable[[str, int], None]] = None,
         token_callback: Optional[Callable[[str], None]] = None,
         progress_start: int = 0,
-        progress_end: int = 100
+        progress_end: int = 100,
+        json_schema: Optional[Dict] = None,
+        stop_condition: Optional[Callable[[str], bool]] = None
     ) -> str:
         """
         Run model inference with progress tracking.
@@ -727,6 +972,8 @@ class LocalModelClient:
             progress_callback: Optional progress callback
             progress_start: Starting progress percentage
             progress_end: Ending progress percentage
+            json_schema: Optional JSON schema constraining the output
+            stop_condition: Optional predicate that cancels generation early
 
         Returns:
             Generated text response
@@ -737,6 +984,23 @@ class LocalModelClient:
         if not self._model_loaded:
             raise RuntimeError("Model not loaded")
 
+        if getattr(self, '_server', None) is not None:
+            # Remote mode: the server runs this method on its own client.
+            # stop_condition must be picklable (a module-level function).
+            if progress_callback:
+                progress_callback("Generating on the model server...", progress_start)
+            return self._server.call(
+                "infer", token_callback=token_callback,
+                system_message=system_message, user_message=user_message,
+                max_tokens=max_tokens, temperature=temperature,
+                json_schema=json_schema, stop_condition=stop_condition,
+            )
+
+        sampling_kwargs = {}
+        grammar = self._get_grammar(json_schema) if json_schema else None
+        if grammar is not None:
+            sampling_kwargs["grammar"] = grammar
+
         temp = temperature if temperature is not None else self.temperature
 
         # Format prompt with appropriate template
@@ -746,45 +1010,54 @@ class LocalModelClient:
         prompt_chars = len(prompt)
         logger.info(f"Running inference: max_tokens={max_tokens}, temp={temp}, prompt_chars={prompt_chars}")
 
-        # Hard-truncate prompt if it would exceed context window
-        estimated_prompt_tokens = prompt_chars // 3  # Conservative estimate
-        safe_prompt_tokens = self.n_ctx - max_tokens - 256  # 256 token safety buffer
-        if estimated_prompt_tokens > safe_prompt_tokens and safe_prompt_tokens > 0:
-            safe_chars = safe_prompt_tokens * 3
-            logger.warning(
-                f"Prompt exceeds context window: ~{estimated_prompt_tokens} tokens "
-                f"+ {max_tokens} output > {self.n_ctx} context. "
-                f"Truncating prompt from {prompt_chars} to {safe_chars} chars."
-            )
-            # Truncate the user_message portion, preserving system message framing
-            prompt = prompt[:safe_chars]
+        prompt, max_tokens = self._fit_context(prompt, max_tokens)
 
+        if getattr(self, '_scheduler', None) is not None:
+            if progress_callback:
+                progress_callback("Waiting for a decode slot...", progress_start)
+            return self._submit_prompt(
+                prompt, max_tokens, temp, json_schema, stop_condition, token_callback
+            ).result()
+
+        self._inference_lock.acquire()
         try:
             import time
             output_tokens = []
             tokens_generated = 0
             start_time = time.time()
+            first_token_time = None
+            stopped_early = False
 
             if progress_callback:
                 progress_callback("Processing prompt (this may take a moment)...", progress_start)
 
-            for token_output in self._model(
+            stream = self._model(
                 prompt,
                 max_tokens=max_tokens,
                 temperature=temp,
                 stop=stop_sequences,
-                stream=True
-            ):
+                stream=True,
+                **sampling_kwargs
+            )
+            for token_output in stream:
                 if isinstance(token_output, dict):
                     choice = token_output.get('choices', [{}])[0]
                     text = choice.get('text', '')
                     output_tokens.append(text)
                     tokens_generated += 1
+                    if first_token_time is None:
+                        first_token_time = time.time()
 
                     # Stream token to UI
                     if token_callback and text:
                         token_callback(text)
 
+                    # Cancel as soon as the answer is decided (e.g. NOT FOUND)
+                    if (stop_condition and tokens_generated <= STOP_CHECK_TOKENS
+                            and stop_condition(''.join(output_tokens))):
+                        stopped_early = True
+                        break
+
                     # Update progress every 10 tokens (frequent updates for responsiveness)
                     if progress_callback and tokens_generated % 10 == 0:
                         elapsed = time.time() - start_time
@@ -798,14 +1071,29 @@ class LocalModelClient:
                             progress_pct
                         )
 
+            if stopped_early and hasattr(stream, 'close'):
+                stream.close()
+
             response_text = ''.join(output_tokens)
             elapsed = time.time() - start_time
 
+            if stopped_early:
+                self.early_stop_stats.record_aborted(
+                    tokens_generated, max_tokens, time.time() - first_token_time
+                )
+                logger.info(f"Generation stopped early after {tokens_generated} tokens")
+            elif stop_condition:
+                self.early_stop_stats.record_completed(tokens_generated)
+
             logger.info(
                 f"Inference complete: {tokens_generated} tokens in {elapsed:.1f}s "
                 f"({tokens_generated / max(elapsed, 0.1):.1f} tok/s)"
+                f"{' [json-constrained]' if grammar is not None else ''}"
             )
 
+            if grammar is not None:
+                self._record_json_call(response_text, tokens_generated)
+
             return response_text
 
         except OSError as e:
@@ -813,18 +1101,21 @@ class LocalModelClient:
             if self.n_gpu_layers != 0 and not getattr(self, '_gpu_fallback_attempted', False):
                 self._gpu_fallback_attempted = True
                 logger.warning("GPU inference crashed (%s), reloading model on CPU...", e)
+                self._record_gpu_probe(False, f"inference crashed: {e}"[:200])
                 try:
+                    self._stop_scheduler()
                     del self._model
                     self._model = None
                     self._model_loaded = False
                     self.n_gpu_layers = 0
                     self.gpu_backend = "cpu"
-                    self.ensure_loaded()
+                    (getattr(self, '_reload_model', None) or self.ensure_loaded)()
                     logger.info("Model reloaded on CPU, retrying inference")
                     return self._run_inference(
                         system_message, user_message, max_tokens,
                         temperature, progress_callback, token_callback,
-                        progress_start, progress_end,
+                        progress_start, progress_end, json_schema,
+                        stop_condition,
                     )
                 except Exception as reload_err:
                     logger.error("CPU fallback failed: %s", reload_err)
@@ -834,6 +1125,230 @@ class LocalModelClient:
         except Exception as e:
             logger.error(f"Inference failed: {e}", exc_info=True)
             raise RuntimeError(f"Local model inference failed: {e}")
+        finally:
+            self._inference_lock.release()
+
+    def submit(
+        self,
+        system_message: str,
+        user_message: str,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict] = None,
+        stop_condition: Optional[Callable[[str], bool]] = None
+    ) -> Future:
+        """
+        Start generating a response without waiting for it.
+
+        With parallel decoding enabled, requests submitted together are
+        decoded in the same batches. Otherwise the request runs right away
+        on the calling thread and the returned future is already done.
+
+        Args:
+            system_message: System/instruction message for the model
+            user_message: User input/prompt
+            max_tokens: Optional max output tokens (default: MAX_TOKENS_ANALYSIS)
+            json_schema: Optional JSON schema the response must match
+            stop_condition: Optional predicate that cancels generation early
+
+        Returns:
+            Future resolving to the raw text response
+        """
+        if not self._model_loaded:
+            self._load_model()
+
+        if self._scheduler is None:
+            future = Future()
+            try:
+                future.set_result(self.generate(
+                    system_message, user_message, max_tokens=max_tokens,
+                    json_schema=json_schema, stop_condition=stop_condition
+                ))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        prompt, max_tokens = self._fit_context(
+            self._format_prompt(system_message, user_message),
+            max_tokens or self.MAX_TOKENS_ANALYSIS
+        )
+        return self._submit_prompt(
+            prompt, max_tokens, self.temperature, json_schema, stop_condition, None
+        )
+
+    def _fit_context(self, prompt: str, max_tokens: int) -> Tuple[str, int]:
+        """
+        Fit a formatted prompt and its output budget into one request's context.
+
+        max_tokens is capped at half the context so a prompt always fits,
+        then the prompt is hard-truncated to the remaining room.
+
+        Args:
+            prompt: Formatted prompt (chat template applied)
+            max_tokens: Requested output tokens
+
+        Returns:
+            Tuple of (prompt, max_tokens) that fit context_tokens
+        """
+        context_tokens = self.context_tokens
+        if max_tokens > context_tokens // 2:
+            logger.info(f"Limiting max_tokens from {max_tokens} to {context_tokens // 2} "
+                        f"for a {context_tokens}-token context")
+            max_tokens = context_tokens // 2
+
+        estimated_prompt_tokens = self.count_tokens(prompt)
+        safety_tokens = min(self.CONTEXT_SAFETY_TOKENS, context_tokens // 8)
+        safe_prompt_tokens = context_tokens - max_tokens - safety_tokens
+        if estimated_prompt_tokens > safe_prompt_tokens:
+            prompt_chars = len(prompt)
+            safe_chars = int(prompt_chars * safe_prompt_tokens / estimated_prompt_tokens)
+            logger.warning(
+                f"Prompt exceeds context window: ~{estimated_prompt_tokens} tokens "
+                f"+ {max_tokens} output > {context_tokens} context. "
+                f"Truncating prompt from {prompt_chars} to {safe_chars} chars."
+            )
+            # Truncate the user_message portion, preserving system message framing
+            prompt = prompt[:safe_chars]
+        return prompt, max_tokens
+
+    def _submit_prompt(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict],
+        stop_condition: Optional[Callable[[str], bool]],
+        token_callback: Optional[Callable[[str], None]]
+    ) -> Future:
+        """Queue a formatted prompt on the scheduler; the future resolves to text."""
+        grammar = None
+        if json_schema:
+            try:
+                grammar = schema_to_gbnf(json_schema)
+            except Exception as e:
+                logger.warning("JSON grammar unavailable, generating unconstrained: %s", e)
+
+        inner = self._scheduler.submit(SequenceRequest(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=self._get_stop_sequences(),
+            grammar=grammar,
+            stop_condition=stop_condition,
+            token_callback=token_callback,
+        ))
+        outer: Future = Future()
+
+        def done(future: Future) -> None:
+            try:
+                result: SequenceResult = future.result()
+            except Exception as e:
+                logger.error(f"Inference failed: {e}")
+                outer.set_exception(RuntimeError(f"Local model inference failed: {e}"))
+                return
+            if result.finish_reason == "stop_condition":
+                self.early_stop_stats.record_aborted(result.tokens_generated, max_tokens, result.decode_seconds)
+            elif stop_condition:
+                self.early_stop_stats.record_completed(result.tokens_generated)
+            if grammar is not None:
+                self._record_json_call(result.text, result.tokens_generated)
+            logger.info(
+                f"Inference complete: {result.tokens_generated} tokens "
+                f"({result.finish_reason}, {result.prompt_tokens} prompt tokens, batched)"
+            )
+            outer.set_result(result.text)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def _start_scheduler(self, n_batch: int) -> bool:
+        """
+        Start multi-sequence decoding on the loaded model, if enabled.
+
+        Returns:
+            True if the scheduler is running
+        """
+        if self.parallel_sequences <= 1:
+            return False
+        if self._scheduler is not None:
+            return True
+        if Llama is None or not isinstance(self._model, Llama):
+            logger.info("Parallel decoding needs llama-cpp-python's Llama; decoding serially")
+            return False
+        try:
+            backend = LlamaBatchBackend(
+                self._model, n_slots=self.parallel_sequences, slot_context=self.context_tokens,
+                n_threads=self.n_threads, n_batch=n_batch,
+            )
+        except InferenceSchedulerError as e:
+            logger.warning("Parallel decoding unavailable, decoding serially: %s", e)
+            return False
+        self._scheduler = InferenceScheduler(backend)
+        logger.info("Parallel decoding enabled: %d sequences x %d tokens",
+                    self.parallel_sequences, self.context_tokens)
+        return True
+
+    def _stop_scheduler(self) -> None:
+        """Shut down multi-sequence decoding (before the model is released)."""
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+            self._scheduler = None
+
+    def unload(self) -> None:
+        """
+        Release the model's memory. The next call loads it again.
+
+        In remote mode, only closes this client's server connections; the
+        server unloads its model when idle.
+        """
+        if getattr(self, '_server', None) is not None:
+            self._server.close()
+            self._model_loaded = False
+            return
+        if not self._model_loaded:
+            return
+        self._stop_scheduler()
+        model, self._model = self._model, None
+        self._model_loaded = False
+        if model is not None and hasattr(model, 'close'):
+            model.close()
+        del model
+        gc.collect()
+        logger.info("Model unloaded: %s", self.model_name)
+
+    def _get_grammar(self, json_schema: Dict):
+        """
+        Get the compiled llama.cpp grammar for a JSON schema.
+
+        Grammars are compiled once per distinct schema. If the schema cannot
+        be converted or the backend has no grammar support, None is cached
+        and the call runs unconstrained (callers still parse leniently).
+
+        Args:
+            json_schema: JSON schema dict
+
+        Returns:
+            LlamaGrammar instance, or None
+        """
+        key = json.dumps(json_schema, sort_keys=True)
+        if key not in self._grammar_cache:
+            try:
+                from llama_cpp import LlamaGrammar
+                self._grammar_cache[key] = LlamaGrammar.from_string(
+                    schema_to_gbnf(json_schema), verbose=False
+                )
+            except Exception as e:
+                logger.warning("JSON grammar unavailable, generating unconstrained: %s", e)
+                self._grammar_cache[key] = None
+        return self._grammar_cache[key]
+
+    def _record_json_call(self, response_text: str, tokens_generated: int) -> None:
+        """Count a JSON-constrained call and whether it parsed without repair."""
+        valid = is_valid_json_object(response_text)
+        self.json_stats["calls"] += 1
+        self.json_stats["valid" if valid else "invalid"] += 1
+        self.json_stats["output_tokens"] += tokens_generated
+        if not valid:
+            logger.warning("JSON-constrained output did not parse (likely truncated at max_tokens)")
 
     def _parse_json_response(self, response_text: str) -> Dict:
         """
@@ -0,0 +1,495 @@
+"""
+Local Model Server Module
+
+Keeps one local GGUF model resident in a separate process and serves it to
+every CR2A process on the machine: the GUI, CLI analyses and batch jobs
+share one copy of the weights instead of each loading its own, and
+rebuilding an engine after a settings change no longer reloads the model.
+
+Clients use LocalModelClient(server_address=...), which keeps the
+generate() / process_with_tools() interface and sends each inference call
+to the server. The server queues requests and runs as many at once as the
+model decodes together (local_parallel_sequences). It loads the model on
+the first request and unloads it after idle_unload_seconds without
+requests; the next request loads it again.
+
+Transport is multiprocessing.connection over a localhost TCP port, a named
+pipe (\\\\.\\pipe\\name on Windows) or a Unix socket path. Messages are
+pickled dicts, so connections are authenticated with a random key stored
+next to the config file and readable only by the current user.
+
+Start a server with:
+    python src/cli_main.py serve [--address 127.0.0.1:47811] [--idle-unload 600]
+"""
+
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ADDRESS = "127.0.0.1:47811"
+DEFAULT_IDLE_UNLOAD_SECONDS = 600
+
+# How often the server's main loop checks for an idle model
+_IDLE_CHECK_SECONDS = 1.0
+
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Keyword arguments of LocalModelClient._run_inference() a client may send
+_INFERENCE_ARGS = (
+    "system_message", "user_message", "max_tokens", "temperature", "json_schema", "stop_condition"
+)
+
+
+class ModelServerError(Exception):
+    """Exception raised when the model server cannot be started or reached."""
+    pass
+
+
+def parse_address(address: str) -> Union[tuple, str]:
+    """
+    Convert an address string to a multiprocessing.connection address.
+
+    Args:
+        address: 'host:port' (loopback only), a named pipe
+            (\\\\.\\pipe\\name) or a Unix socket path
+
+    Returns:
+        (host, port) tuple or the pipe/socket path
+
+    Raises:
+        ModelServerError: If a TCP address is not on the loopback interface
+    """
+    if address.startswith("\\\\.\\pipe\\"):
+        return address
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        host = host.strip("[]") or "127.0.0.1"
+        if host not in _LOOPBACK_HOSTS:
+            raise ModelServerError(f"Model server must listen on localhost, not {host}")
+        return host, int(port)
+    return address
+
+
+def default_key_path() -> Path:
+    """Path of the shared authentication key (%APPDATA%/CR2A/model_server.key)."""
+    appdata = os.environ.get('APPDATA', os.path.expanduser('~'))
+    return Path(appdata) / 'CR2A' / 'model_server.key'
+
+
+def load_auth_key(path: Optional[Path] = None, create: bool = False) -> bytes:
+    """
+    Read the server's authentication key, optionally creating it.
+
+    Args:
+        path: Key file (default: default_key_path())
+        create: Generate and store a new key if none exists
+
+    Returns:
+        Key bytes
+
+    Raises:
+        ModelServerError: If no key exists and create is False
+    """
+    path = Path(path) if path else default_key_path()
+    if path.exists():
+        return bytes.fromhex(path.read_text(encoding='utf-8').strip())
+    if not create:
+        raise ModelServerError(
+            f"No model server key at {path}. Start the server first:\n"
+            "  python src/cli_main.py serve"
+        )
+    key = secrets.token_bytes(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(key.hex())
+    return key
+
+
+class ModelServer:
+    """
+    Serves one local model to clients in other processes.
+
+    The model is loaded and unloaded only on the thread running
+    serve_forever() (llama_cpp's Llama() constructor is not safe to call
+    from secondary threads on Windows). Each connection gets a handler
+    thread; inference requests go through a queue served by
+    client.parallel_sequences worker threads. Unless the client decodes in
+    parallel (client.is_parallel), they reach the model one at a time.
+
+    Args:
+        client: LocalModelClient that owns the model (not yet loaded)
+        address: Address to listen on (see parse_address())
+        authkey: Key clients must present (default: load_auth_key(create=True))
+        idle_unload_seconds: Unload the model after this long without
+            requests (0 = never)
+    """
+
+    def __init__(
+        self,
+        client,
+        address: str = DEFAULT_ADDRESS,
+        authkey: Optional[bytes] = None,
+        idle_unload_seconds: float = DEFAULT_IDLE_UNLOAD_SECONDS,
+    ):
+        self.client = client
+        self.address = address
+        self.idle_unload_seconds = idle_unload_seconds
+        self._authkey = authkey if authkey is not None else load_auth_key(create=True)
+
+        self._listener: Optional[Listener] = None
+        self._workers = ThreadPoolExecutor(
+            max_workers=max(1, getattr(client, 'parallel_sequences', 1)),
+            thread_name_prefix="model-server",
+        )
+        # Model load/unload tasks for the serve_forever() thread
+        self._lifecycle: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        # Held around inference when the client cannot decode in parallel
+        self._serial = threading.Lock()
+        self._active = 0
+        self._last_used = time.monotonic()
+        self._stopped = threading.Event()
+        # A reload after a GPU crash must also run on the main thread
+        client._reload_model = lambda: self._run_on_main(self._load)
+
+        # Counters reported by the 'info' request
+        self.requests_served = 0
+        self.loads = 0
+        self.unloads = 0
+
+    def start(self) -> None:
+        """
+        Bind the address and start accepting connections.
+
+        Raises:
+            ModelServerError: If the address is in use or invalid
+        """
+        try:
+            self._listener = Listener(parse_address(self.address), authkey=self._authkey)
+        except OSError as e:
+            raise ModelServerError(f"Cannot listen on {self.address}: {e}")
+        # Report the bound port when asked for port 0
+        if isinstance(self._listener.address, tuple):
+            host, port = self._listener.address[:2]
+            self.address = f"{host}:{port}"
+        threading.Thread(target=self._accept_loop, name="model-server-accept", daemon=True).start()
+        logger.info("Model server listening on %s (model=%s, idle unload=%ss)",
+                    self.address, self.client.model_name, self.idle_unload_seconds or "never")
+
+    def serve_forever(self) -> None:
+        """Run model load/unload tasks and idle checks until stop() is called."""
+        if self._listener is None:
+            self.start()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    task, future = self._lifecycle.get(timeout=_IDLE_CHECK_SECONDS)
+                except queue.Empty:
+                    self._unload_if_idle()
+                    continue
+                try:
+                    future.set_result(task())
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        """Ask serve_forever() to return; the model is unloaded on the way out."""
+        self._stopped.set()
+
+    def info(self) -> Dict:
+        """Model settings and server state sent to clients."""
+        return {
+            "model_name": self.client.model_name,
+            "n_ctx": self.client.n_ctx,
+            "context_tokens": getattr(self.client, 'context_tokens', self.client.n_ctx),
+            "n_gpu_layers": getattr(self.client, 'n_gpu_layers', 0),
+            "gpu_backend": getattr(self.client, 'gpu_backend', "cpu"),
+            "parallel_sequences": getattr(self.client, 'parallel_sequences', 1),
+            "loaded": bool(self.client._model_loaded),
+            "pid": os.getpid(),
+            "requests_served": self.requests_served,
+            "loads": self.loads,
+            "unloads": self.unloads,
+        }
+
+    # -------------------------------------------------------------------------
+    # Connections
+    # -------------------------------------------------------------------------
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                logger.warning("Model server rejected a connection with a wrong key")
+                continue
+            except OSError:
+                if self._stopped.is_set():
+                    return
+                logger.warning("Model server accept failed", exc_info=True)
+                continue
+            if self._stopped.is_set():
+                conn.close()
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn) -> None:
+        """Serve one client connection until it closes."""
+        try:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = {"ok": True, "result": self._dispatch(conn, message)}
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e)}
+                conn.send(reply)
+        except OSError as e:
+            logger.debug(f"Model server connection closed: {e}")
+        finally:
+            conn.close()
+
+    def _dispatch(self, conn, message: Dict):
+        op = message.get("op")
+        args = message.get("args") or {}
+        if op == "info":
+            return self.info()
+        if op == "count_tokens":
+            return self.client.count_tokens(args["text"])
+        if op == "load":
+            self._acquire()
+            self._release()
+            return self.info()
+        if op == "infer":
+            unknown = set(args) - set(_INFERENCE_ARGS)
+            if unknown:
+                raise ValueError(f"Unsupported inference arguments: {sorted(unknown)}")
+            token_callback = (lambda text: conn.send({"token": text})) if message.get("stream") else None
+            return self._workers.submit(self._infer, args, token_callback).result()
+        if op == "unload":
+            return self._run_on_main(self._unload)
+        if op == "shutdown":
+            self.stop()
+            return None
+        raise ValueError(f"Unknown model server request: {op!r}")
+
+    # -------------------------------------------------------------------------
+    # Model lifecycle
+    # -------------------------------------------------------------------------
+
+    def _infer(self, args: Dict, token_callback: Optional[Callable[[str], None]]) -> str:
+        self._acquire()
+        try:
+            # _run_inference is the client's single inference path; the
+            # public methods only add prompt building and lazy loading
+            if getattr(self.client, 'is_parallel', False) is True:
+                return self.client._run_inference(token_callback=token_callback, **args)
+            with self._serial:
+                return self.client._run_inference(token_callback=token_callback, **args)
+        finally:
+            self._release(served=True)
+
+    def _acquire(self) -> None:
+        """Mark a request active, loading the model first if needed."""
+        with self._lock:
+            if self._stopped.is_set():
+                raise ModelServerError("Model server is shutting down")
+            self._active += 1
+            loaded = self.client._model_loaded
+        if loaded:
+            return
+        try:
+            self._run_on_main(self._load)
+        except Exception:
+            self._release()
+            raise
+
+    def _release(self, served: bool = False) -> None:
+        with self._lock:
+            self._active -= 1
+            self._last_used = time.monotonic()
+            if served:
+                self.requests_served += 1
+
+    def _run_on_main(self, task: Callable):
+        if self._stopped.is_set():
+            raise ModelServerError("Model server is shutting down")
+        future = Future()
+        self._lifecycle.put((task, future))
+        return future.result()
+
+    def _load(self) -> None:
+        if self.client._model_loaded:
+            return
+        started = time.monotonic()
+        self.client.ensure_loaded()
+        self.loads += 1
+        logger.info("Model loaded in %.1fs", time.monotonic() - started)
+
+    def _unload(self) -> None:
+        with self._lock:
+            if self._active or not self.client._model_loaded:
+                return
+            self.client.unload()
+            self.unloads += 1
+        logger.info("Model unloaded")
+
+    def _unload_if_idle(self) -> None:
+        if not self.idle_unload_seconds:
+            return
+        with self._lock:
+            idle = time.monotonic() - self._last_used
+            if self._active or not self.client._model_loaded or idle < self.idle_unload_seconds:
+                return
+        logger.info("Model idle for %.0fs, unloading", idle)
+        self._unload()
+
+    def _shutdown(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            # Wake the accept thread so it sees the stop flag
+            try:
+                Client(listener.address, authkey=self._authkey).close()
+            except (OSError, AuthenticationError):
+                pass
+            listener.close()
+        self._workers.shutdown(wait=False, cancel_futures=True)
+        # Let running requests finish; fail those waiting for a model load
+        while True:
+            while not self._lifecycle.empty():
+                _, future = self._lifecycle.get_nowait()
+                future.set_exception(ModelServerError("Model server stopped"))
+            with self._lock:
+                if not self._active:
+                    break
+            time.sleep(0.05)
+        if self.client._model_loaded:
+            self.client.unload()
+        logger.info("Model server stopped")
+
+
+class ModelServerClient:
+    """
+    Client side of the model server protocol.
+
+    Keeps a small pool of connections so several threads can have requests
+    in flight at once (the server decodes them together when parallel
+    decoding is enabled).
+
+    Args:
+        address: Server address (see parse_address())
+        authkey: Server key (default: load_auth_key())
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self.address = address
+        self._target = parse_address(address)
+        self._authkey = authkey if authkey is not None else load_auth_key()
+        self._idle: List = []
+        self._lock = threading.Lock()
+
+    def call(self, op: str, token_callback: Optional[Callable[[str], None]] = None, **args):
+        """
+        Send one request and wait for its reply.
+
+        Args:
+            op: Request name ('info', 'load', 'infer', 'count_tokens', 'unload', 'shutdown')
+            token_callback: For 'infer', called with each generated token
+            **args: Request arguments
+
+        Returns:
+            The request's result
+
+        Raises:
+            ModelServerError: If the server cannot be reached
+            RuntimeError: If the server failed the request
+        """
+        conn = self._connect()
+        try:
+            conn.send({"op": op, "args": args, "stream": token_callback is not None})
+            reply = conn.recv()
+            while "token" in reply:
+                token_callback(reply["token"])
+                reply = conn.recv()
+        except (EOFError, OSError) as e:
+            conn.close()
+            raise ModelServerError(f"Lost connection to model server at {self.address}: {e}")
+        except BaseException:
+            conn.close()
+            raise
+        with self._lock:
+            self._idle.append(conn)
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connect(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return Client(self._target, authkey=self._authkey)
+        except AuthenticationError:
+            raise ModelServerError(f"Model server at {self.address} rejected this user's key")
+        except OSError as e:
+            raise ModelServerError(
+                f"No model server at {self.address} ({e}). Start one with:\n"
+                "  python src/cli_main.py serve"
+            )
+
+
+def create_server_client(config_manager, model_name: Optional[str] = None):
+    """
+    Build the LocalModelClient a server owns from the saved local settings.
+
+    Args:
+        config_manager: ConfigManager with local model settings
+        model_name: Model to serve (default: the configured model)
+
+    Returns:
+        LocalModelClient (model not yet loaded)
+    """
+    from src.local_model_client import LocalModelClient
+    from src.model_manager import ModelManager
+
+    model_name = model_name or config_manager.get_local_model_name()
+    gpu_mode = config_manager.get_gpu_mode()
+    gpu_offload_layers = config_manager.get_gpu_offload_layers()
+    if gpu_offload_layers is not None:
+        n_gpu_layers = None
+    else:
+        n_gpu_layers = {"cpu": 0, "gpu": -1}.get(gpu_mode)
+
+    return LocalModelClient(
+        model_path=str(config_manager.get_local_model_path() or ModelManager().get_model_path(model_name)),
+        model_name=model_name,
+        n_threads=config_manager.get_local_model_threads(),
+        n_gpu_layers=n_gpu_layers,
+        ram_reserved_os_mb=config_manager.get_ram_reserved_os_mb(),
+        gpu_offload_layers=gpu_offload_layers,
+        gpu_backend=config_manager.get_gpu_backend(),
+        parallel_sequences=config_manager.get_local_parallel_sequences(),
+    )
@@ -0,0 +1,498 @@
+"""
+Parallel Inference Module
+
+Runs several independent generation requests on one local model at the
+same time. InferenceScheduler owns the model's decoding context on a single
+worker thread (llama.cpp contexts are not thread-safe) and advances every
+active request by one token per llama_decode() call: each request is a
+separate sequence id in one shared KV cache, so one forward pass produces
+the next token for all of them. Callers on any thread submit requests and
+get concurrent.futures.Future objects back.
+
+CPU decode is memory-bound: reading the weights once per step dominates,
+so decoding 2-4 sequences per step costs little more than one and the
+aggregate tokens/sec grows with concurrency (see
+tests/benchmarks/benchmark_parallel_decode.py).
+
+The scheduler talks to the model through a SequenceBackend.
+LlamaBatchBackend implements it with llama-cpp-python's low-level batch
+API on top of an already loaded Llama instance, sharing its weights.
+"""
+
+import codecs
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.early_stop import STOP_CHECK_TOKENS
+
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceSchedulerError(Exception):
+    """Exception raised for requests the scheduler cannot run."""
+    pass
+
+
+@dataclass
+class SequenceRequest:
+    """
+    One generation request.
+
+    Attributes:
+        prompt: Fully formatted prompt (chat template applied)
+        max_tokens: Maximum tokens to generate
+        temperature: Sampling temperature (0 = greedy)
+        stop: Stop strings; generation ends before the first one
+        grammar: Optional GBNF grammar constraining the output
+        stop_condition: Optional predicate on the text so far, checked
+            during the first STOP_CHECK_TOKENS tokens
+        token_callback: Optional callback for each generated piece of text
+            (called on the scheduler thread)
+    """
+    prompt: str
+    max_tokens: int
+    temperature: float = 0.0
+    stop: Sequence[str] = ()
+    grammar: Optional[str] = None
+    stop_condition: Optional[Callable[[str], bool]] = None
+    token_callback: Optional[Callable[[str], None]] = None
+
+
+@dataclass
+class SequenceResult:
+    """
+    Outcome of a SequenceRequest.
+
+    Attributes:
+        text: Generated text (stop string excluded)
+        prompt_tokens: Tokens in the prompt
+        tokens_generated: Tokens sampled
+        finish_reason: 'stop', 'length', 'stop_condition' or 'context'
+        decode_seconds: Time from the first generated token to the last
+    """
+    text: str
+    prompt_tokens: int
+    tokens_generated: int
+    finish_reason: str
+    decode_seconds: float = 0.0
+
+
+@dataclass
+class BatchEntry:
+    """Tokens of one sequence in a decode step."""
+    slot: int
+    tokens: List[int]
+    start_pos: int
+    logits: bool  # sample a token after the last one
+
+
+class SequenceBackend(ABC):
+    """
+    Interface between InferenceScheduler and a model.
+
+    Attributes:
+        n_slots: Sequences that can be decoded together
+        slot_context: KV cache tokens available to each sequence
+        n_batch: Maximum tokens in one decode call
+    """
+    n_slots: int = 1
+    slot_context: int = 0
+    n_batch: int = 512
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[int]:
+        """Tokenize a prompt."""
+
+    @abstractmethod
+    def token_bytes(self, token: int) -> bytes:
+        """Get the UTF-8 bytes of a token."""
+
+    @abstractmethod
+    def is_end(self, token: int) -> bool:
+        """True if token ends generation."""
+
+    @abstractmethod
+    def start(self, slot: int, request: SequenceRequest) -> None:
+        """Clear the slot's KV cache and prepare sampling for a new request."""
+
+    @abstractmethod
+    def decode(self, entries: List[BatchEntry]) -> Dict[int, int]:
+        """Run one forward pass; return {slot: sampled token} for entries wanting logits."""
+
+    def release(self, slot: int) -> None:
+        """Free per-request state of a slot."""
+
+    def close(self) -> None:
+        """Free the backend's resources."""
+
+
+@dataclass
+class _Active:
+    """A request occupying a slot."""
+    slot: int
+    request: SequenceRequest
+    future: Future
+    pending: List[int]                  # prompt tokens not yet decoded
+    prompt_tokens: int
+    n_past: int = 0
+    next_token: Optional[int] = None    # sampled, not yet decoded
+    generated: int = 0
+    text: str = ""
+    first_token_time: Optional[float] = None
+    decoder: object = field(default_factory=lambda: codecs.getincrementaldecoder("utf-8")("replace"))
+
+
+class InferenceScheduler:
+    """
+    Continuous-batching scheduler over a SequenceBackend.
+
+    Requests are admitted into free slots as they arrive and leave as soon
+    as they finish, so a long answer does not hold up short ones. Each step
+    decodes one token for every generating sequence and fills the rest of
+    the batch with prompt tokens of newly admitted requests.
+
+    Args:
+        backend: Model backend; owned by the scheduler from now on
+    """
+
+    def __init__(self, backend: SequenceBackend):
+        self.backend = backend
+        self._queue: deque = deque()
+        self._active: Dict[int, _Active] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Throughput counters (read by benchmarks and logs)
+        self.steps = 0
+        self.tokens_generated = 0
+        self.sequence_steps = 0  # sum over steps of sequences generating
+
+        self._thread = threading.Thread(target=self._run, name="InferenceScheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def n_slots(self) -> int:
+        return self.backend.n_slots
+
+    def submit(self, request: SequenceRequest) -> Future:
+        """
+        Queue a request.
+
+        Args:
+            request: Request to run
+
+        Returns:
+            Future resolving to a SequenceResult
+
+        Raises:
+            InferenceSchedulerError: If the scheduler has been shut down
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise InferenceSchedulerError("Scheduler is shut down")
+            self._queue.append((request, future))
+            self._cond.notify()
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker; queued and running requests are cancelled.
+
+        Args:
+            wait: Wait for the worker thread to exit
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if wait and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while not self._closed and not self._queue and not self._active:
+                        self._cond.wait()
+                    if self._closed:
+                        break
+                    admitted = self._take_admissions()
+
+                for request, future in admitted:
+                    self._admit(request, future)
+                if self._active:
+                    self._step()
+        finally:
+            self._cancel_all()
+            self.backend.close()
+
+    def _take_admissions(self) -> list:
+        free = self.backend.n_slots - len(self._active)
+        admitted = []
+        while free > 0 and self._queue:
+            request, future = self._queue.popleft()
+            if future.set_running_or_notify_cancel():
+                admitted.append((request, future))
+                free -= 1
+        return admitted
+
+    def _admit(self, request: SequenceRequest, future: Future) -> None:
+        slot = next(i for i in range(self.backend.n_slots) if i not in self._active)
+        try:
+            tokens = self.backend.tokenize(request.prompt)
+            if not tokens:
+                raise InferenceSchedulerError("Empty prompt")
+            if len(tokens) >= self.backend.slot_context:
+                raise InferenceSchedulerError(
+                    f"Prompt of {len(tokens)} tokens does not fit the "
+                    f"{self.backend.slot_context}-token slot context"
+                )
+            self.backend.start(slot, request)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self._active[slot] = _Active(
+            slot=slot, request=request, future=future,
+            pending=tokens, prompt_tokens=len(tokens),
+        )
+
+    def _step(self) -> None:
+        # Generating sequences first (one token each), then prompt chunks
+        entries = []
+        budget = self.backend.n_batch
+        for active in self._active.values():
+            if active.next_token is not None:
+                entries.append(BatchEntry(active.slot, [active.next_token], active.n_past, True))
+                budget -= 1
+        for active in self._active.values():
+            if active.next_token is None and active.pending and budget > 0:
+                chunk = active.pending[:budget]
+                entries.append(BatchEntry(active.slot, chunk, active.n_past, len(chunk) == len(active.pending)))
+                budget -= len(chunk)
+
+        try:
+            sampled = self.backend.decode(entries)
+        except Exception as e:
+            logger.error(f"Batched decode failed: {e}")
+            for active in list(self._active.values()):
+                self._finish(active, error=e)
+            return
+
+        self.steps += 1
+        generating = sum(1 for e in entries if len(e.tokens) == 1 and e.logits)
+        self.sequence_steps += generating
+
+        for entry in entries:
+            active = self._active.get(entry.slot)
+            if active is None:
+                continue
+            active.n_past += len(entry.tokens)
+            if active.next_token is not None:
+                active.next_token = None
+            else:
+                del active.pending[:len(entry.tokens)]
+            if entry.slot in sampled:
+                self._accept(active, sampled[entry.slot])
+
+    def _accept(self, active: _Active, token: int) -> None:
+        """Handle a newly sampled token for a sequence."""
+        request = active.request
+        now = time.perf_counter()
+        if active.first_token_time is None:
+            active.first_token_time = now
+
+        if self.backend.is_end(token):
+            self._finish(active, "stop")
+            return
+
+        active.generated += 1
+        self.tokens_generated += 1
+        piece = active.decoder.decode(self.backend.token_bytes(token))
+        active.text += piece
+        if request.token_callback and piece:
+            request.token_callback(piece)
+
+        for stop in request.stop:
+            index = active.text.find(stop)
+            if index != -1:
+                active.text = active.text[:index]
+                self._finish(active, "stop")
+                return
+
+        if (request.stop_condition and active.generated <= STOP_CHECK_TOKENS
+                and request.stop_condition(active.text)):
+            self._finish(active, "stop_condition")
+        elif active.generated >= request.max_tokens:
+            self._finish(active, "length")
+        elif active.n_past + 1 >= self.backend.slot_context:
+            self._finish(active, "context")
+        else:
+            active.next_token = token
+
+    def _finish(self, active: _Active, reason: str = "", error: Optional[Exception] = None) -> None:
+        self._active.pop(active.slot, None)
+        try:
+            self.backend.release(active.slot)
+        except Exception as e:
+            logger.debug(f"Releasing slot {active.slot} failed: {e}")
+
+        if error is not None:
+            active.future.set_exception(error)
+            return
+        decode_seconds = time.perf_counter() - active.first_token_time if active.first_token_time else 0.0
+        active.future.set_result(SequenceResult(
+            text=active.text + active.decoder.decode(b"", final=True),
+            prompt_tokens=active.prompt_tokens,
+            tokens_generated=active.generated,
+            finish_reason=reason,
+            decode_seconds=decode_seconds,
+        ))
+
+    def _cancel_all(self) -> None:
+        error = InferenceSchedulerError("Scheduler shut down")
+        for active in list(self._active.values()):
+            self._finish(active, error=error)
+        with self._cond:
+            queued, self._queue = list(self._queue), deque()
+        for _, future in queued:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+
+class LlamaBatchBackend(SequenceBackend):
+    """
+    SequenceBackend over llama-cpp-python's low-level batch API.
+
+    Creates a second llama.cpp context on the weights of an already loaded
+    Llama instance, with one KV cache sequence per slot, and samples each
+    sequence with its own sampler chain (grammar, then temperature or
+    greedy).
+
+    Args:
+        llama: Loaded llama_cpp.Llama instance (used for its weights and tokenizer)
+        n_slots: Sequences decoded together
+        slot_context: KV cache tokens per sequence
+        n_threads: CPU threads for decoding
+        n_batch: Maximum tokens per decode call
+
+    Raises:
+        InferenceSchedulerError: If the installed llama-cpp-python lacks the
+            batch API or the context cannot be created
+    """
+
+    def __init__(self, llama, n_slots: int, slot_context: int, n_threads: int, n_batch: int = 512):
+        try:
+            import llama_cpp
+        except ImportError as e:
+            raise InferenceSchedulerError(f"llama-cpp-python is not available: {e}")
+
+        self._lib = llama_cpp
+        self._llama = llama
+        self.n_slots = n_slots
+        self.slot_context = slot_context
+        self.n_batch = n_batch
+
+        try:
+            self._model = llama._model.model
+            self._vocab = (
+                llama_cpp.llama_model_get_vocab(self._model)
+                if hasattr(llama_cpp, "llama_model_get_vocab") else self._model
+            )
+            params = llama_cpp.llama_context_default_params()
+            params.n_ctx = slot_context * n_slots
+            params.n_batch = n_batch
+            params.n_seq_max = n_slots
+            params.n_threads = n_threads
+            params.n_threads_batch = n_threads
+            init = getattr(llama_cpp, "llama_init_from_model", None) or llama_cpp.llama_new_context_with_model
+            self._ctx = init(self._model, params)
+            if not self._ctx:
+                raise InferenceSchedulerError("llama.cpp could not create a multi-sequence context")
+            self._batch = llama_cpp.llama_batch_init(n_batch, 0, n_slots)
+        except AttributeError as e:
+            raise InferenceSchedulerError(f"llama-cpp-python lacks the batch API: {e}")
+
+        self._samplers: Dict[int, object] = {}
+        logger.info(f"Multi-sequence context ready: {n_slots} slots x {slot_context} tokens")
+
+    def tokenize(self, text: str) -> List[int]:
+        return self._llama.tokenize(text.encode("utf-8"), add_bos=True, special=True)
+
+    def token_bytes(self, token: int) -> bytes:
+        return self._llama.detokenize([token])
+
+    def is_end(self, token: int) -> bool:
+        lib = self._lib
+        if hasattr(lib, "llama_vocab_is_eog"):
+            return bool(lib.llama_vocab_is_eog(self._vocab, token))
+        return bool(lib.llama_token_is_eog(self._model, token))
+
+    def start(self, slot: int, request: SequenceRequest) -> None:
+        lib = self._lib
+        if hasattr(lib, "llama_memory_seq_rm"):
+            lib.llama_memory_seq_rm(lib.llama_get_memory(self._ctx), slot, -1, -1)
+        else:
+            (getattr(lib, "llama_kv_self_seq_rm", None) or lib.llama_kv_cache_seq_rm)(self._ctx, slot, -1, -1)
+
+        chain = lib.llama_sampler_chain_init(lib.llama_sampler_chain_default_params())
+        if request.grammar:
+            lib.llama_sampler_chain_add(
+                chain, lib.llama_sampler_init_grammar(self._vocab, request.grammar.encode("utf-8"), b"root")
+            )
+        if request.temperature > 0:
+            lib.llama_sampler_chain_add(chain, lib.llama_sampler_init_temp(request.temperature))
+            lib.llama_sampler_chain_add(chain, lib.llama_sampler_init_dist(lib.LLAMA_DEFAULT_SEED))
+        else:
+            lib.llama_sampler_chain_add(chain, lib.llama_sampler_init_greedy())
+        self._samplers[slot] = chain
+
+    def decode(self, entries: List[BatchEntry]) -> Dict[int, int]:
+        batch = self._batch
+        n = 0
+        logits_at = {}
+        for entry in entries:
+            last = len(entry.tokens) - 1
+            for i, token in enumerate(entry.tokens):
+                batch.token[n] = token
+                batch.pos[n] = entry.start_pos + i
+                batch.n_seq_id[n] = 1
+                batch.seq_id[n][0] = entry.slot
+                batch.logits[n] = entry.logits and i == last
+                if entry.logits and i == last:
+                    logits_at[entry.slot] = n
+                n += 1
+        batch.n_tokens = n
+
+        rc = self._lib.llama_decode(self._ctx, batch)
+        if rc != 0:
+            raise InferenceSchedulerError(f"llama_decode failed with code {rc}")
+        return {
+            slot: self._lib.llama_sampler_sample(self._samplers[slot], self._ctx, index)
+            for slot, index in logits_at.items()
+        }
+
+    def release(self, slot: int) -> None:
+        chain = self._samplers.pop(slot, None)
+        if chain is not None:
+            self._lib.llama_sampler_free(chain)
+
+    def close(self) -> None:
+        for slot in list(self._samplers):
+            self.release(slot)
+        if getattr(self, "_batch", None) is not None:
+            self._lib.llama_batch_free(self._batch)
+            self._batch = None
+        if getattr(self, "_ctx", None):
+            self._lib.llama_free(self._ctx)
+            self._ctx = None
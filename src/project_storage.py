@@ -27,14 +27,14 @@ class ProjectStorage:
 
     Creates and manages a .cr2a/ subdirectory for storing:
     - versions.db: SQLite database for differential storage
-    - chat_history.json: Append-only chat log with user attribution
+    - chat_history.jsonl: Append-only chat log with user attribution
     - analyses/: Directory for analysis result JSON files
 
     Attributes:
         project_root: Path to the project folder (contains contract files)
         storage_root: Path to .cr2a/ directory
         versions_db_path: Path to versions.db file
-        chat_history_path: Path to chat_history.json file
+        chat_history_path: Path to chat_history.jsonl file
         analyses_dir: Path to analyses/ directory
     """
 
@@ -68,7 +68,7 @@ class ProjectStorage:
         # Define storage paths
         self.storage_root = self.project_root / self.STORAGE_DIR_NAME
         self.versions_db_path = self.storage_root / "versions.db"
-        self.chat_history_path = self.storage_root / "chat_history.json"
+        self.chat_history_path = self.storage_root / "chat_history.jsonl"
         self.analyses_dir = self.storage_root / "analyses"
         self.session_path = self.storage_root / "session.json"
 
@@ -82,7 +82,7 @@ class ProjectStorage:
         - .cr2a/ (hidden directory on Windows)
         - .cr2a/analyses/ (for analysis result JSON files)
 
-        The versions.db and chat_history.json files will be created
+        The versions.db and chat_history.jsonl files will be created
         by their respective managers when first used.
 
         Raises:
@@ -234,6 +234,28 @@ class ProjectStorage:
         # Sort by filename
         return sorted(files, key=lambda f: f.name.lower())
 
+    @classmethod
+    def find_version_databases(cls, root: Path | str) -> list[Path]:
+        """
+        Find the versions.db of every project under a folder.
+
+        Used to search across many past projects at once.
+
+        Args:
+            root: Folder to search; may itself be a project folder
+
+        Returns:
+            List of versions.db paths, sorted
+        """
+        root = Path(root)
+        if not root.is_dir():
+            return []
+        return sorted(
+            db_path
+            for db_path in root.rglob(f"{cls.STORAGE_DIR_NAME}/versions.db")
+            if db_path.is_file()
+        )
+
     def __repr__(self) -> str:
         """String representation for debugging."""
         return f"ProjectStorage(project_root={self.project_root})"
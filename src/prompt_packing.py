@@ -0,0 +1,242 @@
+"""
+Prompt Packing Module
+
+Groups batch-summarization items (one per category) into as few model calls
+as possible. Each call must fit the model's context window: the measured
+prompt tokens plus the output tokens reserved for the answer. Sections
+retrieved for several categories in the same call are sent once and
+referenced by the other categories, so overlapping categories pack
+together cheaply.
+
+Packing is a greedy best-fit-decreasing heuristic over a bin-packing
+problem with shared items. It is not guaranteed optimal but is close for
+the handful of calls a contract needs.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Characters per token when no tokenizer is available (conservative for
+# the Llama tokenizer; Claude averages closer to 4)
+CHARS_PER_TOKEN = 3.5
+
+# Smallest trimmed section worth sending
+_MIN_SECTION_TOKENS = 64
+
+# Layout of rendered items; sections are numbered per batch
+_ITEM_HEADER = "### {key}\n"
+_SECTION_LABEL = "[S{n}] "
+_SECTION_REFERENCE = "(Also see section [S{n}] above.)"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text without a tokenizer."""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+@dataclass
+class PackItem:
+    """
+    One answer to request in a batch (e.g. a category summary).
+
+    Attributes:
+        key: ID the model answers under (e.g. 'change_orders_0')
+        sections: (section key, section text) pairs in relevance order;
+            items sharing a section key share the text
+        preamble: Item-specific text placed before the sections (e.g. past
+            knowledge)
+    """
+    key: str
+    sections: List[Tuple[str, str]] = field(default_factory=list)
+    preamble: str = ""
+
+
+@dataclass
+class PackedBatch:
+    """
+    Items assigned to one model call.
+
+    Attributes:
+        items: Items in the call, in input order
+        prompt_tokens: Measured tokens of the items' text (excluding the
+            fixed instructions)
+        output_tokens: Output tokens reserved for the answers
+    """
+    items: List[PackItem] = field(default_factory=list)
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def keys(self) -> List[str]:
+        return [item.key for item in self.items]
+
+    @property
+    def section_keys(self) -> set:
+        return {key for item in self.items for key, _ in item.sections}
+
+
+class PromptPacker:
+    """
+    Packs items into context-sized batches.
+
+    Args:
+        context_tokens: Model context window in tokens
+        fixed_tokens: Tokens every call spends regardless of items (system
+            message, instructions, chat template, safety margin)
+        item_output_tokens: Output tokens reserved per item
+        max_output_tokens: Upper bound on output tokens for one call
+        count_tokens: Tokenizer-backed counter; estimate_tokens() if None
+    """
+
+    def __init__(
+        self,
+        context_tokens: int,
+        fixed_tokens: int,
+        item_output_tokens: int,
+        max_output_tokens: int,
+        count_tokens: Optional[Callable[[str], int]] = None
+    ):
+        self.budget = context_tokens - fixed_tokens
+        self.item_output_tokens = item_output_tokens
+        self.max_output_tokens = max_output_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self._section_costs: Dict[str, int] = {}
+
+    def pack(self, items: List[PackItem]) -> List[PackedBatch]:
+        """
+        Assign items to as few batches as fit the budget.
+
+        Items too large for a call on their own have their sections trimmed
+        (lowest-ranked sections first, then truncated at a sentence).
+
+        Args:
+            items: Items to pack
+
+        Returns:
+            Batches in the order of their first item
+        """
+        if not items:
+            return []
+        if self.budget <= self.item_output_tokens:
+            raise ValueError(
+                f"Context budget of {self.budget} tokens leaves no room for prompts"
+            )
+
+        fitted = [self._fit_item(item) for item in items]
+        order = {item.key: i for i, item in enumerate(fitted)}
+
+        # Largest first; each item goes to the batch it leaves fullest
+        batches: List[PackedBatch] = []
+        for item in sorted(fitted, key=lambda it: -self._item_cost(it, set())):
+            best, best_room = None, None
+            for batch in batches:
+                if batch.output_tokens + self.item_output_tokens > self.max_output_tokens:
+                    continue
+                room = self._room(batch) - self._item_cost(item, batch.section_keys)
+                if room >= 0 and (best_room is None or room < best_room):
+                    best, best_room = batch, room
+            if best is None:
+                best = PackedBatch()
+                batches.append(best)
+            best.prompt_tokens += self._item_cost(item, best.section_keys) - self.item_output_tokens
+            best.output_tokens += self.item_output_tokens
+            best.items.append(item)
+
+        for batch in batches:
+            batch.items.sort(key=lambda it: order[it.key])
+        batches.sort(key=lambda b: order[b.items[0].key])
+        return batches
+
+    def render(self, batch: PackedBatch) -> str:
+        """
+        Render a batch's items as prompt text.
+
+        Each item is headed by its key. A section's text appears once, under
+        the first item that uses it; later items refer back to its label.
+
+        Args:
+            batch: Batch from pack()
+
+        Returns:
+            Prompt text for the batch's items
+        """
+        numbers: Dict[str, int] = {}
+        blocks = []
+        for item in batch.items:
+            parts = [_ITEM_HEADER.format(key=item.key) + item.preamble]
+            for key, text in item.sections:
+                if key in numbers:
+                    parts.append(_SECTION_REFERENCE.format(n=numbers[key]))
+                else:
+                    numbers[key] = len(numbers) + 1
+                    parts.append(_SECTION_LABEL.format(n=numbers[key]) + text)
+            blocks.append("\n\n".join(p for p in parts if p.strip()))
+        return "\n\n".join(blocks)
+
+    def _room(self, batch: PackedBatch) -> int:
+        return self.budget - batch.prompt_tokens - batch.output_tokens
+
+    def _section_cost(self, key: str, text: str) -> int:
+        cost = self._section_costs.get(key)
+        if cost is None:
+            cost = self.count_tokens(_SECTION_LABEL.format(n=99) + text + "\n\n")
+            self._section_costs[key] = cost
+        return cost
+
+    def _item_cost(self, item: PackItem, present: set) -> int:
+        """Tokens an item adds to a batch already holding the present sections."""
+        cost = self.count_tokens(_ITEM_HEADER.format(key=item.key) + item.preamble + "\n\n")
+        cost += self.item_output_tokens
+        for key, text in item.sections:
+            if key in present:
+                cost += self.count_tokens(_SECTION_REFERENCE.format(n=99) + "\n\n")
+            else:
+                cost += self._section_cost(key, text)
+        return cost
+
+    def _fit_item(self, item: PackItem) -> PackItem:
+        """Trim an item's sections so it fits a call on its own."""
+        if self._item_cost(item, set()) <= self.budget:
+            return item
+
+        room = self.budget - self._item_cost(PackItem(key=item.key, preamble=item.preamble), set())
+        kept = []
+        for key, text in item.sections:
+            cost = self._section_cost(key, text)
+            if cost <= room:
+                kept.append((key, text))
+                room -= cost
+                continue
+            if room < _MIN_SECTION_TOKENS:
+                break
+            # Trimmed text is specific to this item, so it gets its own key
+            trimmed_key = f"{key}~{item.key}"
+            trimmed = _truncate_at_sentence(text, int(len(text) * room / cost))
+            while self._section_cost(trimmed_key, trimmed) > room and len(trimmed) > 1:
+                self._section_costs.pop(trimmed_key)
+                trimmed = _truncate_at_sentence(trimmed, int(len(trimmed) * 0.9))
+            kept.append((trimmed_key, trimmed))
+            break
+
+        logger.info(
+            f"Trimmed sections of {item.key} to fit the context window "
+            f"({len(kept)} of {len(item.sections)} sections kept)"
+        )
+        return PackItem(key=item.key, sections=kept, preamble=item.preamble)
+
+
+def _truncate_at_sentence(text: str, max_chars: int) -> str:
+    """Truncate text at the last sentence boundary before max_chars."""
+    if len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    for end in ['. ', '.\n', ';\n', '\n\n']:
+        pos = truncated.rfind(end)
+        if pos > max_chars // 2:  # Keep at least half the budget
+            return truncated[:pos + 1].rstrip()
+    return truncated.rstrip() + "..."
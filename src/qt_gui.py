@@ -9,6 +9,7 @@ import os
 import sys
 import json
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 # Add project root to path so "from src.X" works when running directly.
@@ -57,7 +58,7 @@ from src.analysis_engine import AnalysisEngine, PreparedContract
 from src.query_engine import QueryEngine
 from src.local_model_client import LocalModelClient
 from src.config_manager import ConfigManager
-from src.history_store import HistoryStore, HistoryStoreError
+from src.history_store import HistoryStore, HistoryStoreError, SQLiteHistoryStore
 from src.history_tab import HistoryTab
 from src.specs_tab import SpecsTab
 from src.bid_review_tab import BidReviewTab
@@ -1003,17 +1004,34 @@ class SingleCategoryThread(QThread):
 
 
 class AnalyzeAllThread(QThread):
-    """Background thread for analyzing all categories sequentially."""
+    """Background thread for analyzing all categories sequentially.
+
+    When reusable_results is given (resuming an interrupted run) as
+    cat_key -> (input_hash, clause_block or None for not found), categories
+    whose retrieved context hashes to the saved value re-emit the saved
+    result instead of being re-analyzed.
+
+    When revision_base is given as (previous PreparedContract, its results),
+    the two versions are diffed section by section first and categories
+    whose retrieved sections did not change re-emit the previous result.
+
+    When fresh is True (an explicit re-run), the AI response cache is
+    bypassed so every category gets a new answer.
+    """
     category_complete = pyqtSignal(str, str, object, str, str)  # cat_key, display_name, clause_block, prompt, response
     category_not_found = pyqtSignal(str, str, str)  # cat_key, prompt, response
     category_error = pyqtSignal(str, str)  # cat_key, error_msg
+    category_input_hash = pyqtSignal(str, str)  # cat_key, input_hash (emitted before the result)
     all_finished = pyqtSignal()
     progress = pyqtSignal(str, int)
 
-    def __init__(self, engine, prepared):
+    def __init__(self, engine, prepared, reusable_results=None, revision_base=None, fresh=False):
         super().__init__()
         self.engine = engine
         self.prepared = prepared
+        self.reusable_results = reusable_results or {}
+        self.revision_base = revision_base
+        self.fresh = fresh
         self.cancelled = False
 
     def cancel(self):
@@ -1029,17 +1047,144 @@ class AnalyzeAllThread(QThread):
             f"Analyzing {total} categories...", 0
         )
 
+        # Count NOT FOUND answers cut short during this run
+        early_stop_stats = getattr(self.engine.ai_client, 'early_stop_stats', None)
+        if early_stop_stats is not None:
+            early_stop_stats.reset()
+
+        # Categories unaffected by a revision keep their previous results
+        revision_results = {}
+        requests, request_errors = {}, {}
+        if self.revision_base:
+            base_prepared, base_results = self.revision_base
+            try:
+                plan = self.engine.plan_revision(base_prepared, self.prepared)
+                requests.update(plan.requests)
+                revision_results = {
+                    k: self._reanchor(base_results[k], plan.requests.get(k))
+                    for k in plan.unchanged if k in base_results
+                }
+            except Exception as e:
+                logger.warning(f"Revision comparison failed, analyzing everything: {e}")
+
+        # Retrieval first, so categories sharing their top sections can be
+        # analyzed together with one multi-category prompt. A revision plan
+        # has already retrieved the categories it compared.
+        for cat_key, _ in categories:
+            if cat_key in requests:
+                continue
+            try:
+                requests[cat_key] = self.engine.prepare_category_request(self.prepared, cat_key)
+            except Exception as e:
+                request_errors[cat_key] = e
+
+        pending = [
+            request for cat_key, request in requests.items()
+            if request is not None and request.early_result is None
+            and cat_key not in revision_results
+            and not self._is_reusable(request)
+        ]
+        shared_groups = {}
+        try:
+            for group in self.engine.group_shared_sections(self.prepared, pending):
+                for cat_key in group.cat_keys:
+                    shared_groups[cat_key] = group
+        except Exception as e:
+            logger.warning(f"Shared-section grouping failed, analyzing categories separately: {e}")
+        # With parallel decoding, keep as many calls in flight as the local
+        # model decodes together; results are still emitted in order. Only
+        # when decoding really runs in parallel: otherwise calls would just
+        # queue on the model's lock.
+        ai_client = self.engine.ai_client
+        parallel = getattr(ai_client, 'parallel_sequences', 1)
+        if getattr(ai_client, 'is_parallel', False) is not True:
+            parallel = 1
+        pool = ThreadPoolExecutor(max_workers=parallel) if isinstance(parallel, int) and parallel > 1 else None
+        shared_results = {}  # id(group) -> Future of {cat_key: result}
+        single_results = {}  # cat_key -> Future of result
+
+        def call(fn):
+            # The cache bypass is per thread, so it is entered on each worker
+            if not self.fresh:
+                return fn()
+            from src.response_cache import bypass_cache
+            with bypass_cache(ai_client):
+                return fn()
+
+        def run(fn):
+            if pool is not None:
+                return pool.submit(call, fn)
+            future = Future()
+            try:
+                future.set_result(call(fn))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        def start(cat_key):
+            group = shared_groups.get(cat_key)
+            if group is not None:
+                if id(group) not in shared_results:
+                    shared_results[id(group)] = run(
+                        lambda: self.engine.analyze_shared_group(self.prepared, group)
+                    )
+            elif cat_key not in single_results:
+                single_results[cat_key] = run(
+                    lambda: self.engine.analyze_single_category(
+                        self.prepared, cat_key, request=requests.get(cat_key)
+                    )
+                )
+
+        if pool is not None:
+            for request in pending:
+                start(request.cat_key)
+
         for i, (cat_key, (section_key, display_name)) in enumerate(categories):
             if self.cancelled:
                 break
 
             pct = int(100 * i / total) if total else 100
-            self.progress.emit(f"Analyzing {display_name} ({i + 1}/{total})...", pct)
 
             try:
-                result = self.engine.analyze_single_category(
-                    self.prepared, cat_key
-                )
+                if cat_key in request_errors:
+                    raise request_errors[cat_key]
+                request = requests.get(cat_key)
+                if request is not None:
+                    self.category_input_hash.emit(cat_key, request.input_hash)
+                    if self._is_reusable(request):
+                        saved = self.reusable_results[cat_key][1]
+                        if saved is None:
+                            self.category_not_found.emit(cat_key, '', '(unchanged since interrupted run)')
+                        else:
+                            self.category_complete.emit(
+                                cat_key, display_name, saved, '', '(unchanged since interrupted run)'
+                            )
+                        continue
+
+                if cat_key in revision_results:
+                    self.category_complete.emit(
+                        cat_key, display_name, revision_results[cat_key],
+                        '', '(unchanged since previous revision)'
+                    )
+                    continue
+
+                self.progress.emit(f"Analyzing {display_name} ({i + 1}/{total})...", pct)
+                start(cat_key)
+                group = shared_groups.get(cat_key)
+                outcomes = {}
+                if group is not None:
+                    try:
+                        outcomes = shared_results[id(group)].result()
+                    except Exception as e:
+                        logger.warning(f"Multi-category analysis failed, analyzing {cat_key} alone: {e}")
+                if group is None:
+                    result = single_results[cat_key].result()
+                elif cat_key in outcomes:
+                    result = outcomes[cat_key]
+                else:
+                    result = call(lambda: self.engine.analyze_single_category(
+                        self.prepared, cat_key, request=request
+                    ))
                 if result:
                     _, disp, clause_block, prompt, response = result
                     if clause_block is not None:
@@ -1051,9 +1196,33 @@ class AnalyzeAllThread(QThread):
             except Exception as e:
                 self.category_error.emit(cat_key, str(e))
 
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if early_stop_stats is not None:
+            logger.info("Analyze All: %s", early_stop_stats.summary())
+
         self.progress.emit("Analysis complete!", 100)
         self.all_finished.emit()
 
+    @staticmethod
+    def _reanchor(clause_block, request):
+        """Point a result kept from the previous revision at the new revision's location and page."""
+        if request is None or not isinstance(clause_block, dict):
+            return clause_block
+        block = dict(clause_block)
+        block['Clause Location'] = request.clause_location
+        if request.clause_page:
+            block['Clause Page'] = request.clause_page
+        else:
+            block.pop('Clause Page', None)
+        return block
+
+    def _is_reusable(self, request):
+        """True if an interrupted run saved a result for these exact inputs."""
+        saved = self.reusable_results.get(request.cat_key)
+        return saved is not None and saved[0] == request.input_hash
+
 
 class ChatOrchestrationThread(QThread):
     """Background thread for ReAct-style tool-calling chat loop."""
@@ -1173,6 +1342,13 @@ class CR2A_GUI(QMainWindow):
         self.category_results = {}  # {cat_key: clause_block_dict} accumulated results
         self.active_category_thread = None  # Running SingleCategoryThread
         self.analyze_all_thread = None  # Running AnalyzeAllThread
+        self._run_input_hashes = {}  # cat_key -> input hash of the in-flight Analyze All item
+        self._revision_base = None  # (PreparedContract, results, file) of the previously loaded contract
+        self._revision_base_confirmed = None  # user's answer to "is this a revision of it?", None = not asked
+        self._revision_base_contract_id = None  # stored contract the previous revision belongs to
+        self._current_contract_id = None  # stored contract the loaded file belongs to, once known
+        self._matched_contract = None  # ContractMatch the user confirmed when the contract loaded
+        self._content_signature = None  # MinHash signature of the loaded contract's text
 
         # Versioning components
         self.version_db = None
@@ -1236,7 +1412,7 @@ class CR2A_GUI(QMainWindow):
             logger.info("Differential storage initialized")
             
             # Initialize other versioning components
-            self.contract_identity_detector = ContractIdentityDetector(self.differential_storage)
+            self.contract_identity_detector = ContractIdentityDetector(self.version_db)
             self.change_comparator = ChangeComparator()
             self.version_manager = VersionManager(self.differential_storage)
             
@@ -1260,7 +1436,7 @@ class CR2A_GUI(QMainWindow):
     def init_history_store(self):
         """Initialize history store for persistent analysis records."""
         try:
-            self.history_store = HistoryStore()
+            self.history_store = SQLiteHistoryStore()
             logger.info("History store initialized successfully")
         except HistoryStoreError as e:
             logger.error("Failed to initialize history store: %s", e)
@@ -1373,6 +1549,7 @@ class CR2A_GUI(QMainWindow):
             
             # Set as current_analysis
             self.current_analysis = analysis_result
+            self._invalidate_query_context()
             
             # Store the record_id for tracking
             self.current_history_record_id = record_id
@@ -1424,6 +1601,7 @@ class CR2A_GUI(QMainWindow):
             
             # Clear the current analysis
             self.current_analysis = None
+            self._invalidate_query_context()
             self.current_file = None
             self.current_history_record_id = None
             
@@ -1807,6 +1985,9 @@ class CR2A_GUI(QMainWindow):
             QMessageBox.warning(self, "No Contract", "Please open a folder and load documents first.")
             return
 
+        if tool_name == "run_full_bid_review" and self.session_manager:
+            self._prepare_bid_review_run()
+
         # Display user message
         self._log_to_chat('user', command, 'You:')
         self.send_btn.setEnabled(False)
@@ -1822,6 +2003,22 @@ class CR2A_GUI(QMainWindow):
         self._quick_tool_thread.item_complete_signal.connect(self._on_quick_tool_item)
         self._quick_tool_thread.start()
 
+    def _prepare_bid_review_run(self):
+        """Record the bid item queue and, when resuming, hand saved items to the registry."""
+        from analyzer.bid_spec_patterns import BID_ITEM_MAP
+        from src.bid_review_models import ChecklistItem
+
+        kind = self.session_manager.RUN_BID_ITEMS
+        if self._ask_resume_run(kind, len(BID_ITEM_MAP), "bid items"):
+            saved = self.session_manager.bid_review_item_results
+            self.tool_registry.bid_resume_items = {
+                item_key: (input_hash, ChecklistItem.from_dict(saved[item_key]))
+                for item_key, input_hash in self.session_manager.reusable_input_hashes(kind).items()
+                if item_key in saved
+            }
+        self.session_manager.start_run(kind, list(BID_ITEM_MAP))
+        self.session_manager.save()
+
     def create_contract_tab(self):
         """Create the Contract tab with analysis sidebar."""
         widget = QWidget()
@@ -2378,6 +2575,18 @@ class CR2A_GUI(QMainWindow):
             if hasattr(self, 'bid_review_engine') and self.bid_review_engine:
                 self.bid_review_engine.ai_client = ai_client
 
+    def _create_response_cache(self):
+        """Open the AI response cache per settings, or None if disabled or unavailable."""
+        if self.config_manager and not self.config_manager.get_ai_response_cache_enabled():
+            return None
+        max_mb = self.config_manager.get_ai_response_cache_max_mb() if self.config_manager else 256
+        try:
+            from src.response_cache import ResponseCache
+            return ResponseCache(max_bytes=max_mb * 1024 * 1024)
+        except Exception as e:
+            logger.warning(f"AI response cache unavailable: {e}")
+            return None
+
     def _init_engines_claude(self):
         """Initialize engines with Claude API backend."""
         try:
@@ -2414,6 +2623,7 @@ class CR2A_GUI(QMainWindow):
                 ai_backend="claude",
                 api_key=api_key,
                 claude_model=claude_model,
+                response_cache=self._create_response_cache(),
             )
 
             from src.document_retriever import DocumentRetriever
@@ -2458,13 +2668,15 @@ class CR2A_GUI(QMainWindow):
         try:
             model_name = self.config_manager.get_local_model_name() if self.config_manager else "llama-3.2-3b-q4"
 
+            server_address = self.config_manager.get_local_model_server_address() if self.config_manager else None
+
             logger.info(f"Initializing local AI engine: {model_name}")
 
-            # Check if model needs to be downloaded
+            # Check if model needs to be downloaded (a model server has its own copy)
             from src.model_manager import ModelManager
             model_mgr = ModelManager()
 
-            if not model_mgr.is_model_cached(model_name):
+            if not server_address and not model_mgr.is_model_cached(model_name):
                 logger.info(f"Model {model_name} not cached, showing first-run dialog")
 
                 first_run_dialog = FirstRunDialog(model_name, self)
@@ -2483,12 +2695,16 @@ class CR2A_GUI(QMainWindow):
             gpu_backend = self.config_manager.get_gpu_backend() if self.config_manager else "auto"
             ram_reserved_os_mb = self.config_manager.get_ram_reserved_os_mb() if self.config_manager else None
             gpu_offload_layers = self.config_manager.get_gpu_offload_layers() if self.config_manager else None
+            parallel_sequences = self.config_manager.get_local_parallel_sequences() if self.config_manager else 1
             self.analysis_engine = AnalysisEngine(
                 local_model_name=model_name,
                 gpu_mode=gpu_mode,
                 gpu_backend=gpu_backend,
                 ram_reserved_os_mb=ram_reserved_os_mb,
                 gpu_offload_layers=gpu_offload_layers,
+                response_cache=self._create_response_cache(),
+                parallel_sequences=parallel_sequences,
+                model_server_address=server_address,
             )
 
             from src.document_retriever import DocumentRetriever
@@ -2667,6 +2883,7 @@ class CR2A_GUI(QMainWindow):
         self.prepared_bid_review = None
         self.category_results = {}
         self.current_analysis = None
+        self._invalidate_query_context()
 
         # Initialize project storage for the folder
         from pathlib import Path
@@ -2775,7 +2992,7 @@ class CR2A_GUI(QMainWindow):
         """Reinitialize storage components to use project paths."""
         from src.version_database import VersionDatabase
         from src.differential_storage import DifferentialStorage
-        from src.history_store import HistoryStore
+        from src.history_store import SQLiteHistoryStore
         from src.chat_history_manager import ChatHistoryManager
 
         try:
@@ -2788,7 +3005,7 @@ class CR2A_GUI(QMainWindow):
             self.differential_storage = DifferentialStorage(self.version_db)
 
             # Reinitialize history store with project analyses directory
-            self.history_store = HistoryStore(
+            self.history_store = SQLiteHistoryStore(
                 storage_dir=self.project_storage.analyses_dir
             )
 
@@ -2925,6 +3142,7 @@ class CR2A_GUI(QMainWindow):
     def on_analysis_complete(self, result):
         """Handle analysis completion."""
         self.current_analysis = result
+        self._invalidate_query_context()
         
         # Clear the history record ID since this is a new analysis (not from history)
         self.current_history_record_id = None
@@ -3031,10 +3249,31 @@ class CR2A_GUI(QMainWindow):
         else:
             analysis_result = result
         
+        # A match confirmed when the contract loaded is stored as its next version
+        content_signature = self._content_signature
+        if self._matched_contract is not None:
+            match = self._matched_contract
+            if match.match_type == 'hash':
+                # Identical to the stored version; another copy adds nothing
+                logger.info("Contract %s is unchanged; not storing a new version", match.contract_id)
+                self._current_contract_id = match.contract_id
+                return
+            self._current_contract_id = self._store_contract_version(
+                match.contract_id, match.current_version, analysis_result
+            )
+            self._store_content_signature(self._current_contract_id, content_signature)
+            return
+        
         # Check for duplicate contracts
         file_hash = self.contract_identity_detector.compute_file_hash(self.current_file)
         filename = Path(self.current_file).name
-        matches = self.contract_identity_detector.find_potential_matches(file_hash, filename)
+        if content_signature is None and self.contract_text:
+            content_signature = self.contract_identity_detector.compute_content_signature(
+                self.contract_text
+            )
+        matches = self.contract_identity_detector.find_potential_matches(
+            file_hash, filename, content_signature
+        )
         
         if matches:
             # Found potential duplicate
@@ -3049,6 +3288,15 @@ class CR2A_GUI(QMainWindow):
                     f"Current Version: {match.current_version}\n\n"
                     f"Is this an updated version of the same contract?"
                 )
+            elif match.match_type == 'content':
+                message = (
+                    f"This file's text closely matches a previously analyzed contract "
+                    f"(for example a re-scanned or re-exported copy):\n\n"
+                    f"Contract: {match.filename}\n"
+                    f"Content Similarity: {match.similarity_score:.0%}\n"
+                    f"Current Version: {match.current_version}\n\n"
+                    f"Is this an updated version of the same contract?"
+                )
             else:
                 message = (
                     f"This file has a similar name to a previously analyzed contract:\n\n"
@@ -3068,14 +3316,128 @@ class CR2A_GUI(QMainWindow):
             
             if reply == QMessageBox.Yes:
                 # User confirmed it's an update - store as new version
-                self._store_contract_version(match.contract_id, match.current_version, analysis_result)
+                contract_id = self._store_contract_version(
+                    match.contract_id, match.current_version, analysis_result
+                )
+                self._store_content_signature(contract_id, content_signature)
+                self._current_contract_id = contract_id
                 return
         
         # No duplicate or user said it's different - store as new contract
-        self._store_new_contract(analysis_result, file_hash, filename)
+        contract_id = self._store_new_contract(analysis_result, file_hash, filename)
+        self._store_content_signature(contract_id, content_signature)
+        self._current_contract_id = contract_id
+    
+    def _check_contract_identity(self, prepared):
+        """
+        Offer a stored analysis when the loaded contract matches one.
+        
+        Runs when the contract loads, before Analyze All, so an identical
+        or re-scanned copy does not have to be analyzed again. The user can
+        reuse the stored results, or analyze the file as the next version of
+        the stored contract (its clauses are then diffed against the stored
+        version when saved). A byte-identical file can only be reused, since
+        as a new version it would duplicate the stored one.
+        
+        Args:
+            prepared: PreparedContract that was just loaded
+        """
+        if not (self.contract_identity_detector and self.differential_storage and self.version_manager):
+            return
+        
+        from pathlib import Path
+        detector = self.contract_identity_detector
+        try:
+            file_hash = detector.compute_file_hash(self.current_file)
+            if prepared.contract_text:
+                self._content_signature = detector.compute_content_signature(prepared.contract_text)
+            matches = detector.find_potential_matches(
+                file_hash, Path(self.current_file).name, self._content_signature
+            )
+        except Exception as e:
+            logger.warning("Contract identity check failed: %s", e)
+            return
+        if not matches:
+            return
+        
+        match = matches[0]
+        if match.match_type == 'hash':
+            detail = "This file is identical to a previously analyzed contract:"
+        elif match.match_type == 'content':
+            detail = (f"This file's text closely matches a previously analyzed contract "
+                      f"({match.similarity_score:.0%} similar, e.g. a re-scanned or re-exported copy):")
+        else:
+            detail = (f"This file has a similar name to a previously analyzed contract "
+                      f"({match.similarity_score:.0%} similar):")
+        
+        identical = match.match_type == 'hash'
+        if identical:
+            question = "Reuse the stored analysis?"
+        else:
+            question = ("Reuse the stored analysis, or analyze this file as the next version "
+                        "of that contract and compare the results?")
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("Previously Analyzed Contract")
+        box.setIcon(QMessageBox.Question)
+        box.setText(
+            f"{detail}\n\nContract: {match.filename}\n"
+            f"Current Version: {match.current_version}\n\n{question}"
+        )
+        reuse_btn = box.addButton("Reuse Stored Analysis", QMessageBox.AcceptRole)
+        version_btn = None
+        if not identical:
+            version_btn = box.addButton("Analyze as New Version", QMessageBox.ActionRole)
+        box.addButton("Different Contract", QMessageBox.RejectRole)
+        box.exec_()
+        clicked = box.clickedButton()
+        if clicked is None or clicked not in (reuse_btn, version_btn):
+            return
+        
+        self._matched_contract = match
+        self._current_contract_id = match.contract_id
+        if self._revision_base and self._revision_base_contract_id == match.contract_id:
+            # The previously loaded contract is a stored version of this one
+            self._revision_base_confirmed = True
+        if clicked is reuse_btn:
+            self._reuse_stored_analysis(match)
+    
+    def _reuse_stored_analysis(self, match):
+        """Load a stored contract version's clauses as this contract's category results."""
+        try:
+            stored = self.version_manager.reconstruct_version(match.contract_id, match.current_version)
+        except Exception as e:
+            logger.error("Failed to load stored analysis: %s", e)
+            QMessageBox.warning(self, "Error", f"Could not load the stored analysis:\n{e}")
+            return
+        
+        # Clauses are stored as "<section>.<display name>"
+        cat_keys = {mapping: cat_key for cat_key, mapping in self.analysis_engine.CATEGORY_MAP.items()}
+        reused = 0
+        for clause in stored.get('clauses', []):
+            section_key, _, display_name = clause.get('clause_identifier', '').partition('.')
+            cat_key = cat_keys.get((section_key, display_name))
+            if cat_key and isinstance(clause.get('metadata'), dict):
+                self.on_category_complete(
+                    cat_key, display_name, clause['metadata'], '', '(reused from stored analysis)'
+                )
+                reused += 1
+        
+        self._rebuild_current_analysis()
+        self._log_to_chat('system', f'Reused {reused} categories from the stored analysis of '
+                          f'{match.filename} (version {match.current_version}).')
+    
+    def _store_content_signature(self, contract_id, content_signature):
+        """Record the analyzed text's signature for near-duplicate detection."""
+        if not content_signature:
+            return
+        try:
+            self.contract_identity_detector.store_content_signature(contract_id, content_signature)
+        except Exception as e:
+            logger.warning("Failed to store content signature: %s", e)
     
     def _store_new_contract(self, analysis_result, file_hash, filename):
-        """Store a new contract with version 1."""
+        """Store a new contract with version 1 and return its ID."""
         import uuid
         from datetime import datetime
         from src.differential_storage import Contract, Clause
@@ -3098,9 +3460,10 @@ class CR2A_GUI(QMainWindow):
         # Store
         self.differential_storage.store_new_contract(contract, clauses)
         logger.info("Stored new contract: %s (version 1)", contract_id)
+        return contract_id
     
     def _store_contract_version(self, contract_id, current_version, new_analysis):
-        """Store a new version of an existing contract."""
+        """Store a new version of an existing contract and return the ID it was stored under."""
         from src.differential_storage import Clause, VersionMetadata
         from datetime import datetime
         
@@ -3121,8 +3484,7 @@ class CR2A_GUI(QMainWindow):
             file_hash = self.contract_identity_detector.compute_file_hash(self.current_file)
             from pathlib import Path
             filename = Path(self.current_file).name
-            self._store_new_contract(new_analysis, file_hash, filename)
-            return
+            return self._store_new_contract(new_analysis, file_hash, filename)
         
         # Compare versions
         contract_diff = self.change_comparator.compare_contracts(old_analysis, new_analysis)
@@ -3147,6 +3509,7 @@ class CR2A_GUI(QMainWindow):
         if self.history_tab:
             self.history_tab.refresh()
             logger.info("Refreshed history tab after storing version %d", new_version)
+        return contract_id
     
     def _extract_clauses_from_analysis(self, analysis, contract_id, version, timestamp):
         """Extract clauses from analysis result for storage."""
@@ -3211,10 +3574,24 @@ class CR2A_GUI(QMainWindow):
             QMessageBox.warning(self, "Error", "No file selected.")
             return
 
+        # Keep the previous contract's results so Analyze All on a revision
+        # only re-runs categories whose sections changed
+        if self.prepared_contract and self.category_results:
+            self._revision_base = (
+                self.prepared_contract, dict(self.category_results),
+                self.prepared_contract.file_path
+            )
+            self._revision_base_confirmed = None
+            self._revision_base_contract_id = self._current_contract_id
+        self._current_contract_id = None
+        self._matched_contract = None
+        self._content_signature = None
+
         # Reset previous state
         self.prepared_contract = None
         self.category_results = {}
         self.current_analysis = None
+        self._invalidate_query_context()
         if self.specs_tab:
             self.specs_tab.clear()
 
@@ -3299,6 +3676,7 @@ class CR2A_GUI(QMainWindow):
             if self.query_engine:
                 self.query_engine.retriever = self.retriever
                 self.query_engine.indexed_contract = prepared.indexed
+                self.query_engine.invalidate_context_index()
 
         self._log_to_chat('system', f'Contract loaded: {filename}')
         self._log_to_chat('log', f'Extracted {text_len:,} characters, parsed {section_count} sections')
@@ -3327,6 +3705,11 @@ class CR2A_GUI(QMainWindow):
         # Attempt to restore previous session for this contract
         self._try_restore_session()
 
+        # Before any AI analysis, look for a stored analysis of the same or a
+        # near-identical contract (e.g. a re-scanned copy)
+        if not self.category_results:
+            self._check_contract_identity(prepared)
+
         # Refresh file browser to show any new files (e.g., CR2A_Analysis.xlsx)
         if self.current_folder:
             self.bid_model.setRootPath(self.current_folder)
@@ -3403,6 +3786,7 @@ class CR2A_GUI(QMainWindow):
         # Auto-save to session
         if self.session_manager:
             self.session_manager.update_category_result(cat_key, primary)
+            self._complete_run_item(cat_key)
             self.session_manager.save()
 
         # Auto-save to Excel workbook — write all instances
@@ -3628,6 +4012,7 @@ class CR2A_GUI(QMainWindow):
         """Handle category not found by AI."""
         if self.session_manager:
             self.session_manager.mark_category_not_found(cat_key)
+            self._complete_run_item(cat_key)
             self.session_manager.save()
         mapping = self.analysis_engine.CATEGORY_MAP.get(cat_key)
         name = mapping[1] if mapping else cat_key
@@ -3670,22 +4055,114 @@ class CR2A_GUI(QMainWindow):
             self._log_to_chat('log', 'Please wait for the current task to finish.')
             return
 
+        reusable_results = None
+        if self.session_manager:
+            kind = self.session_manager.RUN_CATEGORIES
+            if self._ask_resume_run(kind, len(self.analysis_engine.CATEGORY_MAP), "categories"):
+                reusable_results = self._saved_run_results(kind)
+            self.session_manager.start_run(kind, list(self.analysis_engine.CATEGORY_MAP))
+            self.session_manager.save()
+        self._run_input_hashes = {}
+
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.send_btn.setEnabled(False)
-        self._log_to_chat('system', 'Starting full contract analysis...')
+        if reusable_results is not None:
+            self._log_to_chat('system', 'Resuming contract analysis...')
+        else:
+            self._log_to_chat('system', 'Starting full contract analysis...')
+
+        revision_base = None
+        if self._confirm_revision_base():
+            revision_base = self._revision_base[:2]
+            self._log_to_chat('system', 'Comparing with the previous revision; '
+                              'unchanged categories will keep their results.')
+
+        # Running Analyze All again on the same contract asks for new answers,
+        # so stored AI responses are not reused
+        fresh = bool(self.category_results) and reusable_results is None and revision_base is None
 
         self.analyze_all_thread = AnalyzeAllThread(
-            self.analysis_engine, self.prepared_contract
+            self.analysis_engine, self.prepared_contract, reusable_results, revision_base, fresh
         )
         self.analyze_all_thread.category_complete.connect(self.on_category_complete)
         self.analyze_all_thread.category_not_found.connect(self.on_category_not_found)
         self.analyze_all_thread.category_error.connect(self.on_category_error)
+        self.analyze_all_thread.category_input_hash.connect(self._on_category_input_hash)
         self.analyze_all_thread.all_finished.connect(self.on_analyze_all_finished)
         self.analyze_all_thread.progress.connect(self.on_analysis_progress)
         self.analyze_all_thread.start()
 
+    def _confirm_revision_base(self):
+        """Ask once per load whether the previously loaded contract is an earlier revision of this one.
+
+        Results are only carried over between revisions of the same contract;
+        unrelated contracts can share boilerplate sections.
+        """
+        base = self._revision_base
+        if not base or base[2] == self.prepared_contract.file_path:
+            return False
+        if self._revision_base_confirmed is None:
+            similarity = ""
+            detector = self.contract_identity_detector
+            if detector and base[0].contract_text and self.prepared_contract.contract_text:
+                try:
+                    score = detector.estimate_content_similarity(
+                        detector.compute_content_signature(base[0].contract_text),
+                        detector.compute_content_signature(self.prepared_contract.contract_text)
+                    )
+                    similarity = f"Text similarity: {score:.0%}\n\n"
+                except Exception as e:
+                    logger.debug(f"Content similarity unavailable: {e}")
+            reply = QMessageBox.question(
+                self, "Compare With Previous Revision",
+                f"Is {os.path.basename(self.prepared_contract.file_path)} a revision of "
+                f"{os.path.basename(base[2])}?\n\n{similarity}"
+                f"If so, categories whose contract sections did not change keep "
+                f"their previous results instead of being re-analyzed.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            self._revision_base_confirmed = reply == QMessageBox.Yes
+        return self._revision_base_confirmed
+
+    def _ask_resume_run(self, kind, total, noun):
+        """Offer to resume an interrupted run. Returns True to reuse unchanged results."""
+        pending = self.session_manager.pending_run_keys(kind)
+        if not pending:
+            return False
+        reply = QMessageBox.question(
+            self, "Resume Analysis",
+            f"A previous run stopped with {len(pending)} of {total} {noun} remaining.\n\n"
+            f"Resume it? Results whose contract text and prompt are unchanged "
+            f"will be kept instead of re-analyzed.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        return reply == QMessageBox.Yes
+
+    def _complete_run_item(self, cat_key):
+        """Record an Analyze All category as done with the inputs it was analyzed from."""
+        input_hash = self._run_input_hashes.pop(cat_key, None)
+        if self.session_manager and input_hash:
+            self.session_manager.complete_run_item(
+                self.session_manager.RUN_CATEGORIES, cat_key, input_hash
+            )
+
+    def _on_category_input_hash(self, cat_key, input_hash):
+        self._run_input_hashes[cat_key] = input_hash
+
+    def _saved_run_results(self, kind):
+        """Saved results of a run, keyed for reuse: cat_key -> (input_hash, clause_block or None)."""
+        saved = self.session_manager.category_results
+        not_found = set(self.session_manager.categories_not_found)
+        reusable = {}
+        for cat_key, input_hash in self.session_manager.reusable_input_hashes(kind).items():
+            if cat_key in saved:
+                reusable[cat_key] = (input_hash, saved[cat_key])
+            elif cat_key in not_found:
+                reusable[cat_key] = (input_hash, None)
+        return reusable
+
     def on_analyze_all_finished(self):
         """Handle completion of Analyze All."""
         self.progress_bar.setVisible(False)
@@ -3783,8 +4260,10 @@ class CR2A_GUI(QMainWindow):
             )
 
         # Start analysis on the tab
+        # "Re-analyze Checklist" asks for new answers rather than stored ones
+        fresh = self.bid_review_tab.get_result() is not None
         logger.info("Starting bid review analysis (AI available: %s)", ai_client is not None)
-        self.bid_review_tab.start_analysis(bid_engine, prepared)
+        self.bid_review_tab.start_analysis(bid_engine, prepared, fresh=fresh)
 
     def _on_bid_item_session_save(self, item_key, display_name, item):
         """Auto-save a single bid review item and log to chat."""
@@ -3942,9 +4421,15 @@ class CR2A_GUI(QMainWindow):
                 self.category_results,
                 overview=None
             )
+            self._invalidate_query_context()
         except Exception as e:
             logger.error(f"Failed to build comprehensive result: {e}")
 
+    def _invalidate_query_context(self):
+        """Drop the chat retrieval index after the current analysis changes."""
+        if self.query_engine:
+            self.query_engine.invalidate_context_index()
+
     def get_or_build_current_analysis(self):
         """Get or build the current analysis for export/chat."""
         if self.current_analysis:
@@ -3981,6 +4466,7 @@ class CR2A_GUI(QMainWindow):
         
         # Store current analysis for chat
         self.current_analysis = result
+        self._invalidate_query_context()
     
     def _display_standard_analysis(self, result):
         """Display standard (non-verified) analysis results."""
@@ -4326,6 +4812,16 @@ class CR2A_GUI(QMainWindow):
             self._log_to_chat('not_found', f'Not found in contract: {display_name}',
                               cat_key=key)
 
+        elif item_type == 'bid_review_done':
+            # Persist each bid item as it finishes so an interrupted review can resume
+            item_dict = data.get('item')
+            if self.session_manager and item_dict:
+                self.session_manager.update_bid_review_item(key, item_dict)
+                self.session_manager.complete_run_item(
+                    self.session_manager.RUN_BID_ITEMS, key, data.get('input_hash', '')
+                )
+                self.session_manager.save()
+
     def _on_quick_tool_progress(self, message, pct):
         """Handle per-item progress from a running tool."""
         self.chat_status_label.setText(message)
@@ -4734,13 +5230,65 @@ class SettingsDialog(QDialog):
         self._local_only_groups = [hw_group, preset_group, model_group, ram_group, self.gpu_group]
 
         # =====================================================================
-        # F. Dialog Buttons
+        # F. AI Response Cache
+        # =====================================================================
+        cache_group = QGroupBox("AI Response Cache")
+        cache_layout = QHBoxLayout()
+        cache_group.setLayout(cache_layout)
+
+        self.cache_stats_label = QLabel("")
+        self.cache_stats_label.setStyleSheet("color: #666; font-size: 11px;")
+        cache_layout.addWidget(self.cache_stats_label, 1)
+
+        self.clear_cache_btn = QPushButton("Clear Cache")
+        self.clear_cache_btn.setToolTip("Delete stored AI responses so every prompt is answered again")
+        self.clear_cache_btn.clicked.connect(self._clear_response_cache)
+        cache_layout.addWidget(self.clear_cache_btn)
+
+        layout.addWidget(cache_group)
+        self._update_cache_stats()
+
+        # =====================================================================
+        # G. Dialog Buttons
         # =====================================================================
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(self.save_settings)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
+    def _response_cache(self):
+        """The running engine's response cache, or None if caching is off."""
+        engine = getattr(self.parent(), 'analysis_engine', None)
+        ai_client = getattr(engine, 'ai_client', None)
+        from src.response_cache import CachedAIClient
+        return ai_client.cache if isinstance(ai_client, CachedAIClient) else None
+
+    def _update_cache_stats(self):
+        """Show the response cache's size and hit rate."""
+        cache = self._response_cache()
+        if cache is None:
+            self.cache_stats_label.setText("Cache not in use")
+            self.clear_cache_btn.setEnabled(False)
+            return
+        stats = cache.stats()
+        self.cache_stats_label.setText(
+            f"{stats.entries} responses, {stats.size_bytes / (1024 * 1024):.1f} of "
+            f"{stats.max_bytes // (1024 * 1024)} MB  --  "
+            f"{stats.hits} hits, {stats.misses} misses this session ({stats.hit_rate:.0%})"
+        )
+        self.clear_cache_btn.setEnabled(stats.entries > 0)
+
+    def _clear_response_cache(self):
+        """Delete all stored AI responses."""
+        cache = self._response_cache()
+        if cache is None:
+            return
+        try:
+            cache.clear()
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not clear the response cache:\n{e}")
+        self._update_cache_stats()
+
     def _on_backend_changed(self):
         """Toggle visibility of local vs Claude controls."""
         is_claude = self.backend_combo.currentData() == "claude"
@@ -6,15 +6,155 @@ integrating with the local AI model for response generation and handling context
 formatting and relevance extraction.
 
 Supports optional verification mode for answer validation.
+
+Relevance ranking uses a small BM25 index over the loaded analysis (clause
+summaries, risks, compliance issues and redlines). The index is built once
+per analysis and reused for every chat message until the analysis changes.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Tuple
 from src.analysis_models import AnalysisResult
 
 logger = logging.getLogger(__name__)
 
 
+# Words carrying no relevance signal in chat questions
+STOP_WORDS = frozenset({
+    'what', 'when', 'where', 'who', 'how', 'why', 'is', 'are', 'the',
+    'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'about', 'can', 'you', 'tell', 'me', 'show', 'find', 'get', 'any',
+    'this', 'that', 'these', 'those', 'there', 'here', 'does', 'do',
+    'and', 'or', 'be', 'it', 'its', 'our', 'we', 'my', 'if', 'as',
+    'which', 'will', 'would', 'should', 'have', 'has', 'from', 'not'
+})
+
+# Query words mapped to the clause category they imply
+CLAUSE_TYPE_KEYWORDS = {
+    'payment': ['payment', 'pay', 'money', 'fee', 'cost', 'price'],
+    'liability': ['liability', 'liable', 'responsible', 'fault'],
+    'termination': ['termination', 'terminate', 'end', 'cancel', 'exit'],
+    'warranty': ['warranty', 'guarantee', 'assurance'],
+    'indemnity': ['indemnity', 'indemnification', 'protect', 'defend'],
+    'confidentiality': ['confidential', 'secret', 'private', 'nda']
+}
+
+# Sections of the comprehensive schema holding clause blocks
+COMPREHENSIVE_SECTIONS = [
+    'administrative_and_commercial_terms',
+    'technical_and_performance_terms',
+    'legal_risk_and_enforcement',
+    'regulatory_and_compliance_terms',
+    'data_technology_and_deliverables'
+]
+
+
+class ContextIndex:
+    """
+    BM25 index over the items of one analysis result.
+
+    Term weights are precomputed when the index is built, so a search is a
+    handful of dictionary lookups and a sort over the matching items.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, documents: List[Tuple[Dict[str, Any], str]]):
+        """
+        Build the index.
+
+        Args:
+            documents: (item, searchable text) pairs, in display order
+        """
+        self.items = [item for item, _ in documents]
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+
+        term_counts = [Counter(self.tokenize(text)) for _, text in documents]
+        lengths = [sum(counts.values()) for counts in term_counts]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+        total = len(documents)
+
+        for doc_index, counts in enumerate(term_counts):
+            norm = self.K1 * (1 - self.B + self.B * lengths[doc_index] / (average_length or 1.0))
+            for term, tf in counts.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                weight = idf * tf * (self.K1 + 1) / (tf + norm)
+                self._postings[term].append((doc_index, weight))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Split text into normalized index terms.
+
+        Lowercases, drops stop words and very short tokens, and folds simple
+        plurals so "payments" matches "payment".
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            List of terms in order of appearance
+        """
+        terms = []
+        for token in re.findall(r'[a-z0-9]+', text.lower()):
+            if len(token) < 3 or token in STOP_WORDS:
+                continue
+            if token.endswith('ies') and len(token) > 4:
+                token = token[:-3] + 'y'
+            elif token.endswith('s') and not token.endswith('ss') and len(token) > 3:
+                token = token[:-1]
+            terms.append(token)
+        return terms
+
+    @classmethod
+    def query_terms(cls, query: str) -> List[str]:
+        """
+        Tokenize a chat question, adding the clause categories it implies.
+
+        Args:
+            query: User's question
+
+        Returns:
+            Distinct query terms
+        """
+        terms = set(cls.tokenize(query))
+        words = set(re.findall(r'[a-z]+', query.lower()))
+        for category, keywords in CLAUSE_TYPE_KEYWORDS.items():
+            if words.intersection(keywords):
+                terms.add(category)
+        return sorted(terms)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rank indexed items against a query.
+
+        Args:
+            query: User's question
+            limit: Maximum number of items to return (None for all matches)
+
+        Returns:
+            Matching items, best first; ties keep display order
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in self.query_terms(query):
+            for doc_index, weight in self._postings.get(term, ()):
+                scores[doc_index] += weight
+
+        ranked = sorted(scores, key=lambda doc_index: (-scores[doc_index], doc_index))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.items[doc_index] for doc_index in ranked]
+
+
 class QueryEngine:
     """
     Query engine that manages query-response workflow.
@@ -47,6 +187,9 @@ class QueryEngine:
         self.chat_history_manager = chat_history_manager
         self.retriever = retriever
         self.indexed_contract = None  # Set when a contract is loaded
+        # Retrieval indexes for the current analysis, keyed by its identity
+        self._context_key: Optional[Tuple] = None
+        self._context_indexes: Dict[str, ContextIndex] = {}
         logger.info("QueryEngine initialized with memory optimization limits")
     
     def process_query(
@@ -197,9 +340,162 @@ class QueryEngine:
                 'redlining_suggestions': []
             }
     
+    def invalidate_context_index(self) -> None:
+        """
+        Drop the cached retrieval index.
+
+        The index is keyed by the analysis identity (file and analysis time),
+        so callers must invalidate it whenever they change the results of an
+        analysis in place.
+        """
+        self._context_key = None
+        self._context_indexes = {}
+
+    def _get_context_indexes(
+        self,
+        analysis_result: Dict[str, Any],
+        schema_format: str
+    ) -> Dict[str, ContextIndex]:
+        """
+        Return retrieval indexes for an analysis, building them if needed.
+
+        Callers rebuild the analysis dictionary for every message, so the
+        cache is keyed by the analysis metadata (filename and analyzed_at)
+        rather than object identity. Analyses without that metadata are
+        indexed for each call.
+
+        Args:
+            analysis_result: Analysis result dictionary
+            schema_format: "comprehensive" or "legacy"
+
+        Returns:
+            Mapping of item kind to its ContextIndex
+        """
+        key = self._analysis_identity(analysis_result, schema_format)
+        if key is not None and key == self._context_key:
+            return self._context_indexes
+
+        if schema_format == "comprehensive":
+            documents = {'clause_blocks': self._comprehensive_documents(analysis_result)}
+        else:
+            documents = {
+                'clauses': [
+                    (clause, ' '.join([clause.get('type', '')] * 2 + [
+                        clause.get('text', ''), clause.get('risk_level', '')]))
+                    for clause in analysis_result.get('clauses', [])
+                    if isinstance(clause, dict)
+                ],
+            }
+            for kind in ('risks', 'compliance_issues', 'redlining_suggestions'):
+                documents[kind] = [
+                    (item, self._flatten_text(item))
+                    for item in analysis_result.get(kind, [])
+                    if isinstance(item, dict)
+                ]
+
+        self._context_indexes = {
+            kind: ContextIndex(pairs) for kind, pairs in documents.items()
+        }
+        self._context_key = key
+        logger.debug("Built context index: %s", {
+            kind: len(index) for kind, index in self._context_indexes.items()
+        })
+        return self._context_indexes
+
+    @staticmethod
+    def _analysis_identity(
+        analysis_result: Dict[str, Any],
+        schema_format: str
+    ) -> Optional[Tuple]:
+        """
+        Identify an analysis by its metadata.
+
+        Args:
+            analysis_result: Analysis result dictionary
+            schema_format: "comprehensive" or "legacy"
+
+        Returns:
+            (schema_format, filename, analyzed_at), or None if the analysis
+            has no analysis time
+        """
+        metadata = analysis_result.get('metadata') or analysis_result.get('contract_metadata')
+        if not isinstance(metadata, dict) or not metadata.get('analyzed_at'):
+            return None
+        return (schema_format, metadata.get('filename'), metadata.get('analyzed_at'))
+
+    @classmethod
+    def _comprehensive_documents(
+        cls,
+        analysis_result: Dict[str, Any]
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Collect clause blocks from a comprehensive result with their text.
+
+        Each block is copied and tagged with `_section` and `_clause_name`.
+        Its text covers the clause name, location, summary, redlines and
+        harmful language findings.
+
+        Args:
+            analysis_result: Comprehensive format analysis result dictionary
+
+        Returns:
+            (clause block, searchable text) pairs in section order
+        """
+        documents = []
+        for section_name in COMPREHENSIVE_SECTIONS:
+            section_data = analysis_result.get(section_name, {})
+            if isinstance(section_data, dict):
+                for clause_name, clause_block in section_data.items():
+                    if clause_block and isinstance(clause_block, dict):
+                        # Add section and clause name for context
+                        clause_block_copy = clause_block.copy()
+                        clause_block_copy['_section'] = section_name
+                        clause_block_copy['_clause_name'] = clause_name
+                        documents.append(clause_block_copy)
+
+        # Add supplemental operational risks
+        supplemental = analysis_result.get('supplemental_operational_risks', [])
+        for idx, block in enumerate(supplemental):
+            if block and isinstance(block, dict):
+                block_copy = block.copy()
+                block_copy['_section'] = 'supplemental_operational_risks'
+                block_copy['_clause_name'] = f'risk_{idx + 1}'
+                documents.append(block_copy)
+
+        # The clause name is repeated so it weighs like a short title
+        return [
+            (block, ' '.join([block['_clause_name'].replace('_', ' ')] * 2
+                             + [cls._flatten_text(block)]))
+            for block in documents
+        ]
+
+    @classmethod
+    def _flatten_text(cls, value: Any) -> str:
+        """
+        Join the string values of a nested structure, skipping `_` keys.
+
+        Args:
+            value: String, list or dictionary
+
+        Returns:
+            Space-separated text
+        """
+        if isinstance(value, str):
+            return value
+        if isinstance(value, dict):
+            return ' '.join(cls._flatten_text(v) for k, v in value.items()
+                            if not str(k).startswith('_'))
+        if isinstance(value, (list, tuple)):
+            return ' '.join(cls._flatten_text(v) for v in value)
+        return ''
+
     def _format_context_legacy(self, analysis_result: Dict[str, Any], query: str) -> Dict[str, Any]:
         """
         Format legacy analysis result as context for LLM.
+
+        Clauses, risks, compliance issues and redlining suggestions are
+        ranked by the cached BM25 index. Risks and suggestions attached to
+        the selected clauses are included as well.
         
         Args:
             analysis_result: Legacy format analysis result dictionary
@@ -210,45 +506,48 @@ class QueryEngine:
         """
         # Extract keywords from query for relevance matching
         query_lower = query.lower()
+        indexes = self._get_context_indexes(analysis_result, "legacy")
         
         # Get all clauses
-        all_clauses = analysis_result.get('clauses', [])
+        all_clauses = indexes['clauses'].items
         
         # Extract relevant clauses based on query
-        relevant_clauses = self.extract_relevant_clauses(query, all_clauses)
+        relevant_clauses = indexes['clauses'].search(query, limit=self.MAX_CLAUSES)
         
-        # Get risks associated with relevant clauses
-        relevant_clause_ids = {clause['id'] for clause in relevant_clauses}
-        all_risks = analysis_result.get('risks', [])
-        relevant_risks = [
-            risk for risk in all_risks 
-            if risk.get('clause_id') in relevant_clause_ids
-        ]
+        # Get risks matching the query, then those of relevant clauses
+        relevant_clause_ids = {clause.get('id') for clause in relevant_clauses}
+        all_risks = indexes['risks'].items
+        relevant_risks = self._merge_ranked(
+            indexes['risks'].search(query, limit=self.MAX_RISKS),
+            [risk for risk in all_risks if risk.get('clause_id') in relevant_clause_ids]
+        )
         
         # Check if query mentions compliance/regulation keywords
         compliance_keywords = ['compliance', 'regulation', 'gdpr', 'ccpa', 'sox', 'legal', 'law']
         mentions_compliance = any(keyword in query_lower for keyword in compliance_keywords)
         
         # Include compliance issues if query mentions compliance or if no specific clauses found
-        all_compliance = analysis_result.get('compliance_issues', [])
+        all_compliance = indexes['compliance_issues'].items
+        matching_compliance = indexes['compliance_issues'].search(query, limit=self.MAX_COMPLIANCE)
         if mentions_compliance or not relevant_clauses:
-            relevant_compliance = all_compliance[:5]  # Limit to 5 for context size
+            relevant_compliance = self._merge_ranked(matching_compliance, all_compliance)
         else:
-            relevant_compliance = []
+            relevant_compliance = matching_compliance
         
         # Check if query mentions redlining/changes/suggestions
         redlining_keywords = ['change', 'modify', 'suggest', 'improve', 'redline', 'edit', 'revise']
         mentions_redlining = any(keyword in query_lower for keyword in redlining_keywords)
         
         # Include redlining suggestions if query mentions them or for relevant clauses
-        all_redlining = analysis_result.get('redlining_suggestions', [])
+        all_redlining = indexes['redlining_suggestions'].items
+        matching_redlining = indexes['redlining_suggestions'].search(query, limit=self.MAX_REDLINING)
         if mentions_redlining:
-            relevant_redlining = all_redlining[:5]  # Limit to 5
+            relevant_redlining = self._merge_ranked(matching_redlining, all_redlining)
         else:
-            relevant_redlining = [
+            relevant_redlining = self._merge_ranked(matching_redlining, [
                 suggestion for suggestion in all_redlining
                 if suggestion.get('clause_id') in relevant_clause_ids
-            ]
+            ])
         
         # Build formatted context with relevant data (limited for memory optimization)
         formatted_context = {
@@ -285,6 +584,9 @@ class QueryEngine:
     def _format_context_comprehensive(self, analysis_result: Dict[str, Any], query: str) -> Dict[str, Any]:
         """
         Format comprehensive analysis result as context for LLM.
+
+        Clause blocks from every section and the supplemental operational
+        risks are ranked by the cached BM25 index.
         
         Args:
             analysis_result: Comprehensive format analysis result dictionary
@@ -293,47 +595,15 @@ class QueryEngine:
         Returns:
             Filtered analysis result dictionary with relevant data
         """
-        query_lower = query.lower()
-        
-        # Extract all clause blocks from all sections
-        all_clause_blocks = []
-        section_names = [
-            'administrative_and_commercial_terms',
-            'technical_and_performance_terms',
-            'legal_risk_and_enforcement',
-            'regulatory_and_compliance_terms',
-            'data_technology_and_deliverables'
-        ]
-        
-        for section_name in section_names:
-            section_data = analysis_result.get(section_name, {})
-            if isinstance(section_data, dict):
-                for clause_name, clause_block in section_data.items():
-                    if clause_block and isinstance(clause_block, dict):
-                        # Add section and clause name for context
-                        clause_block_copy = clause_block.copy()
-                        clause_block_copy['_section'] = section_name
-                        clause_block_copy['_clause_name'] = clause_name
-                        all_clause_blocks.append(clause_block_copy)
-        
-        # Add supplemental operational risks
-        supplemental = analysis_result.get('supplemental_operational_risks', [])
-        for idx, block in enumerate(supplemental):
-            if block and isinstance(block, dict):
-                block_copy = block.copy()
-                block_copy['_section'] = 'supplemental_operational_risks'
-                block_copy['_clause_name'] = f'risk_{idx + 1}'
-                all_clause_blocks.append(block_copy)
+        index = self._get_context_indexes(analysis_result, "comprehensive")['clause_blocks']
         
         # Filter clause blocks based on query relevance
-        relevant_blocks = self._extract_relevant_clause_blocks(query, all_clause_blocks)
+        relevant_blocks = index.search(query, limit=self.MAX_CLAUSES)
         
         # If no relevant blocks found, include all blocks (limited)
         if not relevant_blocks:
             logger.debug("No relevant clause blocks found, including all blocks")
-            relevant_blocks = all_clause_blocks[:self.MAX_CLAUSES]
-        else:
-            relevant_blocks = relevant_blocks[:self.MAX_CLAUSES]
+            relevant_blocks = index.items[:self.MAX_CLAUSES]
         
         # Build formatted context
         formatted_context = {
@@ -346,56 +616,26 @@ class QueryEngine:
         logger.debug(f"Context formatted: {len(relevant_blocks)} clause blocks from comprehensive schema")
         
         return formatted_context
-    
-    def _extract_relevant_clause_blocks(
-        self, 
-        query: str, 
-        clause_blocks: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
+
+    @staticmethod
+    def _merge_ranked(first: List[Dict[str, Any]], second: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Extract clause blocks relevant to query using keyword matching.
-        
+        Concatenate two item lists, dropping repeats of the same item.
+
         Args:
-            query: User's question
-            clause_blocks: List of clause block dictionaries
-            
+            first: Items to keep first (e.g. direct query matches)
+            second: Items to append after them
+
         Returns:
-            List of relevant clause blocks, sorted by relevance
+            Merged list
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        scored_blocks = []
-        
-        for block in clause_blocks:
-            score = 0
-            
-            # Check clause location
-            clause_location = (block.get('Clause Location') or block.get('clause_location')
-                             or block.get('Clause Language') or block.get('clause_language', '')).lower()
-            clause_summary = (block.get('Clause Summary') or block.get('clause_summary', '')).lower()
-
-            # Count matching words
-            for word in query_words:
-                if len(word) > 3:  # Only count words longer than 3 chars
-                    if word in clause_location:
-                        score += 2
-                    if word in clause_summary:
-                        score += 2
-            
-            # Check clause name
-            clause_name = block.get('_clause_name', '').lower()
-            for word in query_words:
-                if len(word) > 3 and word in clause_name:
-                    score += 1
-            
-            if score > 0:
-                scored_blocks.append((score, block))
-        
-        # Sort by score (highest first)
-        scored_blocks.sort(key=lambda x: x[0], reverse=True)
-        
-        return [block for score, block in scored_blocks]
+        seen = set()
+        merged = []
+        for item in first + second:
+            if id(item) not in seen:
+                seen.add(id(item))
+                merged.append(item)
+        return merged
     
     def extract_relevant_clauses(self, query: str, clauses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -419,19 +659,12 @@ class QueryEngine:
             logger.debug(f"Extracting relevant clauses from {len(clauses)} total clauses")
             
             # Extract keywords from query (remove common stop words)
-            stop_words = {
-                'what', 'when', 'where', 'who', 'how', 'why', 'is', 'are', 'the', 
-                'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-                'about', 'can', 'you', 'tell', 'me', 'show', 'find', 'get', 'any',
-                'this', 'that', 'these', 'those', 'there', 'here', 'does', 'do'
-            }
-            
             query_lower = query.lower()
             query_words = query_lower.split()
             keywords = [
                 word.strip('?.,!') 
                 for word in query_words 
-                if word.lower() not in stop_words and len(word) > 2
+                if word.lower() not in STOP_WORDS and len(word) > 2
             ]
             
             if not keywords:
@@ -463,16 +696,7 @@ class QueryEngine:
                         score += 2
                     
                     # Check for specific clause type keywords
-                    type_keywords = {
-                        'payment': ['payment', 'pay', 'money', 'fee', 'cost', 'price'],
-                        'liability': ['liability', 'liable', 'responsible', 'fault'],
-                        'termination': ['termination', 'terminate', 'end', 'cancel', 'exit'],
-                        'warranty': ['warranty', 'guarantee', 'assurance'],
-                        'indemnity': ['indemnity', 'indemnification', 'protect', 'defend'],
-                        'confidentiality': ['confidential', 'secret', 'private', 'nda']
-                    }
-                    
-                    for clause_category, category_keywords in type_keywords.items():
+                    for clause_category, category_keywords in CLAUSE_TYPE_KEYWORDS.items():
                         if keyword in category_keywords and clause_category in clause_type:
                             score += 4
                 
@@ -0,0 +1,491 @@
+"""
+Response Cache Module
+
+Disk-backed memoization of AI responses. A call to generate() with the same
+model, temperature, output limit and prompts as an earlier one, in this run
+or a previous one, returns the stored text instead of running inference
+again. Re-analyzing a contract after a crash or a settings change then only
+pays for the categories whose prompts actually changed.
+
+Entries live in a SQLite database and are evicted least recently used first
+once the cache exceeds its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+from src.version_database import VersionDatabase, VersionDatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheError(Exception):
+    """Exception raised for response cache errors."""
+    pass
+
+
+@dataclass
+class ResponseCacheStats:
+    """
+    Response cache counters.
+
+    Attributes:
+        hits: Lookups answered from the cache since it was opened
+        misses: Lookups that ran inference since it was opened
+        evictions: Entries removed to stay under the size limit
+        entries: Entries currently stored
+        size_bytes: Total size of stored responses
+        max_bytes: Size limit
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache (0.0 when none yet)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCacheDatabase(VersionDatabase):
+    """
+    Manages the SQLite database backing ResponseCache.
+
+    Reuses VersionDatabase connection handling (WAL mode, per-thread
+    connections, dedicated writer) with a single table of responses keyed
+    by request hash.
+
+    Database location:
+        %APPDATA%/CR2A/cache/responses.db
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize response cache database.
+
+        Args:
+            db_path: Path to database file
+        """
+        super().__init__(db_path=db_path)
+
+    def _initialize_schema(self) -> None:
+        """Create the responses table and its LRU index if missing."""
+        conn = None
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    request_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_responses_last_used
+                ON responses(last_used)
+            """)
+            cursor.execute(
+                "INSERT OR IGNORE INTO schema_version (version) VALUES (?)",
+                (self.SCHEMA_VERSION,)
+            )
+            conn.commit()
+
+        except sqlite3.Error as e:
+            logger.error("Failed to initialize response cache schema: %s", e)
+            if conn:
+                conn.rollback()
+            raise VersionDatabaseError(f"Failed to initialize response cache schema: {e}")
+
+
+class ResponseCache:
+    """
+    Size-bounded, persistent store of AI responses keyed by request hash.
+
+    Lookups and stores are safe from several threads. Database errors are
+    logged and treated as misses so a damaged cache never fails an
+    analysis.
+    """
+
+    # Default size limit for stored response text
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            db_path: Path to database file.
+                    If None, defaults to %APPDATA%/CR2A/cache/responses.db
+            max_bytes: Size limit; least recently used entries are evicted above it
+            enabled: False to bypass the cache (lookups miss, nothing is stored)
+
+        Raises:
+            ResponseCacheError: If the cache database cannot be opened
+        """
+        if db_path is None:
+            appdata = os.environ.get('APPDATA', os.path.expanduser('~'))
+            db_path = Path(appdata) / 'CR2A' / 'cache' / 'responses.db'
+
+        try:
+            self.db = ResponseCacheDatabase(Path(db_path))
+        except VersionDatabaseError as e:
+            raise ResponseCacheError(f"Failed to open response cache: {e}")
+
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._stats_lock = threading.Lock()
+        self._bypass = threading.local()
+        self._last_used = 0.0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_message: str,
+        user_message: str,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Hash the inputs that determine a response.
+
+        Args:
+            model: Model identifier
+            temperature: Sampling temperature (None if the backend has none)
+            max_tokens: Output token limit
+            system_message: System prompt
+            user_message: User prompt
+            options: Other output-affecting arguments (JSON-serializable)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        request = [model, temperature, max_tokens, system_message, user_message]
+        if options:
+            request.append(options)
+        payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def active(self) -> bool:
+        """Whether lookups and stores apply on the calling thread."""
+        return self.enabled and not getattr(self._bypass, 'depth', 0)
+
+    @contextmanager
+    def bypass(self) -> Iterator[None]:
+        """
+        Skip the cache for calls made on this thread inside the block.
+
+        Used for deliberate re-runs where a fresh answer is wanted.
+        """
+        self._bypass.depth = getattr(self._bypass, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._bypass.depth -= 1
+
+    def _timestamp(self) -> float:
+        """Wall-clock time, strictly increasing within this process for LRU order."""
+        with self._stats_lock:
+            self._last_used = max(time.time(), self._last_used + 1e-6)
+            return self._last_used
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response and mark it recently used.
+
+        Args:
+            key: Request key from make_key()
+
+        Returns:
+            Stored response text, or None on a miss
+        """
+        if not self.active:
+            return None
+
+        try:
+            row = self.db.execute(
+                "SELECT response FROM responses WHERE request_key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                with self.db.write_transaction() as conn:
+                    conn.execute(
+                        "UPDATE responses SET last_used = ?, hit_count = hit_count + 1 "
+                        "WHERE request_key = ?",
+                        (self._timestamp(), key)
+                    )
+        except (sqlite3.Error, VersionDatabaseError) as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            row = None
+
+        with self._stats_lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return row['response'] if row is not None else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response, evicting old entries if over the size limit.
+
+        Args:
+            key: Request key from make_key()
+            model: Model identifier (kept for inspection)
+            response: Response text
+        """
+        if not self.active or not response:
+            return
+
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        try:
+            with self.db.write_transaction() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO responses (
+                        request_key, model, response, size_bytes, created_at, last_used
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (key, model, response, size, datetime.now().isoformat(), self._timestamp()))
+                evicted = self._evict(conn)
+        except (sqlite3.Error, VersionDatabaseError) as e:
+            logger.warning("Response cache store failed: %s", e)
+            return
+
+        if evicted:
+            with self._stats_lock:
+                self._evictions += evicted
+            logger.debug("Evicted %d cached responses", evicted)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """
+        Delete least recently used entries until under the size limit.
+
+        Args:
+            conn: Writer connection inside a write transaction
+
+        Returns:
+            Number of entries deleted
+        """
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        doomed = []
+        for key, size in conn.execute(
+            "SELECT request_key, size_bytes FROM responses ORDER BY last_used"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM responses WHERE request_key = ?", doomed)
+        return len(doomed)
+
+    def stats(self) -> ResponseCacheStats:
+        """
+        Get cache counters and current size.
+
+        Returns:
+            ResponseCacheStats snapshot
+        """
+        try:
+            row = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses"
+            ).fetchone()
+            entries, size_bytes = row[0], row[1]
+        except (sqlite3.Error, VersionDatabaseError) as e:
+            logger.warning("Response cache stats failed: %s", e)
+            entries, size_bytes = 0, 0
+
+        with self._stats_lock:
+            return ResponseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=entries,
+                size_bytes=size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self) -> None:
+        """Delete all stored responses."""
+        with self.db.write_transaction() as conn:
+            conn.execute("DELETE FROM responses")
+        logger.info("Response cache cleared")
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self.db.close()
+
+
+def _callable_name(fn: Callable) -> Optional[str]:
+    """Importable name of a module-level function, or None if it has none."""
+    module = getattr(fn, '__module__', None)
+    qualname = getattr(fn, '__qualname__', None)
+    if not module or not qualname or '<' in qualname:
+        return None
+    return f"{module}.{qualname}"
+
+
+def bypass_cache(client) -> ContextManager[None]:
+    """
+    Skip the response cache for calls made on this thread inside the block.
+
+    Args:
+        client: AI client, cached or not
+
+    Returns:
+        ResponseCache.bypass() for a CachedAIClient, otherwise a no-op
+    """
+    if isinstance(client, CachedAIClient):
+        return client.cache.bypass()
+    return nullcontext()
+
+
+class CachedAIClient:
+    """
+    AI client wrapper that memoizes generate() through a ResponseCache.
+
+    Every other attribute and method (process_query, process_with_tools,
+    ensure_loaded, model, ...) is forwarded to the wrapped client, so the
+    wrapper can stand in wherever LocalModelClient or AnthropicClient is
+    used.
+    """
+
+    # generate() arguments that do not change the response text
+    UNKEYED_ARGS = frozenset({'token_callback'})
+
+    def __init__(self, client, cache: ResponseCache):
+        """
+        Args:
+            client: LocalModelClient or AnthropicClient instance
+            cache: ResponseCache to read and fill
+        """
+        self.client = client
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any
+    ) -> str:
+        """
+        Return a cached response, or generate and cache one.
+
+        Every argument except token_callback and progress_callback is part
+        of the cache key. On a hit the stored text is passed to token_callback (if given) in
+        one piece, so streaming displays still show the answer.
+
+        Args:
+            system_message: System prompt
+            user_message: User prompt
+            progress_callback: Optional callback(status_str, percent_int)
+            max_tokens: Optional max output tokens (client default if None)
+            **kwargs: Passed through to the client's generate()
+
+        Returns:
+            Raw text response
+        """
+        options = self._key_options(kwargs) if self.cache.active else None
+        if options is None:
+            return self.client.generate(
+                system_message, user_message,
+                progress_callback=progress_callback, max_tokens=max_tokens, **kwargs
+            )
+
+        model = str(getattr(self.client, 'model', type(self.client).__name__))
+        effective_max_tokens = max_tokens or getattr(self.client, 'MAX_TOKENS_ANALYSIS', None)
+        key = ResponseCache.make_key(
+            model, getattr(self.client, 'temperature', None), effective_max_tokens,
+            system_message, user_message, options
+        )
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("Response cache hit (%s, %d chars)", key[:12], len(cached))
+            if progress_callback:
+                progress_callback("Using cached response", 85)
+            token_callback = kwargs.get('token_callback')
+            if token_callback:
+                token_callback(cached)
+            return cached
+
+        response = self.client.generate(
+            system_message, user_message,
+            progress_callback=progress_callback, max_tokens=max_tokens, **kwargs
+        )
+        self.cache.put(key, model, response)
+        return response
+
+    def _key_options(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Collect the generate() arguments that belong in the cache key.
+
+        Callables are keyed by their importable name.
+        A lambda or nested function has no stable name, so such calls skip
+        the cache.
+
+        Args:
+            kwargs: Extra generate() arguments
+
+        Returns:
+            Key options (empty if there are none), or None to skip the cache
+        """
+        options = {}
+        for name, value in kwargs.items():
+            if name in self.UNKEYED_ARGS or value is None:
+                continue
+            if callable(value):
+                value = _callable_name(value)
+                if value is None:
+                    logger.debug("Response cache skipped: %s has no stable name", name)
+                    return None
+            options[name] = value
+        return options
@@ -2,14 +2,17 @@
 Session State Manager
 
 Manages automatic persistence and restoration of application session state.
-Session data is stored in .cr2a/session.json alongside the contract files.
+Session data is stored in .cr2a/session.json alongside the contract files,
+with incremental changes appended to .cr2a/session.journal.jsonl.
 
 Auto-saves after each analysis event (category complete, bid item complete).
 Restores previous session when the same contract is re-loaded.
 """
 
+import hashlib
 import json
 import logging
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -17,6 +20,28 @@ from typing import Dict, Any, Optional, List
 logger = logging.getLogger(__name__)
 
 
+def compute_input_hash(*parts: Any) -> str:
+    """
+    Hash the inputs of one unit of analysis work (prompt, context, model).
+
+    Used to decide whether a saved result can be reused by a resumed run.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part if part is not None else "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def ai_client_identity(ai_client) -> str:
+    """Name of the model behind an AI client, for input hashing."""
+    if ai_client is None:
+        return ""
+    return (getattr(ai_client, "model_name", None)
+            or getattr(ai_client, "_model_name", None)
+            or type(ai_client).__name__)
+
+
 class SessionManagerError(Exception):
     """Exception raised for session manager errors."""
     pass
@@ -27,15 +52,43 @@ class SessionManager:
     Manages session state persistence to .cr2a/session.json.
 
     Provides auto-save after analysis events and restore on contract load.
-    Uses atomic write (temp file + rename) for crash safety.
+
+    Saves are incremental. Each helper records which part of the state it
+    touched, and save() appends one JSON line per touched category, bid item
+    or field to session.journal.jsonl, so the cost of a save depends on what
+    changed rather than on the size of the whole session. Every
+    CHECKPOINT_INTERVAL journal entries the full state is written to
+    session.json (temp file + rename) and the journal is restarted.
+
+    The journal header carries the generation of the snapshot it extends.
+    load() replays only a journal whose generation matches the snapshot, so a
+    crash between writing a checkpoint and restarting the journal cannot
+    apply old deltas twice. A torn trailing line is ignored.
+
+    The session also holds the work queue of the last Analyze All and full
+    bid review run: the keys still pending and, for each finished key, a
+    hash of the inputs it was analyzed from. A resumed run skips keys whose
+    inputs hash the same and whose result is still saved.
     """
 
-    SCHEMA_VERSION = "1.0"
+    SCHEMA_VERSION = "1.1"
+    JOURNAL_VERSION = "1.0"
+    CHECKPOINT_INTERVAL = 64
+
+    # Run kinds tracked for resumable analysis
+    RUN_CATEGORIES = "categories"
+    RUN_BID_ITEMS = "bid_items"
 
     def __init__(self, storage_root: Path):
         self.session_path = Path(storage_root) / "session.json"
+        self.journal_path = Path(storage_root) / "session.journal.jsonl"
         self._dirty = False
         self._state: Dict[str, Any] = self._empty_state()
+        # Touched state parts in first-touch order: ("category", key), ...
+        self._pending: Dict[tuple, None] = {}
+        # Generation of the snapshot on disk; None forces a checkpoint
+        self._generation: Optional[str] = None
+        self._journal_entries = 0
         logger.info("SessionManager initialized: %s", self.session_path)
 
     def _empty_state(self) -> Dict[str, Any]:
@@ -49,8 +102,15 @@ class SessionManager:
             "categories_not_found": [],
             "bid_review_result": None,
             "bid_review_item_results": {},
+            "runs": {},
         }
 
+    def _touch(self, *part) -> None:
+        """Record a changed part of the state for the next save."""
+        self._pending.pop(part, None)
+        self._pending[part] = None
+        self._dirty = True
+
     # ------------------------------------------------------------------
     # Save helpers (update in-memory state, mark dirty)
     # ------------------------------------------------------------------
@@ -60,51 +120,125 @@ class SessionManager:
         self._state["contract_file"] = contract_file
         self._state["contract_file_path"] = contract_file_path
         self._state["upload_mode"] = upload_mode
-        self._dirty = True
+        self._touch("contract")
 
     def update_category_result(self, cat_key: str, clause_block: dict) -> None:
         self._state["category_results"][cat_key] = clause_block
         nf = self._state["categories_not_found"]
         if cat_key in nf:
             nf.remove(cat_key)
-        self._dirty = True
+        self._touch("category", cat_key)
 
     def mark_category_not_found(self, cat_key: str) -> None:
         nf = self._state["categories_not_found"]
         if cat_key not in nf:
             nf.append(cat_key)
         self._state["category_results"].pop(cat_key, None)
-        self._dirty = True
+        self._touch("category", cat_key)
 
     def update_bid_review_item(self, item_key: str, item_dict: Dict[str, Any]) -> None:
         self._state["bid_review_item_results"][item_key] = item_dict
-        self._dirty = True
+        self._touch("bid_item", item_key)
 
     def update_bid_review_result(self, result_dict: Optional[Dict[str, Any]]) -> None:
         self._state["bid_review_result"] = result_dict
-        self._dirty = True
+        self._touch("bid_result")
+
+    # ------------------------------------------------------------------
+    # Resumable runs
+    # ------------------------------------------------------------------
+
+    def _run(self, kind: str) -> Dict[str, Any]:
+        return self._state.setdefault("runs", {}).setdefault(
+            kind, {"pending": [], "input_hashes": {}}
+        )
+
+    def start_run(self, kind: str, keys: List[str]) -> None:
+        """
+        Record the work queue of a new run.
+
+        Args:
+            kind: RUN_CATEGORIES or RUN_BID_ITEMS
+            keys: Category or item keys in the order they will be processed
+        """
+        self._run(kind)["pending"] = list(keys)
+        self._touch("run", kind)
+
+    def complete_run_item(self, kind: str, key: str, input_hash: str) -> None:
+        """Remove a key from the pending queue and remember the inputs it was analyzed with."""
+        run = self._run(kind)
+        if key in run["pending"]:
+            run["pending"].remove(key)
+        run["input_hashes"][key] = input_hash
+        self._touch("run_item", kind, key)
+
+    def pending_run_keys(self, kind: str) -> List[str]:
+        """Keys still queued by an unfinished run, in processing order."""
+        return list(self._state.get("runs", {}).get(kind, {}).get("pending", []))
+
+    def has_unfinished_run(self, kind: str) -> bool:
+        return bool(self.pending_run_keys(kind))
+
+    def reusable_input_hashes(self, kind: str) -> Dict[str, str]:
+        """
+        Input hashes of completed work whose result is still in the session.
+
+        A key whose saved result has since been dropped is left out so it is
+        always re-analyzed.
+        """
+        hashes = self._state.get("runs", {}).get(kind, {}).get("input_hashes", {})
+        if kind == self.RUN_CATEGORIES:
+            present = set(self.category_results) | set(self.categories_not_found)
+        else:
+            present = set(self.bid_review_item_results)
+        return {k: h for k, h in hashes.items() if k in present}
 
     # ------------------------------------------------------------------
     # Persist to disk
     # ------------------------------------------------------------------
 
     def save(self) -> None:
-        """Atomic write to session.json. Only writes when dirty."""
+        """Append pending changes to the journal, checkpointing when due. Only writes when dirty."""
         if not self._dirty:
             return
 
         self._state["last_saved"] = datetime.now().isoformat()
+
+        try:
+            if (self._generation is None
+                    or self._journal_entries + len(self._pending) > self.CHECKPOINT_INTERVAL):
+                self.checkpoint()
+                return
+
+            self._append_journal([self._delta_for(part) for part in self._pending])
+            self._pending.clear()
+            self._dirty = False
+            logger.debug("Session journal appended (%d entries since checkpoint)",
+                         self._journal_entries)
+
+        except Exception as e:
+            logger.error("Failed to save session: %s", e)
+            # The journal may hold a partial write; rewrite everything next time
+            self._generation = None
+
+    def checkpoint(self) -> None:
+        """Write the full state to session.json and restart the journal."""
+        generation = uuid.uuid4().hex
+        snapshot = dict(self._state, journal_generation=generation)
         temp_path = self.session_path.with_suffix(".tmp")
 
         try:
             self.session_path.parent.mkdir(parents=True, exist_ok=True)
 
             with open(temp_path, "w", encoding="utf-8") as f:
-                json.dump(self._state, f, indent=2, ensure_ascii=False)
+                json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
 
-            # Atomic rename
+            # Atomic rename; a journal from the previous generation is now ignored
             temp_path.replace(self.session_path)
+            self._generation = generation
+            self._pending.clear()
             self._dirty = False
+            self._start_journal()
             logger.info("Session saved (%d categories, %d bid items)",
                         len(self._state["category_results"]),
                         len(self._state["bid_review_item_results"]))
@@ -117,6 +251,128 @@ class SessionManager:
                 except Exception:
                     pass
 
+    def _start_journal(self) -> None:
+        """Replace the journal with an empty one for the current generation."""
+        header = {"journal_version": self.JOURNAL_VERSION, "generation": self._generation}
+        temp_path = self.journal_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+        temp_path.replace(self.journal_path)
+        self._journal_entries = 0
+
+    def _append_journal(self, deltas: List[Dict[str, Any]]) -> None:
+        """Append delta records to the journal, one JSON object per line."""
+        lines = "".join(
+            json.dumps(d, ensure_ascii=False, separators=(",", ":")) + "\n" for d in deltas
+        )
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._journal_entries += len(deltas)
+
+    def _delta_for(self, part: tuple) -> Dict[str, Any]:
+        """Build the journal record for one changed part of the state."""
+        state = self._state
+        kind = part[0]
+        delta: Dict[str, Any] = {"op": kind, "ts": state["last_saved"]}
+        if kind == "contract":
+            delta["contract_file"] = state["contract_file"]
+            delta["contract_file_path"] = state["contract_file_path"]
+            delta["upload_mode"] = state["upload_mode"]
+        elif kind == "category":
+            key = part[1]
+            delta["key"] = key
+            if key in state["category_results"]:
+                delta["value"] = state["category_results"][key]
+            else:
+                delta["not_found"] = key in state["categories_not_found"]
+        elif kind == "bid_item":
+            delta["key"] = part[1]
+            delta["value"] = state["bid_review_item_results"][part[1]]
+        elif kind == "bid_result":
+            delta["value"] = state["bid_review_result"]
+        elif kind == "run":
+            delta["kind"] = part[1]
+            delta["value"] = state["runs"][part[1]]
+        elif kind == "run_item":
+            delta["kind"], delta["key"] = part[1], part[2]
+            delta["input_hash"] = state["runs"][part[1]]["input_hashes"][part[2]]
+        return delta
+
+    def _apply_delta(self, delta: Dict[str, Any]) -> None:
+        """Apply one journal record to the in-memory state."""
+        state = self._state
+        kind = delta.get("op")
+        if kind == "contract":
+            state["contract_file"] = delta.get("contract_file")
+            state["contract_file_path"] = delta.get("contract_file_path")
+            state["upload_mode"] = delta.get("upload_mode", "file")
+        elif kind == "category":
+            key = delta["key"]
+            nf = state["categories_not_found"]
+            if "value" in delta:
+                state["category_results"][key] = delta["value"]
+                if key in nf:
+                    nf.remove(key)
+            else:
+                state["category_results"].pop(key, None)
+                if delta.get("not_found") and key not in nf:
+                    nf.append(key)
+        elif kind == "bid_item":
+            state["bid_review_item_results"][delta["key"]] = delta["value"]
+        elif kind == "bid_result":
+            state["bid_review_result"] = delta.get("value")
+        elif kind == "run":
+            state.setdefault("runs", {})[delta["kind"]] = delta["value"]
+        elif kind == "run_item":
+            run = self._run(delta["kind"])
+            if delta["key"] in run["pending"]:
+                run["pending"].remove(delta["key"])
+            run["input_hashes"][delta["key"]] = delta["input_hash"]
+        else:
+            logger.warning("Unknown session journal entry: %s", kind)
+            return
+        if delta.get("ts"):
+            state["last_saved"] = delta["ts"]
+
+    def _replay_journal(self, generation: Optional[str]) -> Optional[int]:
+        """
+        Apply journal records written after the loaded snapshot.
+
+        Returns:
+            Number of records applied, or None if the journal cannot be
+            appended to as-is (missing, from another checkpoint or damaged)
+            and the next save must checkpoint
+        """
+        if not generation or not self.journal_path.exists():
+            return None
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("generation") != generation:
+            logger.info("Session journal does not match the snapshot, ignoring it")
+            return None
+
+        applied = 0
+        damaged = False
+        for line in lines[1:]:
+            if not line.strip():
+                continue
+            try:
+                delta = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from an interrupted save
+                logger.warning("Skipping damaged session journal entry")
+                damaged = True
+                continue
+            self._apply_delta(delta)
+            applied += 1
+        return None if damaged else applied
+
     # ------------------------------------------------------------------
     # Load / Restore
     # ------------------------------------------------------------------
@@ -136,13 +392,21 @@ class SessionManager:
                 logger.warning("Unknown session version: %s", version)
                 return False
 
+            generation = data.pop("journal_generation", None)
             self._state = data
+            self._state["session_version"] = self.SCHEMA_VERSION
+            self._pending.clear()
             self._dirty = False
-            logger.info("Session loaded: %s (saved %s, %d categories, %d bid items)",
+            replayed = self._replay_journal(generation)
+            self._generation = generation if replayed is not None else None
+            self._journal_entries = replayed or 0
+            logger.info("Session loaded: %s (saved %s, %d categories, %d bid items, "
+                        "%d journal entries)",
                         data.get("contract_file"),
                         data.get("last_saved"),
                         len(data.get("category_results", {})),
-                        len(data.get("bid_review_item_results", {})))
+                        len(data.get("bid_review_item_results", {})),
+                        self._journal_entries)
             return True
 
         except (json.JSONDecodeError, OSError) as e:
@@ -190,4 +454,7 @@ class SessionManager:
     def clear(self) -> None:
         """Reset to empty state."""
         self._state = self._empty_state()
+        self._pending.clear()
         self._dirty = False
+        # The files on disk no longer describe this state; next save rewrites them
+        self._generation = None
@@ -78,6 +78,9 @@ class ToolRegistry:
         self.excel_builder = excel_builder
         self.progress_callback = progress_callback
         self.item_callback: Optional[Callable[[str, str, str, dict], None]] = None
+        # item_key -> (input_hash, ChecklistItem) reusable by the next full bid
+        # review; set by the GUI when resuming an interrupted run
+        self.bid_resume_items: Optional[Dict[str, Any]] = None
 
         # Accumulated results for context building
         self.category_results: Dict[str, dict] = {}
@@ -363,10 +366,13 @@ class ToolRegistry:
         if not self.prepared_bid_review:
             return "Error: No bid review prepared."
 
+        resume_items, self.bid_resume_items = self.bid_resume_items, None
         results = self.bid_review_engine.analyze_all_items(
             self.prepared_bid_review,
             progress_callback=self.progress_callback,
             item_callback=self._on_bid_item_complete,
+            reusable_items=resume_items,
+            input_hash_callback=self._on_bid_item_hashed,
         )
 
         self.bid_item_results.update(results)
@@ -390,6 +396,7 @@ class ToolRegistry:
         """Callback for per-item bid review completion."""
         logger.debug("Bid item complete: %s = %s", display_name,
                       item.value if hasattr(item, "value") else str(item))
+        self.bid_item_results[section_key] = item
         if self.item_callback:
             data = {
                 'value': getattr(item, 'value', None) or '',
@@ -400,6 +407,19 @@ class ToolRegistry:
             }
             self.item_callback('bid_review', section_key, display_name, data)
 
+    def _on_bid_item_hashed(self, item_key: str, input_hash: str):
+        """Callback once a bid item is analyzed or reused, for resumable runs.
+
+        The item travels with the hash so the receiver does not have to read
+        bid_item_results from another thread.
+        """
+        item = self.bid_item_results.get(item_key)
+        if self.item_callback and item is not None:
+            self.item_callback('bid_review_done', item_key, "", {
+                'input_hash': input_hash,
+                'item': item.to_dict() if hasattr(item, 'to_dict') else item,
+            })
+
     def _handle_specs_extraction(self) -> str:
         """Run specs extraction."""
         if not self.analysis_engine or not self.analysis_engine.ai_client:
@@ -5,10 +5,14 @@ Manages SQLite database for contract versioning and differential storage.
 Provides schema creation, migration, and connection management.
 """
 
+import itertools
 import logging
 import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 import os
 
 
@@ -20,6 +24,21 @@ class VersionDatabaseError(Exception):
     pass
 
 
+class _ThreadConnection:
+    """
+    A thread's connection, held in the pool's thread-local storage.
+
+    The thread's local storage is dropped when the thread finishes, for
+    Python threads and for threads started outside Python (QThread) alike,
+    which finalizes this holder and closes its connection.
+    """
+    __slots__ = ('generation', 'connection', '__weakref__')
+
+    def __init__(self, generation: int, connection: sqlite3.Connection):
+        self.generation = generation
+        self.connection = connection
+
+
 class VersionDatabase:
     """
     Manages SQLite database for contract versioning.
@@ -27,6 +46,11 @@ class VersionDatabase:
     This class handles database initialization, schema creation, and connection
     management for the contract change tracking feature.
     
+    Each thread gets its own connection from connect(), so the GUI's worker
+    threads read concurrently under WAL instead of sharing one connection.
+    Multi-statement writes go through write_transaction(), which runs them
+    on a dedicated writer connection, one at a time.
+    
     Database location:
         %APPDATA%/CR2A/versions.db
     """
@@ -34,6 +58,21 @@ class VersionDatabase:
     # Schema version for migrations
     SCHEMA_VERSION = 1
     
+    # Busy timeout (ms); generous for network drives shared by several users
+    BUSY_TIMEOUT_MS = 30000
+    
+    # Page cache per connection, in KiB (PRAGMA cache_size takes negative KiB)
+    CACHE_SIZE_KIB = 16384
+    
+    # Bytes of the database file to memory-map for reads
+    MMAP_SIZE = 64 * 1024 * 1024
+    
+    # Prepared statements kept per connection, keyed by SQL text
+    STATEMENT_CACHE_SIZE = 256
+    
+    # WAL pages written before a commit runs an automatic checkpoint
+    WAL_AUTOCHECKPOINT_PAGES = 1000
+    
     def __init__(self, db_path: Optional[Path] = None):
         """
         Initialize version database.
@@ -55,19 +94,41 @@ class VersionDatabase:
             db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = Path(db_path)
-        self.connection: Optional[sqlite3.Connection] = None
+        
+        # Per-thread connections, also tracked here so close() can reach
+        # other threads' connections
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._connection_ids = itertools.count()
+        # Reentrant: dropping a holder under the lock runs its finalizer
+        self._pool_lock = threading.RLock()
+        self._generation = 0
+        
+        # Dedicated writer connection; the lock allows one write transaction at a time
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
 
         logger.info("Version database initialized at: %s", self.db_path)
 
         # Initialize database schema
         self._initialize_schema()
     
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """The calling thread's connection, or None if it has not connected."""
+        local = getattr(self._local, 'connection', None)
+        if local is None or local.generation != self._generation:
+            return None
+        return local.connection
+    
     def connect(self) -> sqlite3.Connection:
         """
-        Get or create database connection.
+        Get or create the calling thread's database connection.
 
         Enables WAL mode for better concurrent access on network shares
         and sets a busy timeout to handle lock contention gracefully.
+        A thread's connection is closed when the thread finishes.
 
         Returns:
             SQLite connection object
@@ -75,41 +136,155 @@ class VersionDatabase:
         Raises:
             VersionDatabaseError: If connection fails
         """
+        connection = self.connection
+        if connection is not None:
+            return connection
+        
         try:
-            if self.connection is None:
-                self.connection = sqlite3.connect(
-                    str(self.db_path),
-                    check_same_thread=False
-                )
-                # Enable WAL mode for better concurrent access
-                # WAL (Write-Ahead Logging) allows multiple readers + one writer
-                self.connection.execute("PRAGMA journal_mode=WAL")
+            connection = self._open_connection()
+        except sqlite3.Error as e:
+            logger.error("Failed to connect to database: %s", e)
+            raise VersionDatabaseError(f"Failed to connect to database: {e}")
+        
+        with self._pool_lock:
+            holder = _ThreadConnection(self._generation, connection)
+            key = next(self._connection_ids)
+            self._connections[key] = connection
+            self._local.connection = holder
+        weakref.finalize(holder, self._release_connection, key)
+        return connection
+    
+    def _release_connection(self, key: int) -> None:
+        """Close a connection whose thread has finished."""
+        with self._pool_lock:
+            connection = self._connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+            logger.debug("Closed the connection of a finished thread")
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Open and configure a new connection to the database file.
 
-                # Set busy timeout to 30 seconds to handle lock contention
-                # Increased timeout for network drive scenarios where multiple users
-                # may be accessing the database concurrently (e.g., FileCloud F:\ drive)
-                self.connection.execute("PRAGMA busy_timeout=30000")
+        Returns:
+            SQLite connection object
+        """
+        connection = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            cached_statements=self.STATEMENT_CACHE_SIZE
+        )
+        # Enable WAL mode for better concurrent access
+        # WAL (Write-Ahead Logging) allows multiple readers + one writer
+        connection.execute("PRAGMA journal_mode=WAL")
 
-                # Enable foreign key constraints
-                self.connection.execute("PRAGMA foreign_keys=ON")
+        # Set busy timeout to handle lock contention
+        # Increased timeout for network drive scenarios where multiple users
+        # may be accessing the database concurrently (e.g., FileCloud F:\ drive)
+        connection.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
 
-                # Use Row factory for dict-like access
-                self.connection.row_factory = sqlite3.Row
+        # Enable foreign key constraints
+        connection.execute("PRAGMA foreign_keys=ON")
 
-                logger.debug("Database connection established with WAL mode")
+        # WAL makes NORMAL durable against application crashes and
+        # avoids an fsync on every commit
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA cache_size=-{self.CACHE_SIZE_KIB}")
+        connection.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute(f"PRAGMA wal_autocheckpoint={self.WAL_AUTOCHECKPOINT_PAGES}")
 
-            return self.connection
+        # Use Row factory for dict-like access
+        connection.row_factory = sqlite3.Row
 
-        except sqlite3.Error as e:
-            logger.error("Failed to connect to database: %s", e)
-            raise VersionDatabaseError(f"Failed to connect to database: {e}")
+        logger.debug("Database connection established with WAL mode")
+        return connection
+    
+    @contextmanager
+    def write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a write transaction on the dedicated writer connection.
+
+        Write transactions are serialized across threads, and BEGIN IMMEDIATE
+        takes SQLite's write lock up front, so a read-then-write sequence
+        cannot interleave with another writer. Commits on success and rolls
+        back if the block raises. Nested use from the same thread joins the
+        outer transaction.
+
+        Yields:
+            The writer connection
+
+        Raises:
+            VersionDatabaseError: If the writer connection cannot be opened
+        """
+        with self._write_lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield self._writer
+                finally:
+                    self._write_depth -= 1
+                return
+            
+            try:
+                if self._writer is None:
+                    self._writer = self._open_connection()
+                self._writer.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                logger.error("Failed to begin write transaction: %s", e)
+                raise VersionDatabaseError(f"Failed to begin write transaction: {e}")
+            
+            writer = self._writer
+            self._write_depth = 1
+            try:
+                yield writer
+                writer.commit()
+            except BaseException:
+                writer.rollback()
+                raise
+            finally:
+                self._write_depth = 0
+    
+    def checkpoint(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """
+        Checkpoint the write-ahead log into the database file.
+
+        PASSIVE never waits for other connections. TRUNCATE also empties the
+        WAL file, waiting up to the busy timeout for readers to finish.
+
+        Args:
+            mode: PASSIVE, FULL, RESTART or TRUNCATE
+
+        Returns:
+            (busy, wal_pages, checkpointed_pages) as reported by SQLite
+
+        Raises:
+            ValueError: If mode is not a checkpoint mode
+            VersionDatabaseError: If the checkpoint fails
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Unsupported checkpoint mode: {mode}")
+        row = self.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        logger.debug("WAL checkpoint (%s): %s", mode, tuple(row))
+        return tuple(row)
     
     def close(self) -> None:
-        """Close database connection."""
-        if self.connection is not None:
-            self.connection.close()
-            self.connection = None
-            logger.debug("Database connection closed")
+        """Close all database connections, including other threads'."""
+        with self._write_lock:
+            with self._pool_lock:
+                connections = list(self._connections.values())
+                self._connections = {}
+                self._generation += 1
+                self._local = threading.local()
+                if self._writer is not None:
+                    connections.append(self._writer)
+                    self._writer = None
+        
+        for conn in connections:
+            conn.close()
+        if connections:
+            logger.debug("Database connections closed")
     
     def _initialize_schema(self) -> None:
         """
@@ -133,11 +308,16 @@ class VersionDatabase:
                 row = cursor.fetchone()
                 if row and row[0] == self.SCHEMA_VERSION:
                     logger.debug("Database schema up to date (version %d)", self.SCHEMA_VERSION)
-                    return
                 else:
                     logger.info("Database schema needs migration")
                     # Future: implement migration logic here
-                    return
+                # Tables added after the initial schema are created idempotently
+                self._create_snapshot_tables(cursor)
+                self._create_filename_index_tables(cursor)
+                self._create_content_signature_tables(cursor)
+                self._create_clause_search_tables(cursor)
+                conn.commit()
+                return
             
             logger.info("Creating database schema (version %d)", self.SCHEMA_VERSION)
             
@@ -212,6 +392,11 @@ class VersionDatabase:
                 )
             """)
             
+            self._create_snapshot_tables(cursor)
+            self._create_filename_index_tables(cursor)
+            self._create_content_signature_tables(cursor)
+            self._create_clause_search_tables(cursor)
+            
             # Insert schema version
             cursor.execute("""
                 INSERT INTO schema_version (version) VALUES (?)
@@ -226,6 +411,165 @@ class VersionDatabase:
                 conn.rollback()
             raise VersionDatabaseError(f"Failed to initialize schema: {e}")
     
+    @staticmethod
+    def _create_snapshot_tables(cursor: sqlite3.Cursor) -> None:
+        """
+        Create the materialized version snapshot table if missing.
+        
+        A snapshot lists, in order, the clause rows that make up a contract
+        at one version, so reconstruction only has to merge the clauses
+        stored after the nearest snapshot.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS version_snapshots (
+                contract_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                clause_id TEXT NOT NULL,
+                PRIMARY KEY (contract_id, version, position),
+                FOREIGN KEY (contract_id) REFERENCES contracts(contract_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+        """)
+    
+    @staticmethod
+    def _create_filename_index_tables(cursor: sqlite3.Cursor) -> None:
+        """
+        Create the contract filename trigram index if missing.
+        
+        ContractIdentityDetector fills these tables lazily and queries them
+        to find filename-similarity candidates without scanning contracts.
+        Rows cascade away with their contract.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS contract_filename_index (
+                contract_id TEXT PRIMARY KEY,
+                stem TEXT NOT NULL,
+                stem_length INTEGER NOT NULL,
+                FOREIGN KEY (contract_id) REFERENCES contracts(contract_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_filename_index_length
+            ON contract_filename_index(stem_length)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS contract_filename_trigrams (
+                trigram TEXT NOT NULL,
+                contract_id TEXT NOT NULL,
+                occurrences INTEGER NOT NULL,
+                PRIMARY KEY (trigram, contract_id),
+                FOREIGN KEY (contract_id) REFERENCES contract_filename_index(contract_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_filename_trigrams_contract
+            ON contract_filename_trigrams(contract_id)
+        """)
+    
+    @staticmethod
+    def _create_content_signature_tables(cursor: sqlite3.Cursor) -> None:
+        """
+        Add the MinHash content signature column and its LSH band index.
+        
+        contracts.content_signature holds the MinHash of a contract's
+        extracted text next to its file_hash. contract_minhash_bands maps each
+        band of that signature to a bucket so near-duplicate contracts can be
+        looked up by equality instead of comparing every signature.
+        """
+        cursor.execute("PRAGMA table_info(contracts)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'content_signature' not in columns:
+            cursor.execute("ALTER TABLE contracts ADD COLUMN content_signature BLOB")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS contract_minhash_bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                contract_id TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, contract_id),
+                FOREIGN KEY (contract_id) REFERENCES contracts(contract_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_minhash_bands_contract
+            ON contract_minhash_bands(contract_id)
+        """)
+    
+    # Clause summary from the stored ClauseBlock metadata, for the search index
+    _CLAUSE_SUMMARY_SQL = """
+        CASE WHEN json_valid({row}.metadata) THEN COALESCE(
+            json_extract({row}.metadata, '$."Clause Summary"'),
+            json_extract({row}.metadata, '$.clause_summary'),
+            ''
+        ) ELSE '' END
+    """
+    
+    @classmethod
+    def _create_clause_search_tables(cls, cursor: sqlite3.Cursor) -> None:
+        """
+        Create the FTS5 clause search index and its sync triggers if missing.
+        
+        clause_search holds the content and summary of every clause row,
+        keyed by the clause's rowid. Triggers on clauses keep it in sync;
+        when the index is first added to an existing database it is filled
+        from the stored clauses. SQLite builds without FTS5 skip the index
+        and clause search is unavailable.
+        """
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name='clause_search'
+        """)
+        if cursor.fetchone() is not None:
+            return
+        
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE clause_search USING fts5(
+                    content, summary, tokenize = 'porter unicode61'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning("Clause search index unavailable: %s", e)
+            return
+        
+        new_summary = cls._CLAUSE_SUMMARY_SQL.format(row='new')
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS clauses_search_insert
+            AFTER INSERT ON clauses BEGIN
+                INSERT INTO clause_search (rowid, content, summary)
+                VALUES (new.rowid, new.content, {new_summary});
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS clauses_search_delete
+            AFTER DELETE ON clauses BEGIN
+                DELETE FROM clause_search WHERE rowid = old.rowid;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS clauses_search_update
+            AFTER UPDATE OF content, metadata ON clauses BEGIN
+                DELETE FROM clause_search WHERE rowid = old.rowid;
+                INSERT INTO clause_search (rowid, content, summary)
+                VALUES (new.rowid, new.content, {new_summary});
+            END
+        """)
+        
+        summary = cls._CLAUSE_SUMMARY_SQL.format(row='clauses')
+        cursor.execute(f"""
+            INSERT INTO clause_search (rowid, content, summary)
+            SELECT rowid, content, {summary} FROM clauses
+        """)
+        if cursor.rowcount > 0:
+            logger.info("Indexed %d existing clauses for search", cursor.rowcount)
+    
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
         """
         Execute a SQL query.
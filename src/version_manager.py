@@ -5,8 +5,10 @@ Manages version numbers and tracks changes for contract versioning.
 Implements Requirements 3.1, 3.2, 3.3, 3.4, 3.5, 3.6, 7.1, 7.2, 7.3, 7.4.
 """
 
+import copy
 import logging
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Dict, Optional, Any
@@ -52,8 +54,16 @@ class VersionManager:
     
     This class implements version management as specified in Requirements 3.1-3.6
     and version reconstruction as specified in Requirements 7.1-7.4.
+    
+    Reconstructed versions are cached (LRU, keyed by contract_id and
+    version). Entries are reused only while the contract's current version
+    and update time are unchanged, since storing a version can mark clauses
+    of earlier versions as deleted.
     """
     
+    # Number of reconstructed versions kept in memory
+    RECONSTRUCT_CACHE_SIZE = 32
+    
     def __init__(self, storage: DifferentialStorage):
         """
         Initialize the version manager.
@@ -62,6 +72,8 @@ class VersionManager:
             storage: DifferentialStorage instance for accessing contract data
         """
         self.storage = storage
+        # (contract_id, version) -> ((current_version, updated_at), reconstructed)
+        self._reconstruct_cache: OrderedDict = OrderedDict()
         logger.debug("VersionManager initialized")
     
     def get_next_version(self, contract_id: str) -> int:
@@ -177,7 +189,7 @@ class VersionManager:
             changed_clause_ids: List[str] = []
             
             # Get existing clauses to preserve version numbers for unchanged clauses
-            existing_clauses = self.storage.get_clauses(contract_id)
+            existing_clauses = self.storage.get_latest_clauses(contract_id)
             existing_clause_map = {c.clause_identifier: c for c in existing_clauses}
             
             # Process unchanged clauses (Requirement 3.4)
@@ -398,11 +410,12 @@ class VersionManager:
         - 7.4: Include deleted clauses only if they existed at version
         
         Algorithm:
-        1. Retrieve all clauses for the contract
-        2. Filter clauses where clause_version <= requested_version
-        3. Exclude clauses marked as deleted at or before requested_version
-        4. Group by clause identifier, take the latest version <= requested_version
-        5. Assemble into complete contract structure
+        1. Return a copy of the cached reconstruction if the contract has not
+           changed since it was built
+        2. Select in storage, per clause identifier, the latest clause with
+           clause_version <= requested_version that is not deleted
+           (DifferentialStorage.get_clauses_at_version)
+        3. Assemble into complete contract structure and cache it
         
         Args:
             contract_id: ID of the contract
@@ -433,38 +446,19 @@ class VersionManager:
                     f"Invalid version {version}. Must be between 1 and {contract.current_version}"
                 )
             
-            # Get all clauses for the contract
-            all_clauses = self.storage.get_clauses(contract_id)
+            cache_key = (contract_id, version)
+            stamp = (contract.current_version, contract.updated_at)
+            cached = self._reconstruct_cache.get(cache_key)
+            if cached is not None and cached[0] == stamp:
+                self._reconstruct_cache.move_to_end(cache_key)
+                logger.debug("Reconstruction cache hit: %s v%d", contract_id, version)
+                return copy.deepcopy(cached[1])
             
-            # Filter clauses for the requested version
             # Requirement 7.2: Include clauses created at or before version
             # Requirement 7.3: Exclude clauses added after version
-            version_clauses = [
-                c for c in all_clauses
-                if c.clause_version <= version
-            ]
-            
             # Requirement 7.4: Exclude clauses deleted at or before version
-            # Keep only clauses that are not deleted or were deleted after this version
-            active_clauses = []
-            for clause in version_clauses:
-                if not clause.is_deleted:
-                    active_clauses.append(clause)
-                elif clause.deleted_at and clause.deleted_at > datetime.now():
-                    # Clause was deleted in the future (shouldn't happen, but handle it)
-                    active_clauses.append(clause)
-            
-            # Group by clause identifier and take the latest version <= requested_version
-            clause_map: Dict[str, Clause] = {}
-            for clause in active_clauses:
-                identifier = clause.clause_identifier
-                
-                if identifier not in clause_map:
-                    clause_map[identifier] = clause
-                else:
-                    # Keep the clause with the higher version number
-                    if clause.clause_version > clause_map[identifier].clause_version:
-                        clause_map[identifier] = clause
+            # One clause per identifier: the latest version <= requested_version
+            version_clauses = self.storage.get_clauses_at_version(contract_id, version)
             
             # Get version metadata
             version_metadata = self.get_version_metadata(contract_id, version)
@@ -484,7 +478,7 @@ class VersionManager:
                         "metadata": clause.metadata,
                         "created_at": clause.created_at.isoformat()
                     }
-                    for clause in clause_map.values()
+                    for clause in version_clauses
                 ],
                 "version_metadata": version_metadata.to_dict() if version_metadata else None,
                 "reconstructed_at": datetime.now().isoformat()
@@ -492,10 +486,15 @@ class VersionManager:
             
             logger.info(
                 "Reconstruction complete: %d clauses at version %d",
-                len(clause_map),
+                len(version_clauses),
                 version
             )
             
+            self._reconstruct_cache[cache_key] = (stamp, copy.deepcopy(reconstructed))
+            self._reconstruct_cache.move_to_end(cache_key)
+            while len(self._reconstruct_cache) > self.RECONSTRUCT_CACHE_SIZE:
+                self._reconstruct_cache.popitem(last=False)
+            
             return reconstructed
             
         except VersionManagerError:
@@ -0,0 +1,100 @@
+"""
+ChangeComparator similarity benchmark.
+
+Builds clause pairs from the contract fixtures the versioning tests use
+(identical, lightly edited, heavily edited and rewritten clauses) and
+times clause classification with the tiered similarity checks against a
+full SequenceMatcher.ratio() on every pair (the previous behavior).
+
+Usage:
+    python -m tests.benchmarks.benchmark_change_comparator [--clause-chars 4000]
+"""
+
+import argparse
+import difflib
+import random
+import re
+import time
+from pathlib import Path
+
+from src.change_comparator import ChangeComparator
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+EDIT_WORDS = ["shall", "not", "Owner", "Contractor", "sixty", "days", "written", "notice"]
+
+
+def load_clauses(clause_chars: int) -> list:
+    """Split the fixture contract into clause-sized blocks of roughly clause_chars."""
+    text = (FIXTURES / "contract.txt").read_text(encoding="utf-8")
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    clauses, current = [], ""
+    for i in range(len(paragraphs) * 4):
+        current += paragraphs[i % len(paragraphs)] + "\n\n"
+        if len(current) >= clause_chars:
+            clauses.append(current)
+            current = ""
+    return clauses
+
+
+def edit(text: str, fraction: float, rng: random.Random) -> str:
+    words = text.split(" ")
+    for _ in range(max(1, int(len(words) * fraction))):
+        words[rng.randrange(len(words))] = rng.choice(EDIT_WORDS)
+    return " ".join(words)
+
+
+def build_pairs(clauses: list, rng: random.Random) -> list:
+    """Mix of pair types typical between two revisions of a contract."""
+    pairs = []
+    for i, clause in enumerate(clauses):
+        kind = i % 10
+        if kind < 5:
+            pairs.append((clause, clause.replace("  ", " ")))     # unchanged
+        elif kind < 6:
+            pairs.append((clause, edit(clause, 0.01, rng)))      # light edit
+        elif kind < 8:
+            pairs.append((clause, edit(clause, 0.2, rng)))       # heavy edit
+        else:
+            pairs.append((clause, clauses[(i + 3) % len(clauses)]))  # rewritten
+    return pairs
+
+
+def exact_ratio(comparator: ChangeComparator, old: str, new: str) -> float:
+    """Previous behavior: full ratio on every non-empty pair."""
+    norm1, norm2 = comparator.normalize_text(old), comparator.normalize_text(new)
+    return difflib.SequenceMatcher(None, norm1, norm2).ratio()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clause-chars", type=int, default=4000,
+                        help="Approximate length of each clause block")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pairs = build_pairs(load_clauses(args.clause_chars), rng)
+    threshold = ChangeComparator.UNCHANGED_THRESHOLD
+    comparator = ChangeComparator()
+
+    start = time.perf_counter()
+    baseline = [exact_ratio(comparator, old, new) for old, new in pairs]
+    baseline_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tiered = [comparator.calculate_text_similarity(old, new, threshold=threshold)
+              for old, new in pairs]
+    tiered_time = time.perf_counter() - start
+
+    mismatches = sum((a >= threshold) != (b >= threshold) for a, b in zip(baseline, tiered))
+    full_diffs = sum(1 for a, b in zip(baseline, tiered) if a == b and a < 1.0)
+
+    print(f"{len(pairs)} clause pairs, ~{args.clause_chars} chars each")
+    print(f"  full ratio: {baseline_time * 1000:8.1f} ms")
+    print(f"  tiered:     {tiered_time * 1000:8.1f} ms  "
+          f"({baseline_time / tiered_time:.1f}x, {full_diffs} pairs needed the full diff)")
+    print(f"  classification mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+DifferentialStorage write throughput benchmark.
+
+Stores a contract and then a series of versions that each change a
+share of its clause blocks, and reports versions per second and how long
+the write lock is held. Compares the bulk path (rows serialized up front,
+executemany in one short transaction) against row-at-a-time inserts with
+metadata encoded inside the transaction (the previous behavior).
+
+Usage:
+    python -m tests.benchmarks.benchmark_differential_storage [--clauses 300] [--versions 40]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from src.differential_storage import (
+    Clause, Contract, DifferentialStorage, VersionMetadata
+)
+from src.version_database import VersionDatabase
+
+
+def make_clause(contract_id: str, version: int, index: int) -> Clause:
+    """Build a clause roughly the size of a stored category result."""
+    return Clause(
+        clause_id=str(uuid.uuid4()),
+        contract_id=contract_id,
+        clause_version=version,
+        clause_identifier=f"section.category_{index}",
+        content=f"Section {index}.{version}",
+        metadata={
+            "Clause Location": f"Section {index}.{version}",
+            "Clause Summary": f"Summary of category {index} at version {version}. " * 8,
+            "Redline Recommendations": [
+                {"action": "replace", "text": "Revised language. " * 15}
+                for _ in range(2)
+            ],
+        },
+        created_at=datetime.now(),
+        is_deleted=False,
+        deleted_at=None,
+    )
+
+
+def row_at_a_time(storage: DifferentialStorage, contract_id: str, version: int,
+                  clauses: list, metadata: VersionMetadata) -> float:
+    """Previous behavior: one INSERT per clause, JSON encoded under the lock."""
+    with storage.db.write_transaction() as conn:
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.execute("SELECT current_version FROM contracts WHERE contract_id = ?",
+                       (contract_id,))
+        cursor.fetchone()
+        cursor.execute("UPDATE contracts SET current_version = ?, updated_at = ? "
+                       "WHERE contract_id = ?",
+                       (version, datetime.now().isoformat(), contract_id))
+        for clause in clauses:
+            cursor.execute("""
+                INSERT INTO clauses (
+                    clause_id, contract_id, clause_version, clause_identifier,
+                    content, metadata, created_at, is_deleted, deleted_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (clause.clause_id, clause.contract_id, clause.clause_version,
+                  clause.clause_identifier, clause.content, json.dumps(clause.metadata),
+                  clause.created_at.isoformat(), 0, None))
+        cursor.execute("""
+            INSERT INTO version_metadata (
+                contract_id, version, timestamp, changed_clause_ids, change_summary
+            )
+            VALUES (?, ?, ?, ?, ?)
+        """, (contract_id, version, metadata.timestamp.isoformat(),
+              json.dumps(metadata.changed_clause_ids), json.dumps(metadata.change_summary)))
+        if version % storage.SNAPSHOT_INTERVAL == 0:
+            storage._materialize_snapshot(cursor, contract_id, version)
+    return time.perf_counter() - start
+
+
+def run(mode: str, clause_count: int, versions: int, changed: float) -> tuple:
+    """Store one contract and its versions; return (total seconds, lock hold times)."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = VersionDatabase(Path(tmpdir) / "versions.db")
+        storage = DifferentialStorage(db)
+        contract_id = str(uuid.uuid4())
+        now = datetime.now()
+        storage.store_new_contract(
+            Contract(contract_id, "bench.pdf", "hash", 1, now, now),
+            [make_clause(contract_id, 1, i) for i in range(clause_count)]
+        )
+
+        # Time the lock as the span the writer connection is held
+        hold_times = []
+        original = db.write_transaction
+
+        def timed_transaction():
+            class Timed:
+                def __enter__(self):
+                    self.inner = original()
+                    conn = self.inner.__enter__()
+                    self.start = time.perf_counter()
+                    return conn
+
+                def __exit__(self, *exc):
+                    result = self.inner.__exit__(*exc)
+                    hold_times.append(time.perf_counter() - self.start)
+                    return result
+            return Timed()
+
+        db.write_transaction = timed_transaction
+        per_version = max(1, int(clause_count * changed))
+        start = time.perf_counter()
+        for version in range(2, versions + 2):
+            clauses = [make_clause(contract_id, version, (version * 7 + i) % clause_count)
+                       for i in range(per_version)]
+            metadata = VersionMetadata(contract_id, version, datetime.now(),
+                                       [c.clause_id for c in clauses],
+                                       {"modified": len(clauses), "added": 0, "deleted": 0})
+            if mode == "bulk":
+                storage.store_contract_version(contract_id, version, clauses, metadata)
+            else:
+                row_at_a_time(storage, contract_id, version, clauses, metadata)
+        total = time.perf_counter() - start
+        db.close()
+        return total, hold_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clauses", type=int, default=300,
+                        help="Clause blocks per contract")
+    parser.add_argument("--versions", type=int, default=40,
+                        help="Versions to store after the initial one")
+    parser.add_argument("--changed", type=float, default=0.5,
+                        help="Fraction of clause blocks changed per version")
+    args = parser.parse_args()
+
+    print(f"{args.clauses} clauses, {args.versions} versions, "
+          f"{args.changed:.0%} changed per version")
+    for mode in ("row-at-a-time", "bulk"):
+        total, holds = run(mode, args.clauses, args.versions, args.changed)
+        print(f"  {mode:14s} {args.versions / total:8.1f} versions/s   "
+              f"lock held median {statistics.median(holds) * 1000:6.2f} ms, "
+              f"max {max(holds) * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
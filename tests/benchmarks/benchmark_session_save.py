@@ -0,0 +1,93 @@
+"""
+Session save latency benchmark.
+
+Simulates an analysis run that saves the session after every category,
+as the GUI does, and compares the journaled SessionManager against a
+full rewrite of session.json on each save (the previous behavior).
+
+Usage:
+    python -m tests.benchmarks.benchmark_session_save [--sizes 10 60 200]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.session_manager import SessionManager
+
+
+def make_clause_block(index: int) -> dict:
+    """Build a clause block roughly the size of a real category result."""
+    return {
+        "Clause Summary": f"Summary for category {index}. " * 10,
+        "Clause Language": "The Contractor shall indemnify the Owner. " * 60,
+        "Redline Recommendations": [
+            {"action": "replace", "text": "Revised language. " * 20}
+            for _ in range(3)
+        ],
+        "Harmful Language / Policy Conflicts": ["Conflict. " * 15] * 2,
+    }
+
+
+def full_rewrite_save(path: Path, state: dict) -> None:
+    """Previous save strategy: serialize the whole state with indent=2."""
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    temp_path.replace(path)
+
+
+def run_full_rewrite(categories: int) -> list:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "session.json"
+        state = SessionManager(Path(tmpdir))._empty_state()
+        latencies = []
+        for i in range(categories):
+            state["category_results"][f"cat_{i}"] = make_clause_block(i)
+            start = time.perf_counter()
+            full_rewrite_save(path, state)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+
+def run_journaled(categories: int) -> list:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = SessionManager(Path(tmpdir))
+        manager.set_contract_info("contract.pdf", str(Path(tmpdir) / "contract.pdf"))
+        manager.save()
+        latencies = []
+        for i in range(categories):
+            manager.update_category_result(f"cat_{i}", make_clause_block(i))
+            start = time.perf_counter()
+            manager.save()
+            latencies.append(time.perf_counter() - start)
+
+        restored = SessionManager(Path(tmpdir))
+        assert restored.load() and len(restored.category_results) == categories
+        return latencies
+
+
+def summarize(latencies: list) -> str:
+    ms = [x * 1000 for x in latencies]
+    p95 = sorted(ms)[max(0, int(len(ms) * 0.95) - 1)]
+    return (f"total {sum(ms):8.1f} ms  mean {statistics.mean(ms):6.2f} ms  "
+            f"p95 {p95:6.2f} ms  max {max(ms):6.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 60, 200],
+                        help="Category counts to simulate")
+    args = parser.parse_args()
+
+    for categories in args.sizes:
+        print(f"{categories} categories")
+        print(f"  full rewrite: {summarize(run_full_rewrite(categories))}")
+        print(f"  journaled:    {summarize(run_journaled(categories))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Local stand-in for the Anthropic Message Batches API.
+
+Implements the three endpoints batch analysis uses:
+
+    POST /v1/messages/batches                  create a batch
+    GET  /v1/messages/batches/{id}             retrieve its status
+    GET  /v1/messages/batches/{id}/results     download results as JSONL
+
+A batch reports "in_progress" for a configurable number of status checks
+and "ended" afterwards. Each request is answered by a callable given the
+request's params, so tests can derive answers from the prompt. An answer
+of None makes that request "errored". Created batches are kept for
+assertions and survive across client instances, which lets tests simulate
+an application restart between submission and collection.
+
+Usage:
+    with AnthropicBatchServer(lambda params: "NOT FOUND") as server:
+        client = AnthropicClient("test-key", base_url=server.base_url)
+        batch_id = client.submit_batch([...])
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+
+def succeeded(custom_id: str, model: str, text: str) -> Dict[str, Any]:
+    """Build a JSONL result line for a request that succeeded."""
+    return {
+        "custom_id": custom_id,
+        "result": {
+            "type": "succeeded",
+            "message": {
+                "id": f"msg_{custom_id}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": 900,
+                    "output_tokens": 60,
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 120,
+                },
+            },
+        },
+    }
+
+
+def errored(custom_id: str) -> Dict[str, Any]:
+    """Build a JSONL result line for a request that failed."""
+    return {
+        "custom_id": custom_id,
+        "result": {
+            "type": "errored",
+            "error": {
+                "type": "error",
+                "error": {"type": "overloaded_error", "message": "Overloaded"},
+            },
+        },
+    }
+
+
+class AnthropicBatchServer:
+    """Threaded HTTP server emulating Message Batches endpoints."""
+
+    def __init__(self, answer: Callable[[Dict[str, Any]], Optional[str]],
+                 polls_before_end: int = 1):
+        """
+        Args:
+            answer: Called with each request's params; returns the response
+                    text, or None for an errored request
+            polls_before_end: Status checks answered with "in_progress"
+                              before the batch ends
+        """
+        self.answer = answer
+        self.polls_before_end = polls_before_end
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.status_checks = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _batch_json(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        ended = batch["polls"] > self.polls_before_end
+        count = len(batch["requests"])
+        failed = sum(1 for request in batch["requests"]
+                     if self.answer(request["params"]) is None)
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count - failed if ended else 0,
+                "errored": failed if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2026-01-05T10:00:00Z",
+            "expires_at": "2026-01-06T10:00:00Z",
+            "ended_at": "2026-01-05T10:20:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def __enter__(self) -> "AnthropicBatchServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status, payload, content_type="application/json"):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_found(self):
+                self._send_json(404, {
+                    "type": "error",
+                    "error": {"type": "not_found_error", "message": self.path},
+                })
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/v1/messages/batches":
+                    return self._not_found()
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    batch_id = f"msgbatch_{len(fake.batches) + 1:04d}"
+                    fake.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+                    payload = fake._batch_json(batch_id)
+                self._send_json(200, payload)
+
+            def do_GET(self):
+                match = re.fullmatch(r"/v1/messages/batches/([\w-]+)(/results)?",
+                                     self.path.split("?")[0])
+                if not match or match.group(1) not in fake.batches:
+                    return self._not_found()
+                batch_id = match.group(1)
+
+                with fake._lock:
+                    batch = fake.batches[batch_id]
+                    if match.group(2) is None:
+                        batch["polls"] += 1
+                        fake.status_checks += 1
+                        return self._send_json(200, fake._batch_json(batch_id))
+
+                    lines = []
+                    for request in batch["requests"]:
+                        text = fake.answer(request["params"])
+                        if text is None:
+                            lines.append(errored(request["custom_id"]))
+                        else:
+                            lines.append(succeeded(
+                                request["custom_id"], request["params"]["model"], text))
+                body = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+                self._send_json(200, body, content_type="application/binary")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
@@ -0,0 +1,110 @@
+"""
+Local stand-in for the Anthropic Messages API that replays recorded streams.
+
+Each POST to /v1/messages is answered with the next queued server-sent
+event file from anthropic_streams/. Events can be spaced out with a delay
+so time-to-first-token behaviour is observable. Request bodies are kept
+for assertions.
+
+Usage:
+    with AnthropicReplayServer(["text_response.sse"]) as server:
+        client = AnthropicClient("test-key", base_url=server.base_url)
+        client.generate("system", "question", token_callback=print)
+        assert server.requests[0]["stream"] is True
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+STREAMS_DIR = Path(__file__).parent / "anthropic_streams"
+
+
+def load_events(name: str) -> List[bytes]:
+    """
+    Split a recorded .sse file into its events.
+
+    Args:
+        name: File name in anthropic_streams/
+
+    Returns:
+        Raw events, each ending with a blank line
+    """
+    text = (STREAMS_DIR / name).read_text(encoding="utf-8")
+    return [(chunk.strip() + "\n\n").encode("utf-8")
+            for chunk in text.split("\n\n") if chunk.strip()]
+
+
+class AnthropicReplayServer:
+    """Threaded HTTP server replaying queued event streams in order."""
+
+    def __init__(self, streams: List[str], event_delay: float = 0.0):
+        """
+        Args:
+            streams: .sse file names, one per expected request
+            event_delay: Seconds to wait before each event after the first
+        """
+        self.streams = list(streams)
+        self.event_delay = event_delay
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "AnthropicReplayServer":
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with replay._lock:
+                    replay.requests.append(body)
+                    name = replay.streams.pop(0) if replay.streams else None
+
+                if name is None:
+                    payload = json.dumps({
+                        "type": "error",
+                        "error": {"type": "not_found_error", "message": "No stream queued"},
+                    }).encode("utf-8")
+                    self.send_response(404)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for index, event in enumerate(load_events(name)):
+                    if index and replay.event_delay:
+                        time.sleep(replay.event_delay)
+                    self.wfile.write(event)
+                    self.wfile.flush()
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
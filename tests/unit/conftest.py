@@ -0,0 +1,33 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def make_local_client():
+    """
+    Build a LocalModelClient without loading a model.
+
+    Skips __init__, which needs llama-cpp-python and a model file, and sets up
+    the client state through _init_state(). Keyword arguments override the
+    default settings (and set any other attribute, e.g. _model).
+    """
+    from src.local_model_client import LocalModelClient
+
+    def make(parallel_sequences=1, **attrs):
+        client = LocalModelClient.__new__(LocalModelClient)
+        client._init_state(parallel_sequences)
+        client.model_path = None
+        client.model_name = "llama-3.2-3b-q4"
+        client.temperature = 0.0
+        client.n_ctx = 8192
+        client.n_threads = 2
+        client.n_gpu_layers = 0
+        client.gpu_backend = "cpu"
+        for name, value in attrs.items():
+            setattr(client, name, value)
+        return client
+
+    return make
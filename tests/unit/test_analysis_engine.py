@@ -8,6 +8,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from src.analysis_engine import AnalysisEngine
 from src.analysis_models import AnalysisResult, ContractMetadata
+from dataclasses import replace
 from datetime import datetime
 
 
@@ -182,3 +183,204 @@ class TestAnalysisEngine:
         result = engine.validate_api_key()
         
         assert result is False
+
+
+class TestCategoryRequest:
+    """Tests for prepare_category_request() and input hashing."""
+
+    @pytest.fixture
+    def engine(self):
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock(model_name="test-model")
+        engine.ai_client.generate.return_value = "NOT FOUND"
+        engine.knowledge_store = None
+        return engine
+
+    @pytest.fixture
+    def prepared(self):
+        from src.analysis_engine import PreparedContract
+        return PreparedContract(
+            file_path="contract.pdf", contract_text="text", file_info={},
+            section_index=[], exclude_zones=[], indexed=Mock(contract_text="text"),
+        )
+
+    def _retriever(self, section_text):
+        from src.document_retriever import RetrievalResult
+        retriever = Mock()
+        retriever.retrieve_for_category.return_value = [RetrievalResult(
+            section_idx=0, section_header="4.1 Changes", section_text=section_text,
+            combined_score=0.5, found_by=["regex", "keyword"],
+        )]
+        retriever.format_sections_for_ai.return_value = section_text
+        return retriever
+
+    def test_hash_tracks_retrieved_text(self, engine, prepared):
+        """Test that the input hash changes with the retrieved sections only."""
+        cat_key = next(iter(AnalysisEngine.CATEGORY_MAP))
+        with patch('src.document_retriever.DocumentRetriever',
+                   return_value=self._retriever("Owner may order changes.")):
+            first = engine.prepare_category_request(prepared, cat_key)
+            again = engine.prepare_category_request(prepared, cat_key)
+        with patch('src.document_retriever.DocumentRetriever',
+                   return_value=self._retriever("Owner may not order changes.")):
+            changed = engine.prepare_category_request(prepared, cat_key)
+
+        assert first.early_result is None
+        assert first.input_hash == again.input_hash
+        assert first.input_hash != changed.input_hash
+
+    def test_analyze_reuses_prepared_request(self, engine, prepared):
+        """Test that passing a request skips a second retrieval."""
+        cat_key = next(iter(AnalysisEngine.CATEGORY_MAP))
+        retriever = self._retriever("Owner may order changes.")
+        with patch('src.document_retriever.DocumentRetriever', return_value=retriever):
+            request = engine.prepare_category_request(prepared, cat_key)
+            result = engine.analyze_single_category(prepared, cat_key, request=request)
+
+        assert retriever.retrieve_for_category.call_count == 1
+        assert result[2] is None  # AI answered NOT FOUND
+        assert result[3] == request.user_msg
+
+
+class TestRevisionPlan:
+    """Tests for plan_revision() section-level change detection."""
+
+    @pytest.fixture
+    def engine(self):
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock(model_name="test-model")
+        engine.knowledge_store = None
+        return engine
+
+    @staticmethod
+    def contract_text():
+        from pathlib import Path
+        return (Path(__file__).parent.parent / "fixtures" / "contract.txt").read_text()
+
+    @staticmethod
+    def prepare(text):
+        from analyzer.template_patterns import (
+            extract_all_template_clauses, parse_contract_sections
+        )
+        from src.analysis_engine import PreparedContract
+        from src.document_retriever import DocumentRetriever
+
+        sections = parse_contract_sections(text)
+        extracted = extract_all_template_clauses(text, section_index=sections)
+        indexed = DocumentRetriever().index_contract(text, sections, extracted)
+        return PreparedContract(
+            file_path="contract.pdf", contract_text=text, file_info={},
+            section_index=sections, exclude_zones=[], extracted_clauses=extracted,
+            indexed=indexed,
+        )
+
+    def test_identical_revision_changes_nothing(self, engine):
+        """Test that an unchanged contract needs no re-analysis."""
+        old = self.prepare(self.contract_text())
+        plan = engine.plan_revision(old, self.prepare(self.contract_text()))
+
+        assert plan.changed == []
+        assert sorted(plan.unchanged) == sorted(AnalysisEngine.CATEGORY_MAP)
+        engine.ai_client.generate.assert_not_called()
+
+    def test_edit_marks_only_categories_reading_that_section(self, engine):
+        """Test that one edited section re-runs only the categories retrieving it."""
+        old = self.prepare(self.contract_text())
+        new = self.prepare(self.contract_text().replace("sixty (60) days", "thirty (30) days"))
+        plan = engine.plan_revision(old, new)
+
+        assert plan.section_diff.change_summary['modified'] == 1
+        edited = plan.section_diff.modified_sections[0].new_index
+        assert "contract_term_renewal_extensions" in plan.changed
+        assert 0 < len(plan.changed) < len(AnalysisEngine.CATEGORY_MAP) // 2
+        assert set(plan.requests) == set(AnalysisEngine.CATEGORY_MAP)
+        for cat_key in plan.unchanged:
+            request = plan.requests[cat_key]
+            assert request == engine.prepare_category_request(new, cat_key)
+            assert edited not in [r.section_idx for r in request.results]
+
+
+class TestSharedSections:
+    """Tests for multi-category analysis of shared sections."""
+
+    @pytest.fixture
+    def engine(self):
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock(model_name="test-model")
+        engine.knowledge_store = None
+        return engine
+
+    @pytest.fixture
+    def prepared(self):
+        return TestRevisionPlan.prepare(TestRevisionPlan.contract_text())
+
+    def requests(self, engine, prepared):
+        return [engine.prepare_category_request(prepared, k) for k in AnalysisEngine.CATEGORY_MAP]
+
+    def test_groups_share_a_top_section(self, engine, prepared):
+        """Test that grouped categories lead with the group's section, once each."""
+        requests = self.requests(engine, prepared)
+        section_map = engine.section_category_map(requests)
+        groups = engine.group_shared_sections(prepared, requests)
+
+        grouped = [k for g in groups for k in g.cat_keys]
+        assert groups and len(grouped) == len(set(grouped))
+        for group in groups:
+            assert 3 <= len(group.requests) <= AnalysisEngine._SHARED_GROUP_MAX_CATEGORIES
+            assert set(group.cat_keys) <= set(section_map[group.section_idx])
+            for request in group.requests:
+                assert group.section_idx in [r.section_idx for r in request.results[:2]]
+            assert group.results[0].section_idx == group.section_idx
+            header = group.results[0].section_header.upper()
+            assert group.user_msg.count(f"--- {header} ---") == 1
+            assert all(f'"{k}"' in group.user_msg for k in group.cat_keys)
+
+    def test_groups_fit_small_context(self, engine, prepared):
+        """Test that groups are shortened or split to fit a small local context."""
+        engine.ai_client.context_tokens = 6144
+        engine.ai_client.CONTEXT_SAFETY_TOKENS = 256
+        engine.ai_client.count_tokens = lambda text: len(text) // 3 + 1
+
+        # Sections long enough that the fixed 16000-char budget would overflow
+        requests = self.requests(engine, prepared)
+        for request in filter(None, requests):
+            request.results = [replace(r, section_text=r.section_text * 20) for r in request.results]
+        groups = engine.group_shared_sections(prepared, requests)
+
+        assert groups
+
+        for group in groups:
+            prompt_tokens = engine.ai_client.count_tokens(
+                AnalysisEngine._SHARED_SECTION_SYSTEM_MSG + group.user_msg
+            )
+            output_tokens = AnalysisEngine._PER_ITEM_MAX_TOKENS * len(group.requests)
+            reserved = AnalysisEngine._PROMPT_OVERHEAD_TOKENS + 256
+            assert prompt_tokens + output_tokens + reserved <= 6144
+
+    def test_answer_split_into_category_results(self, engine, prepared):
+        """Test that one multi-category answer becomes per-category results."""
+        import json
+
+        group = engine.group_shared_sections(prepared, self.requests(engine, prepared))[0]
+        found, absent, missing = group.cat_keys[:3]
+        header = group.results[0].section_header.upper()
+        engine.ai_client.generate.side_effect = [
+            json.dumps({found: f"[{header}] Payment is due in 30 days.", absent: "NOT FOUND"}),
+            "NOT FOUND",
+        ]
+
+        outcomes = engine.analyze_shared_group(prepared, group)
+
+        assert set(outcomes) == set(group.cat_keys)
+        blocks = outcomes[found][2]
+        assert blocks[0]["Clause Location"] == header
+        assert blocks[0]["Clause Summary"] == "Payment is due in 30 days."
+        assert outcomes[found][3] == group.user_msg
+        assert outcomes[absent][2] is None
+        # Categories left out of the answer are asked about alone
+        first, second = engine.ai_client.generate.call_args_list[:2]
+        assert first.kwargs["json_schema"]["required"] == group.cat_keys
+        assert second.args[1] == next(r for r in group.requests if r.cat_key == missing).user_msg
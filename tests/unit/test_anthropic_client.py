@@ -0,0 +1,239 @@
+"""
+Unit tests for AnthropicClient streaming, against a local replay server.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+from src.anthropic_client import AnthropicClient
+from tests.fixtures.anthropic_replay_server import AnthropicReplayServer
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    """Keep requests to the replay server off any configured proxy."""
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+
+
+def make_registry(observation="Section 6: ten percent retainage."):
+    """Helper to create a ToolRegistry stand-in with one tool."""
+    tool = MagicMock()
+    tool.name = "search_contract"
+    tool.description = "Search the contract text"
+    tool.parameters = {"query": "Search terms"}
+
+    registry = MagicMock()
+    registry.get_tool_names.return_value = ["search_contract"]
+    registry.get_tool.return_value = tool
+    registry.get_system_prompt.return_value = "system"
+    registry.get_skill_prompt.return_value = "skills"
+    registry.execute.return_value = observation
+    return registry
+
+
+class TestAnthropicClientStreaming:
+    """Test suite for streamed Claude responses."""
+
+    def test_generate_streams_tokens(self):
+        """Test that generate forwards text deltas and returns the full text."""
+        tokens = []
+        with AnthropicReplayServer(["text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            text = client.generate("system", "When is payment due?", token_callback=tokens.append)
+
+        assert tokens == ["Payment is due", " within 30 days", " of an approved invoice (Article 5)."]
+        assert text == "".join(tokens)
+        assert server.requests[0]["stream"] is True
+        assert server.requests[0]["system"][0]["text"] == "system"
+
+    def test_first_token_arrives_before_stream_ends(self):
+        """Test that tokens are delivered while the stream is still open."""
+        arrivals = []
+        with AnthropicReplayServer(["text_response.sse"], event_delay=0.05) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            start = time.perf_counter()
+            client.generate("system", "question",
+                            token_callback=lambda _: arrivals.append(time.perf_counter()))
+            total = time.perf_counter() - start
+
+        assert len(arrivals) == 3
+        assert arrivals[0] - start < total - 0.1
+
+    def test_stream_reports_usage_and_stop_reason(self):
+        """Test that usage and stop reason are read from stream events."""
+        with AnthropicReplayServer(["text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            response = client._stream_message(
+                max_tokens=100, messages=[{"role": "user", "content": "q"}])
+
+        assert response.stop_reason == "end_turn"
+        assert response.usage == {
+            "input_tokens": 412, "output_tokens": 17,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0,
+        }
+        assert response.first_token_seconds is not None
+
+    def test_tool_use_assembled_from_deltas(self):
+        """Test that tool input JSON is assembled across deltas and the loop continues."""
+        tokens = []
+        registry = make_registry()
+        with AnthropicReplayServer(["tool_use_response.sse", "tool_followup_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            messages = client.process_with_tools(
+                "What is the retainage?", registry, token_callback=tokens.append)
+
+        registry.execute.assert_called_once_with("search_contract", {"query": "retainage"})
+        assert [m["role"] for m in messages] == ["assistant", "tool_call", "observation", "assistant"]
+        assert messages[-1]["content"] == "Ten percent retainage is withheld until final completion."
+        assert "".join(tokens).startswith("Let me search the contract.")
+
+        # The second request carries the assembled tool_use block and its result
+        followup = server.requests[1]["messages"]
+        assert followup[-2]["content"][1] == {
+            "type": "tool_use", "id": "toolu_01Replay",
+            "name": "search_contract", "input": {"query": "retainage"},
+        }
+        assert followup[-1]["content"][0]["tool_use_id"] == "toolu_01Replay"
+        assert followup[-1]["content"][0]["content"] == "Section 6: ten percent retainage."
+
+    def test_api_error_surfaces_in_tool_loop(self):
+        """Test that a failed request becomes an error message."""
+        with AnthropicReplayServer([]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client._client = client._client.with_options(max_retries=0)
+            messages = client.process_with_tools("question", make_registry())
+
+        assert messages[0]["role"] == "error"
+
+
+def count_breakpoints(request):
+    """Count cache_control markers anywhere in a request body."""
+    if isinstance(request, dict):
+        return ("cache_control" in request) + sum(count_breakpoints(v) for v in request.values())
+    if isinstance(request, list):
+        return sum(count_breakpoints(v) for v in request)
+    return 0
+
+
+class TestAnthropicPromptCaching:
+    """Test suite for prompt caching request shape and accounting."""
+
+    def test_generate_marks_system_and_context(self):
+        """Test cache breakpoints on the system prompt and cached context."""
+        with AnthropicReplayServer(["text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client.generate("system", "question", cached_context="CONTRACT TEXT")
+
+        request = server.requests[0]
+        assert request["system"] == [
+            {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+        ]
+        content = request["messages"][0]["content"]
+        assert content[0] == {
+            "type": "text", "text": "CONTRACT TEXT", "cache_control": {"type": "ephemeral"}
+        }
+        assert content[1] == {"type": "text", "text": "question"}
+
+    def test_process_query_caches_contract_text(self):
+        """Test that chat questions follow the cached contract context."""
+        with AnthropicReplayServer(["text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client.process_query("When is payment due?", {"contract_text": "Article 5 ..."})
+
+        content = server.requests[0]["messages"][0]["content"]
+        assert content[0]["text"].startswith("CONTRACT TEXT:\nArticle 5")
+        assert "cache_control" in content[0]
+        assert "QUESTION: When is payment due?" in content[1]["text"]
+
+    def test_tool_loop_breakpoints(self):
+        """Test tool, system, skill and latest-message breakpoints on every step."""
+        with AnthropicReplayServer(["tool_use_response.sse", "tool_followup_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client.process_with_tools("What is the retainage?", make_registry())
+
+        for request in server.requests:
+            assert count_breakpoints(request) == 4
+            assert "cache_control" in request["tools"][-1]
+            assert [block["text"] for block in request["system"]] == ["system", "skills"]
+            assert all("cache_control" in block for block in request["system"])
+            assert "cache_control" in request["messages"][-1]["content"][-1]
+
+        # Earlier messages are resent without their old breakpoint
+        assert "cache_control" not in server.requests[1]["messages"][0]["content"][-1]
+
+    def test_empty_prompts_are_not_sent_as_cached_blocks(self):
+        """Test that empty system or skill prompts are left out of the request."""
+        registry = make_registry()
+        registry.get_skill_prompt.return_value = ""
+        with AnthropicReplayServer(["text_response.sse", "text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client.process_with_tools("What is the retainage?", registry)
+            client.generate("", "question")
+
+        assert [block["text"] for block in server.requests[0]["system"]] == ["system"]
+        assert "system" not in server.requests[1]
+
+    def test_cache_usage_reported_by_estimate_cost(self):
+        """Test that cache tokens from the stream reach estimate_cost."""
+        with AnthropicReplayServer(["cache_write_response.sse", "cache_read_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            client.generate("system", "category 1", cached_context="CONTRACT TEXT")
+            client.generate("system", "category 2", cached_context="CONTRACT TEXT")
+
+        assert client.usage_totals["cache_creation_input_tokens"] == 3200
+        assert client.usage_totals["cache_read_input_tokens"] == 3200
+        assert client.usage_totals["input_tokens"] == 2 * 150
+
+        cost = client.estimate_cost(0)
+        assert cost["cache_write_tokens"] == 3200
+        assert cost["cache_read_tokens"] == 3200
+
+    def test_estimate_cost_with_shared_prefix(self):
+        """Test that a cached prefix is priced as one write plus discounted reads."""
+        client = AnthropicClient("test-key")
+
+        uncached = client.estimate_cost(40_000, max_output_tokens=0, calls=10)
+        cached = client.estimate_cost(40_000, max_output_tokens=0, cached_chars=36_000, calls=10)
+
+        assert cached["cache_write_tokens_est"] == 9_000
+        assert cached["cache_read_tokens_est"] == 81_000
+        assert cached["input_tokens_est"] == uncached["input_tokens_est"] == 100_000
+        assert cached["total_cost"] < uncached["total_cost"] / 3
+        assert client.estimate_cost(4000)["cache_write_cost"] == 0
+
+
+class TestAnthropicEarlyStop:
+    """Test suite for cancelling streams with a stop condition."""
+
+    def test_stream_closed_at_not_found(self):
+        """Test that a NOT FOUND answer ends the stream after the first deltas."""
+        from src.early_stop import starts_not_found
+
+        tokens = []
+        with AnthropicReplayServer(["not_found_response.sse"], event_delay=0.02) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            text = client.generate("system", "Liquidated damages?",
+                                   token_callback=tokens.append, stop_condition=starts_not_found)
+
+        assert text == "NOT FOUND"
+        assert tokens == ["NOT", " FOUND"]
+        stats = client.early_stop_stats
+        assert (stats.aborted_calls, stats.completed_calls) == (1, 0)
+        assert stats.tokens_saved > 0
+
+    def test_other_answers_complete(self):
+        """Test that answers not matching the condition stream in full."""
+        from src.early_stop import starts_not_found
+
+        with AnthropicReplayServer(["text_response.sse"]) as server:
+            client = AnthropicClient("test-key", base_url=server.base_url)
+            text = client.generate("system", "When is payment due?", stop_condition=starts_not_found)
+
+        assert text.endswith("(Article 5).")
+        assert client.early_stop_stats.completed_calls == 1
+        assert client.early_stop_stats.completed_tokens == 17
@@ -0,0 +1,176 @@
+"""
+Unit tests for batch analysis, against a local fake Message Batches endpoint.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+from src.analysis_engine import AnalysisEngine, PreparedContract
+from src.anthropic_client import AnthropicClient
+from src.batch_analysis import (
+    BatchAnalysisError, BatchAnalysisRunner, BatchJob, BatchJobTracker
+)
+from tests.fixtures.anthropic_batch_server import AnthropicBatchServer
+
+
+PAYMENT_ANSWER = "Fees are due within thirty (30) days of invoice; late payments accrue 1.5% monthly interest."
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    """Keep requests to the fake server off any configured proxy."""
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+
+
+@pytest.fixture
+def storage_root():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / ".cr2a"
+
+
+def answer(params):
+    """Answer payment categories and report everything else as not found."""
+    category_line = params["messages"][0]["content"].splitlines()[0].lower()
+    return PAYMENT_ANSWER if "payment" in category_line else "NOT FOUND"
+
+
+def prepare(file_path, text=None):
+    """Helper to prepare the fixture contract without file extraction."""
+    from analyzer.template_patterns import extract_all_template_clauses, parse_contract_sections
+    from src.document_retriever import DocumentRetriever
+
+    if text is None:
+        text = (Path(__file__).parent.parent / "fixtures" / "contract.txt").read_text()
+    sections = parse_contract_sections(text)
+    extracted = extract_all_template_clauses(text, section_index=sections)
+    return PreparedContract(
+        file_path=file_path, contract_text=text,
+        file_info={"filename": Path(file_path).name, "file_size_bytes": len(text)},
+        section_index=sections, exclude_zones=[], extracted_clauses=extracted,
+        indexed=DocumentRetriever().index_contract(text, sections, extracted),
+    )
+
+
+def make_runner(server, storage_root):
+    """Helper to create a runner whose engine talks to the fake server."""
+    # Skip __init__, which loads the knowledge store
+    engine = AnalysisEngine.__new__(AnalysisEngine)
+    engine.ai_client = AnthropicClient("test-key", base_url=server.base_url)
+    engine.knowledge_store = None
+    return BatchAnalysisRunner(engine, BatchJobTracker(storage_root))
+
+
+class TestBatchAnalysis:
+    """Test suite for BatchAnalysisRunner and BatchJobTracker."""
+
+    def test_submit_persists_job(self, storage_root):
+        """Test that one batch carries every category of every contract."""
+        contracts = [prepare("a/contract.pdf"), prepare("b/contract.pdf")]
+        with AnthropicBatchServer(answer) as server:
+            runner = make_runner(server, storage_root)
+            job = runner.submit(contracts)
+
+        submitted = server.batches[job.batch_id]["requests"]
+        assert len(server.batches) == 1
+        assert sorted(r["custom_id"] for r in submitted) == sorted(job.requests)
+        assert {entry["file_path"] for entry in job.requests.values()} == {
+            "a/contract.pdf", "b/contract.pdf"}
+        params = submitted[0]["params"]
+        assert params["max_tokens"] == AnalysisEngine._PER_ITEM_MAX_TOKENS
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+        record = json.loads((storage_root / "batches" / f"{job.batch_id}.json").read_text())
+        assert record["status"] == "submitted"
+        assert record["requests"] == job.requests
+
+    def test_resume_and_collect_after_restart(self, storage_root):
+        """Test that a new process finds the pending job and builds results."""
+        with AnthropicBatchServer(answer, polls_before_end=2) as server:
+            make_runner(server, storage_root).submit([prepare("contract.pdf")])
+
+            # Simulated restart: new client, tracker and runner
+            runner = make_runner(server, storage_root)
+            pending = runner.tracker.pending()
+            assert len(pending) == 1
+            sleeps = []
+            job = runner.wait(pending[0], poll_interval=5, sleep=sleeps.append)
+            analyses = runner.collect(job, [prepare("contract.pdf")])
+
+        assert sleeps == [5, 5]
+        assert job.status == "collected"
+        assert runner.tracker.pending() == []
+        assert runner.engine.ai_client.usage_totals["output_tokens"] == 60 * len(job.requests)
+
+        result = analyses["contract.pdf"].to_dict()
+        summaries = json.dumps(result["administrative_and_commercial_terms"])
+        assert PAYMENT_ANSWER in summaries
+
+    def test_errored_requests_are_analyzed_live(self, storage_root):
+        """Test that failed requests are analyzed live and counted."""
+        with AnthropicBatchServer(lambda params: None, polls_before_end=0) as server:
+            runner = make_runner(server, storage_root)
+            job = runner.wait(runner.submit([prepare("contract.pdf")]), sleep=lambda _: None)
+
+            runner.engine.analyze_single_category = Mock(return_value=None)
+            analyses = runner.collect(job, [prepare("contract.pdf")])
+
+        assert set(job.results.values()) == {None}
+        assert "contract.pdf" in analyses
+        assert sorted(job.failed) == sorted(job.requests)
+        assert runner.engine.analyze_single_category.call_count == len(job.requests)
+        assert runner.tracker.load(job.batch_id).failed == job.failed
+
+    def test_changed_prompt_is_analyzed_live(self, storage_root):
+        """Test that answers to outdated prompts are not used."""
+        text = (Path(__file__).parent.parent / "fixtures" / "contract.txt").read_text()
+        with AnthropicBatchServer(answer, polls_before_end=0) as server:
+            runner = make_runner(server, storage_root)
+            job = runner.wait(runner.submit([prepare("contract.pdf", text)]), sleep=lambda _: None)
+
+            runner.engine.analyze_single_category = Mock(return_value=None)
+            edited = prepare("contract.pdf", text.replace("thirty (30) days", "sixty (60) days"))
+            runner.collect(job, [edited])
+
+        live = [c.args[1] for c in runner.engine.analyze_single_category.call_args_list]
+        assert "retainage_progress_payments" in live
+        assert 0 < len(live) < len(job.requests)
+
+    def test_wait_times_out(self, storage_root):
+        """Test that waiting gives up after the timeout."""
+        with AnthropicBatchServer(answer, polls_before_end=100) as server:
+            runner = make_runner(server, storage_root)
+            job = runner.submit([prepare("contract.pdf")])
+            with pytest.raises(BatchAnalysisError):
+                runner.wait(job, timeout=0, sleep=lambda _: None)
+            with pytest.raises(BatchAnalysisError):
+                runner.collect(job, [prepare("contract.pdf")])
+
+    def test_requires_batch_capable_client(self, storage_root):
+        """Test that the local backend is rejected."""
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock(spec=["generate"])
+        with pytest.raises(BatchAnalysisError):
+            BatchAnalysisRunner(engine, BatchJobTracker(storage_root))
+
+    def test_tracker_skips_unreadable_records(self, storage_root):
+        """Test that a corrupt record does not hide other jobs."""
+        tracker = BatchJobTracker(storage_root)
+        tracker.save(BatchJob(batch_id="msgbatch_1", model="m", created_at="2026-01-05T10:00:00"))
+        (storage_root / "batches" / "broken.json").write_text("{", encoding="utf-8")
+
+        assert [job.batch_id for job in tracker.pending()] == ["msgbatch_1"]
+
+    def test_batch_cost_is_discounted(self):
+        """Test that batch pricing halves the estimate."""
+        client = AnthropicClient("test-key")
+        regular = client.estimate_cost(40_000, calls=10)
+        batch = client.estimate_cost(40_000, calls=10, batch=True)
+
+        assert batch["total_cost"] == pytest.approx(regular["total_cost"] / 2, abs=1e-3)
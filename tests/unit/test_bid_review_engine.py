@@ -0,0 +1,126 @@
+"""
+Unit tests for BidReviewEngine.
+
+Tests resumable full reviews: input hashing and reuse of unchanged items.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from analyzer.bid_spec_patterns import BID_ITEM_MAP
+from src.bid_review_engine import BidReviewEngine
+from src.bid_review_models import ChecklistItem
+
+
+CONTRACT_TEXT = (
+    "SECTION 00 21 13 INSTRUCTIONS TO BIDDERS\n"
+    "A bid bond in the amount of 5% of the total bid shall accompany each bid.\n"
+    "Retainage of 10% will be withheld from each progress payment.\n"
+    "Liquidated damages shall be $500 per calendar day.\n"
+)
+
+
+@pytest.fixture
+def ai_client():
+    client = Mock()
+    client.model_name = "test-model"
+    client.generate.return_value = "VALUE: 5%\nLOCATION: Section 00 21 13\nCONFIDENCE: high"
+    return client
+
+
+@pytest.fixture
+def prepared(ai_client):
+    return BidReviewEngine(ai_client).prepare_bid_review(CONTRACT_TEXT, file_path="bid.pdf")
+
+
+class TestBidReviewEngineResume:
+    """Tests for resumable analyze_all_items runs."""
+
+    def test_input_hash_is_stable_and_input_sensitive(self, ai_client, prepared):
+        """Test that the hash depends only on what the AI would see."""
+        engine = BidReviewEngine(ai_client)
+        item_key = next(iter(BID_ITEM_MAP))
+
+        first = engine.item_input_hash(prepared, item_key)
+        assert first == engine.item_input_hash(prepared, item_key)
+
+        changed = engine.prepare_bid_review(CONTRACT_TEXT.replace("5%", "10%"))
+        changed_hashes = {k: engine.item_input_hash(changed, k) for k in BID_ITEM_MAP}
+        original_hashes = {k: engine.item_input_hash(prepared, k) for k in BID_ITEM_MAP}
+        assert changed_hashes != original_hashes
+
+        ai_client.model_name = "other-model"
+        assert engine.item_input_hash(prepared, item_key) != first
+
+    def test_unchanged_items_are_reused(self, ai_client, prepared):
+        """Test that a resumed run only calls the AI for changed or missing items."""
+        engine = BidReviewEngine(ai_client)
+        hashes = {}
+        first = engine.analyze_all_items(
+            prepared, input_hash_callback=lambda k, h: hashes.setdefault(k, h)
+        )
+        assert set(hashes) == set(BID_ITEM_MAP)
+        first_calls = ai_client.generate.call_count
+
+        # Pretend the previous run stopped before the last two items
+        keys = list(BID_ITEM_MAP)
+        reusable = {k: (hashes[k], first[k]) for k in keys[:-2]}
+        reusable[keys[0]] = ("stale", ChecklistItem(value="old"))
+
+        ai_client.generate.reset_mock()
+        item_callback = Mock()
+        resumed = engine.analyze_all_items(
+            prepared, item_callback=item_callback, reusable_items=reusable
+        )
+
+        assert set(resumed) == set(BID_ITEM_MAP)
+        reported = {call.args[0]: call.args[2] for call in item_callback.call_args_list}
+        assert set(reported) == set(BID_ITEM_MAP)
+        assert resumed[keys[1]] is first[keys[1]]
+        assert reported[keys[1]] is first[keys[1]]
+        assert ai_client.generate.call_count <= min(first_calls, 3)
+
+    def test_errors_are_not_marked_done(self, ai_client, prepared):
+        """Test that items that failed are not reported as finished."""
+        ai_client.generate.side_effect = RuntimeError("model crashed")
+        engine = BidReviewEngine(ai_client)
+        done = []
+
+        engine.analyze_all_items(prepared, input_hash_callback=lambda k, h: done.append(k))
+
+        errored = [k for k in BID_ITEM_MAP if k not in done]
+        assert errored
+
+
+class TestBidReviewResponseParsing:
+    """Tests for _parse_single_response()."""
+
+    def test_json_answer(self, ai_client):
+        """Test that the JSON answer the prompt asks for is parsed."""
+        engine = BidReviewEngine(ai_client)
+        item = engine._parse_single_response(
+            '```json\n{"value": "5%", "location": "Section 00 21 13", "page": 3, "notes": "NONE"}\n```',
+            regex_matches=[{"position": 0}],
+        )
+
+        assert (item.value, item.location, item.page, item.notes) == ("5%", "Section 00 21 13", 3, "")
+        assert item.confidence == "high"
+
+    def test_json_not_found_and_line_format(self, ai_client):
+        """Test empty JSON values and the older line format."""
+        engine = BidReviewEngine(ai_client)
+        empty = engine._parse_single_response(
+            '{"value": "", "location": "UNKNOWN", "page": null, "notes": ""}', regex_matches=[])
+        lines = engine._parse_single_response(
+            "VALUE: 180 calendar days\nLOCATION: Article 3\nPAGE: 7\nNOTES: NONE", regex_matches=[])
+
+        assert (empty.value, empty.confidence, empty.location) == ("NOT FOUND", "not_found", "")
+        assert (lines.value, lines.page, lines.confidence) == ("180 calendar days", 7, "medium")
+
+    def test_requests_json_schema(self, ai_client, prepared):
+        """Test that item extraction asks for the checklist JSON schema."""
+        BidReviewEngine(ai_client).analyze_single_item(prepared, "bid_bond")
+
+        schema = ai_client.generate.call_args.kwargs["json_schema"]
+        assert schema["required"] == ["value", "location", "page", "notes"]
@@ -2,7 +2,8 @@
 Unit tests for ChangeComparator module.
 
 Tests the change comparison functionality including text normalization,
-similarity calculation, clause comparison, and contract diff generation.
+similarity calculation, clause comparison, contract diff generation, and
+section-level diffs of extracted contract text.
 """
 
 import pytest
@@ -12,8 +13,10 @@ from src.change_comparator import (
     ChangeComparator,
     ClauseChangeType,
     ClauseComparison,
-    ContractDiff
+    ContractDiff,
+    SectionDiff
 )
+from analyzer.template_patterns import parse_contract_sections
 from src.analysis_models import (
     ClauseBlock,
     RedlineRecommendation,
@@ -128,6 +131,45 @@ class TestTextSimilarity:
         similarity = comparator.calculate_text_similarity("hello", "")
         assert similarity == 0.0
 
+    def test_threshold_bound_never_below_exact_ratio(self):
+        """Test that shortcut scores are upper bounds of the exact ratio."""
+        comparator = ChangeComparator()
+        base = ("The Contractor shall furnish all labor, materials and equipment "
+                "necessary to complete the Work within thirty days of notice. ")
+        pairs = [
+            (base * 4, base * 4 + "Additional paragraph."),
+            (base * 4, base.replace("thirty", "sixty") * 4),
+            (base * 4, "Payment shall be made within forty-five days of invoice. " * 6),
+            ("abab" * 200, "abab" * 190 + "xyxy" * 10),
+        ]
+        for old, new in pairs:
+            exact = comparator.calculate_text_similarity(old, new)
+            fast = comparator.calculate_text_similarity(
+                old, new, threshold=ChangeComparator.UNCHANGED_THRESHOLD
+            )
+            assert fast >= exact - 1e-9
+            # Classification against the threshold is unaffected
+            assert (fast >= ChangeComparator.UNCHANGED_THRESHOLD) == \
+                (exact >= ChangeComparator.UNCHANGED_THRESHOLD)
+    
+    def test_rewritten_text_skips_full_diff(self, monkeypatch):
+        """Test that clearly different texts are rejected without ratio()."""
+        import difflib
+        comparator = ChangeComparator()
+        old = "The Owner may terminate this Agreement for convenience upon notice. " * 10
+        new = "All disputes shall be resolved by binding arbitration in the county. " * 10
+        
+        def fail_ratio(self):
+            raise AssertionError("full diff should not run")
+        monkeypatch.setattr(difflib.SequenceMatcher, "ratio", fail_ratio)
+        
+        score = comparator.calculate_text_similarity(
+            old, new, threshold=ChangeComparator.UNCHANGED_THRESHOLD
+        )
+        assert score < ChangeComparator.UNCHANGED_THRESHOLD
+        # Identical text short-circuits as well
+        assert comparator.calculate_text_similarity(old, old.upper()) == 1.0
+
 
 class TestClauseComparison:
     """Test clause comparison functionality."""
@@ -189,6 +231,23 @@ class TestClauseComparison:
         assert result.change_type == ClauseChangeType.MODIFIED
         assert result.similarity_score < 0.95
     
+    def test_modified_clause_score_is_exact(self):
+        """Test that a clearly modified clause stores the exact ratio, not a bound."""
+        comparator = ChangeComparator()
+        old_text = "The Owner may terminate this Agreement for convenience upon notice. " * 5
+        new_text = "All disputes shall be resolved by binding arbitration in the county. " * 5
+        
+        old_clause, new_clause = (
+            ClauseBlock(clause_location=text, clause_summary="Test summary",
+                        redline_recommendations=[], harmful_language_policy_conflicts=[])
+            for text in (old_text, new_text)
+        )
+        
+        result = comparator.compare_clauses(old_clause, new_clause, "test_clause")
+        
+        assert result.change_type == ClauseChangeType.MODIFIED
+        assert result.similarity_score == comparator.calculate_text_similarity(old_text, new_text)
+    
     def test_compare_clauses_minor_change_unchanged(self):
         """Test that minor changes (< 5% difference) are classified as unchanged."""
         comparator = ChangeComparator()
@@ -391,5 +450,89 @@ class TestContractComparison:
         assert diff.change_summary['total'] >= 2
 
 
+class TestSectionDiff:
+    """Test section-level comparison of extracted contract text."""
+    
+    OLD_TEXT = (
+        "1.1 Scope. The Contractor shall furnish all labor, materials, equipment\n"
+        "and supervision necessary to complete the Work described herein.\n\n"
+        "1.2 Payment. The Owner shall pay within thirty (30) days of invoice.\n"
+        "Retainage of ten percent applies to each progress payment until final\n"
+        "completion of the Work.\n\n"
+        "1.3 Termination. Either party may terminate this Agreement for cause\n"
+        "upon ten (10) days written notice to the other party.\n\n"
+        "1.4 Insurance. The Contractor shall carry commercial general liability\n"
+        "insurance naming the Owner as an additional insured.\n"
+    )
+    
+    def diff(self, old_text, new_text):
+        comparator = ChangeComparator()
+        return comparator.compare_sections(
+            old_text, parse_contract_sections(old_text),
+            new_text, parse_contract_sections(new_text)
+        )
+    
+    def test_identical_text_is_all_unchanged(self):
+        """Test that identical contracts produce no changes."""
+        diff = self.diff(self.OLD_TEXT, self.OLD_TEXT)
+        
+        assert isinstance(diff, SectionDiff)
+        assert diff.change_summary['unchanged'] == diff.change_summary['total'] > 0
+        assert all(old == new for old, new in diff.unchanged_section_map().items())
+    
+    def test_whitespace_only_changes_are_unchanged(self):
+        """Test that re-extraction whitespace does not count as a change."""
+        new_text = self.OLD_TEXT.replace("thirty (30) days", "thirty  (30)\ndays")
+        diff = self.diff(self.OLD_TEXT, new_text)
+        
+        assert diff.modified_sections == []
+    
+    def test_edited_section_reports_changed_range(self):
+        """Test that an edit is reported as a modified section with its line."""
+        new_text = self.OLD_TEXT.replace("thirty (30) days", "sixty (60) days")
+        diff = self.diff(self.OLD_TEXT, new_text)
+        
+        assert len(diff.modified_sections) == 1
+        change = diff.modified_sections[0]
+        assert change.header.startswith("1.2")
+        assert change.change_type == ClauseChangeType.MODIFIED
+        assert len(change.new_ranges) == 1
+        start, end = change.new_ranges[0]
+        assert new_text[start:end].startswith("1.2 Payment. The Owner shall pay within sixty")
+        assert "Retainage" not in new_text[start:end]
+        old_start, old_end = change.old_ranges[0]
+        assert "thirty (30) days" in self.OLD_TEXT[old_start:old_end]
+        assert diff.change_summary['unchanged'] == 3
+    
+    def test_added_deleted_and_moved_sections(self):
+        """Test insertions, deletions and reordered sections."""
+        sections = self.OLD_TEXT.split("\n\n")
+        scope, payment, termination, insurance = sections
+        new_text = "\n\n".join([
+            scope,
+            insurance,  # moved up
+            payment,
+            "1.5 Warranty. The Contractor warrants the Work against defects in\n"
+            "materials and workmanship for one (1) year after final completion.\n",
+        ])  # termination removed
+        diff = self.diff(self.OLD_TEXT, new_text)
+        
+        assert diff.modified_sections == []
+        assert [c.header[:3] for c in diff.added_sections] == ["1.5"]
+        assert [c.header[:3] for c in diff.deleted_sections] == ["1.3"]
+        moved = diff.unchanged_section_map()
+        assert len(moved) == 3
+        assert any(old != new for old, new in moved.items())
+    
+    def test_renumbered_section_is_modified_not_replaced(self):
+        """Test that a similar section under a new number is paired."""
+        new_text = self.OLD_TEXT.replace("1.3 Termination.", "2.1 Termination.")
+        diff = self.diff(self.OLD_TEXT, new_text)
+        
+        assert diff.added_sections == []
+        assert diff.deleted_sections == []
+        assert [c.header[:3] for c in diff.modified_sections] == ["2.1"]
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
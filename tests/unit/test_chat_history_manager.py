@@ -0,0 +1,170 @@
+"""
+Unit tests for ChatHistoryManager class.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.chat_history_manager import ChatHistoryManager, ChatHistoryError
+
+
+def make_entry(question, contract_file="contract.pdf"):
+    """Helper to create a chat entry for testing."""
+    return ChatHistoryManager.create_chat_entry(
+        question=question,
+        answer=f"answer to {question}",
+        contract_file=contract_file,
+    )
+
+
+class TestChatHistoryManager:
+    """Test suite for ChatHistoryManager class."""
+
+    def test_initialization_creates_log_with_header(self):
+        """Test that a new manager creates a JSON Lines log with a header."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+
+            lines = manager.chat_history_path.read_text(encoding='utf-8').splitlines()
+            assert len(lines) == 1
+            header = json.loads(lines[0])
+            assert header['version'] == ChatHistoryManager.SCHEMA_VERSION
+            assert header['generation']
+
+    def test_append_writes_one_line_per_entry(self):
+        """Test that appends add lines without rewriting earlier ones."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.append_chat(make_entry("q1"))
+            before = manager.chat_history_path.read_bytes()
+            manager.append_chat(make_entry("q2"))
+            after = manager.chat_history_path.read_bytes()
+
+            assert after.startswith(before)
+            assert len(after.splitlines()) == 3
+
+    def test_load_all_chats_chronological(self):
+        """Test that load_all_chats returns entries in append order."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            for i in range(5):
+                manager.append_chat(make_entry(f"q{i}"))
+
+            questions = [c['question'] for c in manager.load_all_chats()]
+            assert questions == [f"q{i}" for i in range(5)]
+
+    def test_get_chats_for_contract_uses_index(self):
+        """Test contract filtering and incremental index catch-up."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.append_chat(make_entry("a1", "a.pdf"))
+            manager.append_chat(make_entry("b1", "b.pdf"))
+            manager.append_chat(make_entry("a2", "a.pdf"))
+
+            chats = manager.get_chats_for_contract("a.pdf")
+            assert [c['question'] for c in chats] == ["a1", "a2"]
+            assert manager.index_path.exists()
+
+            manager.append_chat(make_entry("a3", "a.pdf"))
+            chats = manager.get_chats_for_contract("a.pdf")
+            assert [c['question'] for c in chats] == ["a1", "a2", "a3"]
+            assert manager.get_chats_for_contract("missing.pdf") == []
+
+    def test_get_recent_chats_newest_first(self):
+        """Test that get_recent_chats reads the tail, newest first."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.TAIL_BLOCK_SIZE = 64  # Force several backward reads
+            for i in range(20):
+                manager.append_chat(make_entry(f"q{i}"))
+
+            recent = manager.get_recent_chats(limit=3)
+            assert [c['question'] for c in recent] == ["q19", "q18", "q17"]
+            assert len(manager.get_recent_chats(limit=100)) == 20
+
+    def test_torn_line_is_skipped_and_compacted(self):
+        """Test that a partially written line does not break reads."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.append_chat(make_entry("q1"))
+            with open(manager.chat_history_path, 'ab') as f:
+                f.write(b'{"chat_id": "torn", "quest')
+            manager.append_chat(make_entry("q2"))
+
+            assert [c['question'] for c in manager.load_all_chats()] == ["q1", "q2"]
+            assert len(manager.get_chats_for_contract("contract.pdf")) == 2
+
+            # The damaged line seen by the index schedules a compaction
+            assert manager._compaction_thread is not None
+            manager._compaction_thread.join(timeout=10)
+            assert len(manager.chat_history_path.read_bytes().splitlines()) == 3
+            assert len(manager.get_chats_for_contract("contract.pdf")) == 2
+
+    def test_index_rebuilt_after_compaction(self):
+        """Test that an index from an older log generation is discarded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.append_chat(make_entry("q1", "a.pdf"))
+            manager.append_chat(make_entry("q2", "b.pdf"))
+            manager.get_chats_for_contract("a.pdf")
+            stale_index = manager.index_path.read_text(encoding='utf-8')
+
+            manager.compact()
+            manager.index_path.write_text(stale_index, encoding='utf-8')
+
+            chats = manager.get_chats_for_contract("b.pdf")
+            assert [c['question'] for c in chats] == ["q2"]
+
+    def test_migrates_legacy_json_history(self):
+        """Test that a pre-2.0 chat_history.json is imported once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            legacy = Path(tmpdir) / "chat_history.json"
+            legacy.write_text(json.dumps({
+                "version": "1.0",
+                "project_path": tmpdir,
+                "chats": [make_entry("old1"), make_entry("old2", "b.pdf")],
+            }), encoding='utf-8')
+
+            manager = ChatHistoryManager(legacy)
+
+            assert manager.chat_history_path.suffix == '.jsonl'
+            assert not legacy.exists()
+            assert [c['question'] for c in manager.load_all_chats()] == ["old1", "old2"]
+            assert [c['question'] for c in manager.get_chats_for_contract("b.pdf")] == ["old2"]
+
+    def test_clear_history(self):
+        """Test that clear_history removes all entries."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            manager.append_chat(make_entry("q1"))
+            manager.get_chats_for_contract("contract.pdf")
+
+            manager.clear_history()
+
+            assert manager.load_all_chats() == []
+            assert manager.get_chats_for_contract("contract.pdf") == []
+            assert manager.get_recent_chats() == []
+
+    def test_background_compaction_runs(self):
+        """Test that compact_in_background completes on a worker thread."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl")
+            entry = make_entry("dup")
+            manager.append_chat(entry)
+            manager.append_chat(entry)
+
+            thread = manager.compact_in_background()
+            assert thread is not None
+            thread.join(timeout=10)
+
+            assert len(manager.load_all_chats()) == 1
+
+    def test_append_failure_raises_chat_history_error(self):
+        """Test that unrecoverable append errors surface as ChatHistoryError."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ChatHistoryManager(Path(tmpdir) / "chat_history.jsonl", max_retries=1)
+            with pytest.raises(ChatHistoryError):
+                manager.append_chat({"chat_id": "x", "bad": object()})
@@ -6,9 +6,11 @@ Tests file hashing, filename similarity, and duplicate detection functionality.
 
 import hashlib
 import os
+import random
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from src.contract_identity_detector import ContractIdentityDetector, ContractMatch
 from src.version_database import VersionDatabase
@@ -269,6 +271,179 @@ class TestContractIdentityDetector(unittest.TestCase):
         self.assertGreater(len(matches), 0)
         self.assertEqual(matches[0].match_type, 'hash')
         self.assertEqual(matches[0].contract_id, 'contract_1')
+    
+    def _insert_contract(self, contract_id: str, filename: str) -> None:
+        """Insert a contract row directly, bypassing the detector."""
+        self.db.execute("""
+            INSERT INTO contracts (contract_id, filename, file_hash, current_version)
+            VALUES (?, ?, ?, ?)
+        """, (contract_id, filename, f'hash_{contract_id}', 1))
+        self.db.commit()
+    
+    def test_filename_index_catches_up_with_new_contracts(self):
+        """Test that contracts added after a lookup are indexed on the next one."""
+        self._insert_contract('contract_1', 'lease_agreement.pdf')
+        self.assertEqual(len(self.detector.find_potential_matches('x', 'lease_agreement2.pdf')), 1)
+        
+        self._insert_contract('contract_2', 'lease_agreements.pdf')
+        matches = self.detector.find_potential_matches('x', 'lease_agreement2.pdf')
+        
+        self.assertEqual({m.contract_id for m in matches}, {'contract_1', 'contract_2'})
+        indexed = self.db.execute(
+            "SELECT COUNT(*) FROM contract_filename_index"
+        ).fetchone()[0]
+        self.assertEqual(indexed, 2)
+    
+    def test_filename_index_drops_deleted_contracts(self):
+        """Test that deleting a contract removes its trigrams."""
+        self._insert_contract('contract_1', 'contract_v1.pdf')
+        self.detector.find_potential_matches('x', 'contract_v2.pdf')
+        
+        self.db.execute("DELETE FROM contracts WHERE contract_id = ?", ('contract_1',))
+        self.db.commit()
+        
+        remaining = self.db.execute(
+            "SELECT COUNT(*) FROM contract_filename_trigrams"
+        ).fetchone()[0]
+        self.assertEqual(remaining, 0)
+        self.assertEqual(self.detector.find_potential_matches('x', 'contract_v2.pdf'), [])
+    
+    def test_filename_index_skips_dissimilar_contracts(self):
+        """Test that only trigram candidates are scored with Levenshtein."""
+        self._insert_contract('contract_1', 'contract_v1.pdf')
+        for i in range(50):
+            self._insert_contract(f'other_{i}', f'invoice_{i:03d}.pdf')
+        
+        with patch.object(
+            self.detector, 'calculate_filename_similarity',
+            wraps=self.detector.calculate_filename_similarity
+        ) as similarity:
+            matches = self.detector.find_potential_matches('x', 'contract_v2.pdf')
+        
+        self.assertEqual([m.contract_id for m in matches], ['contract_1'])
+        self.assertEqual(similarity.call_count, 1)
+    
+    def test_filename_index_matches_full_scan(self):
+        """Test that indexed matching returns exactly what a full scan would."""
+        rng = random.Random(34)
+        alphabet = 'abc_'
+        filenames = []
+        for i in range(150):
+            stem = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            filenames.append(f'{stem}.pdf')
+            self._insert_contract(f'contract_{i}', filenames[-1])
+        
+        for query in filenames[:40] + ['.pdf', 'abcabc.docx', 'a.pdf']:
+            expected = sorted(
+                (round(self.detector.calculate_filename_similarity(query, name), 9), f'contract_{i}')
+                for i, name in enumerate(filenames)
+                if self.detector.calculate_filename_similarity(query, name)
+                >= ContractIdentityDetector.FILENAME_SIMILARITY_THRESHOLD
+            )
+            actual = sorted(
+                (round(m.similarity_score, 9), m.contract_id)
+                for m in self.detector.find_potential_matches('x', query)
+            )
+            self.assertEqual(actual, expected, query)
+    
+    def _contract_text(self, seed: int, words: int = 600) -> str:
+        """Generate contract-like text that differs between seeds."""
+        rng = random.Random(seed)
+        vocabulary = [f'term{i}' for i in range(400)]
+        return ' '.join(rng.choice(vocabulary) for _ in range(words))
+    
+    def test_content_signature_ignores_layout(self):
+        """Test that case, whitespace and punctuation do not change the signature."""
+        text = self._contract_text(1)
+        reformatted = text.upper().replace(' ', ',\n  ')
+        
+        signature = self.detector.compute_content_signature(text)
+        
+        self.assertEqual(len(signature), ContractIdentityDetector.MINHASH_PERMUTATIONS * 4)
+        self.assertEqual(signature, self.detector.compute_content_signature(reformatted))
+        self.assertIsNone(self.detector.compute_content_signature('  ...  '))
+    
+    def test_content_similarity_estimate(self):
+        """Test that similar texts score high and unrelated texts score low."""
+        text = self._contract_text(1)
+        words = text.split()
+        words[100] = 'rescanned'
+        
+        original = self.detector.compute_content_signature(text)
+        edited = self.detector.compute_content_signature(' '.join(words))
+        unrelated = self.detector.compute_content_signature(self._contract_text(2))
+        
+        self.assertGreater(self.detector.estimate_content_similarity(original, edited), 0.9)
+        self.assertLess(self.detector.estimate_content_similarity(original, unrelated), 0.2)
+    
+    def test_find_potential_matches_content_match(self):
+        """Test that a re-exported copy with a new hash and name is matched by content."""
+        text = self._contract_text(1)
+        self._insert_contract('contract_1', 'master_agreement.pdf')
+        self._insert_contract('contract_2', 'unrelated.pdf')
+        self.detector.store_content_signature(
+            'contract_1', self.detector.compute_content_signature(text)
+        )
+        self.detector.store_content_signature(
+            'contract_2', self.detector.compute_content_signature(self._contract_text(2))
+        )
+        
+        words = text.split()
+        words[10] = 'ocr'
+        signature = self.detector.compute_content_signature(' '.join(words))
+        matches = self.detector.find_potential_matches('hash_new', 'scan_0001.pdf', signature)
+        
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].contract_id, 'contract_1')
+        self.assertEqual(matches[0].match_type, 'content')
+        self.assertGreaterEqual(
+            matches[0].similarity_score,
+            ContractIdentityDetector.CONTENT_SIMILARITY_THRESHOLD
+        )
+    
+    def test_content_matches_rank_above_filename_matches(self):
+        """Test ordering of content and filename matches, without duplicates."""
+        text = self._contract_text(1)
+        self._insert_contract('contract_1', 'contract_v1.pdf')
+        self._insert_contract('contract_2', 'renamed.pdf')
+        self.detector.store_content_signature(
+            'contract_1', self.detector.compute_content_signature(text)
+        )
+        self.detector.store_content_signature(
+            'contract_2', self.detector.compute_content_signature(text)
+        )
+        
+        matches = self.detector.find_potential_matches(
+            'hash_new', 'contract_v2.pdf', self.detector.compute_content_signature(text)
+        )
+        
+        self.assertEqual(
+            [(m.contract_id, m.match_type) for m in matches],
+            [('contract_1', 'content'), ('contract_2', 'content')]
+        )
+    
+    def test_content_index_built_lazily_and_replaced(self):
+        """Test that signatures written directly are indexed and updates replace bands."""
+        text = self._contract_text(1)
+        self._insert_contract('contract_1', 'a.pdf')
+        self.db.execute(
+            "UPDATE contracts SET content_signature = ? WHERE contract_id = ?",
+            (self.detector.compute_content_signature(text), 'contract_1')
+        )
+        self.db.commit()
+        
+        signature = self.detector.compute_content_signature(text)
+        self.assertEqual(len(self.detector.find_potential_matches('x', 'b.pdf', signature)), 1)
+        
+        self.detector.store_content_signature(
+            'contract_1', self.detector.compute_content_signature(self._contract_text(3))
+        )
+        bands = self.db.execute(
+            "SELECT COUNT(*) FROM contract_minhash_bands WHERE contract_id = ?",
+            ('contract_1',)
+        ).fetchone()[0]
+        self.assertEqual(bands, ContractIdentityDetector.MINHASH_BANDS)
+        self.assertEqual(self.detector.find_potential_matches('x', 'b.pdf', signature), [])
 
 
 if __name__ == '__main__':
@@ -352,6 +352,262 @@ class TestDifferentialStorage:
         assert deleted[0].is_deleted is True
         assert deleted[0].deleted_at is not None
 
+    
+    def test_get_contracts_page_filters_and_sorts(self, storage):
+        """Test paged contract listing with filename filter and sort order."""
+        base = datetime(2024, 1, 1)
+        for i, name in enumerate(["alpha.pdf", "beta_1.pdf", "Alpha_2.pdf", "gamma%.pdf"]):
+            storage.store_new_contract(Contract(
+                contract_id=f"c{i}",
+                filename=name,
+                file_hash=f"hash{i}",
+                current_version=1,
+                created_at=base,
+                updated_at=base.replace(day=i + 1)
+            ), [])
+        
+        page = storage.get_contracts_page(offset=0, limit=2)
+        assert [c.contract_id for c in page] == ["c3", "c2"]
+        page = storage.get_contracts_page(offset=2, limit=2)
+        assert [c.contract_id for c in page] == ["c1", "c0"]
+        
+        by_name = storage.get_contracts_page(sort_by="filename", descending=False)
+        assert [c.filename for c in by_name][:2] == ["alpha.pdf", "Alpha_2.pdf"]
+        
+        assert storage.count_contracts() == 4
+        assert storage.count_contracts("ALPHA") == 2
+        # LIKE wildcards in the filter are matched literally
+        assert storage.count_contracts("_") == 2
+        assert storage.count_contracts("%") == 1
+        
+        with pytest.raises(ValueError):
+            storage.get_contracts_page(sort_by="file_hash")
+    
+    def test_find_contract_by_filename(self, storage, sample_contract, sample_clauses):
+        """Test looking up a contract by its filename."""
+        storage.store_new_contract(sample_contract, sample_clauses)
+        
+        found = storage.find_contract_by_filename("test_contract.pdf")
+        assert found is not None
+        assert found.contract_id == "contract_001"
+        assert storage.find_contract_by_filename("missing.pdf") is None
+    
+    def test_count_versioned_clauses(self, storage, sample_contract, sample_clauses):
+        """Test counting clause identifiers present in several versions."""
+        storage.store_new_contract(sample_contract, sample_clauses)
+        assert storage.count_versioned_clauses("contract_001") == 0
+        
+        modified_clause = Clause(
+            clause_id="clause_003",
+            contract_id="contract_001",
+            clause_version=2,
+            clause_identifier="Section 1",
+            content="Modified clause.",
+            metadata={},
+            created_at=datetime.now(),
+            is_deleted=False,
+            deleted_at=None
+        )
+        version_metadata = VersionMetadata(
+            contract_id="contract_001",
+            version=2,
+            timestamp=datetime.now(),
+            changed_clause_ids=["clause_003"],
+            change_summary={"modified": 1, "added": 0, "deleted": 0}
+        )
+        storage.store_contract_version("contract_001", 2, [modified_clause], version_metadata)
+        
+        assert storage.count_versioned_clauses("contract_001") == 1
+        assert storage.count_versioned_clauses("nonexistent") == 0
+
+
+class TestVersionSnapshots:
+    """Tests for SQL version selection and materialized snapshots."""
+    
+    @staticmethod
+    def reference_selection(all_clauses, version):
+        """Latest non-deleted clause per identifier, selected in Python."""
+        clause_map = {}
+        for clause in all_clauses:
+            if clause.clause_version > version or clause.is_deleted:
+                continue
+            current = clause_map.get(clause.clause_identifier)
+            if current is None or clause.clause_version > current.clause_version:
+                clause_map[clause.clause_identifier] = clause
+        return [c.clause_id for c in clause_map.values()]
+    
+    @staticmethod
+    def make_clause(clause_id, version, identifier, is_deleted=False):
+        return Clause(
+            clause_id=clause_id,
+            contract_id="contract_001",
+            clause_version=version,
+            clause_identifier=identifier,
+            content=f"{identifier} as of version {version}",
+            metadata={},
+            created_at=datetime.now(),
+            is_deleted=is_deleted,
+            deleted_at=datetime.now() if is_deleted else None
+        )
+    
+    def store_history(self, storage, sample_contract, versions):
+        """Store a contract whose later versions modify, add and delete clauses."""
+        latest = {}
+        initial = [self.make_clause(f"s{i}-v1", 1, f"Section {i}") for i in range(6)]
+        latest.update({c.clause_identifier: c for c in initial})
+        storage.store_new_contract(sample_contract, initial)
+        
+        for version in range(2, versions + 1):
+            changed = [self.make_clause(f"s{version % 6}-v{version}", version, f"Section {version % 6}")]
+            if version % 3 == 0:
+                changed.append(self.make_clause(f"new{version}", version, f"Added {version}"))
+            if version % 4 == 0:
+                gone = latest[f"Section {(version + 3) % 6}"]
+                changed.append(self.make_clause(
+                    gone.clause_id, gone.clause_version, gone.clause_identifier, is_deleted=True
+                ))
+            latest.update({c.clause_identifier: c for c in changed if not c.is_deleted})
+            storage.store_contract_version("contract_001", version, changed, VersionMetadata(
+                contract_id="contract_001",
+                version=version,
+                timestamp=datetime.now(),
+                changed_clause_ids=[c.clause_id for c in changed],
+                change_summary={}
+            ))
+    
+    def test_selection_matches_reference_with_snapshots(self, storage, sample_contract):
+        """Test that snapshot-based selection equals filtering every clause."""
+        storage.SNAPSHOT_INTERVAL = 3
+        self.store_history(storage, sample_contract, 14)
+        
+        snapshots = storage.db.execute(
+            "SELECT DISTINCT version FROM version_snapshots ORDER BY version"
+        ).fetchall()
+        assert [row[0] for row in snapshots] == [3, 6, 9, 12]
+        
+        all_clauses = storage.get_clauses("contract_001")
+        for version in range(1, 15):
+            selected = storage.get_clauses_at_version("contract_001", version)
+            assert [c.clause_id for c in selected] == self.reference_selection(all_clauses, version)
+    
+    def test_snapshots_rebuilt_after_deletion(self, storage, sample_contract):
+        """Test that deleting a clause refreshes snapshots of earlier versions."""
+        storage.SNAPSHOT_INTERVAL = 2
+        self.store_history(storage, sample_contract, 3)
+        before = [c.clause_id for c in storage.get_clauses_at_version("contract_001", 2)]
+        
+        # Version 4 deletes a clause stored in version 1
+        storage.store_contract_version("contract_001", 4, [
+            self.make_clause("s1-v1", 1, "Section 1", is_deleted=True)
+        ], VersionMetadata(
+            contract_id="contract_001", version=4, timestamp=datetime.now(),
+            changed_clause_ids=["s1-v1"], change_summary={}
+        ))
+        
+        after = [c.clause_id for c in storage.get_clauses_at_version("contract_001", 2)]
+        assert "s1-v1" in before
+        assert after == [c for c in before if c != "s1-v1"]
+    
+    def test_get_latest_clauses_includes_deleted(self, storage, sample_contract):
+        """Test that the latest clause per identifier is returned even if deleted."""
+        self.store_history(storage, sample_contract, 4)
+        
+        latest = {c.clause_identifier: c for c in storage.get_latest_clauses("contract_001")}
+        
+        assert latest["Section 2"].clause_id == "s2-v2"
+        assert latest["Section 1"].is_deleted  # Deleted by version 4
+        assert latest["Added 3"].clause_id == "new3"
+        assert len(latest) == 7
+
+
+class TestClauseSearch:
+    """Tests for full-text clause search."""
+    
+    @staticmethod
+    def make_clause(clause_id, version, identifier, location, summary="", is_deleted=False):
+        return Clause(
+            clause_id=clause_id,
+            contract_id="contract_001",
+            clause_version=version,
+            clause_identifier=identifier,
+            content=location,
+            metadata={"Clause Location": location, "Clause Summary": summary},
+            created_at=datetime.now(),
+            is_deleted=is_deleted,
+            deleted_at=datetime.now() if is_deleted else None
+        )
+    
+    def store(self, storage, sample_contract):
+        storage.store_new_contract(sample_contract, [
+            self.make_clause("pay-v1", 1, "admin.payment", "Section 5.2",
+                             "Subcontractor is paid only if the owner pays (pay-if-paid)."),
+            self.make_clause("ins-v1", 1, "legal.insurance", "Section 9 Insurance",
+                             "Builder's risk insurance is required."),
+        ])
+    
+    def test_search_matches_summary_with_snippet(self, storage, sample_contract):
+        """Test that clause summaries are searchable and punctuation is not syntax."""
+        self.store(storage, sample_contract)
+        
+        hits = storage.search_clauses("pay-if-paid")
+        
+        assert [h.clause_id for h in hits] == ["pay-v1"]
+        assert hits[0].filename == "test_contract.pdf"
+        assert hits[0].category == "admin.payment"
+        assert hits[0].version == 1
+        assert "[pay-if-paid]" in hits[0].snippet
+        assert storage.search_clauses('"builder\'s risk" section')[0].clause_id == "ins-v1"
+        assert storage.search_clauses("indemnification") == []
+        assert storage.search_clauses('  ""  ') == []
+    
+    def test_search_current_version_only(self, storage, sample_contract):
+        """Test that superseded clause rows are only returned when asked for."""
+        self.store(storage, sample_contract)
+        storage.store_contract_version("contract_001", 2, [
+            self.make_clause("pay-v2", 2, "admin.payment", "Section 5.2",
+                             "Payment is due within 30 days regardless of owner payment."),
+        ], VersionMetadata(
+            contract_id="contract_001", version=2, timestamp=datetime.now(),
+            changed_clause_ids=["pay-v2"], change_summary={}
+        ))
+        
+        assert storage.search_clauses("owner")[0].clause_id == "pay-v2"
+        assert len(storage.search_clauses("owner")) == 1
+        assert {h.clause_id for h in storage.search_clauses("owner", current_only=False)} == {
+            "pay-v1", "pay-v2"
+        }
+    
+    def test_search_skips_deleted_clauses(self, storage, sample_contract, temp_db):
+        """Test that deleted clauses and contracts drop out of the index."""
+        self.store(storage, sample_contract)
+        storage.store_contract_version("contract_001", 2, [
+            self.make_clause("ins-v1", 1, "legal.insurance", "Section 9 Insurance",
+                             "Builder's risk insurance is required.", is_deleted=True),
+        ], VersionMetadata(
+            contract_id="contract_001", version=2, timestamp=datetime.now(),
+            changed_clause_ids=["ins-v1"], change_summary={}
+        ))
+        
+        assert storage.search_clauses("insurance") == []
+        
+        temp_db.execute("DELETE FROM contracts WHERE contract_id = ?", ("contract_001",))
+        temp_db.commit()
+        assert temp_db.execute("SELECT COUNT(*) FROM clause_search").fetchone()[0] == 0
+    
+    def test_index_built_for_existing_database(self, storage, sample_contract, temp_db):
+        """Test that a database created before the index gets its clauses indexed."""
+        self.store(storage, sample_contract)
+        for trigger in ("insert", "delete", "update"):
+            temp_db.execute(f"DROP TRIGGER clauses_search_{trigger}")
+        temp_db.execute("DROP TABLE clause_search")
+        temp_db.commit()
+        temp_db.close()
+        
+        reopened = DifferentialStorage(VersionDatabase(temp_db.db_path))
+        
+        assert [h.clause_id for h in reopened.search_clauses("insurance")] == ["ins-v1"]
+        reopened.close()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+"""
+Unit tests for NOT FOUND detection and early-stopped generation.
+"""
+
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.early_stop import EarlyStopStats, is_not_found, starts_not_found
+
+
+class TestNotFoundHeuristics:
+    """Test suite for starts_not_found() and is_not_found()."""
+
+    @pytest.mark.parametrize("text", [
+        "NOT FOUND", "Not found.", "N/A - no clause", "None found in these sections",
+        "No relevant provisions.", "This clause is not present.",
+        "Here is a summary of the sections:\nNOT FOUND",
+        "The sections cover insurance only; the clause is NOT FOUND here.",
+    ])
+    def test_not_found_answers(self, text):
+        """Test that NOT FOUND signals are recognized complete and streaming."""
+        assert is_not_found(text)
+        assert starts_not_found(text)
+
+    def test_summaries_are_not_stopped(self):
+        """Test that real summaries and late mentions do not trigger."""
+        summary = "[ARTICLE 5 - PAYMENT] Payment is due within 30 days of an approved invoice."
+        late = summary + " " * 150 + "A separate retainage provision was not found."
+
+        for text in (summary, late, "", None):
+            assert not starts_not_found(text)
+            assert not is_not_found(text)
+
+    def test_every_prefix_decision_is_final(self):
+        """Test that a stopped prefix is classified like the full answer."""
+        answer = "NOT FOUND\n\nThe sections describe payment terms but none address damages."
+        stopped = next(answer[:i] for i in range(1, len(answer) + 1) if starts_not_found(answer[:i]))
+
+        assert stopped == "NOT FOUND"
+        assert is_not_found(stopped) == is_not_found(answer)
+
+    def test_marker_only_answers_need_full_text(self):
+        """Test the repeated-marker rule, which only applies to complete answers."""
+        assert is_not_found("[ARTICLE 9]: not-found")
+        assert not starts_not_found("[ARTICLE 9]: not-found")
+
+
+class TestEarlyStopStats:
+    """Test suite for EarlyStopStats estimates."""
+
+    def test_savings_use_average_completed_answer(self):
+        """Test that saved tokens and time are estimated from completed calls."""
+        stats = EarlyStopStats()
+        stats.record_completed(200)
+        stats.record_completed(100)
+        stats.record_aborted(tokens=5, max_tokens=600, decode_seconds=0.4)
+
+        assert stats.tokens_saved == 145
+        assert stats.seconds_saved == pytest.approx(145 * 0.1)
+        assert "1 of 3 answers" in stats.summary()
+
+        stats.reset()
+        assert (stats.aborted_calls, stats.completed_calls, stats.tokens_saved) == (0, 0, 0)
+
+    def test_savings_before_any_completed_call(self):
+        """Test that the token limit bounds the estimate until averages exist."""
+        stats = EarlyStopStats()
+        stats.record_aborted(tokens=3, max_tokens=50, decode_seconds=0.2)
+
+        assert stats.tokens_saved == 47
+
+
+class TestLocalModelEarlyStop:
+    """Test suite for LocalModelClient generation with a stop condition."""
+
+    @pytest.fixture
+    def client(self, make_local_client):
+        return make_local_client(_model_loaded=True)
+
+    @staticmethod
+    def stream(chunks):
+        """Helper to create a llama.cpp-style token stream that records what was consumed."""
+        produced = []
+
+        def generate():
+            for chunk in chunks:
+                produced.append(chunk)
+                yield {"choices": [{"text": chunk}]}
+
+        return generate(), produced
+
+    def test_generation_cancelled_at_not_found(self, client):
+        """Test that the token loop stops once the answer is decided."""
+        filler = [" The", " sections", " describe", " payment", " terms."] * 20
+        stream, produced = self.stream(["NOT", " FOUND"] + filler)
+        client._model = MagicMock(return_value=stream)
+
+        text = client.generate("system", "user", max_tokens=600, stop_condition=starts_not_found)
+
+        assert text == "NOT FOUND"
+        assert len(produced) == 2
+        assert client.early_stop_stats.aborted_calls == 1
+        assert client.early_stop_stats.tokens_saved == 598
+
+    def test_summary_runs_to_completion(self, client):
+        """Test that other answers are generated in full and counted."""
+        chunks = ["Payment", " is", " due", " in", " 30", " days."]
+        client._model = MagicMock(return_value=self.stream(chunks)[0])
+
+        text = client.generate("system", "user", stop_condition=starts_not_found)
+
+        assert text == "".join(chunks)
+        assert client.early_stop_stats.completed_calls == 1
+        assert client.early_stop_stats.completed_tokens == len(chunks)
+
+
+class TestAnalysisEngineEarlyStop:
+    """Test that category analysis requests early stopping."""
+
+    def test_category_call_passes_stop_condition(self):
+        from src.analysis_engine import AnalysisEngine, CategoryRequest, PreparedContract
+
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock()
+        engine.ai_client.generate.return_value = "NOT FOUND"
+        prepared = PreparedContract(file_path="c.pdf", contract_text="text", file_info={},
+                                    section_index=[], exclude_zones=[])
+        request = CategoryRequest(cat_key="change_orders", section_key="s", display_name="Change Orders",
+                                  input_hash="h", user_msg="prompt")
+
+        result = engine.analyze_single_category(prepared, "change_orders", request=request)
+
+        assert engine.ai_client.generate.call_args.kwargs["stop_condition"] is starts_not_found
+        assert result[2] is None
@@ -0,0 +1,150 @@
+"""
+Unit tests for cached GPU probe results.
+"""
+
+import json
+import sys
+
+import pytest
+
+import src.gpu_probe_cache as gpu_probe_cache
+from src.gpu_probe_cache import GpuProbeCache, ProbeResult
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "model.gguf"
+    path.write_bytes(b"GGUF" + b"\0" * 5000)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GpuProbeCache(tmp_path / "gpu_probe_cache.json")
+
+
+def leave_crash_mark(cache, key, monkeypatch):
+    """Simulate a process that died while loading on the GPU."""
+    data = json.loads(cache.cache_path.read_text()) if cache.cache_path.exists() else {}
+    data.setdefault(key, {})["loading_pid"] = 999999
+    cache.cache_path.write_text(json.dumps(data))
+    monkeypatch.setattr(gpu_probe_cache, "_process_alive", lambda pid: False)
+
+
+class TestGpuProbeCache:
+    """Test suite for GpuProbeCache."""
+
+    def test_result_reused_until_something_changes(self, cache, model_file):
+        """Test that results are keyed by model, driver and backend."""
+        key = cache.make_key(model_file, "vulkan", driver_version="31.0.101.5186")
+        cache.record(key, ProbeResult(backend="vulkan", gpu_layers=-1, passed=True))
+
+        assert cache.lookup(key).result.passed
+        assert cache.lookup(cache.make_key(model_file, "vulkan", driver_version="32.0.101.6078")).result is None
+        assert cache.lookup(cache.make_key(model_file, "sycl", driver_version="31.0.101.5186")).result is None
+
+        model_file.write_bytes(b"GGUF" + b"\1" * 5000)
+        assert cache.make_key(model_file, "vulkan", driver_version="31.0.101.5186") != key
+
+    def test_crash_during_load_invalidates(self, cache, model_file, monkeypatch):
+        """Test that a load that killed the process drops the result, then fails the GPU."""
+        key = cache.make_key(model_file, "vulkan", driver_version="1.0")
+        cache.record(key, ProbeResult(backend="vulkan", gpu_layers=-1, passed=True))
+
+        leave_crash_mark(cache, key, monkeypatch)
+        entry = cache.lookup(key)
+        assert (entry.result, entry.crashes) == (None, 1)
+        assert cache.lookup(key).crashes == 1  # the crash is counted once
+
+        leave_crash_mark(cache, key, monkeypatch)
+        entry = cache.lookup(key)
+        assert not entry.result.passed
+        assert "crashed during load" in entry.result.reason
+
+    def test_load_in_progress_elsewhere_is_not_a_crash(self, cache, model_file, monkeypatch):
+        """Test that another live process's mark forces a probe without counting a crash."""
+        key = cache.make_key(model_file, "vulkan", driver_version="1.0")
+        cache.record(key, ProbeResult(backend="vulkan", gpu_layers=-1, passed=True))
+        leave_crash_mark(cache, key, monkeypatch)
+        monkeypatch.setattr(gpu_probe_cache, "_process_alive", lambda pid: True)
+
+        entry = cache.lookup(key)
+
+        assert (entry.result, entry.crashes) == (None, 0)
+
+    def test_unreadable_cache_is_ignored(self, cache, model_file):
+        """Test that a corrupt file behaves like an empty cache."""
+        cache.cache_path.write_text("{not json")
+        key = cache.make_key(model_file, "vulkan", driver_version="1.0")
+
+        assert cache.lookup(key).result is None
+        cache.record(key, ProbeResult(backend="vulkan", gpu_layers=-1, passed=False, reason="test"))
+        assert cache.lookup(key).result.reason == "test"
+
+
+class FakeLlama:
+    """Records constructions and test completions instead of loading a model."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.completions = 0
+        FakeLlama.instances.append(self)
+
+    def create_completion(self, prompt, max_tokens, temperature):
+        self.completions += 1
+        return {"choices": [{"text": "ok"}]}
+
+    def reset(self):
+        pass
+
+
+class TestLocalModelProbeCache:
+    """Test that LocalModelClient skips GPU checks a previous launch passed."""
+
+    @pytest.fixture
+    def make_client(self, tmp_path, model_file, monkeypatch, make_local_client):
+        import src.local_model_client as local_model_client
+
+        monkeypatch.setattr(local_model_client, "Llama", FakeLlama)
+        monkeypatch.setattr("src.hardware_info.get_gpu_driver_version", lambda: "31.0.101.5186")
+        FakeLlama.instances = []
+
+        def make():
+            return make_local_client(
+                model_path=model_file,
+                n_ctx=2048,
+                n_gpu_layers=-1,
+                gpu_backend="vulkan",
+                _probe_cache=GpuProbeCache(tmp_path / "gpu_probe_cache.json"),
+            )
+
+        return make
+
+    def test_second_launch_skips_probe_and_test(self, make_client, monkeypatch):
+        """Test that the subprocess probe and GPU test run only on the first launch."""
+        first, second = make_client(), make_client()
+        monkeypatch.setattr(sys, "frozen", True, raising=False)
+        probes = []
+        monkeypatch.setattr("src.local_model_client.LocalModelClient._probe_gpu_in_subprocess",
+                            lambda self: probes.append(1) or True)
+
+        first.ensure_loaded()
+        second.ensure_loaded()
+
+        assert len(probes) == 1
+        assert [m.completions for m in FakeLlama.instances] == [1, 0]
+        assert all(m.kwargs["n_gpu_layers"] == -1 for m in FakeLlama.instances)
+
+    def test_failed_probe_goes_straight_to_cpu(self, make_client, monkeypatch):
+        """Test that a recorded GPU failure skips the GPU attempt next time."""
+        monkeypatch.setattr(FakeLlama, "create_completion",
+                            lambda self, *a, **k: (_ for _ in ()).throw(OSError("access violation")))
+
+        make_client().ensure_loaded()
+        second = make_client()
+        second.ensure_loaded()
+
+        assert [m.kwargs["n_gpu_layers"] for m in FakeLlama.instances] == [-1, 0, 0]
+        assert second.n_gpu_layers == 0
@@ -56,7 +56,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_called_on_analysis_complete(self):
         """Test that auto-save is called when analysis completes."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -91,7 +91,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_updates_history_tab(self):
         """Test that auto-save updates the History tab with the new record."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -129,7 +129,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_handles_save_error_gracefully(self):
         """Test that auto-save handles save errors without blocking workflow."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -158,7 +158,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_skipped_when_history_store_unavailable(self):
         """Test that auto-save is skipped when history store is unavailable."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             from src.history_store import HistoryStoreError
             mock_history_store.side_effect = HistoryStoreError("Storage directory inaccessible")
             
@@ -182,7 +182,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_skipped_when_history_tab_unavailable(self):
         """Test that auto-save is skipped when history tab is unavailable."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -213,7 +213,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_handles_get_summary_failure(self):
         """Test that auto-save handles get_summary failure gracefully."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -249,7 +249,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_method_exists(self):
         """Test that _auto_save_analysis method exists."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -263,7 +263,7 @@ class TestGUIAutoSave:
     
     def test_auto_save_logs_success(self):
         """Test that auto-save logs success messages."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
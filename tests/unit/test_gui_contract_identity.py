@@ -0,0 +1,79 @@
+"""
+Unit tests for the previously-analyzed-contract prompt in CR2A_GUI.
+
+The prompt is exercised on a stand-in for the window, with QMessageBox
+patched, so the tests do not need the model or the full GUI.
+"""
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+# Ensure QApplication exists for tests
+if not QApplication.instance():
+    app = QApplication(sys.argv)
+
+from src.contract_identity_detector import ContractMatch
+from src.qt_gui import CR2A_GUI
+
+
+def _window(match):
+    """Stand-in window whose identity detector reports the given match."""
+    window = MagicMock()
+    window.current_file = "/contracts/contract.pdf"
+    window._revision_base = None
+    window.contract_identity_detector.find_potential_matches.return_value = [match]
+    return window
+
+
+def _match(match_type):
+    return ContractMatch(
+        contract_id="contract-1",
+        filename="contract.pdf",
+        file_hash="abc123",
+        current_version=2,
+        match_type=match_type,
+        similarity_score=1.0 if match_type == 'hash' else 0.9,
+    )
+
+
+def _prompt(window, choose):
+    """Run the identity prompt, clicking the button labelled choose; return the labels offered."""
+    buttons = {}
+
+    def add_button(label, role):
+        buttons[label] = object()
+        return buttons[label]
+
+    with patch('src.qt_gui.QMessageBox') as box_class:
+        box = box_class.return_value
+        box.addButton.side_effect = add_button
+        box.clickedButton.side_effect = lambda: buttons.get(choose)
+        CR2A_GUI._check_contract_identity(window, SimpleNamespace(contract_text="text"))
+    return list(buttons)
+
+
+class TestContractIdentityPrompt:
+
+    def test_identical_file_is_only_offered_for_reuse(self):
+        match = _match('hash')
+        window = _window(match)
+
+        labels = _prompt(window, "Reuse Stored Analysis")
+
+        assert labels == ["Reuse Stored Analysis", "Different Contract"]
+        window._reuse_stored_analysis.assert_called_once_with(match)
+        assert window._current_contract_id == "contract-1"
+
+    @pytest.mark.parametrize("match_type", ['content', 'filename'])
+    def test_similar_file_can_be_analyzed_as_new_version(self, match_type):
+        window = _window(_match(match_type))
+
+        labels = _prompt(window, "Analyze as New Version")
+
+        assert labels == ["Reuse Stored Analysis", "Analyze as New Version", "Different Contract"]
+        window._reuse_stored_analysis.assert_not_called()
+        assert window._matched_contract.match_type == match_type
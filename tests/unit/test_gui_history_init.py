@@ -24,7 +24,7 @@ class TestGUIHistoryStoreInitialization:
     
     def test_history_store_initialized_successfully(self):
         """Test that HistoryStore is initialized successfully during GUI init."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_instance = MagicMock()
             mock_history_store.return_value = mock_instance
             
@@ -40,7 +40,7 @@ class TestGUIHistoryStoreInitialization:
     
     def test_history_store_error_handled_gracefully(self):
         """Test that HistoryStoreError is handled gracefully without crashing."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             # Simulate HistoryStoreError during initialization
             mock_history_store.side_effect = HistoryStoreError("Storage directory inaccessible")
             
@@ -60,7 +60,7 @@ class TestGUIHistoryStoreInitialization:
     
     def test_unexpected_error_handled_gracefully(self):
         """Test that unexpected errors during HistoryStore init are handled gracefully."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             # Simulate unexpected error
             mock_history_store.side_effect = RuntimeError("Unexpected error")
             
@@ -82,7 +82,7 @@ class TestGUIHistoryStoreInitialization:
         """Test that HistoryStore is initialized before analysis engines."""
         init_order = []
         
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_history_store.return_value = MagicMock()
             
             with patch('src.qt_gui.AnalysisEngine') as mock_analysis_engine:
@@ -113,7 +113,7 @@ class TestGUIHistoryStoreInitialization:
     
     def test_gui_continues_without_history_store(self):
         """Test that GUI continues to function even if HistoryStore fails."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_history_store.side_effect = HistoryStoreError("Failed to create directory")
             
             with patch('src.qt_gui.QMessageBox.warning'):
@@ -33,7 +33,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_added_to_tab_widget(self):
         """Test that History tab is added to the main tab widget."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -53,7 +53,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_has_correct_label(self):
         """Test that History tab has the correct label with emoji."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -68,7 +68,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_signals_connected(self):
         """Test that History tab signals are connected to handler methods."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -90,7 +90,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_not_added_when_store_fails(self):
         """Test that History tab is not added when HistoryStore initialization fails."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             from src.history_store import HistoryStoreError
             mock_history_store.side_effect = HistoryStoreError("Storage directory inaccessible")
             
@@ -111,7 +111,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_added_after_chat_tab(self):
         """Test that History tab is added after the Chat tab (Requirements 2.1)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -128,7 +128,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_on_history_selected_handler_exists(self):
         """Test that on_history_selected handler method exists."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -142,7 +142,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_on_history_deleted_handler_exists(self):
         """Test that on_history_deleted handler method exists."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -156,7 +156,7 @@ class TestGUIHistoryTabIntegration:
     
     def test_history_tab_instance_stored_in_gui(self):
         """Test that the HistoryTab instance is stored in the GUI."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
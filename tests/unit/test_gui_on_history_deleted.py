@@ -33,7 +33,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_deleted_clears_current_analysis_when_match(self):
         """Test that on_history_deleted clears current analysis when deleted record matches."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -59,7 +59,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_deleted_does_not_clear_when_no_match(self):
         """Test that on_history_deleted does not clear current analysis when record_id doesn't match."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -85,7 +85,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_deleted_does_not_clear_when_no_current_analysis(self):
         """Test that on_history_deleted handles case when no analysis is loaded."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -109,7 +109,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_deleted_updates_chat_history(self):
         """Test that on_history_deleted updates chat history when clearing current analysis."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -138,7 +138,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_deleted_clears_analysis_display(self):
         """Test that on_history_deleted clears the analysis display."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -163,7 +163,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_history_selected_sets_record_id(self):
         """Test that on_history_selected sets the current_history_record_id."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
@@ -190,7 +190,7 @@ class TestGUIOnHistoryDeleted:
     
     def test_on_analysis_complete_clears_record_id(self):
         """Test that on_analysis_complete clears the current_history_record_id."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store:
             mock_store_instance = MagicMock()
             mock_history_store.return_value = mock_store_instance
             
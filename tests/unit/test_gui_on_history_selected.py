@@ -49,7 +49,7 @@ class TestOnHistorySelected:
     
     def test_loads_full_analysis_from_history_store(self):
         """Test that handler loads full analysis from HistoryStore (Requirement 4.1)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -71,7 +71,7 @@ class TestOnHistorySelected:
     
     def test_sets_as_current_analysis(self):
         """Test that handler sets loaded analysis as current_analysis (Requirement 4.1)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -96,7 +96,7 @@ class TestOnHistorySelected:
     
     def test_displays_in_analysis_tab(self):
         """Test that handler displays analysis in Analysis tab (Requirement 4.2)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -120,7 +120,7 @@ class TestOnHistorySelected:
     
     def test_enables_chat_tab_for_querying(self):
         """Test that handler enables Chat tab for querying (Requirement 4.3)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -143,7 +143,7 @@ class TestOnHistorySelected:
     
     def test_switches_to_analysis_tab(self):
         """Test that handler switches to Analysis tab (Requirement 4.2)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -168,7 +168,7 @@ class TestOnHistorySelected:
     
     def test_handles_load_error_when_analysis_not_found(self):
         """Test that handler handles load errors when analysis is not found (Requirement 4.4)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -198,7 +198,7 @@ class TestOnHistorySelected:
     
     def test_handles_load_error_with_exception(self):
         """Test that handler handles unexpected exceptions during load (Requirement 4.4)."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -225,7 +225,7 @@ class TestOnHistorySelected:
     
     def test_handles_missing_history_store(self):
         """Test that handler handles case when history_store is None."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             from src.history_store import HistoryStoreError
             mock_history_store_class.side_effect = HistoryStoreError("Storage unavailable")
             
@@ -251,7 +251,7 @@ class TestOnHistorySelected:
     
     def test_sets_current_file_from_metadata(self):
         """Test that handler sets current_file from analysis metadata."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -275,7 +275,7 @@ class TestOnHistorySelected:
     
     def test_updates_status_bar(self):
         """Test that handler updates the status bar with loaded analysis info."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -298,7 +298,7 @@ class TestOnHistorySelected:
     
     def test_logs_successful_load(self):
         """Test that handler logs successful load."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
@@ -328,7 +328,7 @@ class TestOnHistorySelected:
     
     def test_logs_load_error(self):
         """Test that handler logs load errors."""
-        with patch('src.qt_gui.HistoryStore') as mock_history_store_class:
+        with patch('src.qt_gui.SQLiteHistoryStore') as mock_history_store_class:
             mock_store = MagicMock()
             mock_history_store_class.return_value = mock_store
             
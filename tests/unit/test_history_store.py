@@ -9,7 +9,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 
-from src.history_store import HistoryStore, HistoryStoreError
+from src.history_store import HistoryStore, HistoryStoreError, SQLiteHistoryStore
 from src.history_models import AnalysisRecord
 from src.analysis_models import AnalysisResult, ContractMetadata, Clause, Risk
 
@@ -440,3 +440,113 @@ class TestHistoryStore:
             # Both files should exist
             assert (storage_dir / f"{record_id1}.json").exists()
             assert (storage_dir / f"{record_id2}.json").exists()
+
+
+
+class TestSQLiteHistoryStore:
+    """Test suite for SQLiteHistoryStore class."""
+
+    create_sample_analysis_result = TestHistoryStore.create_sample_analysis_result
+
+    def test_initialization_creates_database(self):
+        """Test that SQLiteHistoryStore creates history.db instead of index.json."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage_dir = Path(tmpdir) / "test_history"
+            store = SQLiteHistoryStore(storage_dir)
+
+            assert (storage_dir / "history.db").exists()
+            assert not (storage_dir / "index.json").exists()
+            assert store.count() == 0
+
+    def test_save_and_get_summary(self):
+        """Test that save stores a row whose summary can be read back."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SQLiteHistoryStore(Path(tmpdir))
+
+            record_id = store.save(self.create_sample_analysis_result("contract.pdf"))
+            summary = store.get_summary(record_id)
+
+            assert summary is not None
+            assert summary.filename == "contract.pdf"
+            assert summary.clause_count == 2
+            assert summary.risk_count == 1
+            assert not (Path(tmpdir) / f"{record_id}.json").exists()
+
+    def test_result_blob_is_compressed_round_trip(self):
+        """Test that the stored payload decompresses to the original dict."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SQLiteHistoryStore(Path(tmpdir))
+            analysis = self.create_sample_analysis_result()
+
+            record_id = store.save(analysis)
+            row = store.database.execute(
+                "SELECT result_blob FROM analyses WHERE record_id = ?", (record_id,)
+            ).fetchone()
+
+            assert not bytes(row["result_blob"]).startswith(b"{")
+            assert store._load_analysis_data(record_id) == json.loads(json.dumps(analysis.to_dict()))
+
+    def test_load_page_filters_sorts_and_pages(self):
+        """Test paged queries with filename filter and sorting."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SQLiteHistoryStore(Path(tmpdir))
+            for name in ["alpha.pdf", "beta.pdf", "gamma.pdf", "alpha_v2.pdf"]:
+                store.save(self.create_sample_analysis_result(name))
+
+            assert store.count() == 4
+            assert store.count(filename_filter="ALPHA") == 2
+            assert store.count(filename_filter="%") == 0
+
+            page = store.load_page(offset=0, limit=2, sort_by="filename", descending=False)
+            assert [r.filename for r in page] == ["alpha.pdf", "alpha_v2.pdf"]
+            page = store.load_page(offset=2, limit=2, sort_by="filename", descending=False)
+            assert [r.filename for r in page] == ["beta.pdf", "gamma.pdf"]
+
+            newest = store.load_page(limit=1)
+            assert newest[0].filename == "alpha_v2.pdf"
+
+            with pytest.raises(ValueError):
+                store.load_page(sort_by="clause_count; DROP TABLE analyses")
+
+    def test_load_page_matches_json_backend(self):
+        """Test that the JSON backend's in-memory paging gives the same order."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_store = HistoryStore(Path(tmpdir) / "json")
+            sql_store = SQLiteHistoryStore(Path(tmpdir) / "sql")
+            for name in ["b.pdf", "a.pdf", "c.pdf"]:
+                analysis = self.create_sample_analysis_result(name)
+                json_store.save(analysis)
+                sql_store.save(analysis)
+
+            for store in (json_store, sql_store):
+                page = store.load_page(limit=10, sort_by="filename")
+                assert [r.filename for r in page] == ["c.pdf", "b.pdf", "a.pdf"]
+
+    def test_delete(self):
+        """Test that delete removes the row and reports missing ids."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SQLiteHistoryStore(Path(tmpdir))
+            record_id = store.save(self.create_sample_analysis_result())
+
+            assert store.delete(record_id) is True
+            assert store.get_summary(record_id) is None
+            assert store.delete(record_id) is False
+            assert store.load_all() == []
+
+    def test_migrates_json_layout_once(self):
+        """Test one-time import of index.json records into the database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage_dir = Path(tmpdir)
+            json_store = HistoryStore(storage_dir)
+            id1 = json_store.save(self.create_sample_analysis_result("one.pdf"))
+            id2 = json_store.save(self.create_sample_analysis_result("two.pdf"))
+
+            store = SQLiteHistoryStore(storage_dir)
+            assert {r.id for r in store.load_all()} == {id1, id2}
+            assert store._load_analysis_data(id1)["contract_metadata"]["filename"] == "one.pdf"
+
+            # Deleting after migration must not resurrect the record on reopen
+            store.delete(id1)
+            store.database.close()
+            reopened = SQLiteHistoryStore(storage_dir)
+            assert [r.id for r in reopened.load_all()] == [id2]
@@ -6,12 +6,13 @@ import pytest
 import tempfile
 from pathlib import Path
 from datetime import datetime
+from datetime import timedelta
 from unittest.mock import Mock, patch, MagicMock
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QModelIndex
 
-from src.history_tab import HistoryTab
-from src.history_store import HistoryStore
+from src.history_tab import HistoryTab, HistoryListModel
+from src.history_store import HistoryStore, SQLiteHistoryStore
 from src.history_models import AnalysisRecord
 from src.analysis_models import AnalysisResult, ContractMetadata, Clause, Risk
 
@@ -99,6 +100,17 @@ def sample_analysis_result():
     )
 
 
+def displayed_ids(tab):
+    """Record ids currently loaded in the tab's list model, in display order."""
+    return tab.model.record_ids()
+
+
+def empty_state_shown(tab):
+    """Whether the empty-state message would be visible."""
+    return (tab.empty_label.isVisibleTo(tab)
+            and "No analysis history yet" in tab.empty_label.text())
+
+
 class TestHistoryTab:
     """Test suite for HistoryTab class."""
     
@@ -115,17 +127,8 @@ class TestHistoryTab:
         """Test that empty state message is displayed when no records exist."""
         tab = HistoryTab(history_store)
         
-        # Find the empty label in the layout
-        found_empty_label = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'text') and "No analysis history yet" in widget.text():
-                    found_empty_label = True
-                    break
-        
-        assert found_empty_label, "Empty state message should be displayed"
+        assert empty_state_shown(tab), "Empty state message should be displayed"
+        assert tab.model.rowCount() == 0
     
     def test_refresh_displays_records(self, qapp, history_store, sample_analysis_result):
         """Test that refresh() displays saved records."""
@@ -135,134 +138,49 @@ class TestHistoryTab:
         # Create tab and refresh
         tab = HistoryTab(history_store)
         
-        # Check that record is displayed
-        found_record = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    found_record = True
-                    break
-        
-        assert found_record, "Saved record should be displayed after refresh"
+        assert record_id in displayed_ids(tab), "Saved record should be displayed after refresh"
+        assert not empty_state_shown(tab)
     
-    def test_record_widget_shows_filename(self, qapp, history_store, sample_analysis_result):
-        """Test that record widget displays filename."""
+    def test_record_row_shows_filename(self, qapp, history_store, sample_analysis_result):
+        """Test that the record row displays filename."""
         record_id = history_store.save(sample_analysis_result)
         tab = HistoryTab(history_store)
         
-        # Find the record widget
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        # Check that filename is displayed somewhere in the widget
-        # We need to search through child widgets for labels
-        found_filename = False
-        for child in record_widget.findChildren(type(record_widget)):
-            if hasattr(child, 'text') and "test_contract.pdf" in str(child.text()):
-                found_filename = True
-                break
-        
-        # Alternative: check the widget's string representation or layout
-        # Since we know the implementation uses labels, we can be more specific
-        from PyQt5.QtWidgets import QLabel
-        for label in record_widget.findChildren(QLabel):
-            if "test_contract.pdf" in label.text():
-                found_filename = True
-                break
-        
-        assert found_filename, "Filename should be displayed in record widget"
+        row = tab.model.row_for_id(record_id)
+        assert row >= 0
+        assert "test_contract.pdf" in tab.model.data(tab.model.index(row), Qt.DisplayRole)
     
-    def test_record_widget_shows_date_time(self, qapp, history_store, sample_analysis_result):
-        """Test that record widget displays date and time."""
+    def test_record_row_shows_date_time(self, qapp, history_store, sample_analysis_result):
+        """Test that the record row exposes date and time."""
         record_id = history_store.save(sample_analysis_result)
         tab = HistoryTab(history_store)
         
-        # Find the record widget
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        # Check that date/time is displayed
-        from PyQt5.QtWidgets import QLabel
-        found_datetime = False
-        for label in record_widget.findChildren(QLabel):
-            # The date format is "2024-01-15 10:30:00"
-            if "2024-01-15" in label.text() and "10:30:00" in label.text():
-                found_datetime = True
-                break
-        
-        assert found_datetime, "Date and time should be displayed in record widget"
+        index = tab.model.index(tab.model.row_for_id(record_id))
+        tooltip = tab.model.data(index, Qt.ToolTipRole)
+        
+        # The date format is "2024-01-15 10:30:00"
+        assert "2024-01-15" in tooltip and "10:30:00" in tooltip
     
-    def test_record_widget_shows_clause_count(self, qapp, history_store, sample_analysis_result):
-        """Test that record widget displays clause count."""
+    def test_record_row_shows_clause_count(self, qapp, history_store, sample_analysis_result):
+        """Test that the record row displays clause count."""
         record_id = history_store.save(sample_analysis_result)
         tab = HistoryTab(history_store)
         
-        # Find the record widget
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        # Check that clause count is displayed (should be 3 clauses)
-        from PyQt5.QtWidgets import QLabel
-        found_clause_count = False
-        for label in record_widget.findChildren(QLabel):
-            if "3 clauses" in label.text():
-                found_clause_count = True
-                break
-        
-        assert found_clause_count, "Clause count should be displayed in record widget"
+        index = tab.model.index(tab.model.row_for_id(record_id))
+        
+        # Should be 3 clauses
+        assert "3 clauses" in tab.model.data(index, HistoryListModel.DetailRole)
     
-    def test_record_widget_has_delete_button(self, qapp, history_store, sample_analysis_result):
-        """Test that record widget has a delete button."""
+    def test_delete_button_present(self, qapp, history_store, sample_analysis_result):
+        """Test that the tab has a delete button enabled for the selected record."""
         record_id = history_store.save(sample_analysis_result)
         tab = HistoryTab(history_store)
         
-        # Find the record widget
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        # Check that delete button exists
-        from PyQt5.QtWidgets import QPushButton
-        found_delete_button = False
-        for button in record_widget.findChildren(QPushButton):
-            if "Delete" in button.text():
-                found_delete_button = True
-                break
-        
-        assert found_delete_button, "Delete button should be present in record widget"
+        assert "Delete" in tab.delete_btn.text()
+        assert not tab.delete_btn.isEnabled()
+        
+        assert tab.select_record(record_id)
+        assert tab.delete_btn.isEnabled()
     
     def test_add_record_adds_to_list(self, qapp, history_store, sample_analysis_result):
         """Test that add_record() adds a new record to the list."""
@@ -273,17 +191,7 @@ class TestHistoryTab:
         record = history_store.get_summary(record_id)
         tab.add_record(record)
         
-        # Check that the record is present
-        found_record = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    found_record = True
-                    break
-        
-        assert found_record, "Added record should be present in the list"
+        assert record_id in displayed_ids(tab), "Added record should be present in the list"
     
     def test_add_record_removes_empty_state(self, qapp, history_store, sample_analysis_result):
         """Test that add_record() removes the empty state message."""
@@ -294,97 +202,45 @@ class TestHistoryTab:
         record = history_store.get_summary(record_id)
         tab.add_record(record)
         
-        # Empty state should be gone
-        found_empty_label = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'text') and "No analysis history yet" in widget.text():
-                    found_empty_label = True
-                    break
-        
-        assert not found_empty_label, "Empty state message should be removed after adding record"
+        assert not empty_state_shown(tab), "Empty state message should be removed after adding record"
     
     def test_add_record_maintains_sort_order(self, qapp, history_store):
         """Test that add_record() maintains sort order (newest first)."""
         tab = HistoryTab(history_store)
         
-        # Create three analysis results with different timestamps
-        from datetime import timedelta
-        
-        # First analysis (oldest)
-        metadata1 = ContractMetadata(
-            filename="contract1.pdf",
-            analyzed_at=datetime(2024, 1, 15, 10, 0, 0),
-            page_count=10,
-            file_size_bytes=1024000
-        )
-        result1 = AnalysisResult(
-            metadata=metadata1,
-            clauses=[],
-            risks=[],
-            compliance_issues=[],
-            redlining_suggestions=[]
-        )
+        ids = []
+        for hour in (10, 11, 12):
+            metadata = ContractMetadata(
+                filename=f"contract{hour}.pdf",
+                analyzed_at=datetime(2024, 1, 15, hour, 0, 0),
+                page_count=10,
+                file_size_bytes=1024000
+            )
+            result = AnalysisResult(
+                metadata=metadata,
+                clauses=[],
+                risks=[],
+                compliance_issues=[],
+                redlining_suggestions=[]
+            )
+            # Add records in order (simulating sequential analyses)
+            record_id = history_store.save(result)
+            tab.add_record(history_store.get_summary(record_id))
+            ids.append(record_id)
+        
+        # Verify order: newest first
+        assert displayed_ids(tab) == list(reversed(ids))
+    
+    def test_add_record_replaces_same_filename(self, qapp, history_store, sample_analysis_result):
+        """Test that add_record() replaces an existing entry for the same file."""
+        tab = HistoryTab(history_store)
         
-        # Second analysis (middle)
-        metadata2 = ContractMetadata(
-            filename="contract2.pdf",
-            analyzed_at=datetime(2024, 1, 15, 11, 0, 0),
-            page_count=10,
-            file_size_bytes=1024000
-        )
-        result2 = AnalysisResult(
-            metadata=metadata2,
-            clauses=[],
-            risks=[],
-            compliance_issues=[],
-            redlining_suggestions=[]
-        )
+        first_id = history_store.save(sample_analysis_result)
+        tab.add_record(history_store.get_summary(first_id))
+        second_id = history_store.save(sample_analysis_result)
+        tab.add_record(history_store.get_summary(second_id))
         
-        # Third analysis (newest)
-        metadata3 = ContractMetadata(
-            filename="contract3.pdf",
-            analyzed_at=datetime(2024, 1, 15, 12, 0, 0),
-            page_count=10,
-            file_size_bytes=1024000
-        )
-        result3 = AnalysisResult(
-            metadata=metadata3,
-            clauses=[],
-            risks=[],
-            compliance_issues=[],
-            redlining_suggestions=[]
-        )
-        
-        # Add records in order (simulating sequential analyses)
-        id1 = history_store.save(result1)
-        record1 = history_store.get_summary(id1)
-        tab.add_record(record1)
-        
-        id2 = history_store.save(result2)
-        record2 = history_store.get_summary(id2)
-        tab.add_record(record2)
-        
-        id3 = history_store.save(result3)
-        record3 = history_store.get_summary(id3)
-        tab.add_record(record3)
-        
-        # Collect record IDs in display order
-        displayed_ids = []
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id'):
-                    displayed_ids.append(widget.record_id)
-        
-        # Verify order: newest first (id3, id2, id1)
-        assert len(displayed_ids) == 3, "Should have 3 records displayed"
-        assert displayed_ids[0] == id3, "Newest record should be first"
-        assert displayed_ids[1] == id2, "Middle record should be second"
-        assert displayed_ids[2] == id1, "Oldest record should be last"
+        assert displayed_ids(tab) == [second_id]
     
     def test_remove_record_removes_from_list(self, qapp, history_store, sample_analysis_result):
         """Test that remove_record() removes a record from the list."""
@@ -393,33 +249,12 @@ class TestHistoryTab:
         
         # Create tab (will load the record)
         tab = HistoryTab(history_store)
-        
-        # Verify record is present
-        found_before = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    found_before = True
-                    break
-        
-        assert found_before, "Record should be present before removal"
+        assert record_id in displayed_ids(tab), "Record should be present before removal"
         
         # Remove the record
         tab.remove_record(record_id)
         
-        # Verify record is gone
-        found_after = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    found_after = True
-                    break
-        
-        assert not found_after, "Record should be removed from the list"
+        assert record_id not in displayed_ids(tab), "Record should be removed from the list"
     
     def test_remove_record_shows_empty_state_when_last_removed(self, qapp, history_store, sample_analysis_result):
         """Test that remove_record() shows empty state when last record is removed."""
@@ -432,17 +267,7 @@ class TestHistoryTab:
         # Remove the record
         tab.remove_record(record_id)
         
-        # Empty state should be shown
-        found_empty_label = False
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'text') and "No analysis history yet" in widget.text():
-                    found_empty_label = True
-                    break
-        
-        assert found_empty_label, "Empty state message should be shown when last record is removed"
+        assert empty_state_shown(tab), "Empty state message should be shown when last record is removed"
     
     def test_view_button_emits_signal(self, qapp, history_store, sample_analysis_result):
         """Test that clicking view button emits analysis_selected signal."""
@@ -453,27 +278,23 @@ class TestHistoryTab:
         signal_received = []
         tab.analysis_selected.connect(lambda rid: signal_received.append(rid))
         
-        # Find and click the view button
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
+        tab.select_record(record_id)
+        tab.view_btn.click()
         
-        assert record_widget is not None
+        # Signal should have been emitted with the record_id
+        assert signal_received == [record_id]
+    
+    def test_double_click_emits_signal(self, qapp, history_store, sample_analysis_result):
+        """Test that activating a row emits analysis_selected signal."""
+        record_id = history_store.save(sample_analysis_result)
+        tab = HistoryTab(history_store)
+        
+        signal_received = []
+        tab.analysis_selected.connect(lambda rid: signal_received.append(rid))
         
-        from PyQt5.QtWidgets import QPushButton
-        for button in record_widget.findChildren(QPushButton):
-            if "View" in button.text():
-                button.click()
-                break
+        tab.list_view.doubleClicked.emit(tab.model.index(tab.model.row_for_id(record_id)))
         
-        # Signal should have been emitted with the record_id
-        assert len(signal_received) == 1
-        assert signal_received[0] == record_id
+        assert signal_received == [record_id]
     
     @patch('src.history_tab.QMessageBox.question')
     @patch('src.history_tab.QMessageBox.information')
@@ -484,26 +305,12 @@ class TestHistoryTab:
         record_id = history_store.save(sample_analysis_result)
         tab = HistoryTab(history_store)
         
-        # Find and click the delete button
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        from PyQt5.QtWidgets import QPushButton
-        for button in record_widget.findChildren(QPushButton):
-            if "Delete" in button.text():
-                button.click()
-                break
+        tab.select_record(record_id)
+        tab.delete_btn.click()
         
         # Confirmation dialog should have been shown
         assert mock_question.called
+        assert record_id in displayed_ids(tab)
     
     @patch('src.history_tab.QMessageBox.question')
     @patch('src.history_tab.QMessageBox.information')
@@ -518,27 +325,92 @@ class TestHistoryTab:
         signal_received = []
         tab.analysis_deleted.connect(lambda rid: signal_received.append(rid))
         
-        # Find and click the delete button
-        record_widget = None
-        for i in range(tab.history_layout.count()):
-            item = tab.history_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'record_id') and widget.record_id == record_id:
-                    record_widget = widget
-                    break
-        
-        assert record_widget is not None
-        
-        from PyQt5.QtWidgets import QPushButton
-        for button in record_widget.findChildren(QPushButton):
-            if "Delete" in button.text():
-                button.click()
-                break
+        tab.select_record(record_id)
+        tab.delete_btn.click()
         
         # Signal should have been emitted
-        assert len(signal_received) == 1
-        assert signal_received[0] == record_id
+        assert signal_received == [record_id]
         
         # Record should be removed from storage
         assert history_store.get(record_id) is None
+
+
+class TestHistoryListModelPaging:
+    """Tests for lazy paging, filtering and sorting in the history list."""
+    
+    def _save_many(self, history_store, count):
+        ids = []
+        for i in range(count):
+            metadata = ContractMetadata(
+                filename=f"contract_{i:03d}.pdf",
+                analyzed_at=datetime(2024, 1, 1) + timedelta(minutes=i),
+                page_count=1,
+                file_size_bytes=1000
+            )
+            result = AnalysisResult(
+                metadata=metadata, clauses=[], risks=[],
+                compliance_issues=[], redlining_suggestions=[]
+            )
+            ids.append(history_store.save(result))
+        return ids
+    
+    def test_loads_first_page_only(self, qapp, temp_storage):
+        """Test that only one page is loaded until more is fetched."""
+        store = SQLiteHistoryStore(temp_storage)
+        self._save_many(store, HistoryListModel.PAGE_SIZE + 5)
+        tab = HistoryTab(store)
+        
+        assert tab.model.rowCount() == HistoryListModel.PAGE_SIZE
+        assert tab.model.total_count == HistoryListModel.PAGE_SIZE + 5
+        assert tab.model.canFetchMore(QModelIndex())
+        
+        tab.model.fetchMore(QModelIndex())
+        assert tab.model.rowCount() == HistoryListModel.PAGE_SIZE + 5
+        assert not tab.model.canFetchMore(QModelIndex())
+    
+    def test_search_filters_in_store(self, qapp, temp_storage):
+        """Test that the search box filters through the store."""
+        store = SQLiteHistoryStore(temp_storage)
+        self._save_many(store, 12)
+        tab = HistoryTab(store)
+        
+        tab.search_input.setText("contract_01")
+        tab._apply_query()
+        
+        assert tab.model.total_count == 2
+        assert [tab.model.record_at(r).filename for r in range(tab.model.rowCount())] == [
+            "contract_011.pdf", "contract_010.pdf"
+        ]
+        
+        tab.search_input.setText("no such file")
+        tab._apply_query()
+        assert tab.model.rowCount() == 0
+        assert tab.empty_label.isVisibleTo(tab)
+        assert "No analyses match" in tab.empty_label.text()
+    
+    def test_sort_order_changes_query(self, qapp, temp_storage):
+        """Test that choosing a sort option re-queries in that order."""
+        store = SQLiteHistoryStore(temp_storage)
+        self._save_many(store, 3)
+        tab = HistoryTab(store)
+        
+        tab.sort_combo.setCurrentIndex(1)  # Oldest first
+        assert tab.model.record_at(0).filename == "contract_000.pdf"
+    
+    def test_version_info_is_lazy_and_cached(self, qapp, history_store, sample_analysis_result):
+        """Test that version info is computed on first request only."""
+        history_store.save(sample_analysis_result)
+        calls = []
+        
+        def provider(record):
+            calls.append(record.id)
+            return None
+        
+        model = HistoryListModel()
+        model.set_source(history_store, provider)
+        assert calls == []
+        
+        index = model.index(0)
+        model.data(index, HistoryListModel.VersionInfoRole)
+        model.data(index, HistoryListModel.DetailRole)
+        assert len(calls) == 1
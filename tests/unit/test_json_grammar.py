@@ -0,0 +1,284 @@
+"""
+Unit tests for JSON-schema to GBNF conversion and constrained generation.
+
+llama.cpp is not needed: grammars are checked with a small GBNF matcher
+that supports the constructs schema_to_gbnf() emits.
+"""
+
+import json
+import re
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.json_grammar import (
+    JsonGrammarError, bid_item_response_schema, clause_response_schema,
+    schema_to_gbnf, summary_map_schema
+)
+
+
+ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\", '"': '"', "]": "]", "-": "-", "^": "^"}
+
+
+def _read_char(text, pos):
+    """Read one (possibly escaped) character of a literal or class."""
+    if text[pos] != "\\":
+        return text[pos], pos + 1
+    if text[pos + 1] == "x":
+        return chr(int(text[pos + 2:pos + 4], 16)), pos + 4
+    return ESCAPES[text[pos + 1]], pos + 2
+
+
+def parse_gbnf(grammar):
+    """Parse GBNF text into {rule name: expression tree}."""
+    rules = {}
+    for line in grammar.strip().splitlines():
+        name, body = line.split(" ::= ", 1)
+        node, pos = _parse_alt(body, 0)
+        assert pos == len(body), f"trailing input in rule {name}: {body[pos:]}"
+        rules[name] = node
+    return rules
+
+
+def _skip(text, pos):
+    while pos < len(text) and text[pos] == " ":
+        pos += 1
+    return pos
+
+
+def _parse_alt(text, pos):
+    options = []
+    seq, pos = _parse_seq(text, pos)
+    options.append(seq)
+    while pos < len(text) and text[pos] == "|":
+        seq, pos = _parse_seq(text, _skip(text, pos + 1))
+        options.append(seq)
+    return ("alt", options), pos
+
+
+def _parse_seq(text, pos):
+    items = []
+    pos = _skip(text, pos)
+    while pos < len(text) and text[pos] not in "|)":
+        char = text[pos]
+        if char == '"':
+            literal, pos = "", pos + 1
+            while text[pos] != '"':
+                value, pos = _read_char(text, pos)
+                literal += value
+            node, pos = ("lit", literal), pos + 1
+        elif char == "[":
+            pos += 1
+            negate = text[pos] == "^"
+            pos += negate
+            ranges = []
+            while text[pos] != "]":
+                low, pos = _read_char(text, pos)
+                high = low
+                if text[pos] == "-" and text[pos + 1] != "]":
+                    high, pos = _read_char(text, pos + 1)
+                ranges.append((low, high))
+            node, pos = ("cls", negate, ranges), pos + 1
+        elif char == "(":
+            node, pos = _parse_alt(text, pos + 1)
+            assert text[pos] == ")"
+            pos += 1
+        else:
+            match = re.match(r"[a-z0-9-]+", text[pos:])
+            node, pos = ("ref", match.group()), pos + match.end()
+        if pos < len(text) and text[pos] in "?*+":
+            node = ("rep", node, 1 if text[pos] == "+" else 0, 1 if text[pos] == "?" else None)
+            pos += 1
+        items.append(node)
+        pos = _skip(text, pos)
+    return ("seq", items), pos
+
+
+def _match(rules, node, text, pos):
+    """Yield every end position at which node can match text from pos."""
+    kind = node[0]
+    if kind == "lit":
+        if text.startswith(node[1], pos):
+            yield pos + len(node[1])
+    elif kind == "cls":
+        if pos < len(text):
+            inside = any(low <= text[pos] <= high for low, high in node[2])
+            if inside != node[1]:
+                yield pos + 1
+    elif kind == "ref":
+        yield from _match(rules, rules[node[1]], text, pos)
+    elif kind == "alt":
+        for option in node[1]:
+            yield from _match(rules, option, text, pos)
+    elif kind == "seq":
+        yield from _match_seq(rules, node[1], text, pos)
+    elif kind == "rep":
+        yield from _match_rep(rules, node, text, pos, 0)
+
+
+def _match_seq(rules, items, text, pos):
+    if not items:
+        yield pos
+        return
+    for end in _match(rules, items[0], text, pos):
+        yield from _match_seq(rules, items[1:], text, end)
+
+
+def _match_rep(rules, node, text, pos, count):
+    _, inner, low, high = node
+    if high is None or count < high:
+        for end in _match(rules, inner, text, pos):
+            if end != pos:
+                yield from _match_rep(rules, node, text, end, count + 1)
+    if count >= low:
+        yield pos
+
+
+def accepts(grammar, text):
+    """Whether the grammar's root rule matches all of text."""
+    rules = parse_gbnf(grammar)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 20000))
+    try:
+        return any(end == len(text) for end in _match(rules, rules["root"], text, 0))
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def compact(value):
+    """Serialize the way a constrained model writes JSON."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class TestSchemaToGbnf:
+    """Test suite for schema_to_gbnf()."""
+
+    def test_clause_response_accepts_valid_answers(self):
+        """Test that well-formed per-item answers match the grammar."""
+        grammar = schema_to_gbnf(clause_response_schema())
+        answer = {
+            "found": True, "clause_location": "Article 5", "clause_page": 12,
+            "clause_summary": 'Pay "within" 30 days.é', "flow_down": ["Subcontracts"],
+            "redlines": [{"action": "replace", "text": "45 days"}],
+            "harmful_language": [],
+        }
+
+        assert accepts(grammar, compact(answer))
+        assert accepts(grammar, json.dumps(answer))  # single spaces are allowed
+        assert accepts(grammar, compact({**answer, "found": False, "clause_page": None,
+                                         "redlines": [], "flow_down": []}))
+
+    def test_clause_response_rejects_invalid_answers(self):
+        """Test that schema violations and malformed JSON cannot be produced."""
+        grammar = schema_to_gbnf(clause_response_schema())
+        answer = {
+            "found": True, "clause_location": "Article 5", "clause_page": 12,
+            "clause_summary": "Pay in 30 days.", "flow_down": [],
+            "redlines": [], "harmful_language": [],
+        }
+
+        assert not accepts(grammar, compact(answer)[:-1])  # unclosed
+        assert not accepts(grammar, compact(answer) + "\nHope this helps!")
+        assert not accepts(grammar, compact({**answer, "clause_page": "12"}))
+        assert not accepts(grammar, compact({**answer, "redlines": [{"action": "strike", "text": "x"}]}))
+        assert not accepts(grammar, compact({**answer, "harmful_language": [""]}))
+        assert not accepts(grammar, "{" + compact(answer)[1:].replace('"found":true,', ""))
+        assert not accepts(grammar, compact(answer).replace('"Pay', '"Pay\n'))
+
+    def test_summary_map_requires_every_id(self):
+        """Test that batch summaries must cover each clause ID in order."""
+        grammar = schema_to_gbnf(summary_map_schema(["change_orders_0", "retainage_0"]))
+
+        assert accepts(grammar, '{"change_orders_0":"Written requests.","retainage_0":"5% held."}')
+        assert not accepts(grammar, '{"change_orders_0":"Written requests."}')
+        assert not accepts(grammar, '{"change_orders_0":"Written requests.","retainage_0":""}')
+
+    def test_bid_item_schema_from_checklist_definition(self):
+        """Test that bid answers follow the ChecklistItem-derived schema."""
+        schema = bid_item_response_schema()
+        grammar = schema_to_gbnf(schema)
+
+        assert list(schema["properties"]) == ["value", "location", "page", "notes"]
+        assert accepts(grammar, '{"value":"5%","location":"Section 00 21 13","page":null,"notes":"NONE"}')
+        assert not accepts(grammar, '{"value":"5%","location":"","page":1.5,"notes":""}')
+
+    def test_array_bounds_and_enums(self):
+        """Test minItems/maxItems and enum handling."""
+        grammar = schema_to_gbnf({"type": "object", "properties": {
+            "tags": {"type": "array", "items": {"enum": ["a", "b", 3]}, "minItems": 1, "maxItems": 2},
+        }})
+
+        assert accepts(grammar, '{"tags":["a"]}')
+        assert accepts(grammar, '{"tags":["b",3]}')
+        assert not accepts(grammar, '{"tags":[]}')
+        assert not accepts(grammar, '{"tags":["a","b","a"]}')
+        assert not accepts(grammar, '{"tags":["c"]}')
+
+    def test_unsupported_schemas_rejected(self):
+        """Test that constructs without a grammar translation raise."""
+        with pytest.raises(JsonGrammarError):
+            schema_to_gbnf({"type": "array"})
+        with pytest.raises(JsonGrammarError):
+            schema_to_gbnf({"type": "object", "properties": {"x": {"anyOf": []}}})
+
+
+class TestConstrainedGeneration:
+    """Test suite for LocalModelClient.generate(json_schema=...)."""
+
+    @pytest.fixture
+    def client(self, make_local_client):
+        chunks = ['{"value":', '"5%",', '"location":"", "page":null,"notes":""}']
+        return make_local_client(
+            _model=MagicMock(return_value=[{"choices": [{"text": c}]} for c in chunks]),
+            _model_loaded=True,
+        )
+
+    def test_grammar_compiled_once_and_passed_to_sampler(self, client):
+        """Test that a schema's grammar is built once and used for sampling."""
+        llama_cpp = MagicMock()
+        with patch.dict(sys.modules, {"llama_cpp": llama_cpp}):
+            first = client.generate("system", "user", json_schema=bid_item_response_schema())
+            client._model.return_value = [{"choices": [{"text": "{}"}]}]
+            client.generate("system", "user", json_schema=bid_item_response_schema())
+
+        assert json.loads(first)["value"] == "5%"
+        llama_cpp.LlamaGrammar.from_string.assert_called_once()
+        grammar_text = llama_cpp.LlamaGrammar.from_string.call_args.args[0]
+        assert grammar_text.startswith("root ::= ")
+        assert client._model.call_args.kwargs["grammar"] is llama_cpp.LlamaGrammar.from_string.return_value
+        assert client.json_stats == {"calls": 2, "valid": 2, "invalid": 0, "output_tokens": 4}
+
+    def test_plain_calls_are_unconstrained(self, client):
+        """Test that calls without a schema do not pass a grammar."""
+        client.generate("system", "user")
+
+        assert "grammar" not in client._model.call_args.kwargs
+        assert client.json_stats["calls"] == 0
+
+    def test_missing_grammar_support_falls_back(self, client):
+        """Test that generation still runs when grammars cannot be built."""
+        with patch.dict(sys.modules, {"llama_cpp": None}):
+            text = client.generate("system", "user", json_schema=bid_item_response_schema())
+
+        assert text.startswith('{"value":')
+        assert "grammar" not in client._model.call_args.kwargs
+
+
+class TestPerItemJsonPrompt:
+    """Test the system message sent with the per-item clause schema."""
+
+    def test_constrained_call_asks_for_json(self):
+        """Test that the schema-constrained per-item call does not ask for prose."""
+        from src.analysis_engine import AnalysisEngine
+
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = MagicMock()
+        engine.ai_client.generate.return_value = '{"found": false}'
+        engine._per_item_ai_analysis("ARTICLE 1 - PAYMENT\nOwner pays monthly.", [], {}, [])
+
+        system_msg = engine.ai_client.generate.call_args.args[0]
+        assert engine.ai_client.generate.call_args.kwargs["json_schema"] == clause_response_schema()
+        assert system_msg == AnalysisEngine._PER_ITEM_JSON_SYSTEM_MSG
+        assert "JSON" in system_msg and "plain flowing sentences" not in system_msg
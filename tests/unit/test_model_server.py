@@ -0,0 +1,174 @@
+"""
+Unit tests for the local model server and LocalModelClient's remote mode.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.early_stop import starts_not_found
+from src.local_model_client import LocalModelClient
+from src.model_server import (
+    ModelServer, ModelServerClient, ModelServerError, load_auth_key, parse_address
+)
+
+
+class StubModelClient:
+    """Stands in for the server's LocalModelClient: echoes prompts word by word."""
+
+    model_name = "llama-3.2-3b-q4"
+    n_ctx = 4096
+    n_gpu_layers = 0
+    gpu_backend = "cpu"
+    parallel_sequences = 2
+
+    def __init__(self):
+        self._model_loaded = False
+        self.loads = 0
+        self.unloads = 0
+        self.load_threads = set()
+        self.calls = []
+        self.running = 0
+        self.most_running = 0
+
+    def ensure_loaded(self, progress_callback=None):
+        if not self._model_loaded:
+            self.loads += 1
+            self.load_threads.add(threading.current_thread().name)
+            self._model_loaded = True
+
+    def unload(self):
+        self.unloads += 1
+        self._model_loaded = False
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    def _run_inference(self, system_message, user_message, max_tokens, temperature=None,
+                       token_callback=None, json_schema=None, stop_condition=None):
+        assert self._model_loaded
+        self.calls.append({"user_message": user_message, "max_tokens": max_tokens,
+                           "temperature": temperature, "stop_condition": stop_condition})
+        if user_message == "fail":
+            raise RuntimeError("Local model inference failed: out of memory")
+        if user_message == "gpu crash":
+            # What LocalModelClient does after a GPU crash: drop the model and reload on CPU
+            self._model_loaded = False
+            self._reload_model()
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        time.sleep(0.01)
+        self.running -= 1
+        words = ["echo:"] + user_message.split()
+        for i, word in enumerate(words):
+            if token_callback:
+                token_callback(word if i == 0 else " " + word)
+        return " ".join(words)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    server = ModelServer(StubModelClient(), address="127.0.0.1:0", authkey=load_auth_key(create=True),
+                         idle_unload_seconds=0)
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, name="server-main", daemon=True)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join(timeout=10)
+
+
+class TestModelServer:
+    """Test suite for ModelServer and ModelServerClient."""
+
+    def test_remote_client_interface(self, server):
+        """Test that generate() and process_with_tools() run on the server's model."""
+        client = LocalModelClient(model_name="llama-3.2-3b-q4", server_address=server.address)
+        assert (client.n_ctx, client.parallel_sequences) == (4096, 2)
+
+        client.ensure_loaded()
+        text = client.generate("system", "payment terms", max_tokens=50, stop_condition=starts_not_found)
+
+        registry = type("Registry", (), {
+            "get_system_prompt": lambda self: "tools", "get_skill_prompt": lambda self, _: "skills",
+        })()
+        tokens = []
+        messages = client.process_with_tools("what is the retainage", registry, token_callback=tokens.append)
+
+        assert text == "echo: payment terms"
+        assert server.client.calls[0]["stop_condition"] is starts_not_found
+        assert messages[-1]["content"].endswith("what is the retainage")
+        assert "".join(tokens).startswith("echo: User:")
+        assert server.client.calls[1]["temperature"] == 0.3
+        assert client.count_tokens("three token text") == 3
+
+    def test_clients_share_one_model(self, server):
+        """Test that concurrent clients use one load, done on the serving thread."""
+        clients = [LocalModelClient(server_address=server.address) for _ in range(3)]
+        threads = []
+        results = {}
+
+        for i, client in enumerate(clients):
+            def run(i=i, client=client):
+                results[i] = client.generate("system", f"contract {i}")
+            threads.append(threading.Thread(target=run))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert results == {i: f"echo: contract {i}" for i in range(3)}
+        assert server.client.loads == 1
+        assert server.client.load_threads == {"server-main"}
+        assert server.info()["requests_served"] == 3
+        # The stub has no batch scheduler, so requests reach it one at a time
+        assert server.client.most_running == 1
+
+    def test_gpu_fallback_reloads_on_serving_thread(self, server):
+        """Test that a reload during inference runs on the serving thread."""
+        client = LocalModelClient(server_address=server.address)
+
+        assert client.generate("system", "gpu crash") == "echo: gpu crash"
+        assert server.client.loads == 2
+        assert server.client.load_threads == {"server-main"}
+
+    def test_idle_model_is_unloaded_and_reloaded(self, server):
+        """Test the idle-unload timeout and reload on the next request."""
+        client = LocalModelClient(server_address=server.address)
+        client.generate("system", "first")
+        server.idle_unload_seconds = 0.1
+
+        deadline = time.monotonic() + 5
+        while server.client._model_loaded and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert server.client.unloads == 1
+
+        assert client.generate("system", "second") == "echo: second"
+        assert server.client.loads == 2
+
+    def test_errors(self, server, tmp_path):
+        """Test that failures reach the caller and the connection stays usable."""
+        remote = ModelServerClient(server.address)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            remote.call("infer", system_message="s", user_message="fail", max_tokens=10)
+        with pytest.raises(RuntimeError, match="Unsupported inference arguments"):
+            remote.call("infer", system_message="s", user_message="x", max_tokens=10, grammar="root ::= x")
+        assert remote.call("info")["loaded"]
+
+        with pytest.raises(ModelServerError, match="rejected"):
+            ModelServerClient(server.address, authkey=b"wrong key").call("info")
+        with pytest.raises(ModelServerError, match="No model server"):
+            ModelServerClient("127.0.0.1:1").call("info")
+        with pytest.raises(ModelServerError):
+            load_auth_key(tmp_path / "missing.key")
+
+    def test_addresses(self):
+        """Test address parsing and the localhost-only rule."""
+        assert parse_address("127.0.0.1:47811") == ("127.0.0.1", 47811)
+        assert parse_address("[::1]:5000") == ("::1", 5000)
+        assert parse_address("\\\\.\\pipe\\cr2a-model") == "\\\\.\\pipe\\cr2a-model"
+        assert parse_address("/tmp/cr2a-model.sock") == "/tmp/cr2a-model.sock"
+        with pytest.raises(ModelServerError):
+            parse_address("0.0.0.0:47811")
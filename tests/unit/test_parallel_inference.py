@@ -0,0 +1,322 @@
+"""
+Unit tests for the multi-sequence inference scheduler, using a scripted backend.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.early_stop import starts_not_found
+from src.parallel_inference import (
+    InferenceScheduler, InferenceSchedulerError, LlamaBatchBackend, SequenceBackend, SequenceRequest
+)
+
+
+END = 0
+
+
+class ScriptedBackend(SequenceBackend):
+    """
+    Backend whose 'model' answers each prompt with a fixed reply.
+
+    Prompts and replies are whitespace-separated words, one token each.
+    Records the entries of every decode call.
+    """
+
+    def __init__(self, replies, n_slots=4, slot_context=256, n_batch=64, fail_on_step=None):
+        self.replies = replies  # prompt -> reply text
+        self.n_slots = n_slots
+        self.slot_context = slot_context
+        self.n_batch = n_batch
+        self.fail_on_step = fail_on_step
+        self.vocab = {}
+        self.words = {END: ""}
+        self.steps = []
+        self.scripts = {}
+        self.closed = False
+
+    def _id(self, word):
+        if word not in self.vocab:
+            self.vocab[word] = len(self.vocab) + 1
+            self.words[self.vocab[word]] = word
+        return self.vocab[word]
+
+    def tokenize(self, text):
+        return [self._id(w) for w in text.split()]
+
+    def token_bytes(self, token):
+        return (" " + self.words[token]).encode("utf-8")
+
+    def is_end(self, token):
+        return token == END
+
+    def start(self, slot, request):
+        reply = [self._id(w) for w in self.replies[request.prompt].split()] + [END]
+        self.scripts[slot] = iter(reply)
+
+    def decode(self, entries):
+        self.steps.append(entries)
+        if self.fail_on_step is not None and len(self.steps) >= self.fail_on_step:
+            raise RuntimeError("decode failed")
+        return {e.slot: next(self.scripts[e.slot]) for e in entries if e.logits}
+
+    def close(self):
+        self.closed = True
+
+
+def generating_per_step(backend):
+    return [sum(1 for e in step if len(e.tokens) == 1 and e.logits) for step in backend.steps]
+
+
+@pytest.fixture
+def replies():
+    return {f"prompt {i}": " ".join(f"answer{i}-{t}" for t in range(8)) for i in range(6)}
+
+
+class TestInferenceScheduler:
+    """Test suite for InferenceScheduler."""
+
+    def test_requests_decoded_together(self, replies):
+        """Test that concurrent requests share decode steps and get their own text."""
+        backend = ScriptedBackend(replies)
+        scheduler = InferenceScheduler(backend)
+        futures = [scheduler.submit(SequenceRequest(prompt=f"prompt {i}", max_tokens=50)) for i in range(3)]
+        results = [f.result(timeout=5) for f in futures]
+        scheduler.shutdown()
+
+        for i, result in enumerate(results):
+            assert result.text.strip() == replies[f"prompt {i}"]
+            assert result.finish_reason == "stop"
+            assert result.tokens_generated == 8
+        assert max(generating_per_step(backend)) == 3
+        assert len(backend.steps) < 3 * 9
+        assert scheduler.tokens_generated == 24
+        assert backend.closed
+
+    def test_more_requests_than_slots(self, replies):
+        """Test that queued requests take over slots as others finish."""
+        backend = ScriptedBackend(replies, n_slots=2)
+        scheduler = InferenceScheduler(backend)
+        futures = [scheduler.submit(SequenceRequest(prompt=f"prompt {i}", max_tokens=50)) for i in range(6)]
+        texts = [f.result(timeout=5).text.strip() for f in futures]
+        scheduler.shutdown()
+
+        assert texts == [replies[f"prompt {i}"] for i in range(6)]
+        assert max(generating_per_step(backend)) == 2
+
+    def test_per_sequence_stopping(self, replies):
+        """Test that limits and stop rules end only their own sequence."""
+        replies = dict(replies, **{"nf": "NOT FOUND because the sections cover insurance"})
+        scheduler = InferenceScheduler(ScriptedBackend(replies))
+        limited = scheduler.submit(SequenceRequest(prompt="prompt 0", max_tokens=3))
+        stopped = scheduler.submit(SequenceRequest(prompt="prompt 1", max_tokens=50, stop=["answer1-4"]))
+        early = scheduler.submit(SequenceRequest(prompt="nf", max_tokens=50, stop_condition=starts_not_found))
+        full = scheduler.submit(SequenceRequest(prompt="prompt 2", max_tokens=50))
+
+        assert limited.result(timeout=5).finish_reason == "length"
+        assert limited.result().text.split() == ["answer0-0", "answer0-1", "answer0-2"]
+        assert stopped.result(timeout=5).text.split() == [f"answer1-{t}" for t in range(4)]
+        assert early.result(timeout=5).finish_reason == "stop_condition"
+        assert early.result().text.strip() == "NOT FOUND"
+        assert full.result(timeout=5).tokens_generated == 8
+        scheduler.shutdown()
+
+    def test_long_prompts_are_chunked(self):
+        """Test that prompt tokens never exceed the batch size."""
+        prompt = " ".join(f"w{i}" for i in range(10))
+        backend = ScriptedBackend({prompt: "done"}, n_batch=4)
+        scheduler = InferenceScheduler(backend)
+        result = scheduler.submit(SequenceRequest(prompt=prompt, max_tokens=5)).result(timeout=5)
+        scheduler.shutdown()
+
+        assert result.text.strip() == "done"
+        assert result.prompt_tokens == 10
+        assert [sum(len(e.tokens) for e in step) for step in backend.steps] == [4, 4, 2, 1]
+        assert [e.start_pos for step in backend.steps for e in step] == [0, 4, 8, 10]
+
+    def test_errors_reach_the_caller(self, replies):
+        """Test that oversized prompts and decode failures fail their futures."""
+        scheduler = InferenceScheduler(ScriptedBackend(replies, slot_context=2))
+        with pytest.raises(InferenceSchedulerError):
+            scheduler.submit(SequenceRequest(prompt="prompt 0", max_tokens=5)).result(timeout=5)
+        scheduler.shutdown()
+
+        scheduler = InferenceScheduler(ScriptedBackend(replies, fail_on_step=2))
+        futures = [scheduler.submit(SequenceRequest(prompt=f"prompt {i}", max_tokens=50)) for i in range(2)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        # The scheduler keeps serving after a failed step
+        scheduler.backend.fail_on_step = None
+        assert scheduler.submit(SequenceRequest(prompt="prompt 3", max_tokens=2)).result(timeout=5).text
+        scheduler.shutdown()
+
+        with pytest.raises(InferenceSchedulerError):
+            scheduler.submit(SequenceRequest(prompt="prompt 0", max_tokens=5))
+
+
+class TestLocalModelParallelDecoding:
+    """Test that LocalModelClient routes calls through the scheduler."""
+
+    @pytest.fixture
+    def client(self, replies, make_local_client):
+        client = make_local_client(parallel_sequences=4, _model_loaded=True)
+
+        # The scripted model answers by user message; wrap replies in the chat template
+        templated = {client._format_prompt("system", p): r for p, r in replies.items()}
+        templated[client._format_prompt("system", "nf")] = "NOT FOUND in these sections"
+        backend = ScriptedBackend(templated)
+        client._scheduler = InferenceScheduler(backend)
+        yield client
+        client._stop_scheduler()
+
+    def test_concurrent_generate_calls_share_steps(self, client, replies):
+        """Test that generate() from several threads is decoded in one batch."""
+        barrier = threading.Barrier(4)
+
+        def call(i):
+            barrier.wait()
+            return client.generate("system", f"prompt {i}")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            texts = list(pool.map(call, range(4)))
+
+        assert [t.strip() for t in texts] == [replies[f"prompt {i}"] for i in range(4)]
+        assert max(generating_per_step(client._scheduler.backend)) > 1
+
+    def test_submit_returns_future_and_records_stats(self, client):
+        """Test the futures API and early-stop accounting on batched calls."""
+        future = client.submit("system", "nf", max_tokens=100, stop_condition=starts_not_found)
+
+        assert future.result(timeout=5).strip() == "NOT FOUND"
+        assert client.early_stop_stats.aborted_calls == 1
+
+    def test_serial_fallback_is_not_parallel(self, client):
+        """Test that without the scheduler, concurrent calls use the model one at a time."""
+        assert client.is_parallel
+        client._stop_scheduler()
+        assert not client.is_parallel
+
+        active = []
+        overlaps = []
+
+        def model(prompt, **kwargs):
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.02)
+            active.pop()
+            return iter([{"choices": [{"text": "ok"}]}])
+
+        client._model = model
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            texts = list(pool.map(lambda i: client.generate("system", f"prompt {i}"), range(4)))
+
+        assert texts == ["ok"] * 4
+        assert max(overlaps) == 1
+
+    def test_context_budget_is_split_across_sequences(self, client, monkeypatch):
+        """Test that the model context and all slots together fit the n_ctx budget."""
+        import src.local_model_client as lmc
+
+        class FakeLlama:
+            pass
+
+        created = {}
+
+        def fake_backend(llama, n_slots, slot_context, n_threads, n_batch):
+            created.update(n_slots=n_slots, slot_context=slot_context)
+            return ScriptedBackend({}, n_slots=n_slots, slot_context=slot_context)
+
+        monkeypatch.setattr(lmc, "Llama", FakeLlama)
+        monkeypatch.setattr(lmc, "LlamaBatchBackend", fake_backend)
+        client._stop_scheduler()
+        client._model = FakeLlama()
+        client.n_threads = 1
+        client._start_scheduler(n_batch=64)
+
+        assert client.context_tokens == 8192 // 5
+        assert created == {"n_slots": 4, "slot_context": client.context_tokens}
+        # The model's own context plus one slot per sequence
+        assert client.context_tokens * (created["n_slots"] + 1) <= client.n_ctx
+
+    def test_serial_fallback_gets_the_full_context(self, client, monkeypatch, tmp_path):
+        """Test that the model is reloaded with all of n_ctx when the scheduler cannot start."""
+        import src.local_model_client as lmc
+
+        class FakeLlama:
+            contexts = []
+
+            def __init__(self, **kwargs):
+                self.contexts.append(kwargs["n_ctx"])
+
+        def unavailable(*args, **kwargs):
+            raise InferenceSchedulerError("no batch API")
+
+        monkeypatch.setattr(lmc, "Llama", FakeLlama)
+        monkeypatch.setattr(lmc, "LlamaBatchBackend", unavailable)
+        client._stop_scheduler()
+        client.model_path = tmp_path / "model.gguf"
+        client.model_path.write_bytes(b"GGUF")
+        client._model_loaded = False
+        client._load_model()
+
+        assert FakeLlama.contexts == [8192 // 5, 8192]
+        assert client._scheduler is None
+        assert client.context_tokens == 8192
+
+    def test_oversized_request_fits_a_slot(self, client):
+        """Test that max_tokens is capped and the prompt truncated to a slot's context."""
+        prompt, max_tokens = client._fit_context("clause " * 5000, client.MAX_TOKENS_ANALYSIS)
+
+        assert max_tokens == client.context_tokens // 2
+        assert 0 < client.count_tokens(prompt) < client.context_tokens - max_tokens
+
+
+class TestLlamaBatchBackend:
+    """Smoke test against a real model (set CR2A_TEST_GGUF to a small GGUF file)."""
+
+    def test_decodes_two_prompts_together(self):
+        """Test that two prompts are decoded together and both produce text."""
+        llama_cpp = pytest.importorskip("llama_cpp")
+        model_path = os.environ.get("CR2A_TEST_GGUF")
+        if not model_path or not os.path.exists(model_path):
+            pytest.skip("CR2A_TEST_GGUF does not point to a model file")
+
+        llama = llama_cpp.Llama(model_path=model_path, n_ctx=512, n_gpu_layers=0, verbose=False)
+        scheduler = InferenceScheduler(LlamaBatchBackend(llama, n_slots=2, slot_context=256, n_threads=2))
+        try:
+            futures = [
+                scheduler.submit(SequenceRequest(prompt=f"Count from {n}:", max_tokens=8))
+                for n in (1, 10)
+            ]
+            results = [f.result(timeout=120) for f in futures]
+        finally:
+            scheduler.shutdown()
+
+        for result in results:
+            assert result.tokens_generated > 0
+            assert result.text
+
+    def test_client_splits_context_across_sequences(self):
+        """Test that LocalModelClient's model and slots share one n_ctx budget."""
+        pytest.importorskip("llama_cpp")
+        model_path = os.environ.get("CR2A_TEST_GGUF")
+        if not model_path or not os.path.exists(model_path):
+            pytest.skip("CR2A_TEST_GGUF does not point to a model file")
+        from src.local_model_client import LocalModelClient
+
+        client = LocalModelClient(model_path=model_path, n_ctx=1536, n_threads=2,
+                                  n_gpu_layers=0, parallel_sequences=2)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                texts = list(pool.map(
+                    lambda n: client.generate("system", f"Count from {n}:", max_tokens=6), (1, 10)))
+            backend = client._scheduler.backend
+        finally:
+            client._stop_scheduler()
+
+        assert client._model.n_ctx() + backend.n_slots * backend.slot_context <= 1536
+        assert all(isinstance(text, str) for text in texts)
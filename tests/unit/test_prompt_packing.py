@@ -0,0 +1,168 @@
+"""
+Unit tests for context-budget packing of batch summarization prompts.
+"""
+
+import json
+import re
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
+
+from src.analysis_engine import AnalysisEngine
+from src.prompt_packing import PackItem, PromptPacker, estimate_tokens
+
+
+def words(text):
+    """Test tokenizer: one token per whitespace-separated word."""
+    return len(text.split())
+
+
+def section(n_words, name):
+    return f"{name} " + " ".join(["word"] * (n_words - 1))
+
+
+class TestPromptPacker:
+    """Test suite for PromptPacker."""
+
+    def make_packer(self, context_tokens=1000, max_output_tokens=4000):
+        return PromptPacker(context_tokens=context_tokens, fixed_tokens=100, item_output_tokens=50,
+                            max_output_tokens=max_output_tokens, count_tokens=words)
+
+    def test_batches_fit_the_budget(self):
+        """Test that every batch's prompt plus output fits the context window."""
+        packer = self.make_packer()
+        items = [PackItem(key=f"cat{i}_0", sections=[(f"s{i}", section(60 + 40 * (i % 4), f"s{i}"))])
+                 for i in range(12)]
+
+        batches = packer.pack(items)
+
+        assert sorted(k for b in batches for k in b.keys) == sorted(i.key for i in items)
+        for batch in batches:
+            assert words(packer.render(batch)) + batch.output_tokens <= packer.budget
+            assert batch.output_tokens == 50 * len(batch.items)
+
+    def test_fewer_calls_than_fixed_batches(self):
+        """Test that small categories share calls instead of two per call."""
+        packer = self.make_packer()
+        items = [PackItem(key=f"cat{i}_0", sections=[(f"s{i}", section(40, f"s{i}"))]) for i in range(12)]
+
+        assert len(packer.pack(items)) < 12 // 2
+
+    def test_shared_sections_sent_once(self):
+        """Test that a section used by several items is rendered once and packed together."""
+        packer = self.make_packer()
+        shared = ("s0", section(300, "shared"))
+        items = [
+            PackItem(key="payment_0", sections=[shared, ("s1", section(100, "own1"))]),
+            PackItem(key="other_0", sections=[("s2", section(500, "other"))]),
+            PackItem(key="retainage_0", sections=[shared, ("s3", section(100, "own3"))]),
+        ]
+
+        batches = packer.pack(items)
+        together = next(b for b in batches if "payment_0" in b.keys)
+        text = packer.render(together)
+
+        assert together.keys == ["payment_0", "retainage_0"]
+        assert text.count("shared ") == 1
+        assert "(Also see section [S1] above.)" in text.split("### retainage_0")[1]
+
+    def test_oversized_item_is_trimmed(self):
+        """Test that an item larger than a call keeps its best sections."""
+        packer = self.make_packer()
+        item = PackItem(key="scope_0", sections=[
+            ("s0", ". ".join(["first section words"] * 400) + "."),
+            ("s1", section(400, "second")),
+        ])
+
+        [batch] = packer.pack([item])
+
+        assert words(packer.render(batch)) + batch.output_tokens <= packer.budget
+        assert batch.items[0].sections[0][0] == "s0~scope_0"
+        assert len(batch.items[0].sections) == 1
+
+    def test_output_cap_limits_items_per_call(self):
+        """Test that one call never reserves more than the output cap."""
+        packer = self.make_packer(context_tokens=100_000, max_output_tokens=200)
+        items = [PackItem(key=f"cat{i}_0", sections=[(f"s{i}", "short")]) for i in range(10)]
+
+        batches = packer.pack(items)
+
+        assert [len(b.items) for b in batches] == [4, 4, 2]
+
+    def test_estimate_without_tokenizer(self):
+        """Test the character-based fallback estimate."""
+        assert estimate_tokens("x" * 350) == 101
+
+
+class TestHybridBatchPacking:
+    """Test that _hybrid_batch_analysis packs categories by token budget."""
+
+    @staticmethod
+    def prepare():
+        from analyzer.template_patterns import extract_all_template_clauses, parse_contract_sections
+        from src.document_retriever import DocumentRetriever
+
+        text = (Path(__file__).parent.parent / "fixtures" / "contract.txt").read_text()
+        sections = parse_contract_sections(text)
+        extracted = extract_all_template_clauses(text, section_index=sections)
+        return extracted, sections, DocumentRetriever().index_contract(text, sections, extracted)
+
+    def run(self, n_ctx):
+        def generate(system, user, progress_callback=None, max_tokens=None, json_schema=None):
+            prompts.append((system, user, max_tokens))
+            return json.dumps({cid: f"Summary of {cid}." for cid in json_schema["properties"]})
+
+        prompts = []
+        # Skip __init__, which loads a model and the knowledge store
+        engine = AnalysisEngine.__new__(AnalysisEngine)
+        engine.ai_client = Mock(spec=["generate", "count_tokens", "n_ctx", "CONTEXT_SAFETY_TOKENS"])
+        engine.ai_client.n_ctx = n_ctx
+        engine.ai_client.CONTEXT_SAFETY_TOKENS = 256
+        engine.ai_client.count_tokens = estimate_tokens
+        engine.ai_client.generate.side_effect = generate
+        engine.knowledge_store = None
+
+        extracted, sections, indexed = self.prepare()
+        response = engine._hybrid_batch_analysis(extracted, sections, indexed_contract=indexed)
+        return response, prompts, [k for k in extracted if extracted[k]]
+
+    def test_prompts_fit_small_context(self):
+        """Test that each call fits and every category is summarized once."""
+        response, prompts, cat_keys = self.run(2048)
+
+        asked = [cid for _, user, _ in prompts for cid in re.findall(r"^### (\S+)$", user, re.M)]
+        assert sorted(asked) == sorted(f"{k}_0" for k in cat_keys)
+        assert len(prompts) < (len(cat_keys) + 1) // 2  # fewer calls than the old 2-per-batch
+        for system, user, max_tokens in prompts:
+            assert estimate_tokens(system + user) + max_tokens <= 2048 - 256
+            labels = re.findall(r"^\[S\d+\] ", user, re.M)
+            assert len(labels) == len(set(labels))
+
+        summaries = json.dumps(response)
+        assert all(f"Summary of {k}_0." in summaries for k in cat_keys if k in AnalysisEngine.CATEGORY_MAP)
+
+    def test_larger_context_needs_fewer_calls(self):
+        """Test that a bigger window packs more categories per call."""
+        _, small, _ = self.run(2048)
+        _, large, _ = self.run(8192)
+
+        assert len(large) < len(small)
+
+
+
+class TestLocalTokenCounting:
+    """Test that LocalModelClient checks prompts with its tokenizer."""
+
+    def test_measured_prompt_is_not_truncated(self, make_local_client):
+        """Test that a prompt that fits by token count is sent whole."""
+        client = make_local_client(
+            n_ctx=2048,
+            _model=MagicMock(return_value=[{"choices": [{"text": "ok"}]}]),
+            _model_loaded=True,
+        )
+        client._model.tokenize.side_effect = lambda data, add_bos, special: data.split()
+        user = "clause " * 1200  # 8400 chars: over the old 3-chars-per-token estimate
+
+        client.generate("system", user, max_tokens=200)
+
+        assert client.count_tokens(user) == 1200
+        assert user in client._model.call_args.args[0]
@@ -0,0 +1,171 @@
+"""
+Unit tests for QueryEngine context assembly.
+"""
+
+import copy
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.query_engine import ContextIndex, QueryEngine
+
+
+def make_block(location, summary, redline=""):
+    """Helper to create a comprehensive clause block."""
+    return {
+        "Clause Location": location,
+        "Clause Summary": summary,
+        "Redline Recommendations": [{"action": "replace", "text": redline}] if redline else [],
+        "Harmful Language / Policy Conflicts": [],
+    }
+
+
+def make_comprehensive():
+    """Helper to create a comprehensive analysis dictionary."""
+    return {
+        "schema_version": "v1.0.0",
+        "contract_overview": {"Project Title": "Pipeline"},
+        "administrative_and_commercial_terms": {
+            "payment_terms": make_block(
+                "Article 5", "Owner pays within 30 days of an approved invoice."),
+            "retainage": make_block(
+                "Article 6", "Ten percent retainage is withheld until final completion."),
+        },
+        "legal_risk_and_enforcement": {
+            "indemnification": make_block(
+                "Article 12", "Contractor defends and holds harmless the owner.",
+                "Limit indemnity to the contractor's negligence."),
+            "termination_for_convenience": make_block(
+                "Article 14", "Owner may end the agreement on seven days notice."),
+        },
+        "supplemental_operational_risks": [
+            make_block("Exhibit C", "Liquidated damages of $5,000 per day for late completion."),
+        ],
+        "metadata": {"filename": "contract.pdf", "analyzed_at": "2026-01-05T09:30:00"},
+    }
+
+
+@pytest.fixture
+def engine():
+    return QueryEngine(MagicMock())
+
+
+class TestContextIndex:
+    """Test suite for the BM25 ContextIndex."""
+
+    def test_ranks_by_relevance(self):
+        """Test that the best-matching item comes first."""
+        index = ContextIndex([
+            ({"id": 1}, "insurance certificates and coverage limits"),
+            ({"id": 2}, "payment of invoices and payment schedule"),
+            ({"id": 3}, "late payment interest"),
+        ])
+
+        assert [item["id"] for item in index.search("payment schedule")] == [2, 3]
+        assert index.search("arbitration") == []
+
+    def test_folds_plurals_and_expands_categories(self):
+        """Test plural folding and category keywords in queries."""
+        index = ContextIndex([
+            ({"id": 1}, "Payment terms"),
+            ({"id": 2}, "Warranty period"),
+        ])
+
+        assert [item["id"] for item in index.search("payments")] == [1]
+        assert [item["id"] for item in index.search("how much is the fee?")] == [1]
+
+
+class TestQueryEngineContext:
+    """Test suite for QueryEngine.format_context."""
+
+    def test_comprehensive_context_ranks_clause_blocks(self, engine):
+        """Test that matching clause blocks and supplemental risks are selected."""
+        context = engine.format_context(make_comprehensive(), "What are the liquidated damages?")
+
+        names = [block["_clause_name"] for block in context["clause_blocks"]]
+        assert names == ["risk_1"]
+        assert context["clause_blocks"][0]["_section"] == "supplemental_operational_risks"
+        assert context["schema_version"] == "v1.0.0"
+
+    def test_redline_text_is_searchable(self, engine):
+        """Test that redline recommendations contribute to ranking."""
+        context = engine.format_context(make_comprehensive(), "negligence")
+
+        assert [b["_clause_name"] for b in context["clause_blocks"]] == ["indemnification"]
+
+    def test_no_match_falls_back_to_all_blocks(self, engine):
+        """Test that unmatched questions still get the analysis as context."""
+        context = engine.format_context(make_comprehensive(), "hello")
+
+        assert len(context["clause_blocks"]) == 5
+
+    def test_index_reused_across_messages(self, engine):
+        """Test that rebuilt but unchanged analysis dicts reuse the index."""
+        analysis = make_comprehensive()
+        with patch("src.query_engine.ContextIndex", wraps=ContextIndex) as index_cls:
+            engine.format_context(analysis, "payment")
+            engine.format_context(copy.deepcopy(analysis), "retainage")
+            engine.format_context(copy.deepcopy(analysis), "termination")
+
+        assert index_cls.call_count == 1
+
+    def test_index_rebuilt_for_a_new_analysis(self, engine):
+        """Test that an analysis with a different identity gets its own index."""
+        analysis = make_comprehensive()
+        engine.format_context(analysis, "payment")
+
+        changed = copy.deepcopy(analysis)
+        changed["administrative_and_commercial_terms"]["retainage"]["Clause Summary"] = (
+            "Five percent retainage after substantial completion.")
+        changed["metadata"]["analyzed_at"] = "2026-01-06T14:00:00"
+        context = engine.format_context(changed, "five percent retainage")
+
+        assert "Five percent" in context["clause_blocks"][0]["Clause Summary"]
+
+    def test_analysis_without_metadata_is_not_cached(self, engine):
+        """Test that analyses without an identity are indexed for each call."""
+        analysis = make_comprehensive()
+        del analysis["metadata"]
+        with patch("src.query_engine.ContextIndex", wraps=ContextIndex) as index_cls:
+            engine.format_context(analysis, "payment")
+            engine.format_context(analysis, "retainage")
+
+        assert index_cls.call_count == 2
+
+    def test_invalidate_context_index(self, engine):
+        """Test that an explicit invalidation picks up results changed in place."""
+        analysis = make_comprehensive()
+        engine.format_context(analysis, "payment")
+        analysis["administrative_and_commercial_terms"]["retainage"]["Clause Summary"] = (
+            "Five percent retainage after substantial completion.")
+        engine.invalidate_context_index()
+
+        with patch("src.query_engine.ContextIndex", wraps=ContextIndex) as index_cls:
+            context = engine.format_context(analysis, "five percent retainage")
+
+        assert index_cls.call_count == 1
+        assert "Five percent" in context["clause_blocks"][0]["Clause Summary"]
+
+    def test_legacy_context_includes_matching_risks(self, engine):
+        """Test legacy ranking of clauses and risks."""
+        analysis = {
+            "contract_metadata": {"filename": "c.pdf"},
+            "clauses": [
+                {"id": "c1", "type": "payment", "text": "Net 30 payment", "risk_level": "low"},
+                {"id": "c2", "type": "insurance", "text": "Umbrella coverage", "risk_level": "medium"},
+            ],
+            "risks": [
+                {"id": "r1", "clause_id": "c1", "description": "Slow payment"},
+                {"id": "r2", "clause_id": None, "description": "Umbrella coverage gap"},
+            ],
+            "compliance_issues": [],
+            "redlining_suggestions": [
+                {"clause_id": "c1", "suggested_text": "Net 15"},
+            ],
+        }
+
+        context = engine.format_context(analysis, "umbrella coverage")
+
+        assert [c["id"] for c in context["clauses"]] == ["c2"]
+        assert [r["id"] for r in context["risks"]] == ["r2"]
+        assert context["redlining_suggestions"] == []
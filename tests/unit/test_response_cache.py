@@ -0,0 +1,211 @@
+"""
+Unit tests for ResponseCache and CachedAIClient.
+"""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.early_stop import is_not_found, starts_not_found
+from src.response_cache import CachedAIClient, ResponseCache, bypass_cache
+
+
+@pytest.fixture
+def cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ResponseCache(Path(tmpdir) / "responses.db")
+        yield cache
+        cache.close()
+
+
+def make_client(model="llama-3.2-3b-q4", temperature=0.1):
+    """Helper to create an AI client stand-in that counts generate() calls."""
+    client = MagicMock()
+    client.model = model
+    client.temperature = temperature
+    client.MAX_TOKENS_ANALYSIS = 2048
+    client.generate.side_effect = lambda system, user, **kwargs: f"answer to {user}"
+    return client
+
+
+def is_upper(text):
+    """Module-level stand-in for a callable generate() option."""
+    return text.isupper()
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    def test_key_covers_every_input(self):
+        """Test that changing any request input changes the key."""
+        base = ("model", 0.1, 2048, "system", "user")
+        key = ResponseCache.make_key(*base)
+
+        assert ResponseCache.make_key(*base) == key
+        for index, value in enumerate(("other", 0.2, 1024, "system 2", "user 2")):
+            changed = list(base)
+            changed[index] = value
+            assert ResponseCache.make_key(*changed) != key
+
+    def test_get_put_and_stats(self, cache):
+        """Test round trip and hit/miss counting."""
+        assert cache.get("k1") is None
+        cache.put("k1", "model", "response text")
+
+        assert cache.get("k1") == "response text"
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.size_bytes == len("response text")
+        assert stats.hit_rate == 0.5
+
+    def test_persists_across_instances(self):
+        """Test that responses survive reopening the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "responses.db"
+            first = ResponseCache(path)
+            first.put("k1", "model", "stored")
+            first.close()
+
+            second = ResponseCache(path)
+            assert second.get("k1") == "stored"
+            second.close()
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the size limit evicts the entry used longest ago."""
+        cache.max_bytes = 25
+        cache.put("a", "model", "x" * 10)
+        cache.put("b", "model", "y" * 10)
+        cache.get("a")  # b is now least recently used
+        cache.put("c", "model", "z" * 10)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 10
+        assert cache.get("c") == "z" * 10
+        assert cache.stats().evictions == 1
+
+    def test_disabled_and_bypass(self, cache):
+        """Test that the bypass switch skips lookups and stores."""
+        cache.put("k1", "model", "stored")
+
+        with cache.bypass():
+            assert cache.get("k1") is None
+            cache.put("k2", "model", "skipped")
+        cache.enabled = False
+        assert cache.get("k1") is None
+        cache.enabled = True
+
+        assert cache.get("k2") is None
+        assert cache.get("k1") == "stored"
+        assert cache.stats().misses == 1
+
+
+class TestCachedAIClient:
+    """Test suite for CachedAIClient."""
+
+    def test_identical_request_served_from_cache(self, cache):
+        """Test that a repeated request does not reach the client."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+
+        first = cached.generate("system", "clause text", max_tokens=800)
+        second = cached.generate("system", "clause text", max_tokens=800)
+
+        assert first == second == "answer to clause text"
+        assert client.generate.call_count == 1
+
+    def test_different_settings_miss(self, cache):
+        """Test that model, temperature and token limit are part of the key."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+        cached.generate("system", "clause text")
+
+        cached.generate("system", "clause text", max_tokens=800)
+        client.temperature = 0.7
+        cached.generate("system", "clause text")
+        CachedAIClient(make_client(model="claude-sonnet-4"), cache).generate("system", "clause text")
+
+        assert client.generate.call_count == 3
+
+    def test_hit_replays_to_token_callback(self, cache):
+        """Test that streaming callers still receive the cached text."""
+        cached = CachedAIClient(make_client(), cache)
+        cached.generate("system", "q", token_callback=lambda _: None)
+
+        tokens = []
+        cached.generate("system", "q", token_callback=tokens.append)
+
+        assert tokens == ["answer to q"]
+
+    def test_errors_are_not_cached(self, cache):
+        """Test that a failed generate() is retried on the next call."""
+        client = make_client()
+        client.generate.side_effect = [RuntimeError("inference failed"), "recovered"]
+        cached = CachedAIClient(client, cache)
+
+        with pytest.raises(RuntimeError):
+            cached.generate("system", "q")
+        assert cached.generate("system", "q") == "recovered"
+
+    def test_other_attributes_forwarded(self, cache):
+        """Test that the wrapper stands in for the client."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+
+        assert cached.model == "llama-3.2-3b-q4"
+        cached.process_with_tools("hi", None)
+        client.process_with_tools.assert_called_once_with("hi", None)
+
+    def test_options_are_part_of_key(self, cache):
+        """Test that extra arguments are keyed, callables by name, and unnamed ones skip the cache."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+
+        cached.generate("system", "q", check=is_upper)
+        cached.generate("system", "q", check=is_upper)
+        cached.generate("system", "q", check=is_upper, limit=3)
+        cached.generate("system", "q", check=lambda text: False)
+        cached.generate("system", "q", check=lambda text: False)
+
+        assert client.generate.call_count == 4
+        assert cache.stats().entries == 2
+
+    def test_bypass_cache_helper(self, cache):
+        """Test that bypass_cache() skips a cached client and ignores a plain one."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+        cached.generate("system", "q")
+
+        with bypass_cache(cached):
+            cached.generate("system", "q")
+        with bypass_cache(client):
+            pass
+
+        assert client.generate.call_count == 2
+
+    def test_json_schema_is_part_of_key(self, cache):
+        """Test that constrained and unconstrained requests are cached apart."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+
+        cached.generate("system", "q")
+        cached.generate("system", "q", json_schema={"type": "object"})
+        cached.generate("system", "q", json_schema={"type": "object"})
+
+        assert client.generate.call_count == 2
+        assert client.generate.call_args.args[0] == "system"
+
+    def test_stop_condition_is_part_of_key(self, cache):
+        """Test that stop rules are keyed by name and unnamed ones skip the cache."""
+        client = make_client()
+        cached = CachedAIClient(client, cache)
+
+        cached.generate("system", "q", stop_condition=starts_not_found)
+        cached.generate("system", "q", stop_condition=starts_not_found)
+        cached.generate("system", "q", stop_condition=is_not_found)
+        cached.generate("system", "q", stop_condition=lambda text: False)
+        cached.generate("system", "q", stop_condition=lambda text: False)
+
+        assert client.generate.call_count == 4
+        assert cache.stats().entries == 2
@@ -0,0 +1,223 @@
+"""
+Unit tests for SessionManager class.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from src.session_manager import SessionManager
+
+
+def block(i):
+    """Helper to create a clause block for testing."""
+    return {"Clause Summary": f"summary {i}", "Clause Language": "text " * 20}
+
+
+class TestSessionManager:
+    """Test suite for SessionManager class."""
+
+    def test_first_save_writes_snapshot_and_journal(self):
+        """Test that the first save checkpoints the full state."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+
+            snapshot = json.loads(manager.session_path.read_text(encoding="utf-8"))
+            assert snapshot["contract_file"] == "c.pdf"
+            header = json.loads(manager.journal_path.read_text(encoding="utf-8").splitlines()[0])
+            assert header["generation"] == snapshot["journal_generation"]
+
+    def test_saves_append_deltas_without_rewriting_snapshot(self):
+        """Test that later saves only append the changed parts."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+            snapshot_before = manager.session_path.read_bytes()
+
+            manager.update_category_result("cat_a", block(1))
+            manager.save()
+            manager.update_category_result("cat_b", block(2))
+            manager.save()
+
+            assert manager.session_path.read_bytes() == snapshot_before
+            lines = manager.journal_path.read_text(encoding="utf-8").splitlines()
+            assert len(lines) == 3
+            assert json.loads(lines[2])["key"] == "cat_b"
+
+    def test_load_replays_journal(self):
+        """Test that load restores snapshot plus journal deltas."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+            manager.update_category_result("cat_a", block(1))
+            manager.mark_category_not_found("cat_b")
+            manager.save()
+            manager.update_category_result("cat_b", block(2))
+            manager.mark_category_not_found("cat_a")
+            manager.update_bid_review_item("item_1", {"value": "yes"})
+            manager.update_bid_review_result({"items": 1})
+            manager.save()
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert restored.contract_file == "c.pdf"
+            assert restored.category_results == {"cat_b": block(2)}
+            assert restored.categories_not_found == ["cat_a"]
+            assert restored.bid_review_item_results == {"item_1": {"value": "yes"}}
+            assert restored.bid_review_result == {"items": 1}
+            assert restored.has_session_for("/tmp/c.pdf")
+
+    def test_checkpoint_after_interval(self):
+        """Test that the journal is folded into the snapshot periodically."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.CHECKPOINT_INTERVAL = 3
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+            for i in range(5):
+                manager.update_category_result(f"cat_{i}", block(i))
+                manager.save()
+
+            lines = manager.journal_path.read_text(encoding="utf-8").splitlines()
+            assert len(lines) - 1 < 3
+            snapshot = json.loads(manager.session_path.read_text(encoding="utf-8"))
+            assert "cat_2" in snapshot["category_results"]
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert len(restored.category_results) == 5
+
+    def test_stale_journal_is_ignored(self):
+        """Test that a journal from an older checkpoint is not replayed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+            manager.update_category_result("cat_a", block(1))
+            manager.save()
+            old_journal = manager.journal_path.read_bytes()
+
+            manager.mark_category_not_found("cat_a")
+            manager.checkpoint()
+            # Simulate a crash between the snapshot rename and journal restart
+            manager.journal_path.write_bytes(old_journal)
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert restored.category_results == {}
+            assert restored.categories_not_found == ["cat_a"]
+
+    def test_torn_journal_line_is_skipped(self):
+        """Test that a partially written journal line does not break load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.save()
+            manager.update_category_result("cat_a", block(1))
+            manager.save()
+            with open(manager.journal_path, "a", encoding="utf-8") as f:
+                f.write('{"op":"category","key":"cat_b","val')
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert list(restored.category_results) == ["cat_a"]
+
+            # The next save rewrites the files instead of appending after the torn line
+            restored.update_category_result("cat_c", block(3))
+            restored.save()
+            again = SessionManager(Path(tmpdir))
+            assert again.load()
+            assert sorted(again.category_results) == ["cat_a", "cat_c"]
+
+    def test_loads_legacy_snapshot(self):
+        """Test that a 1.0 session.json without a journal still loads."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            legacy = SessionManager(Path(tmpdir))._empty_state()
+            legacy.update(session_version="1.0", contract_file="old.pdf",
+                          category_results={"cat_a": block(1)})
+            (Path(tmpdir) / "session.json").write_text(json.dumps(legacy, indent=2),
+                                                       encoding="utf-8")
+
+            manager = SessionManager(Path(tmpdir))
+            assert manager.load()
+            assert manager.category_results == {"cat_a": block(1)}
+
+            manager.update_category_result("cat_b", block(2))
+            manager.save()
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert sorted(restored.category_results) == ["cat_a", "cat_b"]
+
+    def test_clear_forces_full_rewrite(self):
+        """Test that saving after clear() does not replay the old session."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.set_contract_info("c.pdf", "/tmp/c.pdf")
+            manager.update_category_result("cat_a", block(1))
+            manager.save()
+
+            manager.clear()
+            manager.set_contract_info("d.pdf", "/tmp/d.pdf")
+            manager.save()
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert restored.contract_file == "d.pdf"
+            assert restored.category_results == {}
+
+
+class TestSessionManagerRuns:
+    """Tests for the persisted work queue of resumable runs."""
+
+    def test_run_queue_survives_reload(self):
+        """Test that pending keys and input hashes are restored on load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            kind = SessionManager.RUN_CATEGORIES
+            manager.start_run(kind, ["cat_a", "cat_b", "cat_c"])
+            manager.save()
+            manager.update_category_result("cat_a", block(1))
+            manager.complete_run_item(kind, "cat_a", "hash_a")
+            manager.save()
+            manager.mark_category_not_found("cat_b")
+            manager.complete_run_item(kind, "cat_b", "hash_b")
+            manager.save()
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert restored.has_unfinished_run(kind)
+            assert restored.pending_run_keys(kind) == ["cat_c"]
+            assert restored.reusable_input_hashes(kind) == {"cat_a": "hash_a", "cat_b": "hash_b"}
+
+    def test_reusable_hashes_require_saved_result(self):
+        """Test that a hash is not reusable once its result is gone."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            manager.start_run(SessionManager.RUN_BID_ITEMS, ["bid_bond", "retainage"])
+            manager.update_bid_review_item("bid_bond", {"value": "5%"})
+            manager.complete_run_item(SessionManager.RUN_BID_ITEMS, "bid_bond", "h1")
+            # Completed without a saved item (e.g. an older session)
+            manager.complete_run_item(SessionManager.RUN_BID_ITEMS, "retainage", "h2")
+
+            assert manager.reusable_input_hashes(SessionManager.RUN_BID_ITEMS) == {"bid_bond": "h1"}
+            assert not manager.has_unfinished_run(SessionManager.RUN_BID_ITEMS)
+
+    def test_new_run_requeues_all_keys(self):
+        """Test that starting a run resets the queue but keeps input hashes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = SessionManager(Path(tmpdir))
+            kind = SessionManager.RUN_CATEGORIES
+            manager.start_run(kind, ["cat_a"])
+            manager.update_category_result("cat_a", block(1))
+            manager.complete_run_item(kind, "cat_a", "hash_a")
+            manager.start_run(kind, ["cat_a", "cat_b"])
+            manager.save()
+
+            restored = SessionManager(Path(tmpdir))
+            assert restored.load()
+            assert restored.pending_run_keys(kind) == ["cat_a", "cat_b"]
+            assert restored.reusable_input_hashes(kind) == {"cat_a": "hash_a"}
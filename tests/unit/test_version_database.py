@@ -7,6 +7,8 @@ Tests database schema creation, connection management, and basic operations.
 import pytest
 import sqlite3
 import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
 
 from src.version_database import VersionDatabase, VersionDatabaseError
@@ -55,7 +57,8 @@ class TestVersionDatabase:
         columns = {row[1] for row in cursor.fetchall()}
         expected_columns = {
             'contract_id', 'filename', 'file_hash', 
-            'current_version', 'created_at', 'updated_at'
+            'current_version', 'created_at', 'updated_at',
+            'content_signature'
         }
         assert columns == expected_columns
         
@@ -133,6 +136,46 @@ class TestVersionDatabase:
         
         db.close()
     
+    def test_snapshot_table_added_to_existing_database(self, temp_db_path):
+        """Test that opening a database created before snapshots adds the table."""
+        db = VersionDatabase(db_path=temp_db_path)
+        db.execute("DROP TABLE version_snapshots")
+        db.commit()
+        db.close()
+        
+        db = VersionDatabase(db_path=temp_db_path)
+        cursor = db.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name='version_snapshots'
+        """)
+        assert cursor.fetchone() is not None
+        assert db.get_schema_version() == 1
+        
+        db.close()
+    
+    def test_content_signature_column_added_to_existing_database(self, temp_db_path):
+        """Test that opening a database created before content signatures migrates it."""
+        db = VersionDatabase(db_path=temp_db_path)
+        db.execute("""
+            INSERT INTO contracts (contract_id, filename, file_hash)
+            VALUES ('c1', 'a.pdf', 'h1')
+        """)
+        db.execute("DROP TABLE contract_minhash_bands")
+        db.execute("ALTER TABLE contracts DROP COLUMN content_signature")
+        db.commit()
+        db.close()
+        
+        db = VersionDatabase(db_path=temp_db_path)
+        row = db.execute("SELECT content_signature FROM contracts WHERE contract_id = 'c1'").fetchone()
+        assert row['content_signature'] is None
+        cursor = db.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name='contract_minhash_bands'
+        """)
+        assert cursor.fetchone() is not None
+        
+        db.close()
+    
     def test_foreign_key_constraints(self, temp_db_path):
         """Test that foreign key constraints are enforced."""
         db = VersionDatabase(db_path=temp_db_path)
@@ -274,3 +317,208 @@ class TestVersionDatabase:
         assert cursor.fetchone() is None
         
         db.close()
+
+
+class TestConnectionPool:
+    """Tests for per-thread connections and the dedicated writer."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create a VersionDatabase in a temporary directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = VersionDatabase(db_path=Path(tmpdir) / "versions.db")
+            yield db
+            db.close()
+    
+    @staticmethod
+    def run_in_thread(func):
+        """Run func on a new thread and return its result."""
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(value=func()))
+        thread.start()
+        thread.join(timeout=30)
+        return result.get('value')
+    
+    def test_each_thread_gets_its_own_connection(self, db):
+        """Test that connections are reused per thread and not shared across threads."""
+        main = db.connect()
+        assert db.connect() is main
+        
+        other = self.run_in_thread(db.connect)
+        assert other is not None and other is not main
+        
+        assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert db.execute("PRAGMA cache_size").fetchone()[0] == -VersionDatabase.CACHE_SIZE_KIB
+    
+    def test_finished_thread_connections_are_closed(self, db):
+        """Test that a thread's connection is closed when the thread finishes."""
+        finished = self.run_in_thread(db.connect)
+        
+        with pytest.raises(sqlite3.ProgrammingError):
+            finished.execute("SELECT 1")
+        assert list(db._connections.values()) == [db.connect()]
+    
+    def test_finished_qthread_connections_are_closed(self, db):
+        """Test cleanup for QThreads, which Python sees as always-alive dummy threads."""
+        QtCore = pytest.importorskip("PyQt5.QtCore")
+        connections = []
+        
+        class Worker(QtCore.QThread):
+            def run(self):
+                connections.append(db.connect())
+        
+        for _ in range(5):
+            worker = Worker()
+            worker.start()
+            assert worker.wait(30000)
+        
+        assert len(connections) == 5
+        for conn in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        assert list(db._connections.values()) == [db.connect()]
+    
+    def test_close_closes_every_thread_connection(self, db):
+        """Test that close() reaches other threads' connections and resets the pool."""
+        main = db.connect()
+        ready, release = threading.Event(), threading.Event()
+        connections = []
+        
+        def hold_connection():
+            connections.append(db.connect())
+            ready.set()
+            release.wait(timeout=30)
+        
+        thread = threading.Thread(target=hold_connection)
+        thread.start()
+        ready.wait(timeout=30)
+        db.close()
+        release.set()
+        thread.join(timeout=30)
+        
+        for conn in (main, connections[0]):
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        assert db.connect() is not main
+        assert db.get_schema_version() == 1
+    
+    def test_write_transaction_commits_and_rolls_back(self, db):
+        """Test commit on success, rollback on error, and nested use."""
+        with db.write_transaction() as conn:
+            conn.execute("""
+                INSERT INTO contracts (contract_id, filename, file_hash)
+                VALUES ('c1', 'a.pdf', 'h1')
+            """)
+            with db.write_transaction() as inner:
+                assert inner is conn
+                inner.execute("""
+                    INSERT INTO contracts (contract_id, filename, file_hash)
+                    VALUES ('c2', 'b.pdf', 'h2')
+                """)
+        
+        with pytest.raises(RuntimeError):
+            with db.write_transaction() as conn:
+                conn.execute("DELETE FROM contracts")
+                raise RuntimeError("abort")
+        
+        assert db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0] == 2
+    
+    def test_reads_not_blocked_by_open_write(self, db):
+        """Test that another thread can read while a write transaction is open."""
+        with db.write_transaction() as conn:
+            conn.execute("""
+                INSERT INTO contracts (contract_id, filename, file_hash)
+                VALUES ('c1', 'a.pdf', 'h1')
+            """)
+            count = self.run_in_thread(
+                lambda: db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+            )
+            assert count == 0  # Uncommitted write is not visible yet
+        
+        assert db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0] == 1
+    
+    def test_checkpoint(self, db):
+        """Test WAL checkpoint modes."""
+        with db.write_transaction() as conn:
+            conn.execute("""
+                INSERT INTO contracts (contract_id, filename, file_hash)
+                VALUES ('c1', 'a.pdf', 'h1')
+            """)
+        
+        busy, _, _ = db.checkpoint("truncate")
+        assert busy == 0
+        with pytest.raises(ValueError):
+            db.checkpoint("everything")
+    
+    def test_concurrent_storage_and_browsing(self, db):
+        """Stress test: threads store versions while others browse history."""
+        from src.differential_storage import (
+            DifferentialStorage, Contract, Clause, VersionMetadata
+        )
+        
+        storage = DifferentialStorage(db)
+        writers, versions, readers = 4, 8, 4
+        errors = []
+        done = threading.Event()
+        
+        def clause(contract_id, version, index):
+            return Clause(
+                clause_id=f"{contract_id}-v{version}-{index}",
+                contract_id=contract_id,
+                clause_version=version,
+                clause_identifier=f"section.{index}",
+                content=f"Clause {index} as of version {version}",
+                metadata={"Clause Summary": f"summary {index}"},
+                created_at=datetime.now(),
+                is_deleted=False,
+                deleted_at=None
+            )
+        
+        def write(worker):
+            try:
+                for c in range(2):
+                    contract_id = f"w{worker}-c{c}"
+                    now = datetime.now()
+                    storage.store_new_contract(
+                        Contract(contract_id, f"{contract_id}.pdf", f"h-{contract_id}", 1, now, now),
+                        [clause(contract_id, 1, i) for i in range(5)]
+                    )
+                    for version in range(2, versions + 1):
+                        storage.store_contract_version(
+                            contract_id, version,
+                            [clause(contract_id, version, version % 5)],
+                            VersionMetadata(contract_id, version, datetime.now(), [], {})
+                        )
+            except Exception as e:
+                errors.append(e)
+        
+        def browse():
+            try:
+                while not done.is_set():
+                    for contract in storage.get_contracts_page(limit=20):
+                        clauses = storage.get_latest_clauses(contract.contract_id)
+                        assert len(clauses) == 5
+                        storage.get_version_history(contract.contract_id)
+            except Exception as e:
+                errors.append(e)
+        
+        reader_threads = [threading.Thread(target=browse) for _ in range(readers)]
+        writer_threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        for thread in reader_threads + writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join(timeout=120)
+        done.set()
+        for thread in reader_threads:
+            thread.join(timeout=30)
+        
+        assert errors == []
+        assert storage.count_contracts() == writers * 2
+        rows = db.execute("""
+            SELECT contract_id, current_version, COUNT(v.version) AS stored
+            FROM contracts JOIN version_metadata v USING (contract_id)
+            GROUP BY contract_id
+        """).fetchall()
+        assert all(r['current_version'] == versions and r['stored'] == versions for r in rows)
+        assert db.verify_integrity()
@@ -6,8 +6,10 @@ metadata retrieval, and version reconstruction.
 """
 
 import pytest
+import tempfile
 import uuid
 from datetime import datetime
+from pathlib import Path
 from unittest.mock import Mock, MagicMock
 
 from src.version_manager import VersionManager, VersionManagerError, VersionedContract
@@ -22,6 +24,7 @@ from src.change_comparator import (
     ClauseComparison,
     ClauseChangeType
 )
+from src.version_database import VersionDatabase
 
 
 @pytest.fixture
@@ -30,6 +33,50 @@ def mock_storage():
     return Mock(spec=DifferentialStorage)
 
 
+@pytest.fixture
+def db_storage():
+    """Create a DifferentialStorage backed by a temporary database."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = VersionDatabase(Path(tmpdir) / "versions.db")
+        yield DifferentialStorage(database=db)
+        db.close()
+
+
+def make_clause(clause_id, version, identifier, content, is_deleted=False):
+    """Helper to create a clause for contract-123."""
+    return Clause(
+        clause_id=clause_id,
+        contract_id="contract-123",
+        clause_version=version,
+        clause_identifier=identifier,
+        content=content,
+        metadata={},
+        created_at=datetime(2024, 1, version, 10, 0, 0),
+        is_deleted=is_deleted,
+        deleted_at=datetime(2024, 1, version, 10, 0, 0) if is_deleted else None
+    )
+
+
+def store_versions(storage, versions):
+    """Store version 1 and then each later list of changed clauses."""
+    storage.store_new_contract(Contract(
+        contract_id="contract-123",
+        filename="test_contract.pdf",
+        file_hash="abc123",
+        current_version=1,
+        created_at=datetime(2024, 1, 1, 10, 0, 0),
+        updated_at=datetime(2024, 1, 1, 10, 0, 0)
+    ), versions[0])
+    for number, changed in enumerate(versions[1:], start=2):
+        storage.store_contract_version("contract-123", number, changed, VersionMetadata(
+            contract_id="contract-123",
+            version=number,
+            timestamp=datetime.now(),
+            changed_clause_ids=[c.clause_id for c in changed],
+            change_summary={}
+        ))
+
+
 @pytest.fixture
 def version_manager(mock_storage):
     """Create a VersionManager instance with mock storage."""
@@ -127,7 +174,7 @@ class TestAssignClauseVersions:
         """Test version assignment preserves version for unchanged clauses."""
         # Setup mock storage to return existing contract and clauses
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_latest_clauses.return_value = sample_clauses
         
         # Create diff with unchanged clauses
         contract_diff = ContractDiff(
@@ -170,7 +217,7 @@ class TestAssignClauseVersions:
     ):
         """Test version assignment assigns new version to modified clauses."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_latest_clauses.return_value = sample_clauses
         
         contract_diff = ContractDiff(
             unchanged_clauses=[],
@@ -212,7 +259,7 @@ class TestAssignClauseVersions:
     ):
         """Test version assignment assigns new version to added clauses."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_latest_clauses.return_value = sample_clauses
         
         contract_diff = ContractDiff(
             unchanged_clauses=[],
@@ -254,7 +301,7 @@ class TestAssignClauseVersions:
     ):
         """Test version assignment marks deleted clauses."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_latest_clauses.return_value = sample_clauses
         
         contract_diff = ContractDiff(
             unchanged_clauses=[],
@@ -295,7 +342,7 @@ class TestAssignClauseVersions:
     ):
         """Test that version metadata is created correctly."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_latest_clauses.return_value = sample_clauses
         
         contract_diff = ContractDiff(
             unchanged_clauses=[],
@@ -368,7 +415,7 @@ class TestReconstructVersion:
     ):
         """Test reconstructing version 1 of a contract."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = sample_clauses
+        mock_storage.get_clauses_at_version.return_value = sample_clauses
         
         metadata = VersionMetadata(
             contract_id="contract-123",
@@ -386,76 +433,27 @@ class TestReconstructVersion:
         assert len(result["clauses"]) == 2
         assert result["version_metadata"] is not None
     
-    def test_reconstruct_version_excludes_future_clauses(
-        self,
-        version_manager,
-        mock_storage,
-        sample_contract
-    ):
+    def test_reconstruct_version_excludes_future_clauses(self, db_storage):
         """Test that reconstruction excludes clauses added after the version."""
-        # Create clauses with different versions
-        clauses = [
-            Clause(
-                clause_id="clause-1",
-                contract_id="contract-123",
-                clause_version=1,
-                clause_identifier="scope_of_work",
-                content="Version 1 content",
-                metadata={},
-                created_at=datetime(2024, 1, 1, 10, 0, 0),
-                is_deleted=False,
-                deleted_at=None
-            ),
-            Clause(
-                clause_id="clause-2",
-                contract_id="contract-123",
-                clause_version=2,
-                clause_identifier="warranty",
-                content="Added in version 2",
-                metadata={},
-                created_at=datetime(2024, 1, 2, 10, 0, 0),
-                is_deleted=False,
-                deleted_at=None
-            )
-        ]
+        store_versions(db_storage, [
+            [make_clause("clause-1", 1, "scope_of_work", "Version 1 content")],
+            [make_clause("clause-2", 2, "warranty", "Added in version 2")],
+        ])
         
-        sample_contract.current_version = 2
-        mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = clauses
-        mock_storage.get_version_history.return_value = []
-        
-        result = version_manager.reconstruct_version("contract-123", 1)
+        result = VersionManager(db_storage).reconstruct_version("contract-123", 1)
         
         # Should only include clause from version 1
         assert len(result["clauses"]) == 1
         assert result["clauses"][0]["clause_identifier"] == "scope_of_work"
     
-    def test_reconstruct_version_excludes_deleted_clauses(
-        self,
-        version_manager,
-        mock_storage,
-        sample_contract
-    ):
+    def test_reconstruct_version_excludes_deleted_clauses(self, db_storage):
         """Test that reconstruction excludes deleted clauses."""
-        clauses = [
-            Clause(
-                clause_id="clause-1",
-                contract_id="contract-123",
-                clause_version=1,
-                clause_identifier="scope_of_work",
-                content="Content",
-                metadata={},
-                created_at=datetime(2024, 1, 1, 10, 0, 0),
-                is_deleted=True,
-                deleted_at=datetime(2024, 1, 2, 10, 0, 0)
-            )
-        ]
+        store_versions(db_storage, [
+            [make_clause("clause-1", 1, "scope_of_work", "Content")],
+            [make_clause("clause-1", 1, "scope_of_work", "Content", is_deleted=True)],
+        ])
         
-        mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = clauses
-        mock_storage.get_version_history.return_value = []
-        
-        result = version_manager.reconstruct_version("contract-123", 1)
+        result = VersionManager(db_storage).reconstruct_version("contract-123", 1)
         
         # Should exclude deleted clause
         assert len(result["clauses"]) == 0
@@ -483,47 +481,75 @@ class TestReconstructVersion:
         with pytest.raises(VersionManagerError, match="Contract not found"):
             version_manager.reconstruct_version("nonexistent", 1)
     
-    def test_reconstruct_version_takes_latest_clause_version(
+    def test_reconstruct_version_takes_latest_clause_version(self, db_storage):
+        """Test that reconstruction takes the latest version of each clause."""
+        store_versions(db_storage, [
+            [make_clause("clause-1", 1, "scope_of_work", "Version 1 content")],
+            [make_clause("clause-1-v2", 2, "scope_of_work", "Version 2 content")],
+        ])
+        
+        result = VersionManager(db_storage).reconstruct_version("contract-123", 2)
+        
+        # Should only include the latest version (version 2)
+        assert len(result["clauses"]) == 1
+        assert result["clauses"][0]["clause_version"] == 2
+        assert result["clauses"][0]["content"] == "Version 2 content"
+    
+    def test_reconstruct_version_is_cached(
         self,
         version_manager,
         mock_storage,
-        sample_contract
+        sample_contract,
+        sample_clauses
     ):
-        """Test that reconstruction takes the latest version of each clause."""
-        # Create multiple versions of the same clause
-        clauses = [
-            Clause(
-                clause_id="clause-1",
-                contract_id="contract-123",
-                clause_version=1,
-                clause_identifier="scope_of_work",
-                content="Version 1 content",
-                metadata={},
-                created_at=datetime(2024, 1, 1, 10, 0, 0),
-                is_deleted=False,
-                deleted_at=None
-            ),
-            Clause(
-                clause_id="clause-1-v2",
-                contract_id="contract-123",
-                clause_version=2,
-                clause_identifier="scope_of_work",
-                content="Version 2 content",
-                metadata={},
-                created_at=datetime(2024, 1, 2, 10, 0, 0),
-                is_deleted=False,
-                deleted_at=None
-            )
-        ]
+        """Test that repeated reconstructions reuse the cached result."""
+        mock_storage.get_contract.return_value = sample_contract
+        mock_storage.get_clauses_at_version.return_value = sample_clauses
+        mock_storage.get_version_history.return_value = []
         
-        sample_contract.current_version = 2
+        first = version_manager.reconstruct_version("contract-123", 1)
+        first["clauses"].clear()  # Callers get a copy, not the cached dict
+        second = version_manager.reconstruct_version("contract-123", 1)
+        
+        assert mock_storage.get_clauses_at_version.call_count == 1
+        assert len(second["clauses"]) == 2
+    
+    def test_reconstruct_cache_invalidated_by_new_version(
+        self,
+        version_manager,
+        mock_storage,
+        sample_contract,
+        sample_clauses
+    ):
+        """Test that storing a version invalidates cached reconstructions."""
         mock_storage.get_contract.return_value = sample_contract
-        mock_storage.get_clauses.return_value = clauses
+        mock_storage.get_clauses_at_version.return_value = sample_clauses
         mock_storage.get_version_history.return_value = []
+        version_manager.reconstruct_version("contract-123", 1)
         
-        result = version_manager.reconstruct_version("contract-123", 2)
+        sample_contract.current_version = 2
+        sample_contract.updated_at = datetime(2024, 1, 2, 10, 0, 0)
+        version_manager.reconstruct_version("contract-123", 1)
         
-        # Should only include the latest version (version 2)
-        assert len(result["clauses"]) == 1
-        assert result["clauses"][0]["clause_version"] == 2
-        assert result["clauses"][0]["content"] == "Version 2 content"
+        assert mock_storage.get_clauses_at_version.call_count == 2
+    
+    def test_reconstruct_cache_evicts_least_recently_used(
+        self,
+        version_manager,
+        mock_storage,
+        sample_contract,
+        sample_clauses
+    ):
+        """Test that the cache is bounded by RECONSTRUCT_CACHE_SIZE."""
+        version_manager.RECONSTRUCT_CACHE_SIZE = 2
+        sample_contract.current_version = 3
+        mock_storage.get_contract.return_value = sample_contract
+        mock_storage.get_clauses_at_version.return_value = sample_clauses
+        mock_storage.get_version_history.return_value = []
+        
+        for version in (1, 2, 1, 3):
+            version_manager.reconstruct_version("contract-123", version)
+        version_manager.reconstruct_version("contract-123", 1)  # Still cached
+        assert mock_storage.get_clauses_at_version.call_count == 3
+        version_manager.reconstruct_version("contract-123", 2)  # Evicted
+        assert mock_storage.get_clauses_at_version.call_count == 4